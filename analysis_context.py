@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Request-scoped analysis context
+
+One AnalysisContext is created per analyzed call. Derived artefacts are
+computed lazily on first use and memoized, so every stage that needs them
+(speaker analysis, logic verdict, bank detection, Gemini prompts, the
+risk model) shares one computation:
+
+- normalized full text
+- lexicon hits per category (against the lexicon version pinned when the
+  context was created, so a hot reload mid-request cannot mix versions)
+- per-speaker keyword hits, with Latin/Devanagari/Bengali spellings of a
+  word merged by phonetic key (phonetic_keys.py)
+- per-speaker fuzzy phrase matches (fuzzy_phrases.py)
+- the WordTable, per-speaker summary and turn-taking features
+- stage results memoized by name (logic verdict, bank analysis, ...)
+
+Every computation goes through memo(), which also records its duration
+under the 'context' stage with an 'artefact' label.
+"""
+
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from pipeline_metrics import stage_timer
+from scam_lexicon import LexiconIndex, get_lexicon, normalize_text
+
+class AnalysisContext:
+    """Lazily computed, memoized artefacts for one transcription (see module docstring)"""
+
+    def __init__(self, transcription_result: Dict, lexicon: Optional[LexiconIndex] = None):
+        self.transcription = transcription_result
+        self.full_text = transcription_result.get('full_text', '')
+        self.lexicon = lexicon or get_lexicon()
+        self._cache: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_text(cls, text: str, lexicon: Optional[LexiconIndex] = None) -> 'AnalysisContext':
+        """Context for a bare transcript (no word timings)"""
+        return cls({'full_text': text, 'words': []}, lexicon)
+
+    def memo(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached artefact `name`, computing it once"""
+        if name in self._cache:
+            return self._cache[name]
+        # Stages of the async pipeline share a context across threads
+        with self._lock:
+            if name not in self._cache:
+                with stage_timer('context', artefact=name.split(':')[0]):
+                    self._cache[name] = compute()
+            return self._cache[name]
+
+    def preset(self, name: str, value: Any):
+        """Install an artefact computed earlier (e.g. stored turn-taking features when rescoring)"""
+        with self._lock:
+            self._cache[name] = value
+
+    def computed(self) -> List[str]:
+        """Names of the artefacts computed so far"""
+        return list(self._cache)
+
+    @property
+    def normalized_text(self) -> str:
+        return self.memo('normalized_text', lambda: normalize_text(self.full_text))
+
+    def find(self, category: str) -> List[str]:
+        """Lexicon terms of a category found in the full text, in lexicon order"""
+        return self.memo(f'lexicon:{category}', lambda: self.lexicon.find(category, self.normalized_text))
+
+    def first(self, category: str) -> Optional[str]:
+        hits = self.find(category)
+        return hits[0] if hits else None
+
+    def contains_any(self, category: str) -> bool:
+        return bool(self.find(category))
+
+    @property
+    def word_table(self):
+        from word_table import WordTable
+        return self.memo('word_table', lambda: WordTable(self.transcription.get('words', [])))
+
+    @property
+    def speaker_summary(self) -> Dict:
+        return self.memo('speaker_summary', lambda: self.word_table.speaker_summary())
+
+    @property
+    def turn_features(self) -> Dict:
+        from turn_taking import analyze_turn_taking
+        return self.memo('turn_features', lambda: analyze_turn_taking(self.word_table))
+
+    def keyword_hits(self, category: str = 'scam_keywords') -> Dict[int, List[str]]:
+        """Per-speaker-code term hits for a lexicon category (script variants merged by phonetic key)"""
+        from phonetic_keys import get_phonetic_index
+
+        def compute():
+            index = get_phonetic_index(self.lexicon, category)
+            return self.word_table.keyword_hits(self.lexicon.term_set(category), index.lookup if index else None)
+        return self.memo(f'keyword_hits:{category}', compute)
+
+    def fuzzy_phrase_hits(self, category: str = 'high_risk_phrases') -> Dict[int, List[Dict]]:
+        """Per-speaker-code approximate phrase matches (empty when fuzzy matching is disabled)"""
+        from fuzzy_phrases import get_fuzzy_index
+
+        def compute():
+            index = get_fuzzy_index(self.lexicon, category)
+            table = self.word_table
+            return {code: index.match(table.speaker_tokens(code, normalized=True)) if index else []
+                    for code in range(table.speaker_count)}
+        return self.memo(f'fuzzy_hits:{category}', compute)
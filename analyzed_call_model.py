@@ -1,14 +1,48 @@
 import os
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError, ConnectionFailure
+from typing import Optional, Dict, Any, List, Iterable, Callable
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, ConnectionFailure, BulkWriteError
+from pymongo.write_concern import WriteConcern
 from bson import ObjectId
 from dotenv import load_dotenv
+from pipeline_metrics import get_logger, stage_timer
+from deferred_sections import STATUS_GENERATING, STATUS_FAILED, STATUS_PENDING, initial_sections
 
 # Load environment variables
 load_dotenv()
 
+logger = get_logger('analyzed_call_model')
+
+# Call lists leave out the stored word columns (only rescoring reads them)
+LIST_PROJECTION = {'transcription.words': 0}
+
+def call_outcome(scam_detected: bool, risk_level: str, overall_risk_score: float) -> str:
+    """alerted / potential_risk / safe, as shown in the dashboard"""
+    if scam_detected or risk_level == 'critical':
+        return 'alerted'
+    if risk_level in ['high', 'medium'] or int(overall_risk_score * 100) >= 40:
+        return 'potential_risk'
+    return 'safe'
+
+def compact_words(words: List[Dict[str, Any]]) -> Dict[str, List]:
+    """Word list stored column by column (a fraction of the size of one dict per word)"""
+    return {
+        'word': [word.get('word', '') for word in words],
+        'speaker_tag': [word.get('speaker_tag') for word in words],
+        'start_time': [round(word.get('start_time') or 0.0, 3) for word in words],
+        'end_time': [round(word.get('end_time') or 0.0, 3) for word in words]
+    }
+
+def expand_words(columns: Optional[Dict[str, List]]) -> List[Dict[str, Any]]:
+    """Inverse of compact_words (empty for documents stored without words)"""
+    if not columns:
+        return []
+    return [{'word': word, 'speaker_tag': speaker, 'start_time': start, 'end_time': end}
+            for word, speaker, start, end in zip(columns['word'], columns['speaker_tag'],
+                                                 columns['start_time'], columns['end_time'])]
+
 class AnalyzedCallModel:
     def __init__(self):
         """Initialize MongoDB connection and analyzed calls collection"""
@@ -37,22 +71,97 @@ class AnalyzedCallModel:
             
             # Test connection before creating indexes
             self.client.admin.command('ping')
-            print("✅ AnalyzedCallModel MongoDB connection successful")
+            logger.info("AnalyzedCallModel MongoDB connection successful")
             
             # Create indexes for better performance
             self.analyzed_calls_collection.create_index("user_id")
             self.analyzed_calls_collection.create_index("timestamp")
             self.analyzed_calls_collection.create_index("probability")
             self.analyzed_calls_collection.create_index("outcome")
+            self.analyzed_calls_collection.create_index("analysis_id")
             self.analyzed_calls_collection.create_index([("user_id", 1), ("timestamp", -1)])
-            print("✅ AnalyzedCallModel indexes created successfully")
-            
-            print("✅ AnalyzedCall MongoDB connection established successfully")
+            logger.info("AnalyzedCallModel indexes created")
             
         except ConnectionFailure as e:
-            print(f"❌ AnalyzedCall MongoDB connection failed: {e}")
+            logger.error("AnalyzedCall MongoDB connection failed", extra={'error': str(e)})
             raise
     
+    def build_analyzed_call_document(self, user_id: Optional[str], call_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the analyzed_calls document for a single analysis record
+        
+        Shared by save_analyzed_call and bulk_save_analyzed_calls so both
+        paths store exactly the same schema.
+        
+        Args:
+            user_id: User's MongoDB ObjectId as string (or None/"anonymous")
+            call_data: Dictionary containing call analysis data
+            
+        Returns:
+            Document ready for insertion
+        """
+        # Extract keywords from analysis
+        keywords = []
+        for speaker_data in call_data.get('analysis', {}).values():
+            keywords.extend(speaker_data.get('scam_keywords', []))
+        
+        # Remove duplicates and filter out phrase markers
+        keywords = list(set([kw for kw in keywords if not kw.startswith('[PHRASE:')]))
+        
+        # Determine outcome based on risk level and scam detection
+        scam_detected = call_data.get('scam_detected', False)
+        risk_level = call_data.get('risk_level', 'safe')
+        overall_risk_score = call_data.get('overall_risk_score', 0.0)
+        
+        # Convert risk score to probability percentage
+        probability = int(overall_risk_score * 100)
+        
+        outcome = call_outcome(scam_detected, risk_level, overall_risk_score)
+        
+        # Keep the original analysis time for backfilled records, stored as ISO string
+        timestamp = call_data.get('timestamp') or datetime.utcnow()
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        
+        return {
+            "analysis_id": call_data.get('analysis_id'),
+            "timestamp": timestamp,
+            "user_id": ObjectId(user_id) if user_id and user_id != "anonymous" else None,
+            "caller": call_data.get('caller', 'Unknown'),
+            "probability": probability,
+            "keywords": keywords,
+            "outcome": outcome,
+            "risk_level": risk_level,
+            "scam_detected": scam_detected,
+            "overall_risk_score": overall_risk_score,
+            "call_summary": call_data.get('call_summary', ''),
+            "gemini_suggestion": call_data.get('gemini_suggestion') or '',
+            "bank_rules": call_data.get('bank_rules') or '',
+            # Status handles for the lazily generated sections above (deferred_sections.py)
+            "sections": call_data.get('sections') or initial_sections(call_data),
+            "logic_scam_detected": call_data.get('logic_scam_detected', False),
+            "logic_reason": call_data.get('logic_reason', ''),
+            "bank_analysis": call_data.get('bank_analysis'),
+            # Cascade tier and skipped heavy stages, for cost vs accuracy reviews
+            "cascade": call_data.get('cascade'),
+            "transcription": {
+                "full_text": call_data.get('transcription', {}).get('full_text', ''),
+                "speaker_count": call_data.get('speakers_count', 0),
+                # Diarized words, so calls can be rescored without STT (rescore_calls.py)
+                "words": compact_words(call_data.get('transcription', {}).get('words') or [])
+            },
+            "ipfs_hash": call_data.get('ipfs_hash'),
+            "ipfs_url": call_data.get('ipfs_url'),
+            "pinata_url": call_data.get('pinata_url'),
+            "analysis": call_data.get('analysis', {}),
+            "metadata": {
+                "audio_duration": call_data.get('audio_duration', 0),
+                "ip_address": call_data.get('ip_address'),
+                "user_agent": call_data.get('user_agent'),
+                "audio_format": call_data.get('audio_format', 'webm')
+            }
+        }
+    
     def save_analyzed_call(self, user_id: str, call_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Save analyzed call data
@@ -65,89 +174,21 @@ class AnalyzedCallModel:
             Dict with success status and call ID
         """
         try:
-            print(f"🔍 DEBUG: AnalyzedCallModel.save_analyzed_call called")
-            print(f"🔍 DEBUG: User ID: {user_id}")
-            print(f"🔍 DEBUG: Call data keys: {list(call_data.keys())}")
-            
-            # Extract keywords from analysis
-            keywords = []
-            if 'analysis' in call_data:
-                print(f"🔍 DEBUG: Analysis data found, extracting keywords...")
-                for speaker_data in call_data['analysis'].values():
-                    if 'scam_keywords' in speaker_data:
-                        keywords.extend(speaker_data['scam_keywords'])
-                        print(f"🔍 DEBUG: Found keywords from speaker: {speaker_data['scam_keywords']}")
-            
-            # Remove duplicates and filter out phrase markers
-            keywords = list(set([kw for kw in keywords if not kw.startswith('[PHRASE:')]))
-            print(f"🔍 DEBUG: Final keywords: {keywords}")
-            
-            # Determine outcome based on risk level and scam detection
-            scam_detected = call_data.get('scam_detected', False)
-            risk_level = call_data.get('risk_level', 'safe')
-            overall_risk_score = call_data.get('overall_risk_score', 0.0)
-            
-            # Extract IPFS information if available
-            ipfs_hash = call_data.get('ipfs_hash')
-            ipfs_url = call_data.get('ipfs_url')
-            pinata_url = call_data.get('pinata_url')
-            
-            # Convert risk score to probability percentage
-            probability = int(overall_risk_score * 100)
-            
-            # Determine outcome
-            if scam_detected or risk_level == 'critical':
-                outcome = 'alerted'
-            elif risk_level in ['high', 'medium'] or probability >= 40:
-                outcome = 'potential_risk'
-            else:
-                outcome = 'safe'
-            
-            print(f"🔍 DEBUG: Calculated values:")
-            print(f"   - Scam detected: {scam_detected}")
-            print(f"   - Risk level: {risk_level}")
-            print(f"   - Overall risk score: {overall_risk_score}")
-            print(f"   - Probability: {probability}")
-            print(f"   - Outcome: {outcome}")
-            
             # Prepare analyzed call document
-            analyzed_call_doc = {
-                "timestamp": datetime.utcnow().isoformat(),
-                "user_id": ObjectId(user_id) if user_id and user_id != "anonymous" else None,
-                "caller": call_data.get('caller', 'Unknown'),
-                "probability": probability,
-                "keywords": keywords,
-                "outcome": outcome,
-                "risk_level": risk_level,
-                "scam_detected": scam_detected,
-                "overall_risk_score": overall_risk_score,
-                "call_summary": call_data.get('call_summary', ''),
-                "gemini_suggestion": call_data.get('gemini_suggestion', ''),
-                "transcription": {
-                    "full_text": call_data.get('transcription', {}).get('full_text', ''),
-                    "speaker_count": call_data.get('speakers_count', 0)
-                },
-                "ipfs_hash": ipfs_hash,
-                "ipfs_url": ipfs_url,
-                "pinata_url": pinata_url,
-                "analysis": call_data.get('analysis', {}),
-                "metadata": {
-                    "audio_duration": call_data.get('audio_duration', 0),
-                    "ip_address": call_data.get('ip_address'),
-                    "user_agent": call_data.get('user_agent'),
-                    "audio_format": call_data.get('audio_format', 'webm')
-                }
-            }
-            
-            print(f"🔍 DEBUG: Prepared document for insertion")
-            print(f"🔍 DEBUG: Document keys: {list(analyzed_call_doc.keys())}")
+            analyzed_call_doc = self.build_analyzed_call_document(user_id, call_data)
             
             # Insert analyzed call
-            print(f"🔍 DEBUG: Attempting to insert document into MongoDB...")
-            result = self.analyzed_calls_collection.insert_one(analyzed_call_doc)
+            with stage_timer('db_write'):
+                result = self.analyzed_calls_collection.insert_one(analyzed_call_doc)
             call_id = str(result.inserted_id)
             
-            print(f"✅ DEBUG: Document inserted successfully with ID: {call_id}")
+            logger.info("Analyzed call saved", extra={
+                'call_id': call_id,
+                'user_id': user_id,
+                'risk_level': analyzed_call_doc['risk_level'],
+                'probability': analyzed_call_doc['probability'],
+                'outcome': analyzed_call_doc['outcome']
+            })
             
             return {
                 "success": True,
@@ -156,15 +197,122 @@ class AnalyzedCallModel:
             }
             
         except Exception as e:
-            print(f"❌ ERROR in save_analyzed_call: {e}")
-            print(f"❌ ERROR type: {type(e)}")
-            import traceback
-            print(f"❌ ERROR traceback: {traceback.format_exc()}")
+            logger.exception("Failed to save analyzed call", extra={'error': str(e)})
             return {
                 "success": False,
                 "error": f"Failed to save analyzed call: {str(e)}"
             }
     
+    def bulk_save_analyzed_calls(self, records: Iterable[Any], batch_size: int = 500,
+                                 write_concern_w: Any = 1,
+                                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Save many analyzed calls using batched, unordered insert_many writes
+        
+        Records are consumed lazily, so any iterable (generator, file reader,
+        cursor) can be passed without materialising the whole backfill.
+        
+        Args:
+            records: Iterable of call_data dicts, or (user_id, call_data) tuples.
+                     A plain dict may carry its own 'user_id' key.
+            batch_size: Number of documents per insert_many call
+            write_concern_w: Write concern for the bulk writes (1 by default,
+                             'majority' to match save_analyzed_call)
+            progress_callback: Optional callable receiving each batch report
+            
+        Returns:
+            Dict with success status, totals and per-batch reports
+        """
+        if batch_size < 1:
+            return {
+                "success": False,
+                "error": "batch_size must be at least 1"
+            }
+        
+        collection = self.analyzed_calls_collection.with_options(
+            write_concern=WriteConcern(w=write_concern_w)
+        )
+        
+        batches = []
+        totals = {"submitted": 0, "inserted": 0, "failed": 0, "invalid": 0}
+        started = time.perf_counter()
+        
+        def flush(documents, invalid):
+            batch_started = time.perf_counter()
+            inserted = 0
+            errors = []
+            if documents:
+                try:
+                    result = collection.insert_many(documents, ordered=False)
+                    inserted = len(result.inserted_ids)
+                except BulkWriteError as e:
+                    details = e.details or {}
+                    inserted = details.get('nInserted', 0)
+                    for write_error in details.get('writeErrors', []):
+                        errors.append({
+                            "index": write_error.get('index'),
+                            "code": write_error.get('code'),
+                            "message": write_error.get('errmsg', '')[:200]
+                        })
+                except Exception as e:
+                    errors.append({"index": None, "code": None, "message": str(e)})
+            elapsed = time.perf_counter() - batch_started
+            
+            report = {
+                "batch": len(batches) + 1,
+                "submitted": len(documents) + invalid,
+                "inserted": inserted,
+                "failed": len(documents) - inserted,
+                "invalid": invalid,
+                "seconds": round(elapsed, 4),
+                "docs_per_second": round(inserted / elapsed, 1) if elapsed > 0 else 0.0,
+                "errors": errors
+            }
+            batches.append(report)
+            totals["submitted"] += report["submitted"]
+            totals["inserted"] += inserted
+            totals["failed"] += report["failed"]
+            totals["invalid"] += invalid
+            
+            logger.info("Bulk batch written", extra={key: value for key, value in report.items() if key != 'errors'})
+            if progress_callback:
+                progress_callback(report)
+        
+        documents = []
+        invalid = 0
+        for record in records:
+            try:
+                if isinstance(record, tuple):
+                    user_id, call_data = record
+                else:
+                    call_data = record
+                    user_id = call_data.get('user_id')
+                documents.append(self.build_analyzed_call_document(
+                    str(user_id) if user_id else None, call_data
+                ))
+            except Exception as e:
+                logger.warning("Skipping invalid analysis record", extra={'error': str(e)})
+                invalid += 1
+            
+            if len(documents) + invalid >= batch_size:
+                flush(documents, invalid)
+                documents = []
+                invalid = 0
+        
+        if documents or invalid:
+            flush(documents, invalid)
+        
+        elapsed = time.perf_counter() - started
+        logger.info("Bulk ingest complete", extra=dict(totals, seconds=round(elapsed, 2)))
+        
+        return {
+            "success": totals["failed"] == 0 and totals["invalid"] == 0,
+            "totals": totals,
+            "seconds": round(elapsed, 4),
+            "docs_per_second": round(totals["inserted"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "batches": batches
+        }
+    
     def get_user_analyzed_calls(self, user_id: str, limit: int = 50, offset: int = 0, 
                                risk_filter: str = 'all') -> Dict[str, Any]:
         """
@@ -196,7 +344,7 @@ class AnalyzedCallModel:
             total_count = self.analyzed_calls_collection.count_documents(query_filter)
             
             # Get analyzed calls with pagination
-            calls = list(self.analyzed_calls_collection.find(query_filter)
+            calls = list(self.analyzed_calls_collection.find(query_filter, LIST_PROJECTION)
                         .sort("timestamp", -1)
                         .skip(offset)
                         .limit(limit))
@@ -322,7 +470,7 @@ class AnalyzedCallModel:
             }
             
             # Get search results
-            calls = list(self.analyzed_calls_collection.find(search_filter)
+            calls = list(self.analyzed_calls_collection.find(search_filter, LIST_PROJECTION)
                         .sort("timestamp", -1)
                         .limit(limit))
             
@@ -397,7 +545,7 @@ class AnalyzedCallModel:
                 query["user_id"] = ObjectId(user_id)
             
             # Get calls with pagination
-            calls = list(self.analyzed_calls_collection.find(query)
+            calls = list(self.analyzed_calls_collection.find(query, LIST_PROJECTION)
                         .sort("timestamp", -1)
                         .skip(offset)
                         .limit(limit))
@@ -421,7 +569,7 @@ class AnalyzedCallModel:
             return calls
             
         except Exception as e:
-            print(f"❌ Error getting analyzed calls: {e}")
+            logger.error("Error getting analyzed calls", extra={'error': str(e)})
             return []
     
     def get_analyzed_call_by_id(self, analysis_id, user_id=None):
@@ -438,20 +586,89 @@ class AnalyzedCallModel:
                 call["_id"] = str(call["_id"])
                 if call.get("user_id"):
                     call["user_id"] = str(call["user_id"])
-                if call.get("timestamp"):
+                if isinstance(call.get("timestamp"), datetime):
                     call["timestamp"] = call["timestamp"].isoformat()
             
             return call
             
         except Exception as e:
-            print(f"❌ Error getting analyzed call by ID: {e}")
+            logger.error("Error getting analyzed call by ID", extra={'error': str(e)})
             return None
+    
+    def claim_deferred_section(self, analysis_id: str, name: str, stale_before: str) -> bool:
+        """
+        Atomically mark a deferred section as generating
+        
+        Succeeds for pending, failed or missing sections, and for generating ones
+        claimed before `stale_before` (ISO timestamp). Returns False when
+        another reader holds the claim or the section is already resolved.
+        """
+        try:
+            field = f"sections.{name}"
+            claimed = self.analyzed_calls_collection.find_one_and_update(
+                {
+                    "analysis_id": analysis_id,
+                    "$or": [
+                        {f"{field}.status": {"$in": [STATUS_PENDING, STATUS_FAILED]}},
+                        {field: {"$exists": False}},
+                        {f"{field}.status": STATUS_GENERATING, f"{field}.claimed_at": {"$lt": stale_before}}
+                    ]
+                },
+                {"$set": {f"{field}.status": STATUS_GENERATING, f"{field}.claimed_at": datetime.utcnow().isoformat()}},
+                projection={"_id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            return claimed is not None
+        except Exception as e:
+            logger.error("Error claiming deferred section", extra={'analysis_id': analysis_id, 'section': name,
+                                                                   'error': str(e)})
+            return False
+    
+    def store_deferred_section(self, analysis_id: str, name: str, section: Dict[str, Any],
+                               text: Optional[str] = None) -> bool:
+        """Store a generated section's status handle and, when ready, its text"""
+        try:
+            update = {f"sections.{name}": section}
+            if text is not None:
+                update[name] = text
+            with stage_timer('db_write', op='deferred_section'):
+                result = self.analyzed_calls_collection.update_one({"analysis_id": analysis_id}, {"$set": update})
+            return result.matched_count > 0
+        except Exception as e:
+            logger.error("Error storing deferred section", extra={'analysis_id': analysis_id, 'section': name,
+                                                                  'error': str(e)})
+            return False
 
+    def update_verdicts(self, updates: List[tuple], write_concern_w: Any = 1) -> Dict[str, Any]:
+        """
+        Apply rescored verdicts with one unordered bulk_write
+        
+        Args:
+            updates: (document _id, fields to $set) pairs
+        """
+        if not updates:
+            return {"success": True, "matched": 0, "modified": 0, "errors": []}
+        collection = self.analyzed_calls_collection.with_options(write_concern=WriteConcern(w=write_concern_w))
+        try:
+            result = collection.bulk_write([UpdateOne({"_id": _id}, {"$set": fields}) for _id, fields in updates],
+                                           ordered=False)
+            return {"success": True, "matched": result.matched_count, "modified": result.modified_count, "errors": []}
+        except BulkWriteError as e:
+            details = e.details or {}
+            errors = [{"index": error.get('index'), "message": error.get('errmsg', '')[:200]}
+                      for error in details.get('writeErrors', [])]
+            logger.error("Verdict bulk update had errors", extra={'errors': len(errors)})
+            return {"success": False, "matched": details.get('nMatched', 0), "modified": details.get('nModified', 0),
+                    "errors": errors}
+        except Exception as e:
+            logger.error("Verdict bulk update failed", extra={'error': str(e)})
+            return {"success": False, "matched": 0, "modified": 0, "errors": [{"index": None, "message": str(e)}]}
+    
     def close_connection(self):
         """Close MongoDB connection"""
         if hasattr(self, 'client'):
             self.client.close()
-            print("✅ AnalyzedCall MongoDB connection closed")
+            logger.info("AnalyzedCall MongoDB connection closed")
 
 # Global instance
 analyzed_call_model = AnalyzedCallModel()
@@ -28,6 +28,25 @@ import base64
 import uuid
 from datetime import datetime
 from email_service import send_call_analysis_notification
+import time
+from flask import Response
+from pipeline_metrics import (
+    get_logger, stage_timer, metrics_registry, request_latency, request_count,
+    start_request_trace, end_request_trace, get_request_timings
+)
+
+from scam_lexicon import get_lexicon, reload_lexicon
+from risk_model import get_risk_model
+from analysis_context import AnalysisContext
+from cascade import canned_suggestion
+from feature_graph import PROFILE_NAMES
+from feature_store import get_feature_store, store_call_features
+from deferred_sections import DEFERRED_SECTIONS, DeferredSectionResolver, initial_sections, should_prefetch
+from async_pipeline import AsyncAnalysisPipeline, StageError, convert_to_wav
+from concurrent.futures import ThreadPoolExecutor
+from flask import stream_with_context
+
+logger = get_logger('api_server')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
@@ -35,6 +54,76 @@ CORS(app)  # Enable CORS for frontend
 # Initialize the scam detector
 scam_detector = CompleteScamDetector()
 
+# Side work (IPFS upload, email, deferred-section prefetch) off the request thread
+_background_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='background')
+
+# Generates and caches the lazily computed Gemini sections of stored calls
+section_resolver = DeferredSectionResolver(scam_detector, analyzed_call_model)
+
+# Readiness state: flipped by warm_up() once models have run once, and back
+# off when a worker starts shutting down so load balancers drain it first
+_serving_state = {'ready': False, 'warmed_at': None, 'shutting_down': False, 'checks': {}}
+
+def warm_up():
+    """Run each heavy model once so the first real request does not pay for lazy init/JIT"""
+    checks = {}
+    
+    with stage_timer('warm_up', component='speaker_analysis'):
+        try:
+            scam_detector.analyze_speakers({
+                'full_text': 'hello this is a warm up call',
+                'speaker_text': {1: ['hello', 'this', 'is'], 2: ['a', 'warm', 'up', 'call']},
+                'words': []
+            })
+            checks['speaker_analysis'] = True
+        except Exception as e:
+            logger.error("Speaker analysis warm up failed", extra={'error': str(e)})
+            checks['speaker_analysis'] = False
+    
+    if MOZILLA_VOICE_AVAILABLE and mozilla_voice_analyzer:
+        with stage_timer('warm_up', component='voice_analysis'):
+            warm_path = None
+            try:
+                import numpy as np
+                import soundfile as sf
+                
+                # One second of quiet tone is enough to compile librosa's numba kernels
+                t = np.arange(16000) / 16000.0
+                with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as warm_file:
+                    warm_path = warm_file.name
+                sf.write(warm_path, (0.1 * np.sin(2 * np.pi * 150.0 * t)).astype(np.float32), 16000)
+                mozilla_voice_analyzer.extract_audio_features(warm_path)
+                checks['voice_analysis'] = True
+            except Exception as e:
+                logger.error("Voice analysis warm up failed", extra={'error': str(e)})
+                checks['voice_analysis'] = False
+            finally:
+                if warm_path and os.path.exists(warm_path):
+                    os.unlink(warm_path)
+    
+    checks['gemini'] = scam_detector.gemini_model is not None
+    _serving_state.update(ready=checks['speaker_analysis'], warmed_at=datetime.utcnow().isoformat(), checks=checks)
+    logger.info("Models warmed up", extra={'ready': _serving_state['ready'], 'checks': checks})
+    return _serving_state['ready']
+
+def reset_clients_after_fork():
+    """
+    Re-create network clients inherited from a preloading parent process
+    
+    gRPC channels are not fork-safe, and pymongo clients should not share
+    sockets across processes (a closed MongoClient reopens on next use).
+    """
+    from google.cloud import speech
+    scam_detector.speech_client = speech.SpeechClient()
+    for model in (analyzed_call_model, user_model):
+        client = getattr(model, 'client', None)
+        if client is not None:
+            client.close()
+
+def mark_shutting_down():
+    """Report not-ready so in-flight requests can finish while traffic drains"""
+    _serving_state.update(ready=False, shutting_down=True)
+
 # Authentication decorator
 def require_auth(f):
     @wraps(f)
@@ -74,10 +163,11 @@ def require_auth(f):
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Liveness probe: the process is up and serving requests (readiness is /api/ready)"""
     return jsonify({
         'status': 'healthy',
-        'message': 'Scam Detection API is running'
+        'message': 'Scam Detection API is running',
+        'pid': os.getpid()
     })
 
 # Authentication endpoints
@@ -296,78 +386,92 @@ def get_user_statistics():
 @app.route('/api/analyze-audio', methods=['POST'])
 def analyze_audio():
     """Analyze audio file for scam detection"""
+    trace_token = start_request_trace()
+    request_started = time.perf_counter()
+    outcome = 'error'
     try:
         # Get audio data from request
         data = request.get_json()
         
         if 'audio' not in data:
+            outcome = 'bad_request'
             return jsonify({
                 'success': False,
                 'error': 'No audio data provided'
             }), 400
         
-        # Decode base64 audio
-        audio_base64 = data['audio']
-        audio_bytes = base64.b64decode(audio_base64)
+        include_timings = bool(data.get('include_timings')) or request.args.get('timings') in ('1', 'true')
+        # Run every heavy stage regardless of the cascade tier
+        force_full = bool(data.get('full_analysis')) or request.args.get('full') in ('1', 'true')
         
-        # Save audio to temporary file (WebM format from browser)
-        with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_file:
-            temp_file.write(audio_bytes)
-            temp_file_path = temp_file.name
-        
-        # Convert WebM to WAV for Google STT (like two_person_test.py)
-        wav_file_path = temp_file_path.replace('.webm', '.wav')
-        try:
-            from pydub import AudioSegment
-            
-            # Load WebM audio and convert to WAV
-            audio = AudioSegment.from_file(temp_file_path, format="webm")
+        with stage_timer('decode'):
+            # Decode base64 audio
+            audio_base64 = data['audio']
+            audio_bytes = base64.b64decode(audio_base64)
             
-            # Convert to 16kHz mono WAV with 16-bit samples
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            # Force 16-bit samples
-            audio = audio.set_sample_width(2)  # 2 bytes = 16 bits
-            audio.export(wav_file_path, format="wav")
+            # Save audio to temporary file (WebM format from browser)
+            with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as temp_file:
+                temp_file.write(audio_bytes)
+                temp_file_path = temp_file.name
             
-            # Use the WAV file for transcription
-            temp_file_path = wav_file_path
-            print(f"✅ Converted WebM to WAV using pydub: {wav_file_path}")
-            
-        except Exception as e:
-            print(f"⚠️ Pydub conversion failed: {e}")
-            print("🔄 Trying direct WebM processing...")
-            # Keep original WebM file if conversion fails
+            # Convert WebM to WAV for Google STT (like two_person_test.py)
+            wav_file_path = temp_file_path.replace('.webm', '.wav')
+            try:
+                from pydub import AudioSegment
+                
+                # Load WebM audio and convert to WAV
+                audio = AudioSegment.from_file(temp_file_path, format="webm")
+                
+                # Convert to 16kHz mono WAV with 16-bit samples
+                audio = audio.set_frame_rate(16000).set_channels(1)
+                # Force 16-bit samples
+                audio = audio.set_sample_width(2)  # 2 bytes = 16 bits
+                audio.export(wav_file_path, format="wav")
+                
+                # Use the WAV file for transcription
+                temp_file_path = wav_file_path
+                logger.debug("Converted WebM to WAV using pydub", extra={'path': wav_file_path})
+                
+            except Exception as e:
+                logger.warning("Pydub conversion failed, trying direct WebM processing", extra={'error': str(e)})
+                # Keep original WebM file if conversion fails
         
         try:
             # Transcribe with diarization
-            print(f"🔄 Starting transcription for: {temp_file_path}")
             transcription_result = scam_detector.transcribe_with_diarization(temp_file_path)
             
             if not transcription_result:
-                print("❌ Transcription failed - no result")
+                logger.error("Transcription failed - no result")
+                outcome = 'transcription_failed'
                 return jsonify({
                     'success': False,
                     'error': 'Transcription failed'
                 }), 500
             
-            print("✅ Transcription successful, analyzing speakers...")
+            # Derived text artefacts (normalized text, lexicon hits, logic verdict...) are
+            # computed once per request and shared by every stage below
+            context = AnalysisContext(transcription_result)
+            
             # Analyze speakers
-            analysis_results = scam_detector.analyze_speakers(transcription_result)
-            print("✅ Speaker analysis completed")
+            with stage_timer('speaker_analysis'):
+                analysis_results = scam_detector.analyze_speakers(transcription_result, context)
+            
+            # Repeat-caller lookup against stored voice prints (enabled by VOICE_INDEX_DIR)
+            voice_embeddings = {}
+            try:
+                voice_matches, voice_embeddings = scam_detector.match_speaker_voices(temp_file_path, transcription_result)
+                for speaker, match in voice_matches.items():
+                    if speaker in analysis_results:
+                        analysis_results[speaker]['voice_match'] = match
+            except Exception as e:
+                logger.error("Voice matching failed", extra={'error': str(e)})
             
             # Calculate overall risk score and level
             scam_detected = any(result['is_potential_scammer'] for result in analysis_results.values())
             overall_risk_score = max([result['risk_score'] for result in analysis_results.values()], default=0)
             
             # Determine risk level
-            if overall_risk_score >= 0.7:
-                risk_level = 'critical'
-            elif overall_risk_score >= 0.4:
-                risk_level = 'high'
-            elif overall_risk_score >= 0.2:
-                risk_level = 'medium'
-            else:
-                risk_level = 'safe'
+            risk_level = scam_detector.get_risk_level(overall_risk_score)
             
             # Generate call summary
             call_summary = f"Call analyzed with {len(analysis_results)} speakers. "
@@ -376,47 +480,49 @@ def analyze_audio():
             else:
                 call_summary += f"✅ Safe conversation - Risk Level: {risk_level.upper()}"
             
-            # Get Gemini AI suggestion and analysis
-            print("🤖 Getting Gemini AI suggestion...")
-            gemini_suggestion = scam_detector.get_gemini_suggestion(
-                transcription_result['full_text'], 
-                scam_detected, 
-                risk_level
-            )
-            print("✅ Gemini AI suggestion received")
-            
-            # Check for bank-related content and get bank rules
-            print("🏦 Checking for bank-related content...")
-            bank_analysis = scam_detector.detect_bank_related_content(
-                transcription_result['full_text'], 
-                []  # We'll extract keywords from the analysis results
-            )
+            # Cheap-stage triage: Gemini only runs for ambiguous calls (or ?full=1)
+            cascade = scam_detector.triage_call(context, analysis_results, force=force_full, endpoint='analyze_audio')
             
+            # Gemini advice and bank rules are deferred sections (deferred_sections.py): generated on
+            # the first read of /api/analyzed-calls/<id>, or prefetched for high-risk calls after the save.
+            # Calls the cascade settled get their canned advice right away.
+            gemini_suggestion = None if cascade['plan']['gemini_suggestion'] else canned_suggestion(cascade)
             bank_rules = ""
-            if bank_analysis['is_bank_related']:
-                print(f"🏦 Bank-related content detected: {bank_analysis['bank_keywords_detected']}")
-                bank_rules = scam_detector.get_bank_rules_from_gemini(
-                    transcription_result['full_text'],
-                    bank_analysis['bank_keywords_detected']
+            
+            # Check for bank-related content
+            with stage_timer('bank_detection'):
+                bank_analysis = scam_detector.detect_bank_related_content(
+                    transcription_result['full_text'], 
+                    [],  # We'll extract keywords from the analysis results
+                    context
                 )
-                print("✅ Bank rules generated")
-            else:
-                print("ℹ️ No bank-related content detected")
             
             # Run logic-based analysis to get more accurate scam detection
             logic_scam_detected, logic_reason = scam_detector.analyze_conversation_logic(
-                transcription_result['full_text']
+                transcription_result['full_text'], context
             )
             
             # Use Gemini's analysis to override scam detection
             final_scam_detected = logic_scam_detected or scam_detected
             if logic_scam_detected:
-                print(f"🚨 Gemini logic detected scam: {logic_reason}")
+                logger.warning("Logic detected scam", extra={'reason': logic_reason})
                 overall_risk_score = max(overall_risk_score, 0.9)
                 risk_level = 'critical'
             
+            # Calibrated probability from the trained risk model, when one is deployed
+            scored = scam_detector.apply_risk_model({
+                'transcription': transcription_result,
+                'analysis': analysis_results,
+                'overall_risk_score': overall_risk_score,
+                'risk_level': risk_level,
+                'scam_detected': final_scam_detected,
+                'logic_scam_detected': logic_scam_detected
+            }, context=context)
+            overall_risk_score = scored['overall_risk_score']
+            risk_level = scored['risk_level']
+            final_scam_detected = scored['scam_detected']
+            
             # Format response
-            print("🔄 Formatting response...")
             response_data = {
                 'success': True,
                 'data': {
@@ -427,11 +533,16 @@ def analyze_audio():
                     'overall_risk_score': overall_risk_score,
                     'risk_level': risk_level,
                     'call_summary': call_summary,
-                    'gemini_suggestion': gemini_suggestion,
+                    'gemini_suggestion': gemini_suggestion or '',
                     'logic_scam_detected': logic_scam_detected,
                     'logic_reason': logic_reason,
                     'bank_analysis': bank_analysis,
-                    'bank_rules': bank_rules
+                    'bank_rules': bank_rules,
+                    'known_scam_voice': any(result.get('voice_match', {}).get('known_scam_voice')
+                                            for result in analysis_results.values()),
+                    'risk_scorer': scored['risk_scorer'],
+                    'risk_model': scored.get('risk_model'),
+                    'cascade': cascade
                 }
             }
             
@@ -439,7 +550,6 @@ def analyze_audio():
             ipfs_info = None
             if PINATA_AVAILABLE:
                 try:
-                    print("📤 Uploading audio to Pinata IPFS...")
                     pinata_service = get_pinata_service()
                     
                     # Generate filename with timestamp
@@ -461,27 +571,25 @@ def analyze_audio():
                     ipfs_info = pinata_service.upload_audio_file(audio_bytes, filename, metadata)
                     
                     if ipfs_info:
-                        print(f"✅ Audio uploaded to IPFS: {ipfs_info['ipfs_hash']}")
                         # Add IPFS info to response
                         response_data['data']['ipfs_hash'] = ipfs_info['ipfs_hash']
                         response_data['data']['ipfs_url'] = ipfs_info['ipfs_url']
                         response_data['data']['pinata_url'] = ipfs_info['pinata_url']
                     else:
-                        print("❌ Failed to upload audio to IPFS")
+                        logger.error("Failed to upload audio to IPFS")
                         
                 except Exception as e:
-                    print(f"❌ Error uploading to Pinata: {e}")
+                    logger.error("Error uploading to Pinata", extra={'error': str(e)})
                     # Continue without IPFS upload
             else:
-                print("ℹ️ Pinata not available, skipping IPFS upload")
+                logger.debug("Pinata not available, skipping IPFS upload")
             
             # Store analysis data in database
-            print("🔄 Starting database storage process...")
+            analysis_record = None
+            saved = False
             try:
                 # Get user info if authenticated
                 user_id = getattr(request, 'current_user', {}).get('user_id') if hasattr(request, 'current_user') else None
-                print(f"🔍 User ID: {user_id}")
-                print(f"🔍 Has current_user: {hasattr(request, 'current_user')}")
                 
                 # Create analysis record in the format expected by save_analyzed_call
                 analysis_record = {
@@ -496,6 +604,9 @@ def analyze_audio():
                     'logic_scam_detected': logic_scam_detected,
                     'logic_reason': logic_reason,
                     'call_summary': call_summary,
+                    'bank_analysis': bank_analysis,
+                    'bank_rules': bank_rules,
+                    'cascade': cascade,
                     'audio_duration': len(audio_bytes) / (16000 * 2) if 'audio_bytes' in locals() else 0,
                     'speakers_count': len(analysis_results),
                     'keywords_found': [keyword for result in analysis_results.values() for keyword in result.get('scam_keywords', [])],
@@ -504,34 +615,42 @@ def analyze_audio():
                     'ipfs_url': ipfs_info['ipfs_url'] if ipfs_info else None,
                     'pinata_url': ipfs_info['pinata_url'] if ipfs_info else None
                 }
+                analysis_record['sections'] = initial_sections(analysis_record)
+                response_data['data']['sections'] = analysis_record['sections']
                 
-                print(f"🔍 Analysis record created: {analysis_record['analysis_id']}")
-                print(f"🔍 Record keys: {list(analysis_record.keys())}")
-                print(f"🔍 Transcription text length: {len(transcription_result.get('full_text', ''))}")
-                print(f"🔍 Speakers detected: {len(analysis_results)}")
-                print(f"🔍 Keywords found: {len(analysis_record['keywords_found'])}")
-                
-                # Save to analyzed_calls collection
-                print("🔄 Calling analyzed_call_model.save_analyzed_call...")
-                print(f"🔍 User ID for save: {user_id}")
-                print(f"🔍 Analysis record type: {type(analysis_record)}")
+                logger.debug("Analysis record created", extra={
+                    'analysis_id': analysis_record['analysis_id'],
+                    'user_id': user_id,
+                    'text_length': len(transcription_result.get('full_text', '')),
+                    'speakers': len(analysis_results),
+                    'keywords': len(analysis_record['keywords_found'])
+                })
                 
                 # Handle None user_id - pass None to the method
                 user_id_str = str(user_id) if user_id else None
-                print(f"🔍 User ID for save: {user_id_str}")
                 
                 save_result = analyzed_call_model.save_analyzed_call(user_id_str, analysis_record)
-                print(f"🔍 Save result: {save_result}")
                 
                 if save_result.get('success'):
-                    print("✅ Analysis data stored in database successfully")
+                    saved = True
                     # Add analysis_id to response
                     response_data['data']['analysis_id'] = analysis_record['analysis_id']
                     
+                    # High-risk calls get their deferred sections generated off the request thread
+                    if should_prefetch(analysis_record):
+                        _background_pool.submit(section_resolver.prefetch, dict(analysis_record))
+                    
+                    try:
+                        scam_detector.index_speaker_voices(voice_embeddings, analysis_record)
+                    except Exception as e:
+                        logger.error("Voice indexing failed", extra={'error': str(e)})
+                    
+                    if get_feature_store() is not None:
+                        _background_pool.submit(store_call_features, dict(analysis_record), None, None, context)
+                    
                     # Send email notification if user is authenticated
                     if user_id:
                         try:
-                            print("📧 Sending email notification...")
                             # Get user info for email
                             user_info = user_model.get_user_by_id(user_id)
                             if user_info:
@@ -552,29 +671,37 @@ def analyze_audio():
                                     
                                     # Send email notification
                                     email_sent = send_call_analysis_notification(user_email, user_name, email_data)
-                                    if email_sent:
-                                        print(f"✅ Email notification sent to {user_email}")
-                                    else:
-                                        print(f"❌ Failed to send email to {user_email}")
+                                    if not email_sent:
+                                        logger.error("Failed to send email notification", extra={'to': user_email})
                                 else:
-                                    print("❌ User email not found, skipping email notification")
+                                    logger.info("User email not found, skipping email notification")
                             else:
-                                print("❌ User info not found, skipping email notification")
+                                logger.info("User info not found, skipping email notification")
                         except Exception as e:
-                            print(f"❌ Error sending email notification: {e}")
+                            logger.error("Error sending email notification", extra={'error': str(e)})
                             # Don't fail the request if email fails
                     else:
-                        print("ℹ️ No authenticated user, skipping email notification")
+                        logger.debug("No authenticated user, skipping email notification")
                 else:
-                    print(f"❌ Database save failed: {save_result.get('error', 'Unknown error')}")
+                    logger.error("Database save failed", extra={'error': save_result.get('error', 'Unknown error')})
                 
             except Exception as e:
-                print(f"❌ Exception in database storage: {e}")
-                import traceback
-                print(f"🔍 Full traceback: {traceback.format_exc()}")
+                logger.exception("Exception in database storage", extra={'error': str(e)})
                 # Continue without failing the request
             
-            print("✅ Response formatted successfully")
+            # An unsaved call cannot be read back later, so its sections are generated now
+            if analysis_record is not None and not saved:
+                section_resolver.generate_unsaved(analysis_record)
+                response_data['data'].update({key: analysis_record.get(key) or '' for key in DEFERRED_SECTIONS})
+                response_data['data']['sections'] = analysis_record['sections']
+            
+            outcome = 'scam' if final_scam_detected else 'safe'
+            if include_timings:
+                response_data['data']['timings'] = get_request_timings()
+                response_data['data']['timings'].append({
+                    'stage': 'total',
+                    'ms': round((time.perf_counter() - request_started) * 1000.0, 2)
+                })
             return jsonify(response_data)
             
         finally:
@@ -585,10 +712,244 @@ def analyze_audio():
                 os.unlink(wav_file_path)
                 
     except Exception as e:
+        logger.exception("Analyze audio request failed", extra={'error': str(e)})
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
+    
+    finally:
+        elapsed = time.perf_counter() - request_started
+        request_latency.observe(elapsed, endpoint='analyze_audio')
+        request_count.inc(endpoint='analyze_audio', outcome=outcome)
+        timings = end_request_trace(trace_token)
+        logger.info("Analyze audio request finished", extra={
+            'outcome': outcome,
+            'ms': round(elapsed * 1000.0, 2),
+            'stages': ','.join(f"{t['stage']}={t['ms']}" for t in timings)
+        })
+
+@app.route('/api/analyze-audio-async', methods=['POST'])
+async def analyze_audio_async():
+    """
+    Same analysis as /api/analyze-audio, run as an async stage graph
+    
+    Independent stages (STT language configs, IPFS upload, user lookup)
+    overlap, so latency follows the critical path instead of
+    the sum of all stages. Requires Flask's async extra (asgiref).
+    """
+    trace_token = start_request_trace()
+    request_started = time.perf_counter()
+    outcome = 'error'
+    try:
+        data = request.get_json()
+        if not data or 'audio' not in data:
+            outcome = 'bad_request'
+            return jsonify({
+                'success': False,
+                'error': 'No audio data provided'
+            }), 400
+        
+        with stage_timer('decode', step='base64'):
+            audio_bytes = base64.b64decode(data['audio'])
+        
+        user_id = getattr(request, 'current_user', {}).get('user_id') if hasattr(request, 'current_user') else None
+        pipeline = AsyncAnalysisPipeline(
+            scam_detector, analyzed_call_model, user_model,
+            pinata_factory=get_pinata_service if PINATA_AVAILABLE else None,
+            email_sender=send_call_analysis_notification,
+            section_resolver=section_resolver,
+            prefetch_submitter=_background_pool.submit
+        )
+        force_full = bool(data.get('full_analysis')) or request.args.get('full') in ('1', 'true')
+        result = await pipeline.analyze(audio_bytes, user_id=user_id, force_full=force_full)
+        outcome = 'scam' if result['scam_detected'] else 'safe'
+        return jsonify({'success': True, 'data': result})
+        
+    except StageError as e:
+        outcome = f"{e.stage}_failed"
+        logger.error("Async analysis failed", extra={'stage': e.stage, 'error': str(e.error)})
+        return jsonify({
+            'success': False,
+            'error': 'Transcription failed' if e.stage == 'stt' else str(e)
+        }), 500
+    except Exception as e:
+        logger.exception("Async analysis request failed", extra={'error': str(e)})
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+    finally:
+        elapsed = time.perf_counter() - request_started
+        request_latency.observe(elapsed, endpoint='analyze_audio_async')
+        request_count.inc(endpoint='analyze_audio_async', outcome=outcome)
+        end_request_trace(trace_token)
+
+def sse_event(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+@app.route('/api/analyze-audio-stream', methods=['POST'])
+def analyze_audio_stream():
+    """
+    Analyze audio and stream partial results as Server-Sent Events
+    
+    Events, in order: transcript (as soon as STT returns), verdict (rule-based
+    scoring and logic analysis), suggestion_token (Gemini text as it is
+    generated), suggestion (formatted full text), bank_rules, saved, done.
+    An error event ends the stream early. The body is the same JSON as
+    /api/analyze-audio; read it with fetch() and a stream reader.
+    """
+    data = request.get_json(silent=True) or {}
+    if 'audio' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'No audio data provided'
+        }), 400
+    
+    audio_bytes = base64.b64decode(data['audio'])
+    user_id = getattr(request, 'current_user', {}).get('user_id') if hasattr(request, 'current_user') else None
+    force_full = bool(data.get('full_analysis')) or request.args.get('full') in ('1', 'true')
+    
+    def generate():
+        trace_token = start_request_trace()
+        request_started = time.perf_counter()
+        outcome = 'error'
+        wav_path = None
+        try:
+            analysis_id = str(uuid.uuid4())
+            
+            # The IPFS upload only needs the raw audio, so start it right away
+            ipfs_future = None
+            if PINATA_AVAILABLE:
+                filename = f"audio_analysis_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.wav"
+                ipfs_future = _background_pool.submit(
+                    get_pinata_service().upload_audio_file, audio_bytes, filename, {'analysis_id': analysis_id}
+                )
+            
+            with stage_timer('decode'):
+                wav_path = convert_to_wav(audio_bytes)
+            
+            transcription_result = scam_detector.transcribe_with_diarization(wav_path)
+            if not transcription_result:
+                outcome = 'transcription_failed'
+                yield sse_event('error', {'error': 'Transcription failed'})
+                return
+            yield sse_event('transcript', transcription_result)
+            
+            full_text = transcription_result['full_text']
+            context = AnalysisContext(transcription_result)
+            with stage_timer('speaker_analysis'):
+                analysis_results = scam_detector.analyze_speakers(transcription_result, context)
+            scam_detected = any(result['is_potential_scammer'] for result in analysis_results.values())
+            risk_score = max([result['risk_score'] for result in analysis_results.values()], default=0)
+            speakers = {
+                'analysis': analysis_results,
+                'scam_detected': scam_detected,
+                'overall_risk_score': risk_score,
+                'risk_level': scam_detector.get_risk_level(risk_score)
+            }
+            logic_result = scam_detector.analyze_conversation_logic(full_text, context)
+            with stage_timer('bank_detection'):
+                bank_analysis = scam_detector.detect_bank_related_content(full_text, [], context)
+            cascade = scam_detector.triage_call(context, analysis_results, force=force_full,
+                                                endpoint='analyze_audio_stream')
+            
+            stage_results = {
+                'stt': transcription_result,
+                'speaker_analysis': speakers,
+                'logic': logic_result,
+                'bank_detection': bank_analysis,
+                'triage': cascade
+            }
+            record = scam_detector.apply_risk_model(
+                AsyncAnalysisPipeline.build_record(stage_results, analysis_id, audio_bytes, 'webm'), context=context
+            )
+            outcome = 'scam' if record['scam_detected'] else 'safe'
+            yield sse_event('verdict', {key: record[key] for key in (
+                'analysis', 'speakers_count', 'scam_detected', 'overall_risk_score', 'risk_level',
+                'call_summary', 'logic_scam_detected', 'logic_reason', 'bank_analysis', 'keywords_found',
+                'risk_scorer', 'cascade'
+            )})
+            
+            # Gemini suggestion, token by token (ambiguous calls only; canned advice otherwise)
+            if cascade['plan']['gemini_suggestion']:
+                chunks = []
+                for chunk in scam_detector.stream_gemini_suggestion(full_text, scam_detected, speakers['risk_level'], logic_result):
+                    chunks.append(chunk)
+                    yield sse_event('suggestion_token', {'text': chunk})
+                gemini_suggestion = scam_detector.format_gemini_response(''.join(chunks).strip())
+            else:
+                gemini_suggestion = canned_suggestion(cascade)
+            yield sse_event('suggestion', {'gemini_suggestion': gemini_suggestion})
+            
+            bank_rules = scam_detector.cascade_bank_rules(cascade, full_text, bank_analysis)
+            if bank_rules:
+                yield sse_event('bank_rules', {'bank_rules': bank_rules})
+            
+            stage_results.update(gemini_suggestion=gemini_suggestion, bank_rules=bank_rules)
+            if ipfs_future is not None:
+                try:
+                    stage_results['ipfs_upload'] = ipfs_future.result(timeout=60)
+                except Exception as e:
+                    logger.error("Error uploading to Pinata", extra={'error': str(e)})
+            record = scam_detector.apply_risk_model(
+                AsyncAnalysisPipeline.build_record(stage_results, analysis_id, audio_bytes, 'webm'), context=context
+            )
+            
+            record['sections'] = initial_sections(record)
+            save_result = analyzed_call_model.save_analyzed_call(str(user_id) if user_id else None, record)
+            if save_result.get('success'):
+                yield sse_event('saved', {key: record[key] for key in ('analysis_id', 'ipfs_hash', 'ipfs_url', 'pinata_url',
+                                                                      'sections')})
+                if should_prefetch(record):
+                    _background_pool.submit(section_resolver.prefetch, dict(record))
+                if get_feature_store() is not None:
+                    _background_pool.submit(store_call_features, dict(record), None, None, context)
+                if user_id:
+                    _background_pool.submit(_notify_user, user_id, record)
+            else:
+                logger.error("Database save failed", extra={'error': save_result.get('error', 'Unknown error')})
+            
+            yield sse_event('done', {'success': True, 'timings': get_request_timings()})
+            
+        except Exception as e:
+            logger.exception("Streaming analysis failed", extra={'error': str(e)})
+            yield sse_event('error', {'error': str(e)})
+        finally:
+            if wav_path and os.path.exists(wav_path):
+                os.unlink(wav_path)
+            elapsed = time.perf_counter() - request_started
+            request_latency.observe(elapsed, endpoint='analyze_audio_stream')
+            request_count.inc(endpoint='analyze_audio_stream', outcome=outcome)
+            end_request_trace(trace_token)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Stop nginx from buffering the stream
+    })
+
+def _notify_user(user_id, record):
+    """Email the analysis to an authenticated user (runs off the request thread)"""
+    try:
+        user_info = user_model.get_user_by_id(user_id)
+        if not user_info or not user_info.get('email'):
+            logger.info("User email not found, skipping email notification")
+            return
+        email_data = {
+            'timestamp': record.get('timestamp', datetime.utcnow().isoformat()),
+            'caller': record['caller'],
+            'overall_risk_score': record['overall_risk_score'],
+            'scam_detected': record['scam_detected'],
+            'keywords_found': record['keywords_found'],
+            'transcription': record.get('transcription', {}),
+            'call_summary': record.get('call_summary', '')
+        }
+        user_name = user_info.get('username', user_info.get('name', 'User'))
+        if not send_call_analysis_notification(user_info['email'], user_name, email_data):
+            logger.error("Failed to send email notification", extra={'to': user_info['email']})
+    except Exception as e:
+        logger.error("Error sending email notification", extra={'error': str(e)})
 
 @app.route('/api/analyze-with-mozilla', methods=['POST'])
 def analyze_with_mozilla():
@@ -603,6 +964,15 @@ def analyze_with_mozilla():
                 'error': 'No audio data provided'
             }), 400
         
+        # Acoustic feature profile: triage (fastest), standard or forensic (everything)
+        feature_profile = data.get('feature_profile') or request.args.get('profile')
+        if feature_profile is not None and feature_profile not in PROFILE_NAMES:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown feature profile '{feature_profile}' (choose from {', '.join(PROFILE_NAMES)})"
+            }), 400
+        force_full = bool(data.get('full_analysis')) or request.args.get('full') in ('1', 'true')
+        
         # Decode base64 audio
         audio_base64 = data['audio']
         audio_bytes = base64.b64decode(audio_base64)
@@ -626,8 +996,7 @@ def analyze_with_mozilla():
                 pass
             
             # Run enhanced analysis with Mozilla Voice integration
-            print("🔄 Running enhanced analysis with Mozilla Voice...")
-            combined_analysis = scam_detector.analyze_conversation_with_mozilla(temp_file_path)
+            combined_analysis = scam_detector.analyze_conversation_with_mozilla(temp_file_path, force_full, feature_profile)
             
             return jsonify({
                 'success': True,
@@ -656,17 +1025,22 @@ def calculate_combined_risk(existing_analysis, mozilla_insights):
         # Get Mozilla Voice risk score
         mozilla_risk = mozilla_insights.get('overall_assessment', {}).get('overall_risk_score', 0.5)
         
-        # Combine with weights (you can adjust these)
-        combined_risk = (existing_risk * 0.6) + (mozilla_risk * 0.4)
+        # The trained model scores text and voice features jointly; fixed weights otherwise
+        risk_model = get_risk_model()
+        if risk_model is not None:
+            combined_risk = risk_model.score(existing_analysis, mozilla_insights)['probability']
+        else:
+            combined_risk = (existing_risk * 0.6) + (mozilla_risk * 0.4)
         
         return {
             'combined_score': combined_risk,
             'existing_score': existing_risk,
             'mozilla_score': mozilla_risk,
-            'risk_level': 'high' if combined_risk > 0.7 else 'medium' if combined_risk > 0.4 else 'low'
+            'risk_level': 'high' if combined_risk > 0.7 else 'medium' if combined_risk > 0.4 else 'low',
+            'scorer': 'model' if risk_model is not None else 'weighted'
         }
     except Exception as e:
-        print(f"❌ Error calculating combined risk: {e}")
+        logger.error("Error calculating combined risk", extra={'error': str(e)})
         return {'combined_score': 0.5, 'risk_level': 'medium'}
 
 def generate_enhanced_suggestions(existing_analysis, mozilla_insights):
@@ -691,41 +1065,23 @@ def generate_enhanced_suggestions(existing_analysis, mozilla_insights):
         return suggestions
         
     except Exception as e:
-        print(f"❌ Error generating enhanced suggestions: {e}")
+        logger.error("Error generating enhanced suggestions", extra={'error': str(e)})
         return ["Analysis completed with some limitations"]
 
 @app.route('/api/analyzed-calls', methods=['GET'])
 def get_analyzed_calls():
     """Get analysis history for the authenticated user"""
-    print("🔍 API: /api/analyzed-calls called")
     try:
         # Get user info if authenticated
         user_id = getattr(request, 'current_user', {}).get('user_id') if hasattr(request, 'current_user') else None
-        print(f"🔍 User ID: {user_id}")
         
         # Get query parameters
         limit = request.args.get('limit', 50, type=int)
         offset = request.args.get('offset', 0, type=int)
-        print(f"🔍 Query params - limit: {limit}, offset: {offset}")
         
         # Get analyzed calls from database
-        print("🔄 Fetching calls from database...")
         calls = analyzed_call_model.get_analyzed_calls(user_id, limit, offset)
-        print(f"🔍 Retrieved {len(calls)} calls from database")
-        
-        if calls:
-            print(f"🔍 Sample call keys: {list(calls[0].keys())}")
-            print(f"🔍 Sample call timestamp: {calls[0].get('timestamp')}")
-            print(f"🔍 Sample call caller: {calls[0].get('caller')}")
-            print(f"🔍 Sample call probability: {calls[0].get('probability')}")
-            print(f"🔍 Sample call keywords: {calls[0].get('keywords')}")
-            print(f"🔍 Sample call keywords_found: {calls[0].get('keywords_found')}")
-            print(f"🔍 Sample call scam_detected: {calls[0].get('scam_detected')}")
-            print(f"🔍 Sample call overall_risk_score: {calls[0].get('overall_risk_score')}")
-            print(f"🔍 Sample call transcription: {calls[0].get('transcription')}")
-            print(f"🔍 Sample call outcome: {calls[0].get('outcome')}")
-            print(f"🔍 Sample call risk_level: {calls[0].get('risk_level')}")
-            print(f"🔍 Sample call call_summary: {calls[0].get('call_summary')}")
+        logger.debug("Retrieved analyzed calls", extra={'count': len(calls), 'limit': limit, 'offset': offset})
         
         response_data = {
             'success': True,
@@ -735,15 +1091,10 @@ def get_analyzed_calls():
             'offset': offset
         }
         
-        print(f"🔍 Response data keys: {list(response_data.keys())}")
-        print(f"🔍 Response data length: {len(response_data['data'])}")
-        
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"❌ Error in get_analyzed_calls: {e}")
-        import traceback
-        print(f"🔍 Full traceback: {traceback.format_exc()}")
+        logger.exception("Error in get_analyzed_calls", extra={'error': str(e)})
         return jsonify({
             'success': False,
             'error': str(e)
@@ -751,7 +1102,12 @@ def get_analyzed_calls():
 
 @app.route('/api/analyzed-calls/<analysis_id>', methods=['GET'])
 def get_analyzed_call_details(analysis_id):
-    """Get detailed analysis for a specific call"""
+    """
+    Get detailed analysis for a specific call
+    
+    Pending deferred sections (gemini_suggestion, bank_rules) are generated
+    and cached on this first read; ?generate=0 returns their status only.
+    """
     try:
         # Get user info if authenticated
         user_id = getattr(request, 'current_user', {}).get('user_id') if hasattr(request, 'current_user') else None
@@ -765,6 +1121,9 @@ def get_analyzed_call_details(analysis_id):
                 'error': 'Analysis not found'
             }), 404
         
+        if request.args.get('generate') not in ('0', 'false'):
+            call = section_resolver.resolve(call)
+        
         return jsonify({
             'success': True,
             'data': call
@@ -776,6 +1135,36 @@ def get_analyzed_call_details(analysis_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Prometheus-style metrics for the analysis pipeline"""
+    return Response(metrics_registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 200 only once models are warm and the worker is not draining"""
+    status_code = 200 if _serving_state['ready'] else 503
+    return jsonify({
+        'ready': _serving_state['ready'],
+        'warmed_at': _serving_state['warmed_at'],
+        'shutting_down': _serving_state['shutting_down'],
+        'checks': _serving_state['checks'],
+        'pid': os.getpid()
+    }), status_code
+
+@app.route('/api/lexicon/reload', methods=['POST'])
+@require_auth
+def reload_scam_lexicon():
+    """Reload the scam lexicon from disk in this worker without a restart"""
+    previous = get_lexicon().version
+    lexicon = reload_lexicon()
+    return jsonify({
+        'success': True,
+        'previous_version': previous,
+        'version': lexicon.version,
+        'categories': {category: lexicon.count(category) for category in lexicon.categories}
+    })
+
 @app.route('/api/test', methods=['GET'])
 def test_endpoint():
     """Test endpoint for debugging"""
@@ -783,6 +1172,7 @@ def test_endpoint():
         'message': 'API is working',
         'scam_keywords': scam_detector.scam_keywords[:5],  # Show first 5 keywords
         'high_risk_phrases': scam_detector.high_risk_phrases[:3],  # Show first 3 phrases
+        'lexicon_version': get_lexicon().version,
         'mozilla_voice_available': MOZILLA_VOICE_AVAILABLE
     })
 
@@ -791,6 +1181,10 @@ if __name__ == '__main__':
     print("📡 API will be available at: http://localhost:5000")
     print("🔗 Frontend should connect to: http://localhost:5000/api/analyze-audio")
     print("⏱️  Timeout settings: 60 seconds for audio processing")
-    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
+    print("🏭 For production use: gunicorn -c gunicorn.conf.py wsgi:app")
+    warm_up()
+    # The reloader would import this module (and load every model) a second time
+    debug = os.getenv('FLASK_DEBUG', '1') == '1'
+    app.run(debug=debug, use_reloader=False, host='0.0.0.0', port=5000, threaded=True)
 
 
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Append-only row store shared by the voice index and the feature store
+
+One directory holds fixed-width float32 rows plus one JSON metadata line
+per row:
+
+    meta.json           dim, row count and whatever the owner keeps there
+    vectors.f32         (count, dim) float32, row i = id i
+    <rows>.jsonl        one JSON line per row
+    <rows>_offsets.u64  byte offset of each JSON line, for random access
+
+meta.json is the commit point: a row exists once meta['count'] covers it.
+Appends from several processes (gunicorn workers) are serialized with an
+flock on .lock, and each append first cuts every file back to the
+committed count (count * row size for the two binary files, the end of
+the last committed line for the JSON lines). Bytes left by a writer that
+died mid-append are therefore overwritten instead of shifting every
+later row id. Readers memory-map exactly `count` rows and re-read
+meta.json when its mtime changes.
+"""
+
+import os
+import json
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+VECTOR_DTYPE = np.float32
+OFFSET_DTYPE = np.uint64
+
+class AppendStore:
+    """Flock-serialized, truncate-then-append vectors + JSON lines (see module docstring)"""
+
+    def __init__(self, directory: str, rows_name: str, offsets_name: str):
+        """
+        Args:
+            rows_name: JSON lines file name (e.g. 'entries.jsonl')
+            offsets_name: offsets file name (e.g. 'entry_offsets.u64')
+
+        meta is None until create() when the directory holds no store yet.
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._offsets = None
+        self._mapped_count = -1
+        self._meta_mtime = None
+
+        os.makedirs(directory, exist_ok=True)
+        self.meta_path = os.path.join(directory, 'meta.json')
+        self.vectors_path = os.path.join(directory, 'vectors.f32')
+        self.rows_path = os.path.join(directory, rows_name)
+        self.offsets_path = os.path.join(directory, offsets_name)
+
+        self.meta: Optional[Dict] = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as meta_file:
+                self.meta = json.load(meta_file)
+            self._meta_mtime = os.path.getmtime(self.meta_path)
+
+    @property
+    def dim(self) -> int:
+        return self.meta['dim']
+
+    @property
+    def count(self) -> int:
+        return self.meta['count']
+
+    def create(self, meta: Dict):
+        """Start an empty store with this meta.json (needs 'dim'; count starts at 0)"""
+        self.meta = dict(meta, count=0)
+        self.write_meta()
+
+    def write_meta(self):
+        """Replace meta.json atomically (hold lock() when other processes may append)"""
+        temp_path = self.meta_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as meta_file:
+            json.dump(self.meta, meta_file)
+        os.replace(temp_path, self.meta_path)
+        self._meta_mtime = os.path.getmtime(self.meta_path)
+
+    def refresh(self):
+        """Re-read meta.json when another process (e.g. another gunicorn worker) appended"""
+        mtime = os.path.getmtime(self.meta_path)
+        if mtime != self._meta_mtime:
+            with open(self.meta_path, 'r', encoding='utf-8') as meta_file:
+                self.meta = json.load(meta_file)
+            self._meta_mtime = mtime
+
+    @contextmanager
+    def lock(self):
+        """Exclusive across threads of this process and processes sharing the directory"""
+        with self._lock, open(os.path.join(self.directory, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def mapped(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(vectors, row offsets) memmaps covering the committed count"""
+        self.refresh()
+        if self._mapped_count != self.count:
+            if self.count:
+                self._vectors = np.memmap(self.vectors_path, dtype=VECTOR_DTYPE, mode='r', shape=(self.count, self.dim))
+                self._offsets = np.memmap(self.offsets_path, dtype=OFFSET_DTYPE, mode='r', shape=(self.count,))
+            else:
+                self._vectors = np.zeros((0, self.dim), dtype=VECTOR_DTYPE)
+                self._offsets = np.zeros(0, dtype=OFFSET_DTYPE)
+            self._mapped_count = self.count
+        return self._vectors, self._offsets
+
+    def _committed_rows_size(self, count: int) -> int:
+        """Bytes of the JSON lines file covered by the first `count` rows"""
+        if not count:
+            return 0
+        with open(self.offsets_path, 'rb') as offsets_file:
+            offsets_file.seek((count - 1) * np.dtype(OFFSET_DTYPE).itemsize)
+            last = int(np.frombuffer(offsets_file.read(np.dtype(OFFSET_DTYPE).itemsize), dtype=OFFSET_DTYPE)[0])
+        with open(self.rows_path, 'rb') as rows_file:
+            rows_file.seek(last)
+            return last + len(rows_file.readline())
+
+    @staticmethod
+    def _open_at(path: str, size: int):
+        """Open for writing with everything past `size` bytes cut off, positioned at the end"""
+        handle = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        handle.truncate(size)
+        handle.seek(size)
+        return handle
+
+    def append(self, vectors: np.ndarray, rows: Sequence[Dict],
+               update_meta: Optional[Callable[[Dict, np.ndarray], None]] = None) -> int:
+        """
+        Append (n, dim) vectors with one JSON-serializable dict each; returns the first new row id
+
+        update_meta(meta, vectors) runs under the lock before meta.json is
+        written, for owners that keep running statistics there.
+        """
+        vectors = np.ascontiguousarray(np.atleast_2d(vectors), dtype=VECTOR_DTYPE)
+        if vectors.shape[1] != self.dim or len(vectors) != len(rows):
+            raise ValueError(f"Expected {len(rows)} vectors of dim {self.dim}, got {vectors.shape}")
+
+        with self.lock():
+            self.refresh()
+            first_id = self.count
+            offsets = np.empty(len(rows), dtype=OFFSET_DTYPE)
+            with self._open_at(self.rows_path, self._committed_rows_size(first_id)) as rows_file:
+                position = rows_file.tell()
+                for i, row in enumerate(rows):
+                    line = (json.dumps(row, default=str, ensure_ascii=False) + '\n').encode('utf-8')
+                    offsets[i] = position
+                    rows_file.write(line)
+                    position += len(line)
+            with self._open_at(self.vectors_path, first_id * self.dim * vectors.itemsize) as vectors_file:
+                vectors_file.write(vectors.tobytes())
+            with self._open_at(self.offsets_path, first_id * offsets.itemsize) as offsets_file:
+                offsets_file.write(offsets.tobytes())
+            self.meta['count'] = first_id + len(vectors)
+            if update_meta is not None:
+                update_meta(self.meta, vectors)
+            self.write_meta()
+        return first_id
+
+    def row(self, row_id: int) -> Dict:
+        """JSON line of one row"""
+        _, offsets = self.mapped()
+        with open(self.rows_path, 'rb') as rows_file:
+            rows_file.seek(int(offsets[row_id]))
+            return json.loads(rows_file.readline())
+
+    def rows(self) -> Iterator[Dict]:
+        """JSON lines of every committed row in order (streamed, not loaded at once)"""
+        count = self.mapped()[0].shape[0]
+        if not count:
+            return
+        with open(self.rows_path, 'r', encoding='utf-8') as rows_file:
+            for _, line in zip(range(count), rows_file):
+                yield json.loads(line)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Asyncio analysis pipeline with an explicit stage dependency graph
+
+The synchronous /api/analyze-audio handler runs every network-bound stage
+one after another. Here each stage declares the stages it depends on and
+StageGraph starts it as soon as those finish, so independent work overlaps:
+
+    decode ──> stt ──┬─> speaker_analysis ─┬─> triage ───┐
+      │              ├─> logic ────────────┘             │
+      │              └─> bank_detection ─────────────────┤
+      └─> ipfs_upload ───────────────────────────────────┼─> save ──> email
+                                         user_lookup ────┘
+
+The triage stage is the cascade (cascade.py). Gemini advice and bank rules
+are not stages any more: they are deferred sections (deferred_sections.py)
+generated on first read, or prefetched in the background for high-risk
+calls once the record is saved.
+
+The STT language configs are also issued concurrently instead of in turn.
+Blocking SDKs (Google STT, Gemini, pymongo, requests, smtplib) are offloaded
+with asyncio.to_thread, which keeps the request's timing trace (contextvars)
+attached to the worker thread.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import tempfile
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from pipeline_metrics import get_logger, record_stage, stage_timer
+from analysis_context import AnalysisContext
+from cascade import canned_suggestion
+from deferred_sections import initial_sections, should_prefetch
+
+logger = get_logger('async_pipeline')
+
+class StageError(Exception):
+    """A required pipeline stage failed"""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+class StageGraph:
+    """
+    A DAG of async stages
+
+    Stages must be added after their dependencies, which rules out cycles.
+    A stage function receives the dict of results produced so far. Optional
+    stages that fail yield None (and are listed in `errors`) instead of
+    failing the whole run.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, Dict] = {}
+
+    def add(self, name: str, func: Callable[[Dict[str, Any]], Awaitable[Any]],
+            deps: Iterable[str] = (), optional: bool = False) -> 'StageGraph':
+        if name in self._stages:
+            raise ValueError(f"Stage already defined: {name}")
+        deps = tuple(deps)
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on undefined stages: {missing}")
+        self._stages[name] = {'func': func, 'deps': deps, 'optional': optional}
+        return self
+
+    @property
+    def stages(self) -> List[str]:
+        return list(self._stages)
+
+    def critical_path(self, durations: Dict[str, float]) -> List[str]:
+        """Longest chain of dependent stages given measured durations"""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name, stage in self._stages.items():
+            before = max(stage['deps'], key=lambda dep: finish[dep], default=None)
+            finish[name] = (finish[before] if before else 0.0) + durations.get(name, 0.0)
+            previous[name] = before
+
+        path = []
+        node = max(finish, key=finish.get, default=None)
+        while node:
+            path.append(node)
+            node = previous[node]
+        return list(reversed(path))
+
+    async def run(self, initial: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run every stage as early as its dependencies allow
+
+        If `initial` is given, results are written into it as stages finish,
+        so callers can still clean up after a failed run.
+        """
+        results: Dict[str, Any] = initial if initial is not None else {}
+        errors: Dict[str, str] = {}
+        durations: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str, stage: Dict):
+            if stage['deps']:
+                await asyncio.gather(*(tasks[dep] for dep in stage['deps']))
+            started = time.perf_counter()
+            try:
+                results[name] = await stage['func'](results)
+            except Exception as e:
+                durations[name] = time.perf_counter() - started
+                record_stage(f"async:{name}", durations[name], error=True)
+                if not stage['optional']:
+                    raise StageError(name, e) from e
+                logger.warning("Optional stage failed", extra={'stage': name, 'error': str(e)})
+                errors[name] = str(e)
+                results[name] = None
+                return
+            durations[name] = time.perf_counter() - started
+            record_stage(f"async:{name}", durations[name])
+
+        for name, stage in self._stages.items():
+            tasks[name] = asyncio.create_task(run_stage(name, stage), name=name)
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except StageError:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        results['_errors'] = errors
+        results['_durations'] = durations
+        results['_critical_path'] = self.critical_path(durations)
+        return results
+
+def convert_to_wav(audio_bytes: bytes, source_format: str = 'webm') -> str:
+    """Write browser audio to a 16kHz mono 16-bit WAV temp file (falls back to the raw file)"""
+    with tempfile.NamedTemporaryFile(suffix=f'.{source_format}', delete=False) as temp_file:
+        temp_file.write(audio_bytes)
+        source_path = temp_file.name
+
+    wav_path = source_path.rsplit('.', 1)[0] + '.wav'
+    try:
+        from pydub import AudioSegment
+        audio = AudioSegment.from_file(source_path, format=source_format)
+        audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+        audio.export(wav_path, format="wav")
+        os.unlink(source_path)
+        return wav_path
+    except Exception as e:
+        logger.warning("Pydub conversion failed, using original audio", extra={'error': str(e)})
+        return source_path
+
+class AsyncAnalysisPipeline:
+    """Async equivalent of api_server.analyze_audio built on StageGraph"""
+
+    def __init__(self, detector, call_model, user_store=None,
+                 pinata_factory: Optional[Callable] = None,
+                 email_sender: Optional[Callable] = None,
+                 section_resolver=None,
+                 prefetch_submitter: Optional[Callable] = None):
+        """
+        Args:
+            detector: CompleteScamDetector instance
+            call_model: object with save_analyzed_call(user_id, record)
+            user_store: object with get_user_by_id(user_id), or None
+            pinata_factory: callable returning a PinataService, or None to skip IPFS
+            email_sender: send_call_analysis_notification-compatible callable, or None
+            section_resolver: DeferredSectionResolver, or None to leave sections pending
+            prefetch_submitter: executor.submit-like callable for the high-risk prefetch
+        """
+        self.detector = detector
+        self.call_model = call_model
+        self.user_store = user_store
+        self.pinata_factory = pinata_factory
+        self.email_sender = email_sender
+        self.section_resolver = section_resolver
+        self.prefetch_submitter = prefetch_submitter
+
+    async def _transcribe(self, wav_path: str) -> Optional[Dict]:
+        """Issue every STT language config concurrently and keep the most confident"""
+        from google.cloud import speech
+
+        with open(wav_path, 'rb') as audio_file:
+            audio = speech.RecognitionAudio(content=audio_file.read())
+
+        configs = self.detector.get_stt_configs()
+        candidates = await asyncio.gather(*(
+            asyncio.to_thread(self.detector.recognize_with_config, i, config, audio)
+            for i, config in enumerate(configs)
+        ))
+        best = self.detector.select_best_stt_response(candidates)
+        return await asyncio.to_thread(self.detector.build_transcription_result, best)
+
+    def build_graph(self, audio_bytes: bytes, analysis_id: str, user_id: Optional[str],
+                    audio_format: str = 'webm', force_full: bool = False) -> StageGraph:
+        detector = self.detector
+        graph = StageGraph()
+
+        async def decode(results):
+            with stage_timer('decode'):
+                return await asyncio.to_thread(convert_to_wav, audio_bytes, audio_format)
+
+        async def ipfs_upload(results):
+            # Only needs the raw audio, so it runs alongside transcription
+            if not self.pinata_factory:
+                return None
+            service = self.pinata_factory()
+            filename = f"audio_analysis_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.wav"
+            return await asyncio.to_thread(service.upload_audio_file, audio_bytes, filename, {'analysis_id': analysis_id})
+
+        async def user_lookup(results):
+            if not (user_id and self.user_store):
+                return None
+            return await asyncio.to_thread(self.user_store.get_user_by_id, user_id)
+
+        async def stt(results):
+            transcription = await self._transcribe(results['decode'])
+            if not transcription:
+                raise RuntimeError('Transcription failed')
+            return transcription
+
+        async def context(results):
+            # Shared, memoized text artefacts for the text stages below
+            return AnalysisContext(results['stt'])
+
+        async def speaker_analysis(results):
+            with stage_timer('speaker_analysis'):
+                analysis = await asyncio.to_thread(detector.analyze_speakers, results['stt'], results['context'])
+            scam_detected = any(result['is_potential_scammer'] for result in analysis.values())
+            risk_score = max([result['risk_score'] for result in analysis.values()], default=0)
+            return {
+                'analysis': analysis,
+                'scam_detected': scam_detected,
+                'overall_risk_score': risk_score,
+                'risk_level': detector.get_risk_level(risk_score)
+            }
+
+        async def logic(results):
+            return await asyncio.to_thread(detector.analyze_conversation_logic, results['stt']['full_text'],
+                                           results['context'])
+
+        async def bank_detection(results):
+            with stage_timer('bank_detection'):
+                return detector.detect_bank_related_content(results['stt']['full_text'], [], results['context'])
+
+        async def triage(results):
+            return detector.triage_call(results['context'], results['speaker_analysis']['analysis'],
+                                        force=force_full, endpoint='analyze_audio_async')
+
+        async def save(results):
+            record = detector.apply_risk_model(self.build_record(results, analysis_id, audio_bytes, audio_format),
+                                               context=results['context'])
+            record['sections'] = initial_sections(record)
+            save_result = await asyncio.to_thread(self.call_model.save_analyzed_call,
+                                                  str(user_id) if user_id else None, record)
+            saved = bool(save_result.get('success'))
+            if not saved:
+                logger.error("Database save failed", extra={'error': save_result.get('error', 'Unknown error')})
+                # Nothing to read back later, so generate the sections now
+                if self.section_resolver is not None:
+                    await asyncio.to_thread(self.section_resolver.generate_unsaved, record)
+            elif self.section_resolver is not None and self.prefetch_submitter and should_prefetch(record):
+                self.prefetch_submitter(self.section_resolver.prefetch, dict(record))
+            if saved and os.getenv('FEATURE_STORE_DIR'):
+                from feature_store import store_call_features
+                await asyncio.to_thread(store_call_features, record, None, None, results['context'])
+            return {'record': record, 'saved': saved}
+
+        async def email(results):
+            user_info = results.get('user_lookup')
+            saved = results.get('save') or {}
+            if not (self.email_sender and saved.get('saved') and user_info and user_info.get('email')):
+                return False
+            record = saved['record']
+            email_data = {
+                'timestamp': record.get('timestamp', datetime.utcnow().isoformat()),
+                'caller': record['caller'],
+                'overall_risk_score': record['overall_risk_score'],
+                'scam_detected': record['scam_detected'],
+                'keywords_found': record['keywords_found'],
+                'transcription': record.get('transcription', {}),
+                'call_summary': record.get('call_summary', '')
+            }
+            user_name = user_info.get('username', user_info.get('name', 'User'))
+            return await asyncio.to_thread(self.email_sender, user_info['email'], user_name, email_data)
+
+        graph.add('decode', decode)
+        graph.add('ipfs_upload', ipfs_upload, optional=True)
+        graph.add('user_lookup', user_lookup, optional=True)
+        graph.add('stt', stt, deps=['decode'])
+        graph.add('context', context, deps=['stt'])
+        graph.add('speaker_analysis', speaker_analysis, deps=['context'])
+        graph.add('logic', logic, deps=['context'])
+        graph.add('bank_detection', bank_detection, deps=['context'])
+        graph.add('triage', triage, deps=['speaker_analysis', 'logic'])
+        graph.add('save', save, deps=['triage', 'bank_detection', 'ipfs_upload'], optional=True)
+        graph.add('email', email, deps=['save', 'user_lookup'], optional=True)
+        return graph
+
+    @staticmethod
+    def build_record(results: Dict[str, Any], analysis_id: str, audio_bytes: bytes,
+                     audio_format: str) -> Dict[str, Any]:
+        """Combine stage results into the analysis record stored in MongoDB and returned to clients"""
+        speakers = results['speaker_analysis']
+        logic_scam_detected, logic_reason = results['logic']
+        scam_detected = logic_scam_detected or speakers['scam_detected']
+        risk_score = speakers['overall_risk_score']
+        risk_level = speakers['risk_level']
+        if logic_scam_detected:
+            risk_score = max(risk_score, 0.9)
+            risk_level = 'critical'
+
+        analysis = speakers['analysis']
+        call_summary = f"Call analyzed with {len(analysis)} speakers. "
+        if speakers['scam_detected']:
+            call_summary += f"⚠️ SCAM DETECTED - Risk Level: {speakers['risk_level'].upper()}"
+        else:
+            call_summary += f"✅ Safe conversation - Risk Level: {speakers['risk_level'].upper()}"
+
+        # Calls the cascade settled get canned advice; the rest stay pending (deferred_sections.py)
+        cascade = results.get('triage')
+        gemini_suggestion = results.get('gemini_suggestion')
+        if gemini_suggestion is None and cascade and not cascade['plan']['gemini_suggestion']:
+            gemini_suggestion = canned_suggestion(cascade)
+
+        ipfs_info = results.get('ipfs_upload') or {}
+        return {
+            'analysis_id': analysis_id,
+            'caller': 'Unknown',
+            'transcription': results['stt'],
+            'analysis': analysis,
+            'speakers_count': len(analysis),
+            'scam_detected': scam_detected,
+            'overall_risk_score': risk_score,
+            'risk_level': risk_level,
+            'call_summary': call_summary,
+            'gemini_suggestion': gemini_suggestion,
+            'logic_scam_detected': logic_scam_detected,
+            'logic_reason': logic_reason,
+            'bank_analysis': results['bank_detection'],
+            'bank_rules': results.get('bank_rules') or "",
+            'cascade': results.get('triage'),
+            'keywords_found': [kw for result in analysis.values() for kw in result.get('scam_keywords', [])],
+            'audio_duration': len(audio_bytes) / (16000 * 2),
+            'audio_format': audio_format,
+            'ipfs_hash': ipfs_info.get('ipfs_hash'),
+            'ipfs_url': ipfs_info.get('ipfs_url'),
+            'pinata_url': ipfs_info.get('pinata_url')
+        }
+
+    async def analyze(self, audio_bytes: bytes, user_id: Optional[str] = None,
+                      audio_format: str = 'webm', force_full: bool = False) -> Dict[str, Any]:
+        """
+        Run the full analysis for one recording
+
+        Returns the API response 'data' dict plus a 'pipeline' section with
+        per-stage durations, the critical path and optional-stage errors.
+        """
+        analysis_id = str(uuid.uuid4())
+        graph = self.build_graph(audio_bytes, analysis_id, user_id, audio_format, force_full)
+        results: Dict[str, Any] = {}
+        try:
+            await graph.run(results)
+        finally:
+            wav_path = results.get('decode')
+            if wav_path and os.path.exists(wav_path):
+                os.unlink(wav_path)
+
+        saved = results.get('save') or {}
+        data = saved.get('record') or self.detector.apply_risk_model(
+            self.build_record(results, analysis_id, audio_bytes, audio_format), context=results.get('context')
+        )
+        if not saved.get('saved'):
+            data = dict(data)
+            data.pop('analysis_id', None)
+
+        data['pipeline'] = {
+            'stages_ms': {name: round(seconds * 1000.0, 2) for name, seconds in results['_durations'].items()},
+            'critical_path': results['_critical_path'],
+            'errors': results['_errors']
+        }
+        return data
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Streaming audio capture for the CLI detectors
+
+- RingBuffer: preallocated int16 buffer shared between the audio callback
+  and the consumer; memory stays constant however long the call runs
+- MicrophoneStream: sounddevice.InputStream feeding a RingBuffer from its
+  callback and handing out fixed-size int16 chunks
+- FileReplaySource: same interface, reading a WAV file (stands in for the
+  microphone in tests and demos)
+- VadSegmenter: groups chunks into speech segments with webrtcvad so each
+  utterance can be transcribed as soon as it ends
+"""
+
+import io
+import time
+import wave
+import threading
+import collections
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+class RingBuffer:
+    """Fixed-capacity single-producer/single-consumer int16 ring buffer"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._read_pos = 0
+        self._write_pos = 0
+        self._size = 0
+        self.dropped = 0  # samples overwritten because the consumer fell behind
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def __len__(self):
+        return self._size
+
+    def write(self, samples: np.ndarray):
+        """Append samples, overwriting the oldest ones when full (never blocks the audio thread)"""
+        samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        if len(samples) > self.capacity:
+            self.dropped += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+
+        with self._cond:
+            count = len(samples)
+            first = min(count, self.capacity - self._write_pos)
+            self._data[self._write_pos:self._write_pos + first] = samples[:first]
+            self._data[:count - first] = samples[first:]
+            self._write_pos = (self._write_pos + count) % self.capacity
+
+            overflow = self._size + count - self.capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._read_pos = (self._read_pos + overflow) % self.capacity
+            self._size = min(self._size + count, self.capacity)
+            self._cond.notify_all()
+
+    def read(self, count: int, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """Return exactly `count` samples, waiting up to `timeout`; None on timeout or when closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size >= count or self.closed, timeout=timeout):
+                return None
+            if self._size < count:
+                return None
+
+            out = np.empty(count, dtype=np.int16)
+            first = min(count, self.capacity - self._read_pos)
+            out[:first] = self._data[self._read_pos:self._read_pos + first]
+            out[first:] = self._data[:count - first]
+            self._read_pos = (self._read_pos + count) % self.capacity
+            self._size -= count
+            return out
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+class MicrophoneStream:
+    """
+    Unbounded microphone capture using sounddevice.InputStream callbacks
+
+    Usage:
+        with MicrophoneStream() as mic:
+            for chunk in mic.chunks():
+                ...
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, chunk_ms: int = 30,
+                 buffer_seconds: float = 10.0, device=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.chunk_samples = int(sample_rate * chunk_ms / 1000)
+        self.device = device
+        self.buffer = RingBuffer(int(sample_rate * buffer_seconds))
+        self.status_errors = 0
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.status_errors += 1
+        # First channel only: the pipeline is mono LINEAR16 throughout
+        self.buffer.write(indata[:, 0])
+
+    def start(self):
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype='int16',
+            blocksize=self.chunk_samples,
+            device=self.device,
+            callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        self.buffer.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def chunks(self, timeout: float = 1.0) -> Iterator[np.ndarray]:
+        """Yield int16 chunks of chunk_ms until stop() is called"""
+        while True:
+            chunk = self.buffer.read(self.chunk_samples, timeout=timeout)
+            if chunk is None:
+                if self.buffer.closed:
+                    return
+                continue
+            yield chunk
+
+class FileReplaySource:
+    """Replays a 16-bit mono WAV file as if it were the microphone"""
+
+    def __init__(self, path: str, chunk_ms: int = 30, realtime: bool = False):
+        self.path = path
+        self.realtime = realtime
+        with wave.open(path, 'rb') as wf:
+            if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+                raise ValueError(f"{path}: expected 16-bit mono WAV")
+            self.sample_rate = wf.getframerate()
+        self.channels = 1
+        self.chunk_samples = int(self.sample_rate * chunk_ms / 1000)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def chunks(self, timeout: float = 1.0) -> Iterator[np.ndarray]:
+        """Yield int16 chunks; with realtime=True, paced at the recording's speed"""
+        chunk_seconds = self.chunk_samples / self.sample_rate
+        started = time.perf_counter()
+        with wave.open(self.path, 'rb') as wf:
+            index = 0
+            while True:
+                frames = wf.readframes(self.chunk_samples)
+                if len(frames) < self.chunk_samples * 2:
+                    return
+                if self.realtime:
+                    delay = started + index * chunk_seconds - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                index += 1
+                yield np.frombuffer(frames, dtype=np.int16)
+
+class VadSegmenter:
+    """
+    Turn a stream of 10/20/30 ms chunks into speech segments
+
+    A segment opens when most of the last `padding_ms` of audio is voiced
+    and closes after as much silence, or when it reaches
+    `max_segment_seconds` (keeps memory bounded and stays under the
+    synchronous STT request limit).
+    """
+
+    def __init__(self, sample_rate: int = 16000, chunk_ms: int = 30, aggressiveness: int = 2,
+                 padding_ms: int = 300, max_segment_seconds: float = 15.0, ratio: float = 0.8):
+        import webrtcvad
+
+        self.sample_rate = sample_rate
+        self.chunk_ms = chunk_ms
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.padding_chunks = max(1, padding_ms // chunk_ms)
+        self.max_chunks = int(max_segment_seconds * 1000 / chunk_ms)
+        self.ratio = ratio
+
+    def segments(self, chunks: Iterator[np.ndarray]) -> Iterator[Tuple[float, np.ndarray]]:
+        """Yield (start_seconds, int16 samples) for each detected utterance"""
+        window = collections.deque(maxlen=self.padding_chunks)
+        voiced = []
+        triggered = False
+        start_index = 0
+
+        for index, chunk in enumerate(chunks):
+            is_speech = self.vad.is_speech(chunk.tobytes(), self.sample_rate)
+
+            if not triggered:
+                window.append((chunk, is_speech))
+                if sum(speech for _, speech in window) > self.ratio * window.maxlen:
+                    triggered = True
+                    start_index = index - len(window) + 1
+                    voiced = [c for c, _ in window]
+                    window.clear()
+                continue
+
+            voiced.append(chunk)
+            window.append((chunk, is_speech))
+            silent = sum(not speech for _, speech in window)
+            if silent > self.ratio * window.maxlen or len(voiced) >= self.max_chunks:
+                yield start_index * self.chunk_ms / 1000.0, np.concatenate(voiced)
+                triggered = False
+                voiced = []
+                window.clear()
+
+        if triggered and voiced:
+            yield start_index * self.chunk_ms / 1000.0, np.concatenate(voiced)
+
+def pcm_to_wav_bytes(samples: np.ndarray, sample_rate: int = 16000) -> bytes:
+    """Wrap int16 mono samples in a WAV container"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(np.asarray(samples, dtype=np.int16).tobytes())
+    return buffer.getvalue()
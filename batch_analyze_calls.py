@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Batch/offline analysis of recorded calls
+
+Walks a directory (or reads a manifest) of WAV/WebM recordings and runs the
+scam detection pipeline on each file without a microphone or prompts:
+
+- CPU-bound work (decoding/resampling, acoustic voice features) runs in a
+  process pool
+- I/O-bound work (Google STT, optional Gemini calls) runs in a thread pool
+- Every finished file is appended to a JSONL checkpoint, so an interrupted
+  run resumes where it stopped
+- Results are written as JSONL, or converted to Parquet at the end
+- With --feature-store (or FEATURE_STORE_DIR) every call's feature vector
+  and frame-level voice arrays are also kept in the feature store
+
+Usage:
+    python batch_analyze_calls.py recordings/ --output results.jsonl
+    python batch_analyze_calls.py manifest.txt --output results.parquet --processes 8 --threads 16
+"""
+
+import os
+import sys
+import json
+import wave
+import time
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from analysis_context import AnalysisContext
+from feature_graph import PROFILE_NAMES
+from feature_store import FeatureStore
+
+AUDIO_EXTENSIONS = ('.wav', '.webm')
+
+def discover_audio_files(source: str) -> List[Dict]:
+    """
+    Find the recordings to analyze
+
+    A directory is walked recursively for WAV/WebM files. Any other file is
+    treated as a manifest: either one path per line, or JSONL objects with a
+    'path' key and optional extra fields (e.g. 'label') that are carried into
+    the result record.
+    """
+    entries = []
+
+    if os.path.isdir(source):
+        for root, _, files in os.walk(source):
+            for name in sorted(files):
+                if name.lower().endswith(AUDIO_EXTENSIONS):
+                    entries.append({'path': os.path.join(root, name)})
+        entries.sort(key=lambda entry: entry['path'])
+        return entries
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as manifest:
+        for line in manifest:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            entry = json.loads(line) if line.startswith('{') else {'path': line}
+            if not os.path.isabs(entry['path']):
+                entry['path'] = os.path.join(base_dir, entry['path'])
+            entries.append(entry)
+
+    return entries
+
+def load_checkpoint(checkpoint_path: str, retry_failed: bool = False) -> Set[str]:
+    """Return the set of source paths already processed in a previous run"""
+    done = set()
+    if not os.path.exists(checkpoint_path):
+        return done
+
+    with open(checkpoint_path, 'r', encoding='utf-8') as checkpoint:
+        for line in checkpoint:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial last line from an interrupted run
+                continue
+            if retry_failed and not record.get('success'):
+                continue
+            done.add(record.get('source_path'))
+
+    return done
+
+def _is_linear16_mono_16k(path: str) -> bool:
+    """Check whether a file is already in the format Google STT is configured for"""
+    try:
+        with wave.open(path, 'rb') as wf:
+            return wf.getframerate() == 16000 and wf.getnchannels() == 1 and wf.getsampwidth() == 2
+    except Exception:
+        return False
+
+def prepare_and_extract(source_path: str, work_dir: str, with_voice_features: bool = True,
+                        feature_profile: Optional[str] = None, keep_frames: bool = False) -> Dict:
+    """
+    Process-pool stage: normalize audio to 16kHz mono LINEAR16 and extract
+    acoustic voice features
+
+    Runs in a worker process, so it only returns plain picklable data.
+    """
+    started = time.perf_counter()
+    result = {'source_path': source_path, 'wav_path': source_path, 'converted': False}
+
+    try:
+        if not _is_linear16_mono_16k(source_path):
+            from pydub import AudioSegment
+
+            audio_format = 'webm' if source_path.lower().endswith('.webm') else None
+            audio = AudioSegment.from_file(source_path, format=audio_format)
+            audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
+
+            fd, wav_path = tempfile.mkstemp(suffix='.wav', dir=work_dir)
+            os.close(fd)
+            audio.export(wav_path, format='wav')
+            result['wav_path'] = wav_path
+            result['converted'] = True
+
+        with wave.open(result['wav_path'], 'rb') as wf:
+            result['audio_duration'] = wf.getnframes() / float(wf.getframerate())
+
+        if with_voice_features:
+            from mozilla_voice_analyzer_fallback import mozilla_voice_analyzer
+            result['voice_insights'] = mozilla_voice_analyzer.generate_voice_insights(result['wav_path'], feature_profile,
+                                                                                      keep_frames)
+
+        result['success'] = True
+
+    except Exception as e:
+        result['success'] = False
+        result['error'] = f"Audio preparation failed: {e}"
+
+    result['prepare_seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+class BatchCallAnalyzer:
+    """Fan recordings out over a process pool (CPU) and a thread pool (STT/LLM I/O)"""
+
+    def __init__(self, processes: Optional[int] = None, threads: int = 8,
+                 with_gemini: bool = False, with_voice_features: bool = True, full_analysis: bool = False,
+                 feature_profile: Optional[str] = None, feature_store=None):
+        """Initialize pool sizes and analysis options (feature_store: a FeatureStore or None)"""
+        self.processes = processes or os.cpu_count() or 1
+        self.threads = threads
+        self.with_gemini = with_gemini
+        self.full_analysis = full_analysis
+        self.with_voice_features = with_voice_features
+        self.feature_profile = feature_profile
+        self.feature_store = feature_store
+        self.scam_detector = None
+        self._detector_lock = threading.Lock()
+
+    def _get_detector(self):
+        """
+        Create the shared detector lazily (STT/Gemini clients are thread-safe)
+
+        Created on first use from the thread pool, i.e. after the worker
+        processes have been forked, so no gRPC channel is inherited by a child.
+        """
+        with self._detector_lock:
+            if self.scam_detector is None:
+                from complete_scam_detector import CompleteScamDetector
+                self.scam_detector = CompleteScamDetector()
+        return self.scam_detector
+
+    def analyze_prepared(self, prepared: Dict, extra: Dict) -> Dict:
+        """Thread-pool stage: transcription, rule-based analysis and optional LLM calls"""
+        started = time.perf_counter()
+        record = dict(extra)
+        record.update({
+            'source_path': prepared['source_path'],
+            'analyzed_at': datetime.utcnow().isoformat(),
+            'audio_duration': prepared.get('audio_duration', 0),
+            'prepare_seconds': prepared.get('prepare_seconds', 0)
+        })
+
+        try:
+            if not prepared.get('success'):
+                record.update({'success': False, 'error': prepared.get('error')})
+                return record
+
+            detector = self._get_detector()
+            transcription_result = detector.transcribe_with_diarization(prepared['wav_path'])
+            if not transcription_result:
+                record.update({'success': False, 'error': 'Transcription failed'})
+                return record
+
+            context = AnalysisContext(transcription_result)
+            full_text = transcription_result['full_text']
+
+            # Same scoring as api_server.analyze_audio
+            verdict = detector.score_transcription(transcription_result, context)
+            cascade = detector.triage_call(context, verdict['analysis'], force=self.full_analysis,
+                                           endpoint='batch', source_path=prepared['source_path'])
+
+            record.update(verdict, success=True, transcription=transcription_result, cascade=cascade)
+            risk_level = verdict['risk_level']
+            bank_analysis = verdict['bank_analysis']
+
+            if self.with_gemini:
+                # Only ambiguous calls reach Gemini unless --full-analysis is given
+                record['gemini_suggestion'] = detector.cascade_suggestion(cascade, full_text, record['scam_detected'],
+                                                                          risk_level, context=context)
+                bank_rules = detector.cascade_bank_rules(cascade, full_text, bank_analysis)
+                if bank_rules:
+                    record['bank_rules'] = bank_rules
+
+            frames = None
+            if 'voice_insights' in prepared:
+                frames = prepared['voice_insights'].pop('frames', None)
+                record['voice_insights'] = prepared['voice_insights']
+            detector.apply_risk_model(record, context=context)
+            if self.feature_store is not None:
+                try:
+                    self.feature_store.put(record, frames=frames, context=context)
+                except Exception as e:
+                    print(f"⚠️ Feature store write failed for {record['source_path']}: {e}")
+
+        except Exception as e:
+            record.update({'success': False, 'error': str(e)})
+
+        finally:
+            if prepared.get('converted') and os.path.exists(prepared['wav_path']):
+                os.unlink(prepared['wav_path'])
+            record['analyze_seconds'] = round(time.perf_counter() - started, 4)
+
+        return record
+
+    def run(self, entries: List[Dict], checkpoint_path: str, retry_failed: bool = False) -> Dict:
+        """
+        Analyze all entries not already present in the checkpoint
+
+        Results are appended (and flushed) to checkpoint_path as they finish.
+        At most processes + threads files are in flight at any time, which
+        keeps memory bounded on large archives.
+        """
+        done = load_checkpoint(checkpoint_path, retry_failed)
+        pending = [entry for entry in entries if entry['path'] not in done]
+
+        print(f"📂 {len(entries)} recordings found, {len(entries) - len(pending)} already done, {len(pending)} to analyze")
+
+        stats = {'total': len(pending), 'succeeded': 0, 'failed': 0}
+        if not pending:
+            return stats
+
+        started = time.perf_counter()
+        max_in_flight = self.processes + self.threads
+        work_dir = tempfile.mkdtemp(prefix='batch_analysis_')
+
+        with ProcessPoolExecutor(max_workers=self.processes) as process_pool, \
+                ThreadPoolExecutor(max_workers=self.threads) as thread_pool, \
+                open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+
+            queue = iter(pending)
+            in_flight = {}
+
+            def submit_next():
+                entry = next(queue, None)
+                if entry is None:
+                    return False
+                extra = {key: value for key, value in entry.items() if key != 'path'}
+                future = process_pool.submit(prepare_and_extract, entry['path'], work_dir, self.with_voice_features,
+                                             self.feature_profile, self.feature_store is not None)
+                in_flight[future] = ('prepare', entry['path'], extra)
+                return True
+
+            while len(in_flight) < max_in_flight and submit_next():
+                pass
+
+            while in_flight:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, source_path, extra = in_flight.pop(future)
+
+                    if stage == 'prepare':
+                        try:
+                            prepared = future.result()
+                        except Exception as e:
+                            prepared = {'source_path': source_path, 'success': False, 'error': str(e)}
+                        in_flight[thread_pool.submit(self.analyze_prepared, prepared, extra)] = ('analyze', source_path, extra)
+                        continue
+
+                    record = future.result()
+                    checkpoint.write(json.dumps(record, default=str, ensure_ascii=False) + '\n')
+                    checkpoint.flush()
+
+                    if record.get('success'):
+                        stats['succeeded'] += 1
+                        print(f"✅ {record['source_path']}: {record['risk_level']} ({record['overall_risk_score']:.2f})")
+                    else:
+                        stats['failed'] += 1
+                        print(f"❌ {record['source_path']}: {record.get('error')}")
+
+                    submit_next()
+
+        try:
+            os.rmdir(work_dir)
+        except OSError:
+            pass
+
+        elapsed = time.perf_counter() - started
+        stats['seconds'] = round(elapsed, 2)
+        stats['files_per_minute'] = round(stats['total'] / elapsed * 60, 1) if elapsed > 0 else 0.0
+        return stats
+
+def convert_checkpoint_to_parquet(checkpoint_path: str, output_path: str) -> bool:
+    """Convert the JSONL checkpoint to Parquet (nested fields stored as JSON strings)"""
+    try:
+        import pandas as pd
+    except ImportError:
+        print("❌ pandas (with pyarrow) is required for Parquet output")
+        return False
+
+    rows = []
+    with open(checkpoint_path, 'r', encoding='utf-8') as checkpoint:
+        for line in checkpoint:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            rows.append({
+                key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+                for key, value in record.items()
+            })
+
+    pd.DataFrame(rows).to_parquet(output_path, index=False)
+    print(f"💾 Wrote {len(rows)} rows to {output_path}")
+    return True
+
+def main():
+    """Run batch analysis from the command line"""
+    parser = argparse.ArgumentParser(description="Batch scam analysis of recorded calls")
+    parser.add_argument('source', help="Directory of WAV/WebM files or a manifest file")
+    parser.add_argument('--output', default='batch_results.jsonl', help="Output path (.jsonl or .parquet)")
+    parser.add_argument('--processes', type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument('--threads', type=int, default=8, help="Thread pool size for STT/LLM calls")
+    parser.add_argument('--with-gemini', action='store_true', help="Also request Gemini suggestions and bank rules")
+    parser.add_argument('--full-analysis', action='store_true', help="Call Gemini for every file, not only ambiguous ones")
+    parser.add_argument('--feature-profile', choices=PROFILE_NAMES, default=None,
+                        help="Acoustic feature profile (default: FEATURE_PROFILE or standard)")
+    parser.add_argument('--no-voice-features', action='store_true', help="Skip acoustic voice analysis")
+    parser.add_argument('--feature-store', default=os.getenv('FEATURE_STORE_DIR'),
+                        help="Keep feature vectors and frame arrays in this feature store (default: FEATURE_STORE_DIR)")
+    parser.add_argument('--retry-failed', action='store_true', help="Re-run files that failed in a previous run")
+    args = parser.parse_args()
+
+    print("🗂️ BATCH CALL ANALYSIS")
+    print("=" * 50)
+
+    entries = discover_audio_files(args.source)
+
+    parquet_output = args.output.lower().endswith('.parquet')
+    checkpoint_path = args.output + '.jsonl' if parquet_output else args.output
+
+    analyzer = BatchCallAnalyzer(
+        processes=args.processes,
+        threads=args.threads,
+        with_gemini=args.with_gemini,
+        with_voice_features=not args.no_voice_features,
+        full_analysis=args.full_analysis,
+        feature_profile=args.feature_profile,
+        feature_store=FeatureStore(args.feature_store) if args.feature_store else None
+    )
+    stats = analyzer.run(entries, checkpoint_path, retry_failed=args.retry_failed)
+
+    print(f"\n📊 Analyzed: {stats['total']} | ✅ {stats['succeeded']} | ❌ {stats['failed']}")
+    if 'files_per_minute' in stats:
+        print(f"⏱️ {stats['seconds']}s total, {stats['files_per_minute']} files/min")
+
+    if parquet_output and not convert_checkpoint_to_parquet(checkpoint_path, args.output):
+        return 1
+
+    return 0 if stats['failed'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Deterministic local fakes for the external services used by the pipeline
+
+- FakeSpeechClient      -> google.cloud.speech.SpeechClient
+- FakeGenerativeModel   -> google.generativeai.GenerativeModel
+- FakeCollection        -> pymongo collection (in-memory)
+- FakeAnalyzedCallModel -> analyzed_call_model.analyzed_call_model
+- FakeUserModel         -> user_model.user_model
+- FakePinataService     -> pinata_service.PinataService
+
+Each fake can simulate network latency so macro-benchmarks reflect the
+shape of a real request without touching the network.
+"""
+
+import os
+import sys
+import time
+import types
+import uuid
+import hashlib
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+class _Obj:
+    """Tiny attribute container used to mimic SDK response objects"""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+class FakeSpeechClient:
+    """
+    Stand-in for speech.SpeechClient
+
+    Transcripts are registered by SHA-1 of the audio content; unknown audio
+    gets the default transcript. Confidence is highest when the config
+    language matches the transcript language, so best-config selection in
+    transcribe_with_diarization behaves as with the real service.
+    """
+
+    def __init__(self, transcripts: Optional[Dict[str, Dict]] = None,
+                 default_transcript: Optional[Dict] = None, latency: float = 0.0, **_):
+        self.transcripts = transcripts if transcripts is not None else {}
+        self.default_transcript = default_transcript
+        self.latency = latency
+        self.calls = 0
+
+    def register(self, content: bytes, transcript: Dict, language: str = 'en'):
+        """Register the transcript returned for a given audio payload"""
+        self.transcripts[hashlib.sha1(content).hexdigest()] = dict(transcript, language=language)
+
+    def recognize(self, config=None, audio=None):
+        """Return a response shaped like RecognizeResponse"""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        content = getattr(audio, 'content', b'') or b''
+        transcript = self.transcripts.get(hashlib.sha1(content).hexdigest(), self.default_transcript)
+        if not transcript:
+            return _Obj(results=[])
+
+        language = transcript.get('language', 'en')
+        config_language = getattr(config, 'language_code', 'en-US') or 'en-US'
+        confidence = 0.92 if config_language.startswith(language) else 0.41
+
+        words = [
+            _Obj(
+                word=w['word'],
+                speaker_tag=w['speaker_tag'],
+                start_time=timedelta(seconds=w['start_time']),
+                end_time=timedelta(seconds=w['end_time'])
+            )
+            for w in transcript['words']
+        ]
+        alternative = _Obj(transcript=transcript['full_text'], confidence=confidence, words=words)
+        return _Obj(results=[_Obj(alternatives=[alternative])])
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel with deterministic text and optional streaming"""
+
+    def __init__(self, model_name: str = 'fake-gemini', latency: float = 0.0,
+                 token_latency: float = 0.0, **_):
+        self.model_name = model_name
+        self.latency = latency
+        self.token_latency = token_latency
+        self.calls = 0
+
+    def _text_for(self, prompt: str) -> str:
+        digest = hashlib.sha1(str(prompt).encode('utf-8')).hexdigest()[:8]
+        return (
+            "1. Analysis: This call shows signs consistent with the detected status.\n"
+            "2. Red flags: requests for OTP, PIN or payment.\n"
+            "  - Never share codes over the phone\n"
+            "3. Advice: Hang up and call your bank on its official number.\n"
+            f"4. Next steps: Report the number. (ref {digest})"
+        )
+
+    def generate_content(self, prompt, stream: bool = False, **_):
+        """Return an object with .text, or an iterator of chunks when stream=True"""
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = self._text_for(prompt)
+
+        if not stream:
+            return _Obj(text=text)
+
+        def chunks():
+            for token in text.split(' '):
+                if self.token_latency:
+                    time.sleep(self.token_latency)
+                yield _Obj(text=token + ' ')
+        return chunks()
+
+def _matches(document: Dict, query: Dict) -> bool:
+    for key, expected in query.items():
+        value = document
+        for part in key.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(expected, dict) and any(op.startswith('$') for op in expected):
+            for op, operand in expected.items():
+                if op == '$gte' and not (value is not None and value >= operand):
+                    return False
+                if op == '$lt' and not (value is not None and value < operand):
+                    return False
+                if op == '$in' and value not in operand:
+                    return False
+                if op == '$exists' and (value is not None) != operand:
+                    return False
+        elif value != expected:
+            return False
+    return True
+
+class FakeCursor:
+    """Minimal chainable cursor"""
+
+    def __init__(self, documents: List[Dict]):
+        self.documents = documents
+
+    def sort(self, key, direction=1):
+        self.documents = sorted(self.documents, key=lambda d: str(d.get(key, '')), reverse=direction == -1)
+        return self
+
+    def skip(self, count):
+        self.documents = self.documents[count:]
+        return self
+
+    def limit(self, count):
+        if count:
+            self.documents = self.documents[:count]
+        return self
+
+    def batch_size(self, _):
+        return self
+
+    def __iter__(self):
+        return iter([dict(d) for d in self.documents])
+
+class FakeCollection:
+    """In-memory collection implementing the subset of pymongo the repo uses"""
+
+    def __init__(self, latency: float = 0.0):
+        self.documents: List[Dict] = []
+        self.latency = latency
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def with_options(self, **_):
+        return self
+
+    def create_index(self, *_, **__):
+        return 'fake_index'
+
+    def insert_one(self, document: Dict):
+        self._sleep()
+        document.setdefault('_id', uuid.uuid4().hex)
+        self.documents.append(document)
+        return _Obj(inserted_id=document['_id'])
+
+    def insert_many(self, documents: List[Dict], ordered: bool = True):
+        self._sleep()
+        ids = []
+        for document in documents:
+            document.setdefault('_id', uuid.uuid4().hex)
+            self.documents.append(document)
+            ids.append(document['_id'])
+        return _Obj(inserted_ids=ids)
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None):
+        return FakeCursor([d for d in self.documents if _matches(d, query or {})])
+
+    def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None):
+        for document in self.documents:
+            if _matches(document, query or {}):
+                return dict(document)
+        return None
+
+    def count_documents(self, query: Optional[Dict] = None):
+        return sum(1 for d in self.documents if _matches(d, query or {}))
+
+    def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        self._sleep()
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(update.get('$set', {}))
+                return _Obj(matched_count=1, modified_count=1)
+        return _Obj(matched_count=0, modified_count=0)
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True):
+        self._sleep()
+        modified = 0
+        for request in requests:
+            result = self.update_one(request._filter, request._doc)
+            modified += result.modified_count
+        return _Obj(modified_count=modified, matched_count=modified)
+
+class FakeAnalyzedCallModel:
+    """Stand-in for AnalyzedCallModel backed by a FakeCollection"""
+
+    def __init__(self, latency: float = 0.0):
+        self.analyzed_calls_collection = FakeCollection(latency=latency)
+
+    def save_analyzed_call(self, user_id, call_data):
+        document = dict(call_data, user_id=user_id)
+        result = self.analyzed_calls_collection.insert_one(document)
+        return {"success": True, "call_id": str(result.inserted_id), "message": "Analyzed call saved successfully"}
+
+    def bulk_save_analyzed_calls(self, records, batch_size=500, **_):
+        documents = [dict(r) if isinstance(r, dict) else dict(r[1], user_id=r[0]) for r in records]
+        self.analyzed_calls_collection.insert_many(documents, ordered=False)
+        return {"success": True, "totals": {"submitted": len(documents), "inserted": len(documents), "failed": 0, "invalid": 0}}
+
+    def get_analyzed_calls(self, user_id=None, limit=50, offset=0):
+        query = {"user_id": user_id} if user_id else {}
+        return list(self.analyzed_calls_collection.find(query).sort("timestamp", -1).skip(offset).limit(limit))
+
+    def get_analyzed_call_by_id(self, analysis_id, user_id=None):
+        return self.analyzed_calls_collection.find_one({"analysis_id": analysis_id})
+
+    def claim_deferred_section(self, analysis_id, name, stale_before):
+        for document in self.analyzed_calls_collection.documents:
+            if document.get('analysis_id') != analysis_id:
+                continue
+            section = document.setdefault('sections', {}).setdefault(name, {'status': 'pending'})
+            if section.get('status') in ('pending', 'failed') or (
+                    section.get('status') == 'generating' and section.get('claimed_at', '') < stale_before):
+                section.update(status='generating', claimed_at=datetime.utcnow().isoformat())
+                return True
+        return False
+
+    def store_deferred_section(self, analysis_id, name, section, text=None):
+        for document in self.analyzed_calls_collection.documents:
+            if document.get('analysis_id') == analysis_id:
+                document.setdefault('sections', {})[name] = section
+                if text is not None:
+                    document[name] = text
+                return True
+        return False
+
+class FakeUserModel:
+    """Stand-in for UserModel: no users, every token is rejected"""
+
+    def verify_jwt_token(self, token):
+        return None
+
+    def get_user_by_id(self, user_id):
+        return None
+
+class FakePinataService:
+    """Stand-in for PinataService returning content-addressed fake hashes"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.uploads = 0
+
+    def upload_audio_file(self, audio_data: bytes, filename: str, metadata: Dict[str, Any] = None):
+        self.uploads += 1
+        if self.latency:
+            time.sleep(self.latency)
+        ipfs_hash = 'bafy' + hashlib.sha256(audio_data).hexdigest()[:40]
+        return {
+            'success': True,
+            'ipfs_hash': ipfs_hash,
+            'ipfs_url': f"https://gateway.pinata.cloud/ipfs/{ipfs_hash}",
+            'pinata_url': f"https://gateway.pinata.cloud/ipfs/{ipfs_hash}",
+            'file_size': len(audio_data),
+            'filename': filename
+        }
+
+def install_fake_backends(speech_client: Optional[FakeSpeechClient] = None,
+                          gemini_latency: float = 0.0, mongo_latency: float = 0.0,
+                          pinata_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Patch the SDKs and the repo's service modules with fakes
+
+    Must run before importing api_server or complete_scam_detector so that
+    the global instances they create are built from the fakes.
+    """
+    speech_client = speech_client or FakeSpeechClient()
+    fakes = {
+        'speech_client': speech_client,
+        'gemini_model': FakeGenerativeModel(latency=gemini_latency),
+        'analyzed_call_model': FakeAnalyzedCallModel(latency=mongo_latency),
+        'user_model': FakeUserModel(),
+        'pinata_service': FakePinataService(latency=pinata_latency)
+    }
+
+    # Credentials file must exist for CompleteScamDetector.__init__
+    fd, creds_path = tempfile.mkstemp(suffix='.json', prefix='fake_credentials_')
+    os.close(fd)
+    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = creds_path
+    os.environ['GEMINI_API_KEY'] = 'fake-gemini-key'
+    os.environ.setdefault('MONGODB_URI', 'mongodb://fake')
+    os.environ.setdefault('PINATA_JWT', 'fake-jwt')
+
+    from google.cloud import speech
+    speech.SpeechClient = lambda *args, **kwargs: speech_client
+
+    import google.generativeai as genai
+    genai.configure = lambda *args, **kwargs: None
+    genai.GenerativeModel = lambda *args, **kwargs: fakes['gemini_model']
+
+    analyzed_module = types.ModuleType('analyzed_call_model')
+    analyzed_module.analyzed_call_model = fakes['analyzed_call_model']
+    analyzed_module.AnalyzedCallModel = FakeAnalyzedCallModel
+    sys.modules['analyzed_call_model'] = analyzed_module
+
+    user_module = types.ModuleType('user_model')
+    user_module.user_model = fakes['user_model']
+    sys.modules['user_model'] = user_module
+
+    pinata_module = types.ModuleType('pinata_service')
+    pinata_module.PinataService = FakePinataService
+    pinata_module.get_pinata_service = lambda: fakes['pinata_service']
+    sys.modules['pinata_service'] = pinata_module
+
+    return fakes
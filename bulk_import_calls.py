@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Bulk importer for historical analyzed calls
+
+Reads analysis records (one JSON object per line, same shape as the
+analysis_record built in api_server.analyze_audio) and streams them into
+the analyzed_calls collection with batched, unordered writes.
+
+Usage:
+    python bulk_import_calls.py records.jsonl [more.jsonl ...] --batch-size 1000
+    cat records.jsonl | python bulk_import_calls.py -
+"""
+
+import sys
+import json
+import uuid
+import argparse
+
+def iter_analysis_records(paths, default_user_id=None):
+    """Yield analysis records from JSONL files without loading them into memory"""
+    for path in paths:
+        handle = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+        try:
+            for line_number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"⚠️ {path}:{line_number} is not valid JSON: {e}")
+                    continue
+
+                record.setdefault('analysis_id', str(uuid.uuid4()))
+                if default_user_id and not record.get('user_id'):
+                    record['user_id'] = default_user_id
+                yield record
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+def main():
+    """Run the bulk importer"""
+    parser = argparse.ArgumentParser(description="Bulk import analyzed calls into MongoDB")
+    parser.add_argument('paths', nargs='+', help="JSONL files with analysis records ('-' for stdin)")
+    parser.add_argument('--batch-size', type=int, default=500, help="Documents per insert_many batch")
+    parser.add_argument('--user-id', default=None, help="User ID for records without one")
+    parser.add_argument('--majority', action='store_true', help="Use w='majority' instead of w=1")
+    args = parser.parse_args()
+
+    print("📥 BULK ANALYZED CALL IMPORT")
+    print("=" * 50)
+
+    from analyzed_call_model import analyzed_call_model
+
+    result = analyzed_call_model.bulk_save_analyzed_calls(
+        iter_analysis_records(args.paths, args.user_id),
+        batch_size=args.batch_size,
+        write_concern_w='majority' if args.majority else 1
+    )
+
+    if 'totals' not in result:
+        print(f"❌ Import failed: {result.get('error')}")
+        return 1
+
+    totals = result['totals']
+    print(f"\n📊 Submitted: {totals['submitted']}")
+    print(f"✅ Inserted: {totals['inserted']}")
+    print(f"❌ Failed: {totals['failed']}")
+    print(f"⚠️ Invalid: {totals['invalid']}")
+    print(f"⏱️ Throughput: {result['docs_per_second']} docs/s")
+
+    return 0 if result['success'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tiered analysis cascade
+
+Cheap stages run for every call: lexicon matching, the logic rules and
+turn-taking features (all from the request's AnalysisContext), plus the
+librosa fallback acoustic features where a caller uses them. Their result
+is triaged into one of three tiers using configurable confidence bands:
+
+    critical   logic rules fired, or triage score >= CASCADE_CRITICAL_ABOVE
+    benign     triage score < CASCADE_BENIGN_BELOW and no scam, intent or bank vocabulary
+    ambiguous  everything in between
+
+Heavy stages (HEAVY_STAGES: the two Gemini calls and the transformer
+NLP pipelines of EnhancedFeatureExtractor, via heavy_nlp=plan['nlp_features'])
+run only for ambiguous calls, when the caller explicitly asks for a full
+analysis, or when the cascade is disabled (CASCADE_ENABLED=0). Critical
+and benign calls get a canned, tier-specific suggestion instead of an
+LLM call.
+
+Every decision is logged ("Cascade decision") with its tier, score and
+skipped stages, counted in Prometheus (scam_cascade_decisions_total,
+scam_cascade_stages_skipped_total) and attached to the stored record, so
+the saved LLM/model cost can be compared with accuracy later.
+"""
+
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+from pipeline_metrics import get_logger, metrics_registry
+
+logger = get_logger('cascade')
+
+TIER_CRITICAL = 'critical'
+TIER_AMBIGUOUS = 'ambiguous'
+TIER_BENIGN = 'benign'
+
+HEAVY_STAGES = ('gemini_suggestion', 'bank_rules', 'nlp_features')
+
+# Vocabulary that keeps a low-scoring call out of the benign tier
+BENIGN_BLOCKING_CATEGORIES = ('high_risk_phrases', 'bank_terms', 'intent_scam_request',
+                              'intent_information_gathering', 'intent_money_transfer')
+
+cascade_decisions = metrics_registry.counter(
+    'scam_cascade_decisions_total',
+    'Cascade triage decisions by tier'
+)
+cascade_skipped = metrics_registry.counter(
+    'scam_cascade_stages_skipped_total',
+    'Heavy stages skipped by the cascade'
+)
+
+class CascadePolicy:
+    """Confidence bands and the heavy-stage plan derived from them"""
+
+    def __init__(self, benign_below: Optional[float] = None, critical_above: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        self.benign_below = benign_below if benign_below is not None else float(os.getenv('CASCADE_BENIGN_BELOW', '0.02'))
+        self.critical_above = critical_above if critical_above is not None else float(os.getenv('CASCADE_CRITICAL_ABOVE', '0.7'))
+        if enabled is None:
+            enabled = os.getenv('CASCADE_ENABLED', '1') not in ('0', 'false', 'no')
+        self.enabled = enabled
+
+    def triage(self, context, analysis_results: Dict, logic_result: Tuple[bool, str]) -> Dict:
+        """Assign a tier from the cheap-stage results"""
+        logic_scam_detected, logic_reason = logic_result
+        score = max([result['risk_score'] for result in analysis_results.values()], default=0.0)
+        keywords = sum(result.get('unique_scam_keywords', 0) for result in analysis_results.values())
+        blocking = [category for category in BENIGN_BLOCKING_CATEGORIES if context.contains_any(category)]
+
+        if logic_scam_detected:
+            tier, reason = TIER_CRITICAL, logic_reason
+        elif score >= self.critical_above:
+            tier, reason = TIER_CRITICAL, f"triage score {score:.2f} >= {self.critical_above}"
+        elif score < self.benign_below and not keywords and not blocking:
+            tier, reason = TIER_BENIGN, f"triage score {score:.2f} < {self.benign_below}, no scam vocabulary"
+        else:
+            tier = TIER_AMBIGUOUS
+            reason = f"triage score {score:.2f}" + (f", found {', '.join(blocking)}" if blocking else '')
+
+        return {
+            'tier': tier,
+            'score': round(float(score), 4),
+            'reason': reason,
+            'bands': {'benign_below': self.benign_below, 'critical_above': self.critical_above}
+        }
+
+    def plan(self, decision: Dict, force: bool = False, requested: Iterable[str] = ()) -> Dict[str, bool]:
+        """Which heavy stages to run for this decision"""
+        run_all = force or not self.enabled or decision['tier'] == TIER_AMBIGUOUS
+        requested = set(requested)
+        return {stage: run_all or stage in requested for stage in HEAVY_STAGES}
+
+    def decide(self, context, analysis_results: Dict, logic_result: Tuple[bool, str], force: bool = False,
+               requested: Iterable[str] = (), **log_fields) -> Dict:
+        """triage() + plan(), logged and counted; returns the decision with its 'plan'"""
+        decision = self.triage(context, analysis_results, logic_result)
+        decision['plan'] = self.plan(decision, force, requested)
+        decision['forced'] = bool(force)
+        skipped = [stage for stage, run in decision['plan'].items() if not run]
+
+        cascade_decisions.inc(tier=decision['tier'])
+        for stage in skipped:
+            cascade_skipped.inc(stage=stage, tier=decision['tier'])
+        logger.info("Cascade decision", extra=dict(log_fields, tier=decision['tier'], score=decision['score'],
+                                                   forced=decision['forced'], skipped=','.join(skipped) or 'none',
+                                                   reason=decision['reason']))
+        return decision
+
+def canned_suggestion(decision: Dict) -> str:
+    """Tier-specific advice used instead of a Gemini call"""
+    if decision['tier'] == TIER_CRITICAL:
+        return (
+            "1. This call matches a known scam pattern: " + decision['reason'] + "\n\n"
+            "2. Red flags: requests for OTPs, PINs, passwords or urgent payments, and callers claiming to be your bank\n\n"
+            "3. Do not share any codes or personal details and do not send money\n\n"
+            "4. Hang up and call your bank on the number printed on your card or statement"
+        )
+    return (
+        "1. No scam indicators were found in this conversation\n\n"
+        "2. No requests for codes, passwords or payments were detected\n\n"
+        "3. Stay alert if the caller later asks for OTPs, PINs or money\n\n"
+        "4. No action needed"
+    )
+
+_policy: Optional[CascadePolicy] = None
+
+def get_cascade_policy() -> CascadePolicy:
+    """Shared policy built from the CASCADE_* environment variables"""
+    global _policy
+    if _policy is None:
+        _policy = CascadePolicy()
+    return _policy
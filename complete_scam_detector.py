@@ -4,31 +4,80 @@ import wave
 import sounddevice as sd
 import numpy as np
 import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
 from google.cloud import speech
 from dotenv import load_dotenv
 import google.generativeai as genai
+import logging
+from pipeline_metrics import get_logger, stage_timer
+from scam_lexicon import get_lexicon, normalize_text, normalize_token
+from transliteration import get_transducer
+from turn_taking import conversation_pressure, PRESSURE_RISK_WEIGHT
+from risk_model import get_risk_model
+from voice_index import get_voice_index
+from analysis_context import AnalysisContext
+from cascade import get_cascade_policy, canned_suggestion
+
+logger = get_logger('complete_scam_detector')
+
 # Mozilla Voice integration (optional)
 try:
-    from mozilla_voice_analyzer_fallback import mozilla_voice_analyzer
+    from mozilla_voice_analyzer_fallback import mozilla_voice_analyzer, generate_voice_insights_timed
     MOZILLA_VOICE_AVAILABLE = True
-    print("✅ Mozilla Voice analyzer loaded")
+    logger.info("Mozilla Voice analyzer loaded")
 except ImportError as e:
-    print(f"⚠️ Mozilla Voice analyzer not available: {e}")
+    logger.warning("Mozilla Voice analyzer not available", extra={'error': str(e)})
     MOZILLA_VOICE_AVAILABLE = False
     mozilla_voice_analyzer = None
+    generate_voice_insights_timed = None
+
+# Voice analysis is CPU-bound, so it runs in worker processes next to the STT/LLM calls
+# (0 processes = a background thread instead)
+VOICE_ANALYSIS_PROCESSES = int(os.getenv('VOICE_ANALYSIS_PROCESSES', '2'))
+VOICE_ANALYSIS_TIMEOUT = float(os.getenv('VOICE_ANALYSIS_TIMEOUT', '120'))
+
+_voice_pool = None
+_voice_pool_lock = threading.Lock()
+
+def get_voice_pool():
+    """Executor for voice analysis, created on first use in the process that needs it"""
+    global _voice_pool
+    with _voice_pool_lock:
+        if _voice_pool is None:
+            if VOICE_ANALYSIS_PROCESSES > 0:
+                # spawn: forking a threaded server process is not safe
+                _voice_pool = ProcessPoolExecutor(max_workers=VOICE_ANALYSIS_PROCESSES,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+            else:
+                _voice_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='voice')
+        return _voice_pool
+
+def shutdown_voice_pool():
+    """Stop voice analysis workers (called when a server worker exits)"""
+    global _voice_pool
+    with _voice_pool_lock:
+        if _voice_pool is not None:
+            _voice_pool.shutdown(wait=False, cancel_futures=True)
+            _voice_pool = None
 
 # Load environment variables
 load_dotenv()
 
+# Stop trying STT language configs once one is this confident (1.0 = always try all)
+STT_EARLY_EXIT_CONFIDENCE = float(os.getenv('STT_EARLY_EXIT_CONFIDENCE', '0.92'))
+
 class CompleteScamDetector:
     def __init__(self):
         """Initialize the complete scam detector"""
         creds_path = os.getenv('GOOGLE_APPLICATION_CREDENTIALS', './google-credentials.json')
         if not os.path.exists(creds_path):
-            print(f"❌ Credentials file not found: {creds_path}")
+            logger.error("Credentials file not found", extra={'path': creds_path})
             raise FileNotFoundError(f"Credentials file not found: {creds_path}")
         
-        print(f"✅ Using credentials file: {creds_path}")
+        logger.info("Using credentials file", extra={'path': creds_path})
         self.speech_client = speech.SpeechClient()
         self.sample_rate = 16000  # Use 16kHz like working two_person_test.py
         self.channels = 1
@@ -38,107 +87,43 @@ class CompleteScamDetector:
         if gemini_api_key:
             genai.configure(api_key=gemini_api_key)
             self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-            print("✅ Gemini AI initialized successfully")
+            logger.info("Gemini AI initialized")
         else:
             self.gemini_model = None
-            print("⚠️ Gemini API key not found - AI suggestions disabled")
-        
-        # Scam detection keywords (expanded and improved) - Multi-language support
-        self.scam_keywords = [
-            # English keywords
-            'otp', 'password', 'pin', 'account', 'blocked', 'suspended',
-            'urgent', 'immediately', 'verify', 'confirm', 'share', 'send',
-            'bank', 'rbi', 'government', 'tax', 'refund', 'win', 'prize',
-            'suspicious', 'fraud', 'security', 'update', 'reactivate',
-            'debit', 'credit', 'card', 'number', 'cvv', 'expiry',
-            'say', 'tell', 'give', 'provide', 'enter', 'input', 'type',
-            'code', 'verification', 'authenticate', 'unlock', 'unblock',
-            'reactivate', 'restore', 'access', 'login', 'credentials',
-            'pay', 'payment', 'money', 'transfer', 'deposit', 'send',
-            'fees', 'charges', 'penalty', 'fine', 'amount', 'cost',
-            'reactivate', 'activate', 'restore', 'unlock', 'unblock',
-            
-            # Hindi keywords
-            'ओटीपी', 'पासवर्ड', 'पिन', 'खाता', 'ब्लॉक', 'रोका', 'तत्काल',
-            'जल्दी', 'सत्यापन', 'पुष्टि', 'साझा', 'भेजें', 'बैंक', 'सरकार',
-            'कर', 'रिफंड', 'जीत', 'पुरस्कार', 'संदिग्ध', 'धोखाधड़ी', 'सुरक्षा',
-            'अपडेट', 'पुनः सक्रिय', 'डेबिट', 'क्रेडिट', 'कार्ड', 'नंबर',
-            'कहें', 'बताएं', 'दें', 'प्रदान', 'दर्ज', 'इनपुट', 'टाइप',
-            'कोड', 'सत्यापन', 'प्रमाणीकरण', 'अनलॉक', 'अनब्लॉक',
-            'पुनः सक्रिय', 'पुनर्स्थापित', 'पहुंच', 'लॉगिन', 'क्रेडेंशियल',
-            
-            # Bengali keywords
-            'ওটিপি', 'পাসওয়ার্ড', 'পিন', 'অ্যাকাউন্ট', 'ব্লক', 'রোধ', 'জরুরি',
-            'তাৎক্ষণিক', 'যাচাই', 'নিশ্চিত', 'শেয়ার', 'পাঠান', 'ব্যাংক', 'সরকার',
-            'কর', 'রিফান্ড', 'জয়', 'পুরস্কার', 'সন্দেহজনক', 'জালিয়াতি', 'নিরাপত্তা',
-            'আপডেট', 'পুনরায় সক্রিয়', 'ডেবিট', 'ক্রেডিট', 'কার্ড', 'নম্বর',
-            'বলুন', 'বলুন', 'দিন', 'প্রদান', 'লিখুন', 'ইনপুট', 'টাইপ',
-            'কোড', 'যাচাই', 'প্রমাণীকরণ', 'আনলক', 'আনব্লক',
-            'পুনরায় সক্রিয়', 'পুনরুদ্ধার', 'অ্যাক্সেস', 'লগইন', 'ক্রেডেনশিয়াল'
-        ]
+            logger.warning("Gemini API key not found - AI suggestions disabled")
         
-        # High-risk phrases that indicate immediate danger - Multi-language
-        self.high_risk_phrases = [
-            # English phrases
-            'say your otp', 'tell your otp', 'give your otp', 'share your otp',
-            'provide your otp', 'enter your otp', 'type your otp', 'your otp',
-            'say your password', 'tell your password', 'give your password',
-            'share your pin', 'tell your pin', 'give your pin',
-            'bank account blocked', 'account suspended', 'urgent verification',
-            'immediate action', 'suspicious activity', 'fraud detected',
-            
-            # Payment/Unblocking Scams
-            'pay us money to unblock', 'pay money to unblock account',
-            'send money to unblock', 'transfer money to unblock',
-            'deposit money to unblock', 'pay fees to unblock',
-            'pay charges to unblock', 'pay penalty to unblock',
-            'pay fine to unblock', 'pay amount to unblock',
-            'send payment to unblock', 'make payment to unblock',
-            'pay to reactivate', 'pay to restore', 'pay to unlock',
-            'pay to activate', 'pay to verify', 'pay to confirm',
-            
-            # Bank Impersonation Scams
-            'i am from the bank', 'we are from the bank', 'bank calling',
-            'bank representative', 'bank official', 'bank employee',
-            'give us money', 'send us money', 'transfer money to us',
-            'deposit money to us', 'pay us', 'send payment to us',
-            'bank asking for money', 'bank wants money', 'bank needs money',
-            
-            # Hindi phrases
-            'अपना ओटीपी बताएं', 'ओटीपी साझा करें', 'ओटीपी दें', 'ओटीपी कहें',
-            'अपना पासवर्ड बताएं', 'पासवर्ड साझा करें', 'पासवर्ड दें',
-            'अपना पिन बताएं', 'पिन साझा करें', 'पिन दें',
-            'बैंक खाता ब्लॉक', 'खाता रोका गया', 'तत्काल सत्यापन',
-            'तत्काल कार्रवाई', 'संदिग्ध गतिविधि', 'धोखाधड़ी का पता चला',
-            
-            # Hindi Payment Scams
-            'पैसे भेजकर अनब्लॉक करें', 'रुपए भेजकर खाता खोलें',
-            'पैसे देकर अनब्लॉक करें', 'रुपए देकर खाता सक्रिय करें',
-            'पैसे ट्रांसफर करके अनब्लॉक करें', 'रुपए भेजकर सक्रिय करें',
-            
-            # Hindi Bank Impersonation
-            'मैं बैंक से हूं', 'हम बैंक से हैं', 'बैंक का कॉल',
-            'बैंक प्रतिनिधि', 'बैंक अधिकारी', 'बैंक कर्मचारी',
-            'हमें पैसे दें', 'हमें रुपए भेजें', 'हमें पैसे ट्रांसफर करें',
-            
-            # Bengali phrases
-            'আপনার ওটিপি বলুন', 'ওটিপি শেয়ার করুন', 'ওটিপি দিন', 'ওটিপি বলুন',
-            'আপনার পাসওয়ার্ড বলুন', 'পাসওয়ার্ড শেয়ার করুন', 'পাসওয়ার্ড দিন',
-            'আপনার পিন বলুন', 'পিন শেয়ার করুন', 'পিন দিন',
-            'ব্যাংক অ্যাকাউন্ট ব্লক', 'অ্যাকাউন্ট রোধ করা হয়েছে', 'জরুরি যাচাই',
-            'জরুরি পদক্ষেপ', 'সন্দেহজনক কার্যকলাপ', 'জালিয়াতি সনাক্ত',
-            
-            # Bengali Payment Scams
-            'টাকা পাঠিয়ে আনব্লক করুন', 'রুপি পাঠিয়ে অ্যাকাউন্ট খুলুন',
-            'টাকা দিয়ে আনব্লক করুন', 'রুপি দিয়ে অ্যাকাউন্ট সক্রিয় করুন',
-            'টাকা ট্রান্সফার করে আনব্লক করুন', 'রুপি পাঠিয়ে সক্রিয় করুন',
-            
-            # Bengali Bank Impersonation
-            'আমি ব্যাংক থেকে', 'আমরা ব্যাংক থেকে', 'ব্যাংকের কল',
-            'ব্যাংক প্রতিনিধি', 'ব্যাংক কর্মকর্তা', 'ব্যাংক কর্মচারী',
-            'আমাদের টাকা দিন', 'আমাদের রুপি পাঠান', 'আমাদের টাকা ট্রান্সফার করুন'
-        ]
+        # Hindi-script English words -> English, compiled once (transliteration.py)
+        self.transliterator = get_transducer()
         
+        # Keyword and phrase lists come from the shared lexicon (scam_lexicon.py)
+        logger.info("Scam lexicon ready", extra={'version': get_lexicon().version})
+    
+    @classmethod
+    def rules_only(cls):
+        """
+        Detector for the rule and scoring stages only
+        
+        No STT or Gemini client and no credentials needed, e.g. for
+        rescoring workers (rescore_calls.py) that never touch audio.
+        """
+        detector = cls.__new__(cls)
+        detector.speech_client = None
+        detector.gemini_model = None
+        detector.sample_rate = 16000
+        detector.channels = 1
+        detector.transliterator = get_transducer()
+        return detector
+    
+    @property
+    def scam_keywords(self):
+        """Normalized scam keywords (all languages) from the current lexicon"""
+        return list(get_lexicon().terms('scam_keywords'))
+    
+    @property
+    def high_risk_phrases(self):
+        """Normalized high-risk phrases (all languages) from the current lexicon"""
+        return list(get_lexicon().terms('high_risk_phrases'))
+    
     def test_microphone(self):
         """Test microphone access"""
         print("🎤 Testing microphone access...")
@@ -197,15 +182,38 @@ class CompleteScamDetector:
     
     def transcribe_with_diarization(self, audio_file):
         """Transcribe audio file with speaker diarization (using working code from two_person_test.py)"""
-        print(f"🔄 Transcribing {audio_file} with speaker diarization...")
+        logger.info("Transcribing with speaker diarization", extra={'audio_file': audio_file})
         
         with io.open(audio_file, 'rb') as audio_file_obj:
             content = audio_file_obj.read()
         
+        return self.transcribe_content(content)
+    
+    def transcribe_content(self, content):
+        """Transcribe in-memory WAV (LINEAR16) bytes with speaker diarization"""
         audio = speech.RecognitionAudio(content=content)
         
+        logger.debug("Audio loaded", extra={'bytes': len(content),
+                                            'estimated_seconds': round(len(content) / (self.sample_rate * 2), 2)})
+        
+        # Try configurations in order and pick the best one; a confident early
+        # result skips the remaining (billed) language configs
+        configs = self.get_stt_configs()
+        candidates = []
+        for i, config in enumerate(configs):
+            candidate = self.recognize_with_config(i, config, audio)
+            candidates.append(candidate)
+            if candidate and candidate[0] >= STT_EARLY_EXIT_CONFIDENCE:
+                if i + 1 < len(configs):
+                    logger.info("STT early exit", extra={'config': i + 1, 'confidence': round(candidate[0], 3),
+                                                         'skipped_configs': len(configs) - i - 1})
+                break
+        return self.build_transcription_result(self.select_best_stt_response(candidates))
+    
+    def get_stt_configs(self):
+        """Recognition configs tried for every call (one per supported language)"""
         # Try multiple configurations for better mixed language support and long audio handling
-        configs = [
+        return [
             # English primary with diarization - using LINEAR16 like working two_person_test.py
             speech.RecognitionConfig(
                 encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
@@ -272,50 +280,57 @@ class CompleteScamDetector:
                 )
             )
         ]
-        
-        best_response = None
-        best_confidence = 0
-        
-        # Try both configurations and pick the best one
-        for i, config in enumerate(configs):
-            try:
-                print(f"🔄 Trying configuration {i+1}: {config.language_code} primary...")
-                print(f"📊 Audio file size: {len(content)} bytes")
-                print(f"⏱️  Estimated duration: {len(content) / (self.sample_rate * 2):.2f} seconds")
-                
+    
+    def recognize_with_config(self, index, config, audio):
+        """Run one STT configuration; returns (average confidence, response) or None on failure"""
+        try:
+            logger.debug("Trying STT configuration", extra={'config': index + 1, 'language': config.language_code})
+            
+            with stage_timer('stt', config=str(index + 1), language=config.language_code):
                 response = self.speech_client.recognize(config=config, audio=audio)
+            
+            if not response.results:
+                return None
+            
+            # Calculate average confidence
+            total_confidence = 0
+            total_alternatives = 0
+            for result in response.results:
+                for alternative in result.alternatives:
+                    total_confidence += alternative.confidence
+                    total_alternatives += 1
+            
+            avg_confidence = total_confidence / total_alternatives if total_alternatives > 0 else 0
+            logger.debug("STT configuration confidence", extra={'config': index + 1, 'confidence': round(avg_confidence, 3)})
+            return avg_confidence, response
                 
-                if response.results:
-                    # Calculate average confidence
-                    total_confidence = 0
-                    total_alternatives = 0
-                    for result in response.results:
-                        for alternative in result.alternatives:
-                            total_confidence += alternative.confidence
-                            total_alternatives += 1
-                    
-                    avg_confidence = total_confidence / total_alternatives if total_alternatives > 0 else 0
-                    print(f"📊 Configuration {i+1} confidence: {avg_confidence:.2f}")
-                    
-                    if avg_confidence > best_confidence:
-                        best_confidence = avg_confidence
-                        best_response = response
-                        print(f"✅ Configuration {i+1} selected!")
-                        
-            except Exception as e:
-                print(f"❌ Configuration {i+1} failed: {e}")
-                continue
+        except Exception as e:
+            logger.warning("STT configuration failed", extra={'config': index + 1, 'error': str(e)})
+            return None
+    
+    def select_best_stt_response(self, candidates):
+        """Pick the highest-confidence response from recognize_with_config results (first wins ties)"""
+        best_response = None
+        best_confidence = 0
+        for candidate in candidates:
+            if candidate and candidate[0] > best_confidence:
+                best_confidence, best_response = candidate
         
         if not best_response:
-            print("❌ All transcription configurations failed!")
+            logger.error("All transcription configurations failed")
             return None
             
-        print(f"✅ Best configuration selected with confidence: {best_confidence:.2f}")
-        response = best_response
+        logger.info("Best STT configuration selected", extra={'confidence': round(best_confidence, 3)})
+        return best_response
+    
+    def build_transcription_result(self, response):
+        """Convert a RecognizeResponse into the serializable transcription dict"""
+        if response is None:
+            return None
         
         try:
             if not response.results:
-                print("❌ No transcription results found!")
+                logger.error("No transcription results found")
                 return None
             
             # Combine all words across results (from two_person_test.py)
@@ -333,178 +348,80 @@ class CompleteScamDetector:
                     'end_time': word_info.end_time.total_seconds()
                 })
             
-            # Group words by speaker (from two_person_test.py)
-            speaker_text = {}
-            for word_info in words_info:
-                speaker_tag = word_info.speaker_tag
-                word = word_info.word
-                if speaker_tag not in speaker_text:
-                    speaker_text[speaker_tag] = []
-                speaker_text[speaker_tag].append(word)
-            
-            # Print transcription per speaker (from two_person_test.py)
-            print(f"\n👥 SPEAKER DIARIZATION RESULT:")
-            print("=" * 50)
-            for speaker_tag in sorted(speaker_text.keys()):
-                text = ' '.join(speaker_text[speaker_tag])
-                print(f"👤 Person {speaker_tag}: {text}")
-            
-            # Word-level timing (from two_person_test.py)
-            print(f"\n⏰ WORD-LEVEL TIMING:")
-            print("-" * 50)
-            for word_info in words_info:
-                print(f"Speaker {word_info.speaker_tag}: '{word_info.word}' "
-                      f"({word_info.start_time.total_seconds():.1f}s - {word_info.end_time.total_seconds():.1f}s)")
-            
-            # Build full text
-            full_text = ' '.join([w.word for w in words_info])
-            
-            # Post-process to improve mixed language handling
-            full_text = self.improve_mixed_language_text(full_text)
-            
-            # Update speaker text with improved text
-            for speaker_tag in speaker_text:
-                speaker_text[speaker_tag] = self.improve_mixed_language_text(' '.join(speaker_text[speaker_tag])).split()
-            
-            print(f"\n✅ Transcription successful!")
-            print(f"   Full Text: {full_text}")
-            print(f"   Speakers Detected: {len(speaker_text)}")
+            return self.assemble_transcription(serializable_words)
             
-            return {
-                'full_text': full_text,
-                'speaker_text': speaker_text,
-                'words': serializable_words
-            }
-                
         except Exception as e:
-            print(f"❌ Transcription error: {e}")
+            logger.exception("Transcription error", extra={'error': str(e)})
             return None
     
-    def improve_mixed_language_text(self, text):
-        """Improve mixed language text by converting common Hindi-transcribed English words back to English"""
-        # Common English words that get transcribed in Hindi script
-        hindi_to_english = {
-            'आई': 'I',
-            'एम': 'am',
-            'गोइंग': 'going',
-            'टू': 'to',
-            'एमिटी': 'Amity',
-            'नोएडा': 'Noida',
-            'है': 'is',
-            'और': 'and',
-            'मेरा': 'my',
-            'नाम': 'name',
-            'रोहन': 'Rohan',
-            'हैं': 'are',
-            'हूं': 'am',
-            'हैं': 'are',
-            'है': 'is',
-            'का': 'of',
-            'की': 'of',
-            'के': 'of',
-            'को': 'to',
-            'से': 'from',
-            'में': 'in',
-            'पर': 'on',
-            'तक': 'until',
-            'तो': 'so',
-            'लेकिन': 'but',
-            'या': 'or',
-            'अगर': 'if',
-            'जब': 'when',
-            'कहां': 'where',
-            'कैसे': 'how',
-            'क्यों': 'why',
-            'क्या': 'what',
-            'कौन': 'who',
-            'कितना': 'how much',
-            'कितने': 'how many'
-        }
+    def assemble_transcription(self, words):
+        """
+        Transcription result from serializable STT words
+        
+        The word list keeps the STT text: WordTable, keyword hits and the
+        phrase checks read it, and native-script phrases ("मैं बैंक से हूं")
+        must stay intact. Only the display text (full_text, speaker_text) has
+        Hindi-transcribed English words converted back to English.
+        """
+        speaker_words = {}
+        for word_info in words:
+            speaker_words.setdefault(word_info['speaker_tag'], []).append(word_info['word'])
+        speaker_text = {speaker_tag: self.transliterator.transduce_tokens(tokens)
+                        for speaker_tag, tokens in speaker_words.items()}
+        
+        # Per-speaker text and word-level timing are only rendered at DEBUG level
+        if logger.isEnabledFor(logging.DEBUG):
+            for speaker_tag in sorted(speaker_text.keys()):
+                logger.debug("Speaker text", extra={'speaker': speaker_tag, 'text': ' '.join(speaker_text[speaker_tag])})
+            for word in words:
+                logger.debug("Word timing", extra=word)
         
-        # Split text into words and convert
-        words = text.split()
-        improved_words = []
+        full_text = self.improve_mixed_language_text(' '.join(word_info['word'] for word_info in words))
         
-        for word in words:
-            # Remove punctuation for comparison
-            clean_word = word.strip('.,!?;:')
-            
-            # Check if it's a Hindi-transcribed English word
-            if clean_word in hindi_to_english:
-                # Replace with English, keeping original punctuation
-                english_word = hindi_to_english[clean_word]
-                if word != clean_word:  # Has punctuation
-                    english_word += word[len(clean_word):]
-                improved_words.append(english_word)
-            else:
-                improved_words.append(word)
+        logger.info("Transcription successful", extra={'speakers': len(speaker_text), 'words': len(words)})
         
-        return ' '.join(improved_words)
+        return {
+            'full_text': full_text,
+            'speaker_text': speaker_text,
+            'words': words
+        }
     
-    def analyze_conversation_logic(self, transcription_text):
-        """Enhanced logic-based scam detection"""
-        text_lower = transcription_text.lower()
-        
-        # Critical scam patterns that override everything else
-        critical_scam_patterns = [
-            # Money transfer scams
-            'send us money', 'transfer money to us', 'pay us money',
-            'send payment to us', 'give us money', 'deposit money to us',
-            'send us rupees', 'transfer rupees to us', 'pay us rupees',
-            'send us lakh', 'transfer lakh to us', 'pay us lakh',
-            
-            # Bank impersonation with money demands
-            'bank asking for money', 'bank wants money', 'bank needs money',
-            'we are from bank and need money', 'bank requesting money',
-            'send money to bank', 'transfer money to bank',
-            
-            # Account unblocking scams
-            'pay money to unblock', 'send money to unblock',
-            'transfer money to unblock', 'deposit money to unblock',
-            'pay to unblock account', 'send to unblock account',
-            'money to unblock', 'payment to unblock',
-            
-            # Urgent payment demands
-            'immediate payment', 'urgent payment', 'send immediately',
-            'transfer immediately', 'pay now', 'send now',
-            'immediate transfer', 'urgent transfer'
-        ]
-        
-        # Check for critical scam patterns
-        for pattern in critical_scam_patterns:
-            if pattern in text_lower:
-                return True, f"CRITICAL SCAM PATTERN DETECTED: '{pattern}'"
+    def improve_mixed_language_text(self, text):
+        """Improve mixed language text by converting common Hindi-transcribed English words back to English"""
+        return self.transliterator.transduce_text(text)
+    
+    def analyze_conversation_logic(self, transcription_text, context=None):
+        """Enhanced logic-based scam detection (memoized on the request's AnalysisContext)"""
+        context = context or AnalysisContext.from_text(transcription_text)
+        return context.memo('logic', lambda: self.evaluate_conversation_logic(context))
+    
+    def evaluate_conversation_logic(self, context):
+        """Logic verdict from the context's lexicon hits"""
+        # Critical scam patterns (money transfer, bank impersonation with money
+        # demands, account unblocking, urgent payment) override everything else
+        pattern = context.first('critical_patterns')
+        if pattern:
+            return True, f"CRITICAL SCAM PATTERN DETECTED: '{pattern}'"
         
         # Check for bank impersonation + money combination
-        bank_impersonation = any(phrase in text_lower for phrase in [
-            'i am from bank', 'we are from bank', 'bank calling',
-            'bank representative', 'bank official', 'bank employee'
-        ])
-        
-        money_demand = any(phrase in text_lower for phrase in [
-            'send money', 'transfer money', 'pay money', 'give money',
-            'send rupees', 'transfer rupees', 'pay rupees', 'give rupees',
-            'send payment', 'transfer payment', 'pay payment'
-        ])
+        bank_impersonation = context.contains_any('bank_impersonation')
+        money_demand = context.contains_any('money_demand')
         
         if bank_impersonation and money_demand:
             return True, "BANK IMPERSONATION + MONEY DEMAND SCAM"
         
         return False, "No critical scam patterns detected"
     
-    def get_gemini_suggestion(self, transcription_text, scam_detected, risk_level):
-        """Get AI-powered suggestions from Gemini"""
-        if not self.gemini_model:
-            return "AI suggestions not available - Gemini API key not configured"
+    def build_gemini_suggestion_prompt(self, transcription_text, scam_detected, risk_level, logic_result=None,
+                                       context=None):
+        """Build the Gemini suggestion prompt (logic_result or context avoid re-running the logic check)"""
+        # Run logic-based analysis to get more accurate scam detection
+        logic_scam_detected, logic_reason = logic_result or self.analyze_conversation_logic(transcription_text, context)
         
-        try:
-            # Run logic-based analysis to get more accurate scam detection
-            logic_scam_detected, logic_reason = self.analyze_conversation_logic(transcription_text)
-            
-            # Use logic-based detection if it found a scam, otherwise use the provided scam_detected
-            final_scam_detected = logic_scam_detected or scam_detected
-            
-            prompt = f"""
+        # Use logic-based detection if it found a scam, otherwise use the provided scam_detected
+        final_scam_detected = logic_scam_detected or scam_detected
+        
+        return f"""
             Analyze this phone conversation transcript for scam detection:
 
             CONVERSATION: "{transcription_text}"
@@ -527,20 +444,74 @@ class CompleteScamDetector:
             - Keep it concise (under 200 words) and practical
             - Do not use any markdown formatting
             """
+    
+    def get_gemini_suggestion(self, transcription_text, scam_detected, risk_level, logic_result=None, context=None):
+        """Get AI-powered suggestions from Gemini"""
+        if not self.gemini_model:
+            return "AI suggestions not available - Gemini API key not configured"
+        
+        try:
+            prompt = self.build_gemini_suggestion_prompt(transcription_text, scam_detected, risk_level,
+                                                         logic_result, context)
             
-            response = self.gemini_model.generate_content(prompt)
+            with stage_timer('llm', call='gemini_suggestion'):
+                response = self.gemini_model.generate_content(prompt)
             raw_response = response.text.strip()
-            print(f"🔍 Raw Gemini response: {raw_response[:100]}...")
+            logger.debug("Raw Gemini response", extra={'preview': raw_response[:100]})
             
             formatted_response = self.format_gemini_response(raw_response)
-            print(f"🔍 Formatted response: {formatted_response[:100]}...")
             
             return formatted_response
             
         except Exception as e:
-            print(f"❌ Gemini AI error: {e}")
+            logger.error("Gemini AI error", extra={'error': str(e)})
             return "AI analysis temporarily unavailable"
     
+    def triage_call(self, context, analysis_results, force=False, **log_fields):
+        """Cascade decision (tier + heavy-stage plan) from the cheap stages, see cascade.py"""
+        logic_result = self.analyze_conversation_logic(context.full_text, context)
+        return get_cascade_policy().decide(context, analysis_results, logic_result, force, **log_fields)
+    
+    def cascade_suggestion(self, cascade, transcription_text, scam_detected, risk_level, logic_result=None,
+                           context=None):
+        """Gemini suggestion when the cascade plans one, the tier's canned advice otherwise"""
+        if cascade['plan']['gemini_suggestion']:
+            return self.get_gemini_suggestion(transcription_text, scam_detected, risk_level, logic_result, context)
+        return canned_suggestion(cascade)
+    
+    def cascade_bank_rules(self, cascade, transcription_text, bank_analysis):
+        """Gemini bank rules for bank-related calls the cascade plans them for"""
+        if not bank_analysis['is_bank_related'] or not cascade['plan']['bank_rules']:
+            return ""
+        logger.info("Bank-related content detected", extra={'keywords': bank_analysis['bank_keywords_detected']})
+        return self.get_bank_rules_from_gemini(transcription_text, bank_analysis['bank_keywords_detected'])
+    
+    def stream_gemini_suggestion(self, transcription_text, scam_detected, risk_level, logic_result=None,
+                                 context=None):
+        """
+        Yield Gemini suggestion text chunks as they are generated
+        
+        Chunks have markdown emphasis stripped but are otherwise raw; callers
+        should run the joined text through format_gemini_response at the end.
+        """
+        if not self.gemini_model:
+            yield "AI suggestions not available - Gemini API key not configured"
+            return
+        
+        import re
+        
+        prompt = self.build_gemini_suggestion_prompt(transcription_text, scam_detected, risk_level,
+                                                     logic_result, context)
+        try:
+            with stage_timer('llm', call='gemini_suggestion', mode='stream'):
+                for chunk in self.gemini_model.generate_content(prompt, stream=True):
+                    text = re.sub(r'\*+|__+|~~+', '', getattr(chunk, 'text', '') or '')
+                    if text:
+                        yield text
+        except Exception as e:
+            logger.error("Gemini streaming error", extra={'error': str(e)})
+            yield "AI analysis temporarily unavailable"
+    
     def format_gemini_response(self, response_text):
         """Format Gemini response for better readability"""
         try:
@@ -595,81 +566,134 @@ class CompleteScamDetector:
             return formatted_response.strip()
             
         except Exception as e:
-            print(f"❌ Error formatting Gemini response: {e}")
+            logger.warning("Error formatting Gemini response", extra={'error': str(e)})
             return response_text  # Return original if formatting fails
     
-    def analyze_speakers(self, transcription_result):
+    def get_risk_level(self, risk_score):
+        """Map an overall risk score to the level reported by the API"""
+        if risk_score >= 0.7:
+            return 'critical'
+        elif risk_score >= 0.4:
+            return 'high'
+        elif risk_score >= 0.2:
+            return 'medium'
+        return 'safe'
+    
+    def apply_risk_model(self, record, voice_insights=None, context=None):
+        """
+        Replace the heuristic call score with the trained risk model's probability
+        
+        No-op when no model is deployed. The heuristic score is kept under
+        'heuristic_risk_score'; critical logic patterns still force a critical verdict.
+        """
+        risk_model = get_risk_model()
+        if risk_model is None:
+            record['risk_scorer'] = 'heuristic'
+            return record
+        
+        result = risk_model.score(record, voice_insights, context)
+        record['heuristic_risk_score'] = record.get('overall_risk_score', 0.0)
+        record['risk_scorer'] = 'model'
+        record['risk_model'] = result
+        record['overall_risk_score'] = result['probability']
+        record['scam_detected'] = result['scam_detected'] or bool(record.get('logic_scam_detected'))
+        record['risk_level'] = 'critical' if record.get('logic_scam_detected') else self.get_risk_level(result['probability'])
+        return record
+    
+    def score_transcription(self, transcription_result, context=None):
+        """
+        Rule and scoring stages for a transcript (no STT, no LLM)
+        
+        Speaker analysis, the logic rules (a critical pattern forces a
+        critical verdict) and bank detection, as scored by the API and the
+        batch CLI. Returns the verdict fields of an analysis record.
+        """
+        context = context or AnalysisContext(transcription_result)
+        full_text = transcription_result['full_text']
+        analysis_results = self.analyze_speakers(transcription_result, context)
+        
+        scam_detected = any(result['is_potential_scammer'] for result in analysis_results.values())
+        overall_risk_score = max([result['risk_score'] for result in analysis_results.values()], default=0)
+        risk_level = self.get_risk_level(overall_risk_score)
+        
+        logic_scam_detected, logic_reason = self.analyze_conversation_logic(full_text, context)
+        if logic_scam_detected:
+            overall_risk_score = max(overall_risk_score, 0.9)
+            risk_level = 'critical'
+        
+        return {
+            'analysis': analysis_results,
+            'speakers_count': len(analysis_results),
+            'scam_detected': logic_scam_detected or scam_detected,
+            'overall_risk_score': overall_risk_score,
+            'risk_level': risk_level,
+            'logic_scam_detected': logic_scam_detected,
+            'logic_reason': logic_reason,
+            'bank_analysis': self.detect_bank_related_content(full_text, [], context),
+            'keywords_found': [kw for result in analysis_results.values() for kw in result.get('scam_keywords', [])]
+        }
+    
+    def analyze_speakers(self, transcription_result, context=None):
         """Analyze each speaker for scam indicators (using data from working diarization)"""
-        print(f"\n🔍 ANALYZING SPEAKERS FOR SCAM INDICATORS:")
-        print("=" * 60)
+        context = context or AnalysisContext(transcription_result)
+        return context.memo('speaker_analysis', lambda: self.evaluate_speakers(context))
+    
+    def evaluate_speakers(self, context):
+        """Per-speaker analysis from the context's word table and lexicon hits"""
         
         # Extract data from transcription result
-        speaker_text = transcription_result['speaker_text']
+        transcription_result = context.transcription
         words_info = transcription_result['words']
         full_text = transcription_result['full_text']
         
         # First, run enhanced logic-based analysis on the full conversation
-        print("🧠 Running enhanced logic-based scam detection...")
-        logic_scam_detected, logic_reason = self.analyze_conversation_logic(full_text)
+        logic_scam_detected, logic_reason = self.analyze_conversation_logic(full_text, context)
         
         if logic_scam_detected:
-            print(f"🚨 CRITICAL SCAM DETECTED BY LOGIC: {logic_reason}")
+            logger.warning("Critical scam detected by logic", extra={'reason': logic_reason})
         
         # Check if we have speaker diarization data
         has_diarization = any(word.get('speaker_tag') is not None for word in words_info)
         
         if not has_diarization:
-            print("⚠️  No speaker diarization data available - treating as single speaker")
-            # Create a single speaker entry
-            speaker_text = {'0': [word['word'] for word in words_info]}
+            logger.info("No speaker diarization data available - treating as single speaker")
             # Update words_info to have speaker_tag
             for word in words_info:
                 word['speaker_tag'] = 0
         
-        # Group words by speaker for analysis
-        speaker_data = {}
-        
-        for word_info in words_info:
-            speaker = word_info['speaker_tag']
-            word = word_info['word'].lower()
-            start_time = word_info['start_time']
-            
-            if speaker not in speaker_data:
-                speaker_data[speaker] = {
-                    'words': [],
-                    'timestamps': [],
-                    'scam_keywords': [],
-                    'text': ''
-                }
-            
-            speaker_data[speaker]['words'].append(word)
-            speaker_data[speaker]['timestamps'].append(start_time)
-            
-            # Check for scam keywords
-            if word in self.scam_keywords:
-                speaker_data[speaker]['scam_keywords'].append(word)
-        
-        # Check for high-risk phrases (more comprehensive detection)
-        for speaker in speaker_data:
-            text_lower = ' '.join(speaker_data[speaker]['words']).lower()
-            for phrase in self.high_risk_phrases:
-                if phrase in text_lower:
-                    speaker_data[speaker]['scam_keywords'].append(f"[PHRASE: {phrase}]")
-        
-        # Build text for each speaker
-        for speaker in speaker_data:
-            speaker_data[speaker]['text'] = ' '.join(speaker_data[speaker]['words'])
+        # One pass over the words into columnar arrays; everything per speaker is computed from it
+        lexicon = context.lexicon
+        table = context.word_table
+        keyword_hits = context.keyword_hits('scam_keywords')
+        fuzzy_hits = context.fuzzy_phrase_hits('high_risk_phrases')
+        speaker_summary = context.speaker_summary
+        turn_features = context.turn_features
         
         # Analyze each speaker
         analysis_results = {}
+        # Denominator is fixed by the lexicon so scores stay comparable across lexicon versions
+        risk_denominator = lexicon.scoring.get('keyword_risk_denominator') or lexicon.count('scam_keywords') or 1
         
-        for speaker, data in speaker_data.items():
-            text = data['text']
-            scam_keywords_found = data['scam_keywords']
+        for code, speaker in enumerate(table.speaker_labels):
+            text = ' '.join(table.speaker_tokens(code)).lower()
+            
+            # Keyword hits, then high-risk phrases: exact first, then ASR-error-tolerant matches
+            exact_phrases = lexicon.find('high_risk_phrases', normalize_text(text))
+            phrase_matches = [{'phrase': phrase, 'confidence': 1.0, 'matched': phrase} for phrase in exact_phrases]
+            phrase_matches += [match for match in fuzzy_hits[code] if match['phrase'] not in exact_phrases]
+            phrases = [match['phrase'] for match in phrase_matches]
+            scam_keywords_found = keyword_hits[code] + [f"[PHRASE: {phrase}]" for phrase in phrases]
             
-            # Calculate risk score
+            # Calculate risk score (fuzzy phrases count by their match confidence)
             unique_scam_keywords = len(set(scam_keywords_found))
-            risk_score = unique_scam_keywords / len(self.scam_keywords)
+            keyword_weight = len(set(keyword_hits[code])) + sum(match['confidence'] for match in phrase_matches)
+            risk_score = keyword_weight / risk_denominator
+            
+            # Turn-taking pressure (monologues, fast speech, cutting in) only counts when
+            # there is someone to pressure and the speaker already used scam vocabulary
+            pressure = conversation_pressure(turn_features[speaker]) if table.speaker_count > 1 else 0.0
+            if unique_scam_keywords:
+                risk_score = min(1.0, risk_score + PRESSURE_RISK_WEIGHT * pressure)
             
             # Override risk score if logic-based detection found a scam
             if logic_scam_detected:
@@ -681,14 +705,10 @@ class CompleteScamDetector:
             # First check logic-based detection
             if logic_scam_detected:
                 is_potential_scammer = True
-                print(f"🚨 Speaker {speaker} marked as SCAMMER due to logic detection: {logic_reason}")
             
-            # Check for high-risk phrases first
-            text_lower = text.lower()
-            for phrase in self.high_risk_phrases:
-                if phrase in text_lower:
-                    is_potential_scammer = True
-                    break
+            # Check for high-risk phrases first (fuzzy matches only add to the risk score)
+            if exact_phrases:
+                is_potential_scammer = True
             
             # Also check individual keywords
             if not is_potential_scammer:
@@ -704,11 +724,16 @@ class CompleteScamDetector:
             analysis_results[speaker] = {
                 'text': text,
                 'scam_keywords': scam_keywords_found,
+                'phrase_matches': phrase_matches,
                 'unique_scam_keywords': unique_scam_keywords,
                 'risk_score': risk_score,
                 'is_potential_scammer': is_potential_scammer,
                 'vulnerability_level': vulnerability_level,
-                'word_count': len(data['words'])
+                'word_count': speaker_summary[speaker]['word_count'],
+                'talk_time': speaker_summary[speaker]['talk_time'],
+                'turns': speaker_summary[speaker]['turns'],
+                'turn_taking': turn_features[speaker],
+                'conversation_pressure': pressure
             }
         
         return analysis_results
@@ -730,6 +755,10 @@ class CompleteScamDetector:
             print(f"   Text: {result['text']}")
             print(f"   Word Count: {result['word_count']}")
             print(f"   Scam Keywords Found: {', '.join(result['scam_keywords']) if result['scam_keywords'] else 'None'}")
+            fuzzy = [match for match in result.get('phrase_matches', []) if match['confidence'] < 1.0]
+            if fuzzy:
+                described = [f"{match['phrase']} ~ '{match['matched']}' ({match['confidence']:.0%})" for match in fuzzy]
+                print(f"   Fuzzy Phrases: {', '.join(described)}")
             print(f"   Unique Scam Keywords: {result['unique_scam_keywords']}")
             print(f"   Risk Score: {result['risk_score']:.2f} ({result['risk_score']*100:.1f}%)")
             
@@ -807,24 +836,102 @@ class CompleteScamDetector:
         else:
             print(f"💾 Audio file kept: {audio_file}")
     
-    def detect_bank_related_content(self, transcription_text, keywords_found):
+    def run_streaming_analysis(self, source=None, max_seconds=None):
+        """
+        Analyze a live call utterance by utterance
+        
+        Audio is captured into a ring buffer (constant memory), split into
+        utterances with VAD and each utterance is transcribed as soon as it
+        ends; the risk assessment is refreshed after every utterance. Voice
+        features are accumulated from the same chunks (streaming_features.py)
+        and a voice summary is printed for every window of audio.
+        `source` defaults to the microphone; pass a FileReplaySource to
+        replay a recording instead.
+        """
+        from audio_stream import MicrophoneStream, VadSegmenter, pcm_to_wav_bytes
+        from streaming_features import StreamingVoiceFeatures
+        from mozilla_voice_analyzer_fallback import mozilla_voice_analyzer
+        
+        print("🎯 STREAMING SCAM DETECTION")
+        print("=" * 50)
+        print("🎙️ Listening... press Ctrl+C to stop")
+        
+        source = source or MicrophoneStream(sample_rate=self.sample_rate, channels=self.channels)
+        segmenter = VadSegmenter(sample_rate=source.sample_rate)
+        transcript = {'full_text': '', 'speaker_text': {}, 'words': []}
+        analysis_results = {}
+        voice_features = StreamingVoiceFeatures(sample_rate=source.sample_rate, window_seconds=10.0)
+        
+        def report_window(summary):
+            window = summary['window']
+            voice_risk = mozilla_voice_analyzer.calculate_scam_probability(summary)
+            print(f"🎵 [{window['start_time']:6.1f}s-{window['end_time']:6.1f}s] pitch {summary['pitch_mean']:.0f} Hz, "
+                  f"energy {summary['rms_energy']:.3f}, voice risk {voice_risk:.2f}")
+        
+        try:
+            with source:
+                chunks = voice_features.feed(source.chunks(), on_window=report_window)
+                for offset, samples in segmenter.segments(chunks):
+                    if max_seconds and offset >= max_seconds:
+                        break
+                    
+                    segment = self.transcribe_content(pcm_to_wav_bytes(samples, source.sample_rate))
+                    if not segment:
+                        continue
+                    
+                    # Shift segment-relative word timings onto the call timeline
+                    for word in segment['words']:
+                        word['start_time'] += offset
+                        word['end_time'] += offset
+                        transcript['words'].append(word)
+                    for speaker_tag, words in segment['speaker_text'].items():
+                        transcript['speaker_text'].setdefault(speaker_tag, []).extend(words)
+                    transcript['full_text'] = f"{transcript['full_text']} {segment['full_text']}".strip()
+                    
+                    print(f"\n🗣️ [{offset:6.1f}s] {segment['full_text']}")
+                    context = AnalysisContext(transcript)
+                    analysis_results = self.analyze_speakers(transcript, context)
+                    risk_score = max([r['risk_score'] for r in analysis_results.values()], default=0)
+                    logic_scam_detected, logic_reason = self.analyze_conversation_logic(transcript['full_text'], context)
+                    if logic_scam_detected:
+                        print(f"🚨 SCAM PATTERN: {logic_reason}")
+                    else:
+                        print(f"📊 Running risk: {self.get_risk_level(risk_score).upper()} ({risk_score:.2f})")
+        except KeyboardInterrupt:
+            print("\n⏹️ Stopped listening")
+        
+        if getattr(getattr(source, 'buffer', None), 'dropped', 0):
+            print(f"⚠️ {source.buffer.dropped} samples dropped (analysis fell behind capture)")
+        
+        voice_summary = voice_features.finish()
+        if voice_summary['audio_length']:
+            print(f"🎵 Voice over {voice_summary['duration']:.1f}s: pitch {voice_summary['pitch_mean']:.0f} ± "
+                  f"{voice_summary['pitch_std']:.0f} Hz, voice risk "
+                  f"{mozilla_voice_analyzer.calculate_scam_probability(voice_summary):.2f}")
+        
+        if analysis_results:
+            self.display_analysis_results(analysis_results)
+        else:
+            print("❌ No speech transcribed")
+        return transcript, analysis_results
+    
+    def detect_bank_related_content(self, transcription_text, keywords_found, context=None):
         """Detect if the audio content is bank-related"""
-        bank_keywords = [
-            'bank', 'banking', 'account', 'balance', 'deposit', 'withdrawal', 'transfer',
-            'credit card', 'debit card', 'atm', 'pin', 'password', 'login', 'online banking',
-            'mobile banking', 'transaction', 'payment', 'loan', 'mortgage', 'interest',
-            'statement', 'checking', 'savings', 'routing number', 'account number',
-            'wire transfer', 'ach', 'fraud', 'suspicious', 'freeze', 'unlock',
-            'verification', 'confirm', 'validate', 'security', 'breach', 'compromise',
-            'card', 'cvv', 'expiry', 'expiration', 'billing', 'invoice', 'refund'
-        ]
+        context = context or AnalysisContext.from_text(transcription_text)
+        if not keywords_found:
+            return context.memo('bank_analysis', lambda: self.evaluate_bank_content(context, []))
+        return self.evaluate_bank_content(context, keywords_found)
+    
+    def evaluate_bank_content(self, context, keywords_found):
+        """Bank-related verdict from the context's lexicon hits"""
+        lexicon = context.lexicon
+        bank_keywords = lexicon.terms('bank_terms')
         
         # Check if any bank keywords are present
-        text_lower = transcription_text.lower()
-        bank_matches = [keyword for keyword in bank_keywords if keyword in text_lower]
+        bank_matches = list(context.find('bank_terms'))
         
         # Also check keywords_found for bank-related terms
-        bank_keywords_found = [kw for kw in keywords_found if any(bk in kw.lower() for bk in bank_keywords)]
+        bank_keywords_found = [kw for kw in keywords_found if lexicon.contains_any('bank_terms', normalize_text(kw))]
         
         is_bank_related = len(bank_matches) > 0 or len(bank_keywords_found) > 0
         
@@ -871,19 +978,20 @@ class CompleteScamDetector:
             Keep responses concise and actionable. Focus on protecting the customer's financial security.
             """
 
-            response = self.gemini_model.generate_content(prompt)
+            with stage_timer('llm', call='bank_rules'):
+                response = self.gemini_model.generate_content(prompt)
             bank_rules = self.format_gemini_response(response.text)
             
-            print(f"🏦 Generated bank rules: {len(bank_rules)} characters")
+            logger.debug("Generated bank rules", extra={'characters': len(bank_rules)})
             return bank_rules
             
         except Exception as e:
-            print(f"❌ Error generating bank rules: {e}")
+            logger.error("Error generating bank rules", extra={'error': str(e)})
             return "Unable to generate bank-specific recommendations at this time."
 
-    def analyze_conversation(self, audio_file):
-        """Analyze a conversation for scam indicators"""
-        print(f"🔄 Analyzing conversation: {audio_file}")
+    def analyze_conversation(self, audio_file, force_full=False):
+        """Analyze a conversation for scam indicators (force_full runs every heavy stage)"""
+        logger.info("Analyzing conversation", extra={'audio_file': audio_file})
         
         # Transcribe with diarization
         transcription_result = self.transcribe_with_diarization(audio_file)
@@ -895,7 +1003,9 @@ class CompleteScamDetector:
             }
         
         # Analyze speakers
-        analysis_results = self.analyze_speakers(transcription_result)
+        context = AnalysisContext(transcription_result)
+        with stage_timer('speaker_analysis'):
+            analysis_results = self.analyze_speakers(transcription_result, context)
         
         # Calculate overall risk
         total_speakers = len(analysis_results)
@@ -921,26 +1031,25 @@ class CompleteScamDetector:
         else:
             risk_level = 'low'
         
+        # Gemini calls only for calls the cheap stages could not settle
+        cascade = self.triage_call(context, analysis_results, force=force_full, audio_file=audio_file)
+        
         # Get AI suggestion
-        gemini_suggestion = self.get_gemini_suggestion(
+        gemini_suggestion = self.cascade_suggestion(
+            cascade,
             transcription_result['full_text'], 
             potential_scammers > 0, 
-            risk_level
+            risk_level,
+            context=context
         )
         
         # Check for bank-related content and get bank rules
         bank_analysis = self.detect_bank_related_content(
             transcription_result['full_text'], 
-            []  # We'll extract keywords from the analysis results
+            [],  # We'll extract keywords from the analysis results
+            context
         )
-        
-        bank_rules = ""
-        if bank_analysis['is_bank_related']:
-            print(f"🏦 Bank-related content detected: {bank_analysis['bank_keywords_detected']}")
-            bank_rules = self.get_bank_rules_from_gemini(
-                transcription_result['full_text'],
-                bank_analysis['bank_keywords_detected']
-            )
+        bank_rules = self.cascade_bank_rules(cascade, transcription_result['full_text'], bank_analysis)
         
         return {
             'success': True,
@@ -952,22 +1061,43 @@ class CompleteScamDetector:
             'total_speakers': total_speakers,
             'gemini_suggestion': gemini_suggestion,
             'bank_analysis': bank_analysis,
-            'bank_rules': bank_rules
+            'bank_rules': bank_rules,
+            'cascade': cascade
         }
     
-    def analyze_conversation_with_mozilla(self, audio_file):
-        """Enhanced analysis using both existing logic and Mozilla Voice models"""
-        print(f"🔄 Running enhanced analysis with Mozilla Voice: {audio_file}")
+    def analyze_conversation_with_mozilla(self, audio_file, force_full=False, feature_profile=None):
+        """
+        Enhanced analysis using both existing logic and Mozilla Voice models
+        
+        feature_profile picks the acoustic features computed (triage,
+        standard or forensic, see feature_graph.py).
+        
+        Voice analysis only needs the audio file, so it is submitted to the
+        voice pool first and runs while STT and Gemini calls are in flight;
+        the two branches are joined in calculate_combined_risk.
+        """
+        logger.info("Running enhanced analysis with Mozilla Voice", extra={'audio_file': audio_file})
+        started = time.perf_counter()
+        
+        voice_future = None
+        if MOZILLA_VOICE_AVAILABLE and mozilla_voice_analyzer is not None:
+            try:
+                voice_future = get_voice_pool().submit(generate_voice_insights_timed, audio_file, feature_profile)
+            except Exception as e:
+                logger.warning("Voice pool unavailable, analyzing inline", extra={'error': str(e)})
         
-        # Run existing analysis
-        existing_analysis = self.analyze_conversation(audio_file)
+        # Run existing analysis (STT + LLM, I/O bound) in this thread
+        existing_analysis = self.analyze_conversation(audio_file, force_full)
+        transcription_seconds = time.perf_counter() - started
         
         if not existing_analysis['success']:
+            if voice_future is not None:
+                voice_future.cancel()
             return existing_analysis
         
         # Check if Mozilla Voice is available
         if not MOZILLA_VOICE_AVAILABLE or mozilla_voice_analyzer is None:
-            print("⚠️ Mozilla Voice analyzer not available, using basic analysis only")
+            logger.warning("Mozilla Voice analyzer not available, using basic analysis only")
             return {
                 'success': True,
                 'existing_analysis': existing_analysis,
@@ -982,9 +1112,18 @@ class CompleteScamDetector:
                 'analysis_type': 'basic_only'
             }
         
-        # Run Mozilla Voice analysis
-        print("🔄 Running Mozilla Voice analysis...")
-        mozilla_insights = mozilla_voice_analyzer.generate_voice_insights(audio_file)
+        # Join the voice branch (usually finished already)
+        with stage_timer('voice_analysis'):
+            try:
+                if voice_future is None:
+                    raise RuntimeError('voice analysis was not submitted')
+                mozilla_insights, voice_seconds = voice_future.result(timeout=VOICE_ANALYSIS_TIMEOUT)
+            except Exception as e:
+                if voice_future is not None:
+                    logger.warning("Voice worker failed, analyzing inline", extra={'error': str(e)})
+                voice_started = time.perf_counter()
+                mozilla_insights = mozilla_voice_analyzer.generate_voice_insights(audio_file, feature_profile)
+                voice_seconds = time.perf_counter() - voice_started
         
         # Combine results
         combined_risk_score = self.calculate_combined_risk(existing_analysis, mozilla_insights)
@@ -997,9 +1136,58 @@ class CompleteScamDetector:
             'mozilla_insights': mozilla_insights,
             'combined_risk_score': combined_risk_score,
             'enhanced_suggestions': enhanced_suggestions,
-            'analysis_type': 'enhanced_with_mozilla'
+            'analysis_type': 'enhanced_with_mozilla',
+            'timings': {
+                'transcription_branch_seconds': round(transcription_seconds, 3),
+                'voice_branch_seconds': round(voice_seconds, 3),
+                'total_seconds': round(time.perf_counter() - started, 3)
+            }
         }
     
+    def match_speaker_voices(self, audio_file, transcription_result):
+        """
+        Look up each speaker's voice print in the voice index
+        
+        Returns (matches per speaker, embeddings per speaker); both are empty
+        when VOICE_INDEX_DIR is not set or no voice analyzer is available.
+        """
+        if not MOZILLA_VOICE_AVAILABLE or mozilla_voice_analyzer is None:
+            return {}, {}
+        index = get_voice_index(mozilla_voice_analyzer.embedding_model, mozilla_voice_analyzer.embedding_dim,
+                                mozilla_voice_analyzer.embedding_standardize)
+        if index is None:
+            return {}, {}
+        
+        with stage_timer('voice_match'):
+            embeddings = mozilla_voice_analyzer.speaker_embeddings(audio_file, transcription_result['words'])
+            matches = {speaker: index.match(embedding, threshold=mozilla_voice_analyzer.match_threshold)
+                       for speaker, embedding in embeddings.items()}
+        
+        for speaker, match in matches.items():
+            if match['known_scam_voice']:
+                logger.warning("Known scam voice", extra={'speaker': speaker, 'scam_calls': match['scam_calls']})
+        return matches, embeddings
+    
+    def index_speaker_voices(self, embeddings, record):
+        """Add this call's speaker voice prints to the voice index"""
+        if not embeddings:
+            return []
+        index = get_voice_index(mozilla_voice_analyzer.embedding_model, mozilla_voice_analyzer.embedding_dim,
+                                mozilla_voice_analyzer.embedding_standardize)
+        if index is None:
+            return []
+        
+        analysis = record.get('analysis', {})
+        speakers = list(embeddings)
+        entries = [{
+            'analysis_id': record.get('analysis_id'),
+            'speaker': speaker,
+            'scam_detected': bool(record.get('scam_detected')),
+            'is_potential_scammer': bool(analysis.get(speaker, {}).get('is_potential_scammer')),
+            'timestamp': datetime.utcnow().isoformat()
+        } for speaker in speakers]
+        return index.add(np.vstack([embeddings[speaker] for speaker in speakers]), entries)
+    
     def calculate_combined_risk(self, existing_analysis, mozilla_insights):
         """Calculate combined risk score from both analyses"""
         try:
@@ -1009,17 +1197,22 @@ class CompleteScamDetector:
             # Get Mozilla Voice risk score
             mozilla_risk = mozilla_insights.get('overall_assessment', {}).get('overall_risk_score', 0.5)
             
-            # Combine with weights (you can adjust these)
-            combined_risk = (existing_risk * 0.6) + (mozilla_risk * 0.4)
+            # The trained model scores text and voice features jointly; fixed weights otherwise
+            risk_model = get_risk_model()
+            if risk_model is not None:
+                combined_risk = risk_model.score(existing_analysis, mozilla_insights)['probability']
+            else:
+                combined_risk = (existing_risk * 0.6) + (mozilla_risk * 0.4)
             
             return {
                 'combined_score': combined_risk,
                 'existing_score': existing_risk,
                 'mozilla_score': mozilla_risk,
-                'risk_level': 'high' if combined_risk > 0.7 else 'medium' if combined_risk > 0.4 else 'low'
+                'risk_level': 'high' if combined_risk > 0.7 else 'medium' if combined_risk > 0.4 else 'low',
+                'scorer': 'model' if risk_model is not None else 'weighted'
             }
         except Exception as e:
-            print(f"❌ Error calculating combined risk: {e}")
+            logger.error("Error calculating combined risk", extra={'error': str(e)})
             return {'combined_score': 0.5, 'risk_level': 'medium'}
     
     def generate_enhanced_suggestions(self, existing_analysis, mozilla_insights):
@@ -1044,14 +1237,27 @@ class CompleteScamDetector:
             return suggestions
             
         except Exception as e:
-            print(f"❌ Error generating enhanced suggestions: {e}")
+            logger.error("Error generating enhanced suggestions", extra={'error': str(e)})
             return ["Analysis completed with some limitations"]
 
 def main():
     """Main function"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Complete scam detection system")
+    parser.add_argument('--stream', action='store_true', help="Analyze live, utterance by utterance, until Ctrl+C")
+    parser.add_argument('--replay', help="Stream a 16-bit mono WAV file instead of the microphone")
+    args = parser.parse_args()
+    
     try:
         detector = CompleteScamDetector()
-        detector.run_complete_analysis()
+        if args.replay:
+            from audio_stream import FileReplaySource
+            detector.run_streaming_analysis(FileReplaySource(args.replay, realtime=True))
+        elif args.stream:
+            detector.run_streaming_analysis()
+        else:
+            detector.run_complete_analysis()
     except Exception as e:
         print(f"❌ Error: {e}")
 
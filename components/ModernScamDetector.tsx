@@ -36,6 +36,8 @@ interface AnalysisResponse {
     gemini_suggestion?: string;
     logic_scam_detected?: boolean;
     logic_reason?: string;
+    analysis_id?: string;
+    sections?: { [key: string]: { status: string } };
   };
   error?: string;
 }
@@ -65,6 +67,8 @@ const ModernScamDetector: React.FC = () => {
   const streamRef = useRef<MediaStream | null>(null);
 
   const MAX_RECORDING_TIME = 40;
+  const ADVICE_POLL_INTERVAL_MS = 2000;
+  const ADVICE_POLL_ATTEMPTS = 30;
 
   useEffect(() => {
     return () => {
@@ -83,6 +87,20 @@ const ModernScamDetector: React.FC = () => {
     return `${mins.toString().padStart(2, '0')}:${secs.toString().padStart(2, '0')}`;
   };
 
+  // AI advice is generated lazily on the backend. A background prefetch may already hold the
+  // section ('generating'), so keep reading the stored call until it is ready or has failed.
+  const loadGeminiSuggestion = async (analysisId: string) => {
+    for (let attempt = 0; attempt < ADVICE_POLL_ATTEMPTS; attempt++) {
+      const details = await axios.get<AnalysisResponse>(`http://localhost:5000/api/analyzed-calls/${analysisId}`);
+      const status = details.data.data?.sections?.gemini_suggestion?.status;
+      if (status !== 'pending' && status !== 'generating') {
+        setGeminiSuggestion(details.data.data?.gemini_suggestion || '');
+        return;
+      }
+      await new Promise(resolve => setTimeout(resolve, ADVICE_POLL_INTERVAL_MS));
+    }
+  };
+
   const startRecording = async () => {
     try {
       setError(null);
@@ -195,6 +213,13 @@ const ModernScamDetector: React.FC = () => {
         setLogicScamDetected(response.data.data.logic_scam_detected || false);
         setLogicReason(response.data.data.logic_reason || '');
         
+        // Fetch the AI advice once the call is stored
+        const analysisId = response.data.data.analysis_id;
+        if (analysisId && response.data.data.sections?.gemini_suggestion?.status !== 'ready') {
+          loadGeminiSuggestion(analysisId)
+            .catch(err => console.error('Failed to load AI advice:', err));
+        }
+        
         const callRecord = {
           timestamp: new Date().toLocaleString(),
           duration: recordingTime,
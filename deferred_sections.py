@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Deferred AI sections (Gemini advice and bank rules)
+
+Analyses no longer wait for the two Gemini calls. Every stored call carries
+a `sections` map with one handle per deferred section, e.g.
+
+    {'gemini_suggestion': {'status': 'pending'},
+     'bank_rules': {'status': 'not_applicable'}}
+
+Statuses move pending -> generating -> ready | failed; bank rules are
+not_applicable for calls without bank content. Once ready, the text lives
+in the document's existing top-level gemini_suggestion / bank_rules fields.
+
+Pending sections are generated on the first read of
+/api/analyzed-calls/<analysis_id> and cached in MongoDB, or prefetched in
+the background right after the save for high-risk calls only
+(DEFERRED_PREFETCH_LEVELS, default "high,critical"). Claiming a section is
+an atomic status update, so concurrent readers and the prefetch generate
+each section once; a claim older than DEFERRED_CLAIM_TIMEOUT seconds is
+treated as abandoned, and failed sections are retried on the next read.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from pipeline_metrics import get_logger, metrics_registry, stage_timer
+
+logger = get_logger('deferred_sections')
+
+DEFERRED_SECTIONS = ('gemini_suggestion', 'bank_rules')
+
+STATUS_PENDING = 'pending'
+STATUS_GENERATING = 'generating'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+STATUS_NOT_APPLICABLE = 'not_applicable'
+
+PREFETCH_LEVELS = tuple(level.strip() for level in
+                        os.getenv('DEFERRED_PREFETCH_LEVELS', 'high,critical').split(',') if level.strip())
+CLAIM_TIMEOUT = float(os.getenv('DEFERRED_CLAIM_TIMEOUT', '120'))
+
+# Fallback strings the detector returns instead of raising; not worth caching
+UNAVAILABLE_RESPONSES = (
+    "AI analysis temporarily unavailable",
+    "Unable to generate bank-specific recommendations at this time."
+)
+
+sections_generated = metrics_registry.counter(
+    'scam_deferred_sections_total',
+    'Deferred sections generated, by section, trigger and outcome'
+)
+
+def initial_sections(record: Dict) -> Dict[str, Dict]:
+    """Section handles for a freshly analyzed record (text already present counts as ready)"""
+    cascade = record.get('cascade') or {}
+    sections = {}
+    for name in DEFERRED_SECTIONS:
+        if record.get(name):
+            skipped = cascade.get('plan', {}).get(name) is False
+            sections[name] = {'status': STATUS_READY, 'source': 'canned' if skipped else 'gemini'}
+        else:
+            sections[name] = {'status': STATUS_PENDING}
+
+    bank_analysis = record.get('bank_analysis')
+    if bank_analysis is not None and not bank_analysis.get('is_bank_related') and not record.get('bank_rules'):
+        sections['bank_rules'] = {'status': STATUS_NOT_APPLICABLE}
+    return sections
+
+def pending_sections(call: Dict, names: Iterable[str] = DEFERRED_SECTIONS) -> list:
+    """Sections of a stored call that still need generating"""
+    sections = call.get('sections') or initial_sections(call)
+    return [name for name in names if sections.get(name, {}).get('status') in (STATUS_PENDING, STATUS_FAILED, STATUS_GENERATING)]
+
+def should_prefetch(record: Dict) -> bool:
+    """High-risk calls get their sections generated right after the save"""
+    return record.get('risk_level') in PREFETCH_LEVELS and bool(pending_sections(record))
+
+class DeferredSectionResolver:
+    """Generates and caches pending sections through the detector and the call model"""
+
+    def __init__(self, detector, call_model):
+        """
+        Args:
+            detector: CompleteScamDetector instance (Gemini calls)
+            call_model: object with claim_deferred_section / store_deferred_section
+        """
+        self.detector = detector
+        self.call_model = call_model
+
+    def generate(self, call: Dict, name: str) -> Tuple[Dict, Optional[str]]:
+        """Run the LLM call for one section; returns (section handle, text or None)"""
+        from analysis_context import AnalysisContext
+
+        full_text = (call.get('transcription') or {}).get('full_text', '')
+        context = AnalysisContext.from_text(full_text)
+        if name == 'gemini_suggestion':
+            logic_result = (call['logic_scam_detected'], call.get('logic_reason', '')) \
+                if 'logic_scam_detected' in call else None
+            text = self.detector.get_gemini_suggestion(full_text, call.get('scam_detected', False),
+                                                       call.get('risk_level', 'low'), logic_result, context)
+        else:
+            bank_analysis = call.get('bank_analysis') or self.detector.detect_bank_related_content(full_text, [], context)
+            if not bank_analysis.get('is_bank_related'):
+                return {'status': STATUS_NOT_APPLICABLE}, None
+            text = self.detector.get_bank_rules_from_gemini(full_text, bank_analysis['bank_keywords_detected'])
+
+        generated_at = datetime.utcnow().isoformat()
+        if not text or text in UNAVAILABLE_RESPONSES:
+            return {'status': STATUS_FAILED, 'error': text or 'empty response', 'failed_at': generated_at}, None
+        return {'status': STATUS_READY, 'source': 'gemini', 'generated_at': generated_at}, text
+
+    def resolve(self, call: Dict, names: Iterable[str] = DEFERRED_SECTIONS, trigger: str = 'read') -> Dict:
+        """
+        Generate the call's pending sections that this caller manages to claim
+
+        Updates `call` in place (sections and texts) and returns it. Sections
+        claimed by another reader are left as 'generating'.
+        """
+        analysis_id = call.get('analysis_id')
+        stale_before = (datetime.utcnow() - timedelta(seconds=CLAIM_TIMEOUT)).isoformat()
+        # Calls stored before sections existed get handles derived from their fields
+        sections = call['sections'] = dict(call.get('sections') or initial_sections(call))
+
+        for name in pending_sections(call, names):
+            if not self.call_model.claim_deferred_section(analysis_id, name, stale_before):
+                sections[name] = dict(sections.get(name, {}), status=STATUS_GENERATING)
+                continue
+
+            try:
+                with stage_timer('deferred_section', section=name, trigger=trigger):
+                    section, text = self.generate(call, name)
+            except Exception as e:
+                section, text = {'status': STATUS_FAILED, 'error': str(e),
+                                 'failed_at': datetime.utcnow().isoformat()}, None
+
+            self.call_model.store_deferred_section(analysis_id, name, section, text)
+            sections[name] = section
+            if text is not None:
+                call[name] = text
+            sections_generated.inc(section=name, trigger=trigger, status=section['status'])
+            logger.info("Deferred section resolved", extra={'analysis_id': analysis_id, 'section': name,
+                                                            'trigger': trigger, 'status': section['status']})
+        return call
+
+    def generate_unsaved(self, call: Dict) -> Dict:
+        """Generate pending sections inline for a call that could not be stored (nothing to cache into)"""
+        sections = call['sections'] = dict(call.get('sections') or initial_sections(call))
+        for name in pending_sections(call):
+            section, text = self.generate(call, name)
+            sections[name] = section
+            if text is not None:
+                call[name] = text
+            sections_generated.inc(section=name, trigger='unsaved', status=section['status'])
+        return call
+
+    def prefetch(self, record: Dict) -> Dict:
+        """Background prefetch for high-risk calls; no-op for the rest"""
+        if not should_prefetch(record):
+            return record
+        try:
+            return self.resolve(record, trigger='prefetch')
+        except Exception as e:
+            logger.error("Deferred section prefetch failed", extra={'analysis_id': record.get('analysis_id'),
+                                                                     'error': str(e)})
+            return record
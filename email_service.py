@@ -9,6 +9,9 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import json
+from pipeline_metrics import get_logger, stage_timer
+
+logger = get_logger('email_service')
 
 class EmailService:
     def __init__(self):
@@ -122,7 +125,7 @@ class EmailService:
         """Send call analysis results email"""
         try:
             if not self.email_pass:
-                print("❌ EMAIL_PASS not configured, skipping email")
+                logger.warning("EMAIL_PASS not configured, skipping email")
                 return False
             
             # Create message
@@ -149,16 +152,17 @@ class EmailService:
             msg.attach(html_part)
             
             # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_user, self.email_pass)
-                server.send_message(msg)
+            with stage_timer('email'):
+                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                    server.starttls()
+                    server.login(self.email_user, self.email_pass)
+                    server.send_message(msg)
             
-            print(f"✅ Call analysis email sent successfully to {email}")
+            logger.info("Call analysis email sent", extra={'to': email})
             return True
             
         except Exception as e:
-            print(f"❌ Error sending call analysis email to {email}: {e}")
+            logger.error("Error sending call analysis email", extra={'to': email, 'error': str(e)})
             return False
 
 # Global email service instance
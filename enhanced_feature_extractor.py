@@ -19,6 +19,63 @@ from textblob import TextBlob
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
 
+from scam_lexicon import get_lexicon, normalize_text
+from feature_graph import FeatureGraph, extraction_report, resolve_profile
+
+# Weight added to an intent score per matching phrase
+INTENT_WEIGHTS = {
+    'scam_request': 0.3,
+    'information_gathering': 0.2,
+    'urgent_action': 0.2,
+    'money_transfer': 0.2,
+    'verification': 0.2,
+    'social_engineering': 0.2
+}
+
+# Deception marker -> lexicon category
+DECEPTION_CATEGORIES = {
+    'urgency_indicators': 'deception_urgency',
+    'authority_claims': 'deception_authority',
+    'fear_appeals': 'deception_fear',
+    'social_proof': 'deception_social_proof'
+}
+
+# Acoustic primitives and features; inputs are the audio, its sample rate and the extractor
+# (for its VAD). Spectral features share one magnitude STFT (librosa defaults), pitch and
+# emotion share one pYIN pass, speech rate and voice activity share one VAD pass.
+ACOUSTIC_FEATURE_GRAPH = (
+    FeatureGraph(inputs=('audio', 'sr', 'extractor'))
+    .add('stft', lambda v: np.abs(librosa.stft(v['audio'])))
+    .add('rms', lambda v: librosa.feature.rms(y=v['audio'])[0])
+    .add('rms_fine', lambda v: v['extractor']._fine_rms(v['audio'], v['sr']))
+    .add('zcr', lambda v: librosa.feature.zero_crossing_rate(v['audio'])[0])
+    .add('pyin', lambda v: v['extractor']._pyin(v['audio'], v['sr']))
+    .add('vad_flags', lambda v: v['extractor']._vad_flags(v['audio'], v['sr']))
+    .add('pitch_features', lambda v: v['extractor']._extract_pitch_features(v['audio'], v['sr'], v['pyin']),
+         deps=['pyin'])
+    .add('speech_rate', lambda v: v['extractor']._calculate_speech_rate(v['audio'], v['sr'], v['vad_flags']),
+         deps=['vad_flags'])
+    .add('pause_features', lambda v: v['extractor']._detect_pauses(v['audio'], v['sr'], v['rms_fine']),
+         deps=['rms_fine'])
+    .add('intensity_features', lambda v: v['extractor']._extract_intensity_features(
+        v['audio'], v['sr'], v['rms'], v['stft'], v['zcr']), deps=['rms', 'stft', 'zcr'])
+    .add('prosodic_features', lambda v: v['extractor']._extract_prosodic_features(v['audio'], v['sr'], v['stft']),
+         deps=['stft'])
+    .add('rhythm_features', lambda v: v['extractor']._extract_rhythm_features(v['audio'], v['sr']))
+    .add('voice_activity', lambda v: v['extractor']._analyze_voice_activity(v['audio'], v['sr'], v['vad_flags']),
+         deps=['vad_flags'])
+    .add('emotion_features', lambda v: v['extractor']._extract_emotion_from_voice(
+        v['audio'], v['sr'], v['pitch_features'], v['intensity_features']), deps=['pitch_features', 'intensity_features'])
+)
+
+ACOUSTIC_FEATURE_PROFILES = {
+    'triage': ('speech_rate', 'pause_features', 'intensity_features', 'voice_activity'),
+    'standard': ('pitch_features', 'speech_rate', 'pause_features', 'intensity_features', 'prosodic_features',
+                 'voice_activity', 'emotion_features'),
+    'forensic': ('pitch_features', 'speech_rate', 'pause_features', 'intensity_features', 'prosodic_features',
+                 'voice_activity', 'emotion_features', 'rhythm_features')
+}
+
 class EnhancedFeatureExtractor:
     """
     Enhanced feature extractor for voice-based scam detection
@@ -94,73 +151,58 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Emotion detection failed: {e}")
             self.emotion_pipeline = None
     
-    def extract_acoustic_features(self, audio_file_path: str) -> Dict:
+    def extract_acoustic_features(self, audio_file_path: str, profile=None) -> Dict:
         """
-        Extract comprehensive acoustic features from audio file
+        Extract acoustic features from audio file
         
         Features:
         - Pitch (fundamental frequency)
         - Speech rate (words per minute)
         - Pauses and silence detection
         - Intensity/Energy
-        - Speaker overlap detection
+        - Prosodic features (MFCC, spectral rolloff)
+        - Voice activity
         - Emotion from voice (prosodic features)
+        - Rhythm (beat-tracking tempo; forensic profile only)
+        
+        `profile` is triage/standard/forensic (default FEATURE_PROFILE, see
+        feature_graph.py) or a list of ACOUSTIC_FEATURE_GRAPH nodes. Shared
+        primitives (STFT, RMS frames, pYIN, VAD decisions) are computed once,
+        and per-node costs are returned under 'extraction'.
         """
         print(f"🎵 Extracting acoustic features from: {audio_file_path}")
         
         try:
+            profile_name, targets = resolve_profile(profile, ACOUSTIC_FEATURE_PROFILES)
+            
             # Load audio file
             audio_data, sr = librosa.load(audio_file_path, sr=self.sample_rate)
             
-            # Initialize features dictionary
-            features = {
-                'pitch_features': {},
-                'speech_rate': 0,
-                'pause_features': {},
-                'intensity_features': {},
-                'prosodic_features': {},
-                'voice_activity': {},
-                'emotion_features': {}
-            }
-            
-            # 1. Pitch Analysis (Fundamental Frequency)
-            features['pitch_features'] = self._extract_pitch_features(audio_data, sr)
-            
-            # 2. Speech Rate Analysis
-            features['speech_rate'] = self._calculate_speech_rate(audio_data, sr)
+            features, costs = ACOUSTIC_FEATURE_GRAPH.compute(targets, {'audio': audio_data, 'sr': sr, 'extractor': self})
+            features['extraction'] = extraction_report(profile_name, costs)
             
-            # 3. Pause and Silence Detection
-            features['pause_features'] = self._detect_pauses(audio_data, sr)
-            
-            # 4. Intensity/Energy Analysis
-            features['intensity_features'] = self._extract_intensity_features(audio_data, sr)
-            
-            # 5. Prosodic Features (rhythm, stress patterns)
-            features['prosodic_features'] = self._extract_prosodic_features(audio_data, sr)
-            
-            # 6. Voice Activity Detection
-            features['voice_activity'] = self._analyze_voice_activity(audio_data, sr)
-            
-            # 7. Emotion from Voice (prosodic-based)
-            features['emotion_features'] = self._extract_emotion_from_voice(audio_data, sr)
-            
-            print("✅ Acoustic features extracted successfully")
+            print(f"✅ Acoustic features extracted successfully ({profile_name}, {features['extraction']['total_ms']:.0f} ms)")
             return features
             
         except Exception as e:
             print(f"❌ Acoustic feature extraction failed: {e}")
             return {}
     
-    def _extract_pitch_features(self, audio_data: np.ndarray, sr: int) -> Dict:
+    def _pyin(self, audio_data: np.ndarray, sr: int) -> Tuple[np.ndarray, np.ndarray]:
+        """pYIN fundamental frequency and voiced flags"""
+        f0, voiced_flag, voiced_probs = librosa.pyin(
+            audio_data, 
+            fmin=librosa.note_to_hz('C2'), 
+            fmax=librosa.note_to_hz('C7'),
+            sr=sr
+        )
+        return f0, voiced_flag
+    
+    def _extract_pitch_features(self, audio_data: np.ndarray, sr: int, pyin: Optional[Tuple] = None) -> Dict:
         """Extract pitch-related features"""
         try:
             # Extract fundamental frequency using librosa
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                audio_data, 
-                fmin=librosa.note_to_hz('C2'), 
-                fmax=librosa.note_to_hz('C7'),
-                sr=sr
-            )
+            f0, voiced_flag = pyin if pyin is not None else self._pyin(audio_data, sr)
             
             # Remove NaN values
             f0_clean = f0[~np.isnan(f0)]
@@ -180,36 +222,39 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Pitch extraction failed: {e}")
             return {'mean_pitch': 0, 'pitch_variance': 0, 'pitch_range': 0}
     
-    def _calculate_speech_rate(self, audio_data: np.ndarray, sr: int) -> float:
+    def _vad_flags(self, audio_data: np.ndarray, sr: int) -> List[Optional[bool]]:
+        """WebRTC VAD decision per 25 ms frame (10 ms hop); None where VAD rejected the frame"""
+        frame_length = int(0.025 * sr)  # 25ms frames
+        hop_length = int(0.010 * sr)   # 10ms hop
+        
+        # Convert to 16-bit PCM for VAD
+        audio_int16 = (audio_data * 32767).astype(np.int16)
+        
+        flags = []
+        for i in range(0, len(audio_int16) - frame_length, hop_length):
+            frame = audio_int16[i:i + frame_length]
+            try:
+                flags.append(self.vad.is_speech(frame.tobytes(), sr))
+            except:
+                flags.append(None)
+        return flags
+    
+    def _calculate_speech_rate(self, audio_data: np.ndarray, sr: int, vad_flags: Optional[List] = None) -> float:
         """Calculate speech rate (words per minute approximation)"""
         try:
             # Use voice activity detection to estimate speech segments
-            frame_length = int(0.025 * sr)  # 25ms frames
-            hop_length = int(0.010 * sr)   # 10ms hop
-            
-            # Convert to 16-bit PCM for VAD
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-            
-            # Detect voice activity
-            voice_frames = 0
-            total_frames = 0
+            if vad_flags is None:
+                vad_flags = self._vad_flags(audio_data, sr)
             
-            for i in range(0, len(audio_int16) - frame_length, hop_length):
-                frame = audio_int16[i:i + frame_length]
-                if len(frame) == frame_length:
-                    try:
-                        if self.vad.is_speech(frame.tobytes(), sr):
-                            voice_frames += 1
-                        total_frames += 1
-                    except:
-                        pass
+            decided = [flag for flag in vad_flags if flag is not None]
+            total_frames = len(decided)
+            voice_frames = sum(decided)
             
             if total_frames == 0:
                 return 0.0
             
             # Estimate speech rate (rough approximation)
             voice_ratio = voice_frames / total_frames
-            duration_minutes = len(audio_data) / (sr * 60)
             
             # Rough estimate: assume average speaking rate of 150 WPM
             estimated_wpm = voice_ratio * 150
@@ -220,18 +265,21 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Speech rate calculation failed: {e}")
             return 0.0
     
-    def _detect_pauses(self, audio_data: np.ndarray, sr: int) -> Dict:
+    def _fine_rms(self, audio_data: np.ndarray, sr: int) -> np.ndarray:
+        """RMS energy over 25 ms frames with a 10 ms hop"""
+        return librosa.feature.rms(
+            y=audio_data, 
+            frame_length=int(0.025 * sr), 
+            hop_length=int(0.010 * sr)
+        )[0]
+    
+    def _detect_pauses(self, audio_data: np.ndarray, sr: int, rms_energy: Optional[np.ndarray] = None) -> Dict:
         """Detect pauses and silence in audio"""
         try:
             # Calculate RMS energy
-            frame_length = int(0.025 * sr)  # 25ms frames
             hop_length = int(0.010 * sr)   # 10ms hop
-            
-            rms_energy = librosa.feature.rms(
-                y=audio_data, 
-                frame_length=frame_length, 
-                hop_length=hop_length
-            )[0]
+            if rms_energy is None:
+                rms_energy = self._fine_rms(audio_data, sr)
             
             # Define silence threshold (adaptive)
             silence_threshold = np.percentile(rms_energy, 20)  # Bottom 20%
@@ -269,17 +317,22 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Pause detection failed: {e}")
             return {'total_pause_time': 0, 'pause_count': 0, 'average_pause_duration': 0}
     
-    def _extract_intensity_features(self, audio_data: np.ndarray, sr: int) -> Dict:
+    def _extract_intensity_features(self, audio_data: np.ndarray, sr: int, rms_energy: Optional[np.ndarray] = None,
+                                    stft: Optional[np.ndarray] = None, zcr: Optional[np.ndarray] = None) -> Dict:
         """Extract intensity/energy features"""
         try:
             # Calculate RMS energy
-            rms_energy = librosa.feature.rms(y=audio_data)[0]
+            if rms_energy is None:
+                rms_energy = librosa.feature.rms(y=audio_data)[0]
             
             # Calculate spectral centroid (brightness)
-            spectral_centroid = librosa.feature.spectral_centroid(y=audio_data, sr=sr)[0]
+            if stft is None:
+                stft = np.abs(librosa.stft(audio_data))
+            spectral_centroid = librosa.feature.spectral_centroid(S=stft, sr=sr)[0]
             
             # Calculate zero crossing rate
-            zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
+            if zcr is None:
+                zcr = librosa.feature.zero_crossing_rate(audio_data)[0]
             
             return {
                 'mean_intensity': float(np.mean(rms_energy)),
@@ -295,61 +348,63 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Intensity extraction failed: {e}")
             return {'mean_intensity': 0, 'intensity_variance': 0}
     
-    def _extract_prosodic_features(self, audio_data: np.ndarray, sr: int) -> Dict:
-        """Extract prosodic features (rhythm, stress patterns)"""
+    def _extract_prosodic_features(self, audio_data: np.ndarray, sr: int, stft: Optional[np.ndarray] = None) -> Dict:
+        """Extract prosodic features (MFCC statistics, spectral rolloff)"""
         try:
-            # Extract MFCC features
-            mfccs = librosa.feature.mfcc(y=audio_data, sr=sr, n_mfcc=13)
+            if stft is None:
+                stft = np.abs(librosa.stft(audio_data))
             
-            # Calculate tempo
-            tempo, beats = librosa.beat.beat_track(y=audio_data, sr=sr)
+            # Extract MFCC features (same values as mfcc(y=...), from the shared STFT)
+            mel = librosa.feature.melspectrogram(S=stft ** 2, sr=sr)
+            mfccs = librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=13)
             
             # Calculate spectral rolloff
-            rolloff = librosa.feature.spectral_rolloff(y=audio_data, sr=sr)[0]
+            rolloff = librosa.feature.spectral_rolloff(S=stft, sr=sr)[0]
             
             return {
-                'tempo': float(tempo),
                 'mfcc_mean': [float(np.mean(mfcc)) for mfcc in mfccs],
                 'mfcc_variance': [float(np.var(mfcc)) for mfcc in mfccs],
-                'spectral_rolloff_mean': float(np.mean(rolloff)),
-                'beat_count': len(beats)
+                'spectral_rolloff_mean': float(np.mean(rolloff))
             }
             
         except Exception as e:
             print(f"⚠️ Prosodic extraction failed: {e}")
-            return {'tempo': 0, 'mfcc_mean': [], 'mfcc_variance': []}
+            return {'mfcc_mean': [], 'mfcc_variance': []}
     
-    def _analyze_voice_activity(self, audio_data: np.ndarray, sr: int) -> Dict:
+    def _extract_rhythm_features(self, audio_data: np.ndarray, sr: int) -> Dict:
+        """Beat-tracking tempo (costly and of little use for speech; forensic profile only)"""
+        try:
+            tempo, beats = librosa.beat.beat_track(y=audio_data, sr=sr)
+            return {'tempo': float(tempo), 'beat_count': len(beats)}
+        except Exception as e:
+            print(f"⚠️ Rhythm extraction failed: {e}")
+            return {'tempo': 0, 'beat_count': 0}
+    
+    def _analyze_voice_activity(self, audio_data: np.ndarray, sr: int, vad_flags: Optional[List] = None) -> Dict:
         """Analyze voice activity patterns"""
         try:
-            # Convert to 16-bit PCM for VAD
-            audio_int16 = (audio_data * 32767).astype(np.int16)
-            
-            frame_length = int(0.025 * sr)  # 25ms frames
             hop_length = int(0.010 * sr)   # 10ms hop
+            if vad_flags is None:
+                vad_flags = self._vad_flags(audio_data, sr)
             
             voice_segments = []
             in_voice = False
             voice_start = 0
             
-            for i in range(0, len(audio_int16) - frame_length, hop_length):
-                frame = audio_int16[i:i + frame_length]
-                if len(frame) == frame_length:
-                    try:
-                        is_speech = self.vad.is_speech(frame.tobytes(), sr)
-                        
-                        if is_speech and not in_voice:
-                            voice_start = i
-                            in_voice = True
-                        elif not is_speech and in_voice:
-                            voice_duration = (i - voice_start) * hop_length / sr
-                            voice_segments.append({
-                                'start': voice_start * hop_length / sr,
-                                'duration': voice_duration
-                            })
-                            in_voice = False
-                    except:
-                        pass
+            for frame_index, is_speech in enumerate(vad_flags):
+                if is_speech is None:
+                    continue
+                i = frame_index * hop_length
+                if is_speech and not in_voice:
+                    voice_start = i
+                    in_voice = True
+                elif not is_speech and in_voice:
+                    voice_duration = (i - voice_start) * hop_length / sr
+                    voice_segments.append({
+                        'start': voice_start * hop_length / sr,
+                        'duration': voice_duration
+                    })
+                    in_voice = False
             
             total_voice_time = sum(seg['duration'] for seg in voice_segments)
             total_duration = len(audio_data) / sr
@@ -366,12 +421,15 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Voice activity analysis failed: {e}")
             return {'voice_ratio': 0, 'segment_count': 0}
     
-    def _extract_emotion_from_voice(self, audio_data: np.ndarray, sr: int) -> Dict:
+    def _extract_emotion_from_voice(self, audio_data: np.ndarray, sr: int, pitch_features: Optional[Dict] = None,
+                                    intensity_features: Optional[Dict] = None) -> Dict:
         """Extract emotion-related features from voice prosody"""
         try:
             # Extract features that correlate with emotions
-            pitch_features = self._extract_pitch_features(audio_data, sr)
-            intensity_features = self._extract_intensity_features(audio_data, sr)
+            if pitch_features is None:
+                pitch_features = self._extract_pitch_features(audio_data, sr)
+            if intensity_features is None:
+                intensity_features = self._extract_intensity_features(audio_data, sr)
             
             # Simple emotion classification based on prosodic features
             emotion_scores = {
@@ -414,10 +472,13 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Emotion extraction failed: {e}")
             return {'emotion_scores': {}, 'dominant_emotion': 'neutral', 'confidence': 0}
     
-    def extract_linguistic_features(self, text: str) -> Dict:
+    def extract_linguistic_features(self, text: str, heavy_nlp: bool = True) -> Dict:
         """
         Extract comprehensive linguistic features from text
         
+        heavy_nlp=False skips the transformer sentiment/emotion pipelines
+        (pass the cascade plan's 'nlp_features' entry, see cascade.py).
+        
         Features:
         - Named Entity Recognition (names, banks, OTP)
         - Intent scores
@@ -444,7 +505,7 @@ class EnhancedFeatureExtractor:
             features['intent_scores'] = self._classify_intent(text)
             
             # 3. Sentiment Analysis
-            features['sentiment_analysis'] = self._analyze_sentiment(text)
+            features['sentiment_analysis'] = self._analyze_sentiment(text, heavy_nlp)
             
             # 4. Deception Markers
             features['deception_markers'] = self._detect_deception_markers(text)
@@ -481,7 +542,7 @@ class EnhancedFeatureExtractor:
             }
             
             # Bank names and financial institutions
-            bank_keywords = ['bank', 'rbi', 'sbi', 'hdfc', 'icici', 'axis', 'kotak', 'pnb', 'bob', 'union']
+            lexicon = get_lexicon()
             
             for ent in doc.ents:
                 entity_info = {
@@ -500,7 +561,7 @@ class EnhancedFeatureExtractor:
                 elif ent.label_ == 'ORG':
                     entities['organizations'].append(entity_info)
                     # Check if it's a bank
-                    if any(bank in ent.text.lower() for bank in bank_keywords):
+                    if lexicon.contains_any('bank_names', normalize_text(ent.text)):
                         entities['banks'].append(entity_info)
                 elif ent.label_ == 'MONEY':
                     entities['amounts'].append(entity_info)
@@ -537,8 +598,6 @@ class EnhancedFeatureExtractor:
     def _classify_intent(self, text: str) -> Dict:
         """Classify intent of the conversation"""
         try:
-            text_lower = text.lower()
-            
             intent_scores = {
                 'scam_request': 0.0,
                 'information_gathering': 0.0,
@@ -549,64 +608,10 @@ class EnhancedFeatureExtractor:
                 'legitimate': 0.0
             }
             
-            # Scam request indicators
-            scam_phrases = [
-                'send money', 'transfer money', 'pay money', 'give money',
-                'share otp', 'tell otp', 'say otp', 'provide otp',
-                'bank asking for money', 'urgent payment'
-            ]
-            
-            for phrase in scam_phrases:
-                if phrase in text_lower:
-                    intent_scores['scam_request'] += 0.3
-            
-            # Information gathering
-            info_phrases = [
-                'what is your', 'tell me your', 'share your', 'give me your',
-                'account number', 'card number', 'pin number'
-            ]
-            
-            for phrase in info_phrases:
-                if phrase in text_lower:
-                    intent_scores['information_gathering'] += 0.2
-            
-            # Urgent action
-            urgent_phrases = [
-                'immediately', 'urgent', 'now', 'right now', 'asap',
-                'blocked', 'suspended', 'expired'
-            ]
-            
-            for phrase in urgent_phrases:
-                if phrase in text_lower:
-                    intent_scores['urgent_action'] += 0.2
-            
-            # Money transfer
-            money_phrases = [
-                'transfer', 'send', 'pay', 'deposit', 'lakh', 'rupees'
-            ]
-            
-            for phrase in money_phrases:
-                if phrase in text_lower:
-                    intent_scores['money_transfer'] += 0.2
-            
-            # Verification
-            verify_phrases = [
-                'verify', 'confirm', 'authenticate', 'validate'
-            ]
-            
-            for phrase in verify_phrases:
-                if phrase in text_lower:
-                    intent_scores['verification'] += 0.2
-            
-            # Social engineering
-            social_phrases = [
-                'i am from', 'we are from', 'bank calling', 'government',
-                'representative', 'official', 'employee'
-            ]
-            
-            for phrase in social_phrases:
-                if phrase in text_lower:
-                    intent_scores['social_engineering'] += 0.2
+            lexicon = get_lexicon()
+            text_normalized = normalize_text(text)
+            for intent, weight in INTENT_WEIGHTS.items():
+                intent_scores[intent] += weight * len(lexicon.find(f'intent_{intent}', text_normalized))
             
             # Normalize scores
             total_score = sum(intent_scores.values())
@@ -624,8 +629,8 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Intent classification failed: {e}")
             return {'error': str(e)}
     
-    def _analyze_sentiment(self, text: str) -> Dict:
-        """Analyze sentiment using multiple approaches"""
+    def _analyze_sentiment(self, text: str, heavy_nlp: bool = True) -> Dict:
+        """Analyze sentiment using multiple approaches (TextBlob only when heavy_nlp is False)"""
         try:
             sentiment_results = {}
             
@@ -638,7 +643,7 @@ class EnhancedFeatureExtractor:
             }
             
             # 2. Advanced sentiment analysis (if available)
-            if self.sentiment_pipeline:
+            if heavy_nlp and self.sentiment_pipeline:
                 try:
                     sentiment_scores = self.sentiment_pipeline(text)
                     sentiment_results['advanced'] = sentiment_scores[0]
@@ -646,7 +651,7 @@ class EnhancedFeatureExtractor:
                     print(f"⚠️ Advanced sentiment failed: {e}")
             
             # 3. Emotion detection (if available)
-            if self.emotion_pipeline:
+            if heavy_nlp and self.emotion_pipeline:
                 try:
                     emotion_scores = self.emotion_pipeline(text)
                     sentiment_results['emotions'] = emotion_scores[0]
@@ -662,8 +667,6 @@ class EnhancedFeatureExtractor:
     def _detect_deception_markers(self, text: str) -> Dict:
         """Detect linguistic deception markers"""
         try:
-            text_lower = text.lower()
-            
             deception_markers = {
                 'urgency_indicators': [],
                 'authority_claims': [],
@@ -673,45 +676,10 @@ class EnhancedFeatureExtractor:
                 'deception_score': 0.0
             }
             
-            # Urgency indicators
-            urgency_words = [
-                'urgent', 'immediately', 'now', 'right now', 'asap',
-                'expires', 'deadline', 'last chance', 'final notice'
-            ]
-            
-            for word in urgency_words:
-                if word in text_lower:
-                    deception_markers['urgency_indicators'].append(word)
-            
-            # Authority claims
-            authority_phrases = [
-                'i am from', 'we are from', 'bank calling', 'government',
-                'rbi', 'official', 'representative', 'authorized'
-            ]
-            
-            for phrase in authority_phrases:
-                if phrase in text_lower:
-                    deception_markers['authority_claims'].append(phrase)
-            
-            # Fear appeals
-            fear_words = [
-                'blocked', 'suspended', 'fraud', 'hacked', 'compromised',
-                'penalty', 'fine', 'legal action', 'police'
-            ]
-            
-            for word in fear_words:
-                if word in text_lower:
-                    deception_markers['fear_appeals'].append(word)
-            
-            # Social proof
-            social_proof_phrases = [
-                'everyone is doing', 'many people', 'thousands of',
-                'popular', 'recommended', 'trusted by'
-            ]
-            
-            for phrase in social_proof_phrases:
-                if phrase in text_lower:
-                    deception_markers['social_proof'].append(phrase)
+            lexicon = get_lexicon()
+            text_normalized = normalize_text(text)
+            for marker, category in DECEPTION_CATEGORIES.items():
+                deception_markers[marker].extend(lexicon.find(category, text_normalized))
             
             # Calculate deception score
             total_markers = (
@@ -732,30 +700,11 @@ class EnhancedFeatureExtractor:
     def _analyze_keywords(self, text: str) -> Dict:
         """Analyze keywords and their significance"""
         try:
-            text_lower = text.lower()
-            
-            # Scam-related keywords (from original implementation)
-            scam_keywords = [
-                'otp', 'password', 'pin', 'account', 'blocked', 'suspended',
-                'urgent', 'immediately', 'verify', 'confirm', 'share', 'send',
-                'bank', 'rbi', 'government', 'tax', 'refund', 'win', 'prize',
-                'suspicious', 'fraud', 'security', 'update', 'reactivate',
-                'debit', 'credit', 'card', 'number', 'cvv', 'expiry',
-                'say', 'tell', 'give', 'provide', 'enter', 'input', 'type',
-                'code', 'verification', 'authenticate', 'unlock', 'unblock',
-                'pay', 'payment', 'money', 'transfer', 'deposit', 'send',
-                'fees', 'charges', 'penalty', 'fine', 'amount', 'cost'
-            ]
-            
-            found_keywords = []
-            keyword_positions = {}
+            text_normalized = normalize_text(text)
             
-            for keyword in scam_keywords:
-                if keyword in text_lower:
-                    found_keywords.append(keyword)
-                    # Find positions
-                    start = text_lower.find(keyword)
-                    keyword_positions[keyword] = start
+            # Scam-related keywords (shared lexicon)
+            found_keywords = get_lexicon().find('feature_keywords', text_normalized)
+            keyword_positions = {keyword: text_normalized.find(keyword) for keyword in found_keywords}
             
             return {
                 'found_keywords': found_keywords,
@@ -787,16 +736,42 @@ class EnhancedFeatureExtractor:
             print(f"⚠️ Text statistics calculation failed: {e}")
             return {'error': str(e)}
     
-    def extract_all_features(self, audio_file_path: str, text: str) -> Dict:
-        """Extract both acoustic and linguistic features"""
+    def extract_turn_taking_features(self, words: List[Dict]) -> Dict:
+        """Speaker overlap, interruptions and turn statistics from diarized word timings"""
+        try:
+            from word_table import WordTable
+            from turn_taking import analyze_turn_taking, conversation_pressure
+            
+            table = WordTable(words)
+            speakers = analyze_turn_taking(table)
+            return {
+                'speakers': speakers,
+                'conversation_pressure': {
+                    speaker: conversation_pressure(features) if table.speaker_count > 1 else 0.0
+                    for speaker, features in speakers.items()
+                },
+                'total_overlaps': sum(features['overlaps'] for features in speakers.values()),
+                'total_interruptions': sum(features['interruptions'] for features in speakers.values())
+            }
+            
+        except Exception as e:
+            print(f"⚠️ Turn-taking analysis failed: {e}")
+            return {'error': str(e)}
+    
+    def extract_all_features(self, audio_file_path: str, text: str, words: Optional[List[Dict]] = None,
+                             heavy_nlp: bool = True, profile=None) -> Dict:
+        """Extract both acoustic and linguistic features (plus turn-taking when word timings are given)"""
         print("🔍 Extracting all features...")
         
         features = {
-            'acoustic_features': self.extract_acoustic_features(audio_file_path),
-            'linguistic_features': self.extract_linguistic_features(text),
+            'acoustic_features': self.extract_acoustic_features(audio_file_path, profile),
+            'linguistic_features': self.extract_linguistic_features(text, heavy_nlp),
             'extraction_timestamp': pd.Timestamp.now().isoformat()
         }
         
+        if words:
+            features['turn_taking_features'] = self.extract_turn_taking_features(words)
+        
         print("✅ All features extracted successfully")
         return features
 
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Per-call feature store
+
+Every analyzed call's feature vector (risk_model.FEATURE_NAMES) and, when
+the voice features were extracted with keep_frames=True, its frame-level
+arrays are persisted so thresholds can be retuned and the risk scorer
+retrained without decoding audio or running STT again:
+
+    meta.json           feature names, row count
+    vectors.f32         (count, dim) float32, row i = i-th stored call
+    rows.jsonl          one line per row (key, verdict, label, frames file, timestamp)
+    row_offsets.u64     byte offset of each rows.jsonl line, for random access
+    frames/ab/<sha1>.npz  compressed frame arrays (rms, pitch track, MFCC...)
+                          plus the call's acoustic feature summary as JSON
+
+The vector and row files are an append_store.AppendStore, shared with
+the voice index. Calls are keyed by analysis_id (batch results without
+one use their source path). Storing a key again appends a new row;
+lookups return the latest. vectors() memory-maps the whole matrix for
+training and bulk rescoring, so millions of calls never have to fit in
+RAM, and iter_blocks() walks it in row blocks. Frames use .npz (numpy
+only) rather than Parquet, which would add pyarrow to the requirements.
+
+The store is enabled by setting FEATURE_STORE_DIR.
+
+Usage:
+    python feature_store.py stats
+    python feature_store.py backfill --limit 100000
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from append_store import AppendStore
+from pipeline_metrics import get_logger
+from risk_model import FEATURE_NAMES, build_feature_vector
+
+logger = get_logger('feature_store')
+
+BLOCK_ROWS = 262144
+
+# Record fields copied into rows.jsonl so training and reports need no database
+ROW_FIELDS = ('scam_detected', 'risk_level', 'overall_risk_score', 'heuristic_risk_score', 'risk_scorer',
+              'label', 'source_path', 'audio_duration')
+
+def record_key(record: Dict) -> Optional[str]:
+    """analysis_id, or the source path for batch results"""
+    return record.get('analysis_id') or record.get('source_path')
+
+class FeatureStore:
+    """Append-only feature vectors with memory-mapped bulk access (see module docstring)"""
+
+    def __init__(self, directory: str, feature_names=FEATURE_NAMES):
+        self.directory = directory
+        self._keys: Dict[str, int] = {}
+        self._keys_count = 0  # rows already folded into _keys
+        self._keys_read = 0  # and their bytes in rows.jsonl
+
+        os.makedirs(os.path.join(directory, 'frames'), exist_ok=True)
+        self._store = AppendStore(directory, 'rows.jsonl', 'row_offsets.u64')
+
+        if self._store.meta is not None:
+            if list(feature_names) != self.meta['feature_names']:
+                raise ValueError(f"Feature store at {directory} was written with a different feature layout; "
+                                 f"use a new FEATURE_STORE_DIR after changing FEATURE_NAMES")
+        else:
+            self._store.create({'feature_names': list(feature_names), 'dim': len(feature_names),
+                                'created': datetime.utcnow().isoformat()})
+
+    @property
+    def meta(self) -> Dict:
+        return self._store.meta
+
+    @property
+    def dim(self) -> int:
+        return self._store.dim
+
+    @property
+    def count(self) -> int:
+        return self._store.count
+
+    def _frames_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join('frames', digest[:2], f"{digest}.npz")
+
+    def put(self, record: Dict, voice_insights: Optional[Dict] = None, frames: Optional[Dict] = None,
+            context=None) -> Optional[int]:
+        """Store one analyzed call; returns its row id (None for records without a key)"""
+        key = record_key(record)
+        if not key:
+            return None
+        voice_insights = voice_insights if voice_insights is not None else (
+            record.get('voice_insights') or record.get('mozilla_insights'))
+        vector = build_feature_vector(record, voice_insights, context).astype(np.float32)
+
+        frames_file = None
+        if frames:
+            frames_file = self._frames_path(key)
+            audio_features = {name: value for name, value in ((voice_insights or {}).get('audio_features') or {}).items()
+                              if name != 'frames'}
+            os.makedirs(os.path.dirname(os.path.join(self.directory, frames_file)), exist_ok=True)
+            temp_path = os.path.join(self.directory, frames_file + '.tmp.npz')
+            np.savez_compressed(temp_path, audio_features=np.array(json.dumps(audio_features, default=float)),
+                                **{name: np.asarray(values, dtype=np.float32) for name, values in frames.items()})
+            os.replace(temp_path, os.path.join(self.directory, frames_file))
+
+        row = {field: record[field] for field in ROW_FIELDS if field in record}
+        row.update(key=key, frames=frames_file, timestamp=datetime.utcnow().isoformat())
+        return self._store.append(vector[np.newaxis], [row])
+
+    def _index_keys(self) -> Dict[str, int]:
+        """key -> latest row id, extended incrementally with rows appended since the last lookup"""
+        self._store.mapped()
+        if self._keys_count < self.count:
+            with open(self._store.rows_path, 'rb') as rows_file:
+                rows_file.seek(self._keys_read)
+                for line in rows_file:
+                    if self._keys_count >= self.count:
+                        break  # a writer is mid-append; its row is not counted yet
+                    self._keys[json.loads(line)['key']] = self._keys_count
+                    self._keys_count += 1
+                    self._keys_read += len(line)
+        return self._keys
+
+    def row_id(self, key: str) -> Optional[int]:
+        return self._index_keys().get(key)
+
+    def row(self, row_id: int) -> Dict:
+        """rows.jsonl entry of one row"""
+        return self._store.row(row_id)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Latest stored vector and row entry for a call"""
+        row_id = self.row_id(key)
+        if row_id is None:
+            return None
+        vectors, _ = self._store.mapped()
+        return {'row_id': row_id, 'row': self.row(row_id), 'vector': np.array(vectors[row_id])}
+
+    def load_frames(self, key: str) -> Optional[Dict]:
+        """Frame arrays of a call plus its acoustic summary under 'audio_features'"""
+        stored = self.get(key)
+        if stored is None or not stored['row'].get('frames'):
+            return None
+        with np.load(os.path.join(self.directory, stored['row']['frames'])) as archive:
+            frames = {name: archive[name] for name in archive.files if name != 'audio_features'}
+            frames['audio_features'] = json.loads(str(archive['audio_features']))
+        return frames
+
+    def vectors(self) -> np.ndarray:
+        """(count, dim) float32 memmap of every stored row"""
+        return self._store.mapped()[0]
+
+    def rows(self) -> Iterator[Dict]:
+        """rows.jsonl entries in row order (streamed, not loaded at once)"""
+        return self._store.rows()
+
+    def latest_rows(self) -> np.ndarray:
+        """Row ids holding the latest version of each key, ascending"""
+        return np.array(sorted(self._index_keys().values()), dtype=np.int64)
+
+    def iter_blocks(self, rows: Optional[np.ndarray] = None, block_rows: int = BLOCK_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(row ids, float32 block) pairs over all rows or a subset, BLOCK_ROWS at a time"""
+        vectors = self.vectors()
+        rows = np.arange(len(vectors)) if rows is None else np.asarray(rows)
+        for start in range(0, len(rows), block_rows):
+            ids = rows[start:start + block_rows]
+            yield ids, np.asarray(vectors[ids])
+
+_stores: Dict[str, FeatureStore] = {}
+_stores_lock = threading.Lock()
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """Store under FEATURE_STORE_DIR, or None when the feature store is disabled"""
+    root = os.getenv('FEATURE_STORE_DIR')
+    if not root:
+        return None
+    with _stores_lock:
+        if root not in _stores:
+            _stores[root] = FeatureStore(root)
+        return _stores[root]
+
+def store_call_features(record: Dict, voice_insights: Optional[Dict] = None, frames: Optional[Dict] = None,
+                        context=None) -> Optional[int]:
+    """put() into the configured store; never raises (feature capture must not fail an analysis)"""
+    store = get_feature_store()
+    if store is None:
+        return None
+    try:
+        return store.put(record, voice_insights, frames, context)
+    except Exception as e:
+        logger.error("Feature store write failed", extra={'key': record_key(record), 'error': str(e)})
+        return None
+
+def main():
+    """Inspect or backfill the feature store from the command line"""
+    parser = argparse.ArgumentParser(description="Per-call feature store maintenance")
+    parser.add_argument('command', choices=['stats', 'backfill'])
+    parser.add_argument('--dir', default=os.getenv('FEATURE_STORE_DIR'), help="Store directory (default: FEATURE_STORE_DIR)")
+    parser.add_argument('--limit', type=int, default=0, help="backfill: maximum analyzed_calls documents read")
+    args = parser.parse_args()
+
+    if not args.dir:
+        print("❌ No feature store directory (set FEATURE_STORE_DIR or pass --dir)")
+        return 1
+    store = FeatureStore(args.dir)
+
+    if args.command == 'backfill':
+        # Text and turn-taking features from stored documents; voice features need the audio
+        from analyzed_call_model import analyzed_call_model
+        cursor = analyzed_call_model.analyzed_calls_collection.find({}, {'_id': 0})
+        if args.limit:
+            cursor = cursor.limit(args.limit)
+        stored = 0
+        for document in cursor.batch_size(1000):
+            if record_key(document) and store.row_id(record_key(document)) is None:
+                store.put(document)
+                stored += 1
+        print(f"✅ Backfilled {stored} calls")
+
+    size_mb = store.count * store.dim * 4 / 1024 / 1024
+    print(f"🗃️ {store.count} rows x {store.dim} features ({size_mb:.1f} MB), "
+          f"{len(store.latest_rows())} distinct calls in {args.dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
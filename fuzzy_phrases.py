@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+ASR-error-tolerant phrase matching
+
+Exact substring search misses high-risk phrases the STT spelled slightly
+differently ("share you're OTP", "o t p", "pass word"). FuzzyPhraseIndex
+compiles one lexicon category into:
+
+- a SymSpell-style deletion index over the words of its phrases: every
+  phrase word is stored under its deletion variants (up to 0/1/2 deleted
+  characters by word length), so the lexicon words within spelling
+  distance of a transcript token are found with a handful of dict
+  lookups and one bounded Damerau-Levenshtein check per candidate
+- the phonetic keys of those words (phonetic_keys.py), so "पासवर्ड" or
+  "পাসওয়ার্ড" inside an otherwise English phrase counts as "password"
+- an inverted index from phrase word to the phrases using it
+
+Matching a token sequence then costs:
+
+1. one deletion-index lookup per distinct token (memoized per index)
+2. a pigeonhole filter: a phrase of m words can only match within its
+   edit budget if enough of its words occur (fuzzily) in the sequence
+3. for the surviving phrases, a token-level approximate substring DP
+   (Sellers) whose column is only m + 1 cells tall
+
+so the work stays linear in transcript length. A word matched with
+spelling errors costs distance / (allowed + 1), one in another script
+PHONETIC_COST, an extra transcript word 1; confidence = 1 - cost / m and
+matches below FUZZY_PHRASE_MIN_CONFIDENCE (default 0.75) are dropped.
+Only the lexicon's function_words ("i", "the", "से", "করুন") may be
+missing or replaced by another word (cost 1): every other word of the
+phrase must be matched at least fuzzily, so "i am from the school" is
+not "i am from the bank". Runs of single letters ("o t p") are joined
+before matching.
+
+Set FUZZY_PHRASE_MATCHING=0 to fall back to exact phrases only.
+"""
+
+import os
+import threading
+import weakref
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from phonetic_keys import term_key, token_key
+from scam_lexicon import LexiconIndex
+
+FUZZY_PHRASE_MATCHING = os.getenv('FUZZY_PHRASE_MATCHING', '1') not in ('0', 'false', 'False', '')
+MIN_CONFIDENCE = float(os.getenv('FUZZY_PHRASE_MIN_CONFIDENCE', '0.75'))
+
+MAX_WORD_EDITS = 2
+PHONETIC_COST = 0.25
+UNMATCHED = float('inf')  # cost of deleting or replacing a distinctive phrase word
+TOKEN_CACHE_SIZE = 50000
+
+def allowed_edits(word: str) -> int:
+    """Spelling edits tolerated for a lexicon word: none for short words (otp, pin), then 1, then 2"""
+    if len(word) <= 3:
+        return 0
+    if len(word) <= 7:
+        return 1
+    return MAX_WORD_EDITS
+
+def deletes(word: str, depth: int) -> Set[str]:
+    """The word and every variant with up to `depth` characters deleted"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))
+                    if len(candidate) > 1}
+        variants |= frontier
+    return variants
+
+def edit_distance(source: str, target: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count 1); limit + 1 once it exceeds limit"""
+    if abs(len(source) - len(target)) > limit:
+        return limit + 1
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1 and source[i - 1] == target[j - 2]
+                    and source[i - 2] == target[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1]
+
+def join_spelled_letters(tokens: Sequence[str]) -> List[str]:
+    """Join runs of two or more single letters ("o t p" -> "otp")"""
+    joined: List[str] = []
+    run: List[str] = []
+    for token in list(tokens) + ['']:
+        if len(token) == 1 and token.isalpha():
+            run.append(token)
+            continue
+        if len(run) > 1:
+            joined.append(''.join(run))
+        else:
+            joined.extend(run)
+        run = []
+        if token:
+            joined.append(token)
+    return joined
+
+class FuzzyPhraseIndex:
+    """Deletion index + banded token DP over one lexicon category (see module docstring)"""
+
+    def __init__(self, phrases: Iterable[str], min_confidence: float = MIN_CONFIDENCE,
+                 function_words: AbstractSet[str] = frozenset()):
+        self.min_confidence = min_confidence
+        self.function_words = frozenset(function_words)
+        self.phrases: List[Tuple[str, ...]] = []
+        self.words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._deletes: Dict[str, List[int]] = {}
+        self._phonetic: Dict[str, List[int]] = {}
+        self._phrases_by_word: Dict[int, List[int]] = {}
+        self._token_cache: Dict[str, Dict[int, float]] = {}
+        self._cache_lock = threading.Lock()
+
+        for phrase in dict.fromkeys(phrases):
+            tokens = tuple(phrase.split())
+            if not tokens:
+                continue
+            phrase_id = len(self.phrases)
+            self.phrases.append(tokens)
+            for token in dict.fromkeys(tokens):
+                word_id = self._word_ids.get(token)
+                if word_id is None:
+                    word_id = self._word_ids[token] = len(self.words)
+                    self.words.append(token)
+                    for variant in deletes(token, allowed_edits(token)):
+                        self._deletes.setdefault(variant, []).append(word_id)
+                    key = term_key(token)
+                    if key:
+                        self._phonetic.setdefault(key, []).append(word_id)
+                self._phrases_by_word.setdefault(word_id, []).append(phrase_id)
+        self._phrase_word_ids = [tuple(self._word_ids[token] for token in phrase) for phrase in self.phrases]
+        # Per phrase word: cost of leaving it out or matching another word in its place
+        self._word_costs = [tuple(1.0 if token in self.function_words else UNMATCHED for token in phrase)
+                            for phrase in self.phrases]
+        self._required = [frozenset(self._word_ids[token] for token in phrase if token not in self.function_words)
+                          for phrase in self.phrases]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def lookup(self, token: str) -> Dict[int, float]:
+        """Lexicon words within spelling distance of a token, or sharing its phonetic key: {word id: cost}"""
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+
+        candidates: Dict[int, float] = {}
+        exact = self._word_ids.get(token)
+        if exact is not None:
+            candidates[exact] = 0.0
+        seen = set(candidates)
+        for variant in deletes(token, MAX_WORD_EDITS):
+            for word_id in self._deletes.get(variant, ()):
+                if word_id in seen:
+                    continue
+                seen.add(word_id)
+                word = self.words[word_id]
+                limit = allowed_edits(word)
+                distance = edit_distance(token, word, limit)
+                if distance <= limit:
+                    candidates[word_id] = distance / (limit + 1)
+        key = token_key(token)
+        for word_id in self._phonetic.get(key, ()) if key else ():
+            candidates[word_id] = min(candidates.get(word_id, PHONETIC_COST), PHONETIC_COST)
+
+        with self._cache_lock:
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                self._token_cache.clear()
+            self._token_cache[token] = candidates
+        return candidates
+
+    def _best_match(self, phrase_id: int, candidates: List[Dict[int, float]], max_cost: float) -> Optional[Tuple[float, int, int]]:
+        """Lowest-cost occurrence of a phrase anywhere in the sequence: (cost, start, end) or None"""
+        phrase = self._phrase_word_ids[phrase_id]
+        word_costs = self._word_costs[phrase_id]
+        m = len(phrase)
+        # column[i] = (cost, start) of the best alignment of phrase[:i] ending at the current token
+        column = [(0.0, 0)]
+        for word_cost in word_costs:
+            column.append((column[-1][0] + word_cost, 0))
+        best = None
+        for j, token_candidates in enumerate(candidates):
+            next_column = [(0.0, j + 1)]
+            for i in range(1, m + 1):
+                word_cost = word_costs[i - 1]
+                substitution = token_candidates.get(phrase[i - 1], word_cost)
+                diagonal = column[i - 1]
+                choices = (
+                    (diagonal[0] + substitution, diagonal[1]),
+                    (column[i][0] + 1.0, column[i][1]),  # extra transcript word
+                    (next_column[i - 1][0] + word_cost, next_column[i - 1][1])  # phrase word missing
+                )
+                next_column.append(min(choices))
+            column = next_column
+            cost, start = column[m]
+            if cost <= max_cost and (best is None or cost < best[0]):
+                best = (cost, start, j + 1)
+        return best
+
+    def match(self, tokens: Sequence[str]) -> List[Dict]:
+        """
+        Approximate phrase occurrences in a normalized token sequence
+
+        Returns one entry per matched phrase (its best occurrence), in
+        lexicon order: {'phrase', 'confidence', 'matched'}. Exact
+        occurrences have confidence 1.0; an inexact match overlapping a
+        better one is dropped, so "pay fine to unblock" does not also
+        count as "pay fees to unblock".
+        """
+        tokens = join_spelled_letters([token for token in tokens if token])
+        candidates = [self.lookup(token) for token in tokens]
+
+        # Pigeonhole filter: every distinctive word of a phrase, and enough of the rest, must be present
+        words_present = set().union(*candidates) if candidates else set()
+        present: Dict[int, int] = {}
+        for word_id in words_present:
+            for phrase_id in self._phrases_by_word.get(word_id, ()):
+                present[phrase_id] = present.get(phrase_id, 0) + 1
+
+        found = []
+        for phrase_id, count in present.items():
+            phrase = self.phrases[phrase_id]
+            max_cost = (1.0 - self.min_confidence) * len(phrase)
+            if count < len(set(phrase)) - int(max_cost + 1e-9) or not self._required[phrase_id] <= words_present:
+                continue
+            best = self._best_match(phrase_id, candidates, max_cost + 1e-9)
+            if best is not None:
+                cost, start, end = best
+                found.append((round(1.0 - cost / len(phrase), 3), phrase_id, start, end))
+
+        kept = []
+        for confidence, phrase_id, start, end in sorted(found, key=lambda match: (-match[0], match[1])):
+            if confidence < 1.0 and any(start < other_end and other_start < end
+                                        for _, _, other_start, other_end in kept):
+                continue
+            kept.append((confidence, phrase_id, start, end))
+        return [{'phrase': ' '.join(self.phrases[phrase_id]), 'confidence': confidence,
+                 'matched': ' '.join(tokens[start:end])}
+                for confidence, phrase_id, start, end in sorted(kept, key=lambda match: match[1])]
+
+_indexes: 'weakref.WeakKeyDictionary[LexiconIndex, Dict[str, FuzzyPhraseIndex]]' = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+def get_fuzzy_index(lexicon: LexiconIndex, category: str = 'high_risk_phrases') -> Optional[FuzzyPhraseIndex]:
+    """Index for a category of one lexicon version (built once), or None when fuzzy matching is disabled"""
+    if not FUZZY_PHRASE_MATCHING:
+        return None
+    with _indexes_lock:
+        per_category = _indexes.setdefault(lexicon, {})
+        if category not in per_category:
+            per_category[category] = FuzzyPhraseIndex(lexicon.terms(category),
+                                                      function_words=lexicon.term_set('function_words'))
+        return per_category[category]
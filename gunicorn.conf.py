@@ -0,0 +1,65 @@
+"""
+Gunicorn configuration for the Scam Detection API
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting can be overridden with an environment variable:
+- PORT / BIND            listen address (default 0.0.0.0:5000)
+- WEB_CONCURRENCY        worker processes (default: number of CPU cores)
+- WORKER_THREADS         threads per worker for I/O waits on STT/Gemini/Mongo (default 4)
+- REQUEST_TIMEOUT        seconds before a stuck worker is killed and restarted (default 120)
+- GRACEFUL_TIMEOUT       seconds in-flight requests get to finish on shutdown (default 30)
+- MAX_REQUESTS           recycle a worker after this many requests, 0 disables (default 1000)
+"""
+
+import os
+import multiprocessing
+
+# Listen address
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# One process per core: speaker analysis and librosa feature extraction are
+# CPU bound and hold the GIL, threads cover the network-bound stages
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('WORKER_THREADS', '4'))
+
+# Load models once in the master and share them with workers copy-on-write
+preload_app = True
+
+# Request timeouts: STT over several language configs plus two Gemini calls
+# can legitimately take a while, but a hung request must not pin a worker
+timeout = int(os.getenv('REQUEST_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+# Recycle workers periodically to bound memory growth from model caches
+max_requests = int(os.getenv('MAX_REQUESTS', '1000'))
+max_requests_jitter = max_requests // 10
+
+# Access/error logs go to stdout alongside the structured pipeline logs
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+
+def post_fork(server, worker):
+    """Give each worker its own network clients (gRPC and pymongo are not fork-safe)"""
+    import api_server
+    api_server.reset_clients_after_fork()
+    server.log.info(f"Worker {worker.pid} ready with preloaded models")
+
+def worker_int(worker):
+    """SIGINT/SIGQUIT: stop reporting ready before the worker exits"""
+    import api_server
+    api_server.mark_shutting_down()
+
+def worker_exit(server, worker):
+    """Close database connections once in-flight requests have drained"""
+    import api_server
+    import complete_scam_detector
+    api_server.mark_shutting_down()
+    complete_scam_detector.shutdown_voice_pool()
+    for model in (api_server.analyzed_call_model, api_server.user_model):
+        client = getattr(model, 'client', None)
+        if client is not None:
+            client.close()
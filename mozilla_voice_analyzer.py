@@ -6,6 +6,7 @@ import tempfile
 from transformers import Wav2Vec2ForSequenceClassification, Wav2Vec2Processor, AutoProcessor, AutoModel
 from typing import Dict, List, Optional, Tuple
 import warnings
+from voice_index import DEFAULT_MATCH_THRESHOLD, speaker_audio
 warnings.filterwarnings("ignore")
 
 class MozillaVoiceAnalyzer:
@@ -13,13 +14,31 @@ class MozillaVoiceAnalyzer:
     Mozilla Voice Analyzer using pre-trained models trained on Common Voice dataset
     """
     
-    def __init__(self):
+    # Voice-print embedding: mean-pooled last hidden state of the encoder
+    embedding_model = 'wav2vec2-base-960h'
+    embedding_dim = 768
+    embedding_standardize = False
+    match_threshold = DEFAULT_MATCH_THRESHOLD
+    
+    def __init__(self, inference_mode: Optional[str] = None, quantize: Optional[bool] = None,
+                 torch_threads: Optional[int] = None):
         """Initialize the Mozilla Voice Analyzer"""
         self.model_name = "facebook/wav2vec2-base-960h"  # Pre-trained on Common Voice
         self.processor = None
         self.model = None
         self.voice_classifier = None
         
+        # CPU inference settings:
+        #   'fast'      - one forward pass (logits + embeddings), inference_mode, windowed clips
+        #   'reference' - original full-clip fp32 path with a separate embedding pass
+        self.inference_mode = inference_mode or os.getenv('VOICE_INFERENCE_MODE', 'fast')
+        if quantize is None:
+            quantize = os.getenv('VOICE_QUANTIZE', '1') not in ('0', 'false', 'no')
+        self.quantize = quantize and self.inference_mode == 'fast'
+        self.torch_threads = torch_threads or int(os.getenv('VOICE_TORCH_THREADS', '0'))
+        self.window_seconds = float(os.getenv('VOICE_WINDOW_SECONDS', '10'))
+        self.max_windows = int(os.getenv('VOICE_MAX_WINDOWS', '3'))
+        
         # Initialize models
         self.load_models()
         
@@ -44,10 +63,21 @@ class MozillaVoiceAnalyzer:
                 problem_type="single_label_classification"
             )
             
+            self.model.eval()
+            
+            if self.torch_threads:
+                torch.set_num_threads(self.torch_threads)
+            
+            if self.quantize:
+                # int8 weights for every Linear layer (attention, feed-forward, head);
+                # the convolutional feature encoder stays fp32
+                self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            
             # Load voice embedding model for similarity
             self.voice_classifier = AutoModel.from_pretrained("facebook/wav2vec2-base")
             
-            print("✅ Mozilla Voice models loaded successfully")
+            print(f"✅ Mozilla Voice models loaded successfully ({self.inference_mode}"
+                  f"{', int8' if self.quantize else ''}, {torch.get_num_threads()} threads)")
             
         except Exception as e:
             print(f"❌ Failed to load Mozilla Voice models: {e}")
@@ -128,23 +158,23 @@ class MozillaVoiceAnalyzer:
             # Load audio
             audio, sr = librosa.load(audio_path, sr=16000)
             
-            # Process audio for Wav2Vec2
-            inputs = self.processor(audio, sampling_rate=16000, return_tensors="pt")
-            
-            # Get model predictions
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-            
-            # Extract voice embeddings
-            embeddings = self.model.wav2vec2(**inputs).last_hidden_state.mean(dim=1)
+            if self.inference_mode == 'fast':
+                predictions, embeddings, windows = self.infer_windowed(audio, sr)
+            else:
+                predictions, embeddings = self.infer_reference(audio, sr)
+                windows = 1
             
             # Analyze voice characteristics
             voice_analysis = {
                 'scam_probability': float(predictions[0][1]),  # Probability of being scam
                 'confidence': float(torch.max(predictions)),
                 'voice_embedding': embeddings.numpy().tolist(),
-                'voice_characteristics': self.analyze_voice_quality(audio, sr)
+                'voice_characteristics': self.analyze_voice_quality(audio, sr),
+                'inference': {
+                    'mode': self.inference_mode,
+                    'quantized': self.quantize,
+                    'windows': windows
+                }
             }
             
             return voice_analysis
@@ -153,6 +183,65 @@ class MozillaVoiceAnalyzer:
             print(f"❌ Error in voice analysis: {e}")
             return {"error": str(e)}
     
+    def infer_reference(self, audio: np.ndarray, sr: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Original path: full clip, classification pass plus a separate encoder pass for embeddings"""
+        inputs = self.processor(audio, sampling_rate=sr, return_tensors="pt")
+        
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+            embeddings = self.model.wav2vec2(**inputs).last_hidden_state.mean(dim=1)
+        
+        return predictions, embeddings
+    
+    def split_windows(self, audio: np.ndarray, sr: int) -> List[np.ndarray]:
+        """
+        Cut a clip into at most max_windows windows of window_seconds
+        
+        Long clips are covered by evenly spaced windows, so encoder cost is
+        capped no matter how long the call is (attention is quadratic in length).
+        """
+        window = int(self.window_seconds * sr)
+        if len(audio) <= window:
+            return [audio]
+        
+        count = min(self.max_windows, int(np.ceil(len(audio) / window)))
+        starts = np.linspace(0, len(audio) - window, count).astype(int)
+        return [audio[start:start + window] for start in starts]
+    
+    def infer_windowed(self, audio: np.ndarray, sr: int) -> Tuple[torch.Tensor, torch.Tensor, int]:
+        """
+        Fast path: one batched forward pass over the clip windows
+        
+        Logits and the last hidden state come from the same pass
+        (output_hidden_states), so the encoder runs once. Window
+        probabilities and mean-pooled embeddings are averaged.
+        """
+        windows = self.split_windows(audio, sr)
+        inputs = self.processor(windows, sampling_rate=sr, return_tensors="pt", padding=True)
+        
+        with torch.inference_mode():
+            outputs = self.model(**inputs, output_hidden_states=True)
+            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1).mean(dim=0, keepdim=True)
+            embeddings = outputs.hidden_states[-1].mean(dim=1).mean(dim=0, keepdim=True)
+        
+        return predictions, embeddings, len(windows)
+    
+    def speaker_embeddings(self, audio_path: str, words: List[Dict]) -> Dict:
+        """One voice-print vector per diarized speaker (speakers with under a second of speech are skipped)"""
+        if not self.processor or not self.model:
+            return {}
+        
+        try:
+            audio, sr = librosa.load(audio_path, sr=16000)
+            return {
+                speaker: self.infer_windowed(clip, sr)[1][0].numpy()
+                for speaker, clip in speaker_audio(audio, words, sr).items()
+            }
+        except Exception as e:
+            print(f"❌ Error computing speaker embeddings: {e}")
+            return {}
+    
     def analyze_voice_quality(self, audio: np.ndarray, sr: int) -> Dict:
         """Analyze voice quality characteristics"""
         try:
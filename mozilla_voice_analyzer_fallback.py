@@ -4,14 +4,91 @@ import numpy as np
 import tempfile
 from typing import Dict, List, Optional, Tuple
 import warnings
+from voice_index import speaker_audio
+from feature_graph import FeatureGraph, extraction_report, resolve_profile
 warnings.filterwarnings("ignore")
 
+def _pitch_track(values: Dict) -> np.ndarray:
+    """Strongest piptrack candidate per frame (0 = unvoiced)"""
+    try:
+        pitches, magnitudes = librosa.piptrack(S=values['stft'], sr=values['sr'])
+        return pitches[magnitudes.argmax(axis=0), np.arange(pitches.shape[1])]
+    except Exception:
+        return np.zeros(0)
+
+def _pitch_stats(values: Dict) -> Dict:
+    """Mean/std/range of the voiced frames of the pitch track"""
+    pitch_values = values['pitch_track'][values['pitch_track'] > 0]
+    if len(pitch_values):
+        return {
+            'pitch_mean': float(np.mean(pitch_values)),
+            'pitch_std': float(np.std(pitch_values)),
+            'pitch_range': float(np.max(pitch_values) - np.min(pitch_values))
+        }
+    return {'pitch_mean': 0.0, 'pitch_std': 0.0, 'pitch_range': 0.0}
+
+def _mfcc_frames(values: Dict) -> np.ndarray:
+    mel = librosa.feature.melspectrogram(S=values['stft'] ** 2, sr=values['sr'])
+    return librosa.feature.mfcc(S=librosa.power_to_db(mel), n_mfcc=13)
+
+# Spectral features share one magnitude STFT (librosa's defaults: n_fft=2048, hop 512),
+# so their values match computing each from the waveform. The *_frames / pitch_track
+# nodes are the per-frame arrays behind the summaries (FRAME_NODES, kept with keep_frames).
+VOICE_FEATURE_GRAPH = (
+    FeatureGraph()
+    .add('stft', lambda v: np.abs(librosa.stft(v['audio'])))
+    .add('rms_frames', lambda v: librosa.feature.rms(y=v['audio'])[0])
+    .add('zcr_frames', lambda v: librosa.feature.zero_crossing_rate(v['audio'])[0])
+    .add('centroid_frames', lambda v: librosa.feature.spectral_centroid(S=v['stft'], sr=v['sr'])[0], deps=['stft'])
+    .add('pitch_track', _pitch_track, deps=['stft'])
+    .add('mfcc_frames', _mfcc_frames, deps=['stft'])
+    .add('basic', lambda v: {'duration': len(v['audio']) / v['sr'], 'sample_rate': v['sr'],
+                             'audio_length': len(v['audio'])}, deps=['audio', 'sr'])
+    .add('rms_energy', lambda v: {'rms_energy': float(np.mean(v['rms_frames']))}, deps=['rms_frames'])
+    .add('zero_crossing_rate', lambda v: {'zero_crossing_rate': float(np.mean(v['zcr_frames']))}, deps=['zcr_frames'])
+    .add('spectral_centroid', lambda v: {'spectral_centroid': float(np.mean(v['centroid_frames']))},
+         deps=['centroid_frames'])
+    .add('pitch', _pitch_stats, deps=['pitch_track'])
+    .add('mfcc', lambda v: {'mfcc_mean': np.mean(v['mfcc_frames'], axis=1).tolist(),
+                            'mfcc_std': np.std(v['mfcc_frames'], axis=1).tolist()}, deps=['mfcc_frames'])
+    .add('spectral_shape', lambda v: {
+        'spectral_rolloff': float(np.mean(librosa.feature.spectral_rolloff(S=v['stft'], sr=v['sr']))),
+        'spectral_bandwidth': float(np.mean(librosa.feature.spectral_bandwidth(S=v['stft'], sr=v['sr'])))
+    }, deps=['stft'])
+    .add('chroma', lambda v: {'chroma_mean': np.mean(librosa.feature.chroma_stft(S=v['stft'] ** 2, sr=v['sr']),
+                                                     axis=1).tolist()}, deps=['stft'])
+    .add('spectral_contrast', lambda v: {'energy_entropy': float(np.mean(
+        librosa.feature.spectral_contrast(S=v['stft'], sr=v['sr'])))}, deps=['stft'])
+)
+
+FRAME_NODES = ('rms_frames', 'zcr_frames', 'centroid_frames', 'pitch_track', 'mfcc_frames')
+
+# Files longer than this are read block by block (streaming_features.py) when the
+# profile's features are all frame-local; 0 disables streaming
+STREAMING_ABOVE_SECONDS = float(os.getenv('VOICE_STREAMING_ABOVE_SECONDS', '300'))
+STREAMING_PROFILES = ('triage', 'standard')
+
+# triage = everything calculate_scam_probability / detect_voice_anomalies read
+VOICE_FEATURE_PROFILES = {
+    'triage': ('basic', 'rms_energy', 'zero_crossing_rate', 'spectral_centroid', 'pitch'),
+    'standard': ('basic', 'rms_energy', 'zero_crossing_rate', 'spectral_centroid', 'pitch', 'mfcc', 'spectral_shape'),
+    'forensic': ('basic', 'rms_energy', 'zero_crossing_rate', 'spectral_centroid', 'pitch', 'mfcc', 'spectral_shape',
+                 'chroma', 'spectral_contrast')
+}
+
 class MozillaVoiceAnalyzerFallback:
     """
     Fallback Mozilla Voice Analyzer using only librosa (no transformers dependency)
     This provides basic voice analysis without pre-trained models
     """
     
+    # Voice-print embedding: mean and std of MFCC 1-20 (c0, i.e. loudness, is dropped). The raw stats
+    # are not centered, so the index standardizes them against its stored population before cosine
+    embedding_model = 'mfcc-stats-v2'
+    embedding_dim = 40
+    embedding_standardize = True
+    match_threshold = float(os.getenv('VOICE_MATCH_THRESHOLD_MFCC', '0.9'))
+    
     def __init__(self):
         """Initialize the fallback analyzer"""
         print("⚠️ Using fallback Mozilla Voice analyzer (no transformers)")
@@ -25,73 +102,59 @@ class MozillaVoiceAnalyzerFallback:
             'voice_quality': {'clear': 0.7, 'distorted': 0.3}  # clarity score
         }
     
-    def extract_audio_features(self, audio_path: str) -> Dict:
-        """Extract comprehensive audio features using librosa only"""
+    def extract_audio_features(self, audio_path: str, profile=None, keep_frames: bool = False) -> Dict:
+        """
+        Extract audio features using librosa only
+        
+        `profile` is a feature profile name (triage/standard/forensic, see
+        feature_graph.py) or a list of VOICE_FEATURE_GRAPH nodes; only the
+        primitives that profile needs are computed. Per-node costs are
+        reported under 'extraction'. Long files (VOICE_STREAMING_ABOVE_SECONDS)
+        are summarized block by block in constant memory instead.
+        
+        keep_frames=True adds the per-frame arrays the profile computed
+        (FRAME_NODES, numpy arrays) under 'frames', for the feature store;
+        streamed files have none.
+        """
         try:
-            # Load audio file
-            audio, sr = librosa.load(audio_path, sr=16000)
-            
-            # Basic audio features
-            features = {
-                'duration': len(audio) / sr,
-                'sample_rate': sr,
-                'audio_length': len(audio)
-            }
+            profile_name, targets = resolve_profile(profile, VOICE_FEATURE_PROFILES)
             
-            # MFCC features
-            mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            features['mfcc_mean'] = np.mean(mfcc, axis=1).tolist()
-            features['mfcc_std'] = np.std(mfcc, axis=1).tolist()
+            if profile_name in STREAMING_PROFILES and self._is_long_audio(audio_path):
+                from streaming_features import stream_file_features
+                return stream_file_features(audio_path)
             
-            # Spectral features
-            features['spectral_centroid'] = float(np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr)))
-            features['spectral_rolloff'] = float(np.mean(librosa.feature.spectral_rolloff(y=audio, sr=sr)))
-            features['spectral_bandwidth'] = float(np.mean(librosa.feature.spectral_bandwidth(y=audio, sr=sr)))
-            
-            # Zero crossing rate
-            features['zero_crossing_rate'] = float(np.mean(librosa.feature.zero_crossing_rate(audio)))
-            
-            # Chroma features
-            chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
-            features['chroma_mean'] = np.mean(chroma, axis=1).tolist()
-            
-            # Energy features
-            features['rms_energy'] = float(np.mean(librosa.feature.rms(y=audio)))
-            features['energy_entropy'] = float(np.mean(librosa.feature.spectral_contrast(y=audio, sr=sr)))
-            
-            # Pitch features
-            try:
-                pitches, magnitudes = librosa.piptrack(y=audio, sr=sr)
-                pitch_values = []
-                for t in range(pitches.shape[1]):
-                    index = magnitudes[:, t].argmax()
-                    pitch = pitches[index, t]
-                    if pitch > 0:
-                        pitch_values.append(pitch)
-                
-                if pitch_values:
-                    features['pitch_mean'] = float(np.mean(pitch_values))
-                    features['pitch_std'] = float(np.std(pitch_values))
-                    features['pitch_range'] = float(np.max(pitch_values) - np.min(pitch_values))
-                else:
-                    features['pitch_mean'] = 0.0
-                    features['pitch_std'] = 0.0
-                    features['pitch_range'] = 0.0
-            except:
-                features['pitch_mean'] = 0.0
-                features['pitch_std'] = 0.0
-                features['pitch_range'] = 0.0
+            # Load audio file
+            audio, sr = librosa.load(audio_path, sr=16000)
             
+            groups, costs = VOICE_FEATURE_GRAPH.compute(targets, {'audio': audio, 'sr': sr},
+                                                        keep=FRAME_NODES if keep_frames else ())
+            features = {}
+            for name in targets:
+                features.update(groups[name])
+            features['extraction'] = extraction_report(profile_name, costs)
+            if keep_frames:
+                features['frames'] = {name: groups[name] for name in FRAME_NODES if name in groups}
             return features
             
         except Exception as e:
             print(f"❌ Error extracting audio features: {e}")
             return {}
     
-    def analyze_voice_characteristics(self, audio_path: str) -> Dict:
-        """Analyze voice characteristics using librosa features only"""
+    def _is_long_audio(self, audio_path: str) -> bool:
+        """True for files soundfile can read that run past STREAMING_ABOVE_SECONDS"""
+        if not STREAMING_ABOVE_SECONDS:
+            return False
+        try:
+            import soundfile as sf
+            return sf.info(audio_path).duration > STREAMING_ABOVE_SECONDS
+        except Exception:
+            return False  # e.g. webm; librosa.load decodes it via audioread
+    
+    def analyze_voice_characteristics(self, audio_path: str, features: Optional[Dict] = None) -> Dict:
+        """Analyze voice characteristics using librosa features only (pass `features` to reuse an extraction)"""
         try:
-            features = self.extract_audio_features(audio_path)
+            if features is None:
+                features = self.extract_audio_features(audio_path)
             
             # Simple voice analysis based on features
             voice_analysis = {
@@ -107,6 +170,19 @@ class MozillaVoiceAnalyzerFallback:
             print(f"❌ Error in voice analysis: {e}")
             return {"error": str(e)}
     
+    def speaker_embeddings(self, audio_path: str, words: List[Dict]) -> Dict:
+        """One voice-print vector per diarized speaker (speakers with under a second of speech are skipped)"""
+        try:
+            audio, sr = librosa.load(audio_path, sr=16000)
+            embeddings = {}
+            for speaker, clip in speaker_audio(audio, words, sr).items():
+                mfcc = librosa.feature.mfcc(y=clip, sr=sr, n_mfcc=21)[1:]
+                embeddings[speaker] = np.concatenate([mfcc.mean(axis=1), mfcc.std(axis=1)]).astype(np.float32)
+            return embeddings
+        except Exception as e:
+            print(f"❌ Error computing speaker embeddings: {e}")
+            return {}
+    
     def calculate_scam_probability(self, features: Dict) -> float:
         """Calculate scam probability based on audio features"""
         try:
@@ -213,10 +289,11 @@ class MozillaVoiceAnalyzerFallback:
             'assessment': assessment
         }
     
-    def detect_voice_anomalies(self, audio_path: str) -> Dict:
-        """Detect potential voice anomalies"""
+    def detect_voice_anomalies(self, audio_path: str, features: Optional[Dict] = None) -> Dict:
+        """Detect potential voice anomalies (pass `features` to reuse an extraction)"""
         try:
-            features = self.extract_audio_features(audio_path)
+            if features is None:
+                features = self.extract_audio_features(audio_path)
             
             anomalies = {
                 'suspicious_pitch': False,
@@ -252,17 +329,23 @@ class MozillaVoiceAnalyzerFallback:
             print(f"❌ Error detecting voice anomalies: {e}")
             return {"error": str(e)}
     
-    def generate_voice_insights(self, audio_path: str) -> Dict:
-        """Generate comprehensive voice insights"""
+    def generate_voice_insights(self, audio_path: str, profile=None, keep_frames: bool = False) -> Dict:
+        """
+        Generate comprehensive voice insights (features for `profile` are extracted once and shared)
+        
+        keep_frames=True moves the per-frame arrays to insights['frames'];
+        pop them before serializing the insights.
+        """
         try:
             # Extract features
-            features = self.extract_audio_features(audio_path)
+            features = self.extract_audio_features(audio_path, profile, keep_frames)
+            frames = features.pop('frames', None)
             
             # Analyze voice characteristics
-            voice_analysis = self.analyze_voice_characteristics(audio_path)
+            voice_analysis = self.analyze_voice_characteristics(audio_path, features)
             
             # Detect anomalies
-            anomalies = self.detect_voice_anomalies(audio_path)
+            anomalies = self.detect_voice_anomalies(audio_path, features)
             
             # Combine insights
             insights = {
@@ -272,6 +355,8 @@ class MozillaVoiceAnalyzerFallback:
                 'overall_assessment': self.generate_overall_assessment(voice_analysis, anomalies),
                 'recommendations': self.generate_recommendations(voice_analysis, anomalies)
             }
+            if frames is not None:
+                insights['frames'] = frames
             
             return insights
             
@@ -331,3 +416,10 @@ class MozillaVoiceAnalyzerFallback:
 # Use fallback analyzer (no transformers dependency)
 print("🔄 Using fallback Mozilla Voice analyzer (no transformers)")
 mozilla_voice_analyzer = MozillaVoiceAnalyzerFallback()
+
+def generate_voice_insights_timed(audio_path: str, profile=None, keep_frames: bool = False) -> Tuple[Dict, float]:
+    """Process-pool entry point: voice insights for a file and the seconds they took"""
+    import time
+    started = time.perf_counter()
+    insights = mozilla_voice_analyzer.generate_voice_insights(audio_path, profile, keep_frames)
+    return insights, time.perf_counter() - started
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Script-independent phonetic keys for Latin, Devanagari and Bengali tokens
+
+The same word reaches the scorers in whichever script the STT picked:
+"password", "paasvard", "पासवर्ड", "পাসওয়ার্ড". phonetic_key() reduces
+all of them to one consonant skeleton, Soundex/Metaphone style:
+
+- every letter maps to a coarse sound class; aspirated and unaspirated,
+  dental and retroflex stops share a class (ट/त/t -> T, ड/द/d -> D),
+  v/w/b share one (Bengali has no separate v), s/sh/ś/ṣ share one
+- vowels, matras and inherent vowels are dropped (scripts disagree on
+  where they are written); a word-initial vowel is kept as 'A'
+- h and y are dropped, repeated classes collapse ("ss" -> S), and the
+  anusvara becomes M before labials (नंबर = number)
+- Devanagari and Bengali share one table (the Bengali block mirrors the
+  Devanagari one 0x80 higher), with the Bengali differences (য = j,
+  ya-phala, ওয় = w) handled explicitly
+
+PhoneticIndex maps the keys of a lexicon category to a canonical term
+(the first term with that key, in lexicon order, so English where one
+exists), so matching a token is one key computation and one dict
+lookup. Short skeletons collide easily ("pin", "pen", "paani"), so only
+keys of at least MIN_KEY_CODES classes are indexed, and a token that is
+not itself a lexicon term only counts as a variant with a key of
+MIN_VARIANT_KEY_CODES classes: three classes turn "बनके" (having become)
+into "bank" and "खरीद" (buy) into "card". Latin tokens are mostly real
+English words, matched exactly anyway, and four classes already confuse
+"secret" with "security", so a Latin variant ("paasvard") needs
+MIN_LATIN_KEY_CODES. Inside a fuzzy phrase match the surrounding words
+vouch for a short variant, so fuzzy_phrases uses token_key() at
+MIN_KEY_CODES.
+
+Set PHONETIC_MATCHING=0 to match keywords exactly only.
+"""
+
+import os
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional
+
+from scam_lexicon import LexiconIndex, get_lexicon, normalize_token
+
+PHONETIC_MATCHING = os.getenv('PHONETIC_MATCHING', '1') not in ('0', 'false', 'False', '')
+
+MIN_KEY_CODES = 3
+MIN_VARIANT_KEY_CODES = 4
+MIN_LATIN_KEY_CODES = 5
+
+VOWEL = 'a'
+INITIAL_VOWEL = 'A'
+ANUSVARA = 'n'  # resolved to N or M by the next consonant
+DROPPED = ''
+
+DEVANAGARI, BENGALI = 0x0900, 0x0980
+VIRAMA, NUKTA = 0x4D, 0x3C
+
+# Sound class per offset into the Devanagari / Bengali blocks
+INDIC_CLASSES: Dict[int, str] = {
+    0x01: 'N', 0x02: ANUSVARA, 0x03: DROPPED,
+    0x0B: 'R', 0x0C: 'L', 0x43: 'R', 0x44: 'R', 0x60: 'R', 0x61: 'L', 0x62: 'L', 0x63: 'L',
+    0x15: 'K', 0x16: 'K', 0x17: 'G', 0x18: 'G', 0x19: 'N',
+    0x1A: 'C', 0x1B: 'C', 0x1C: 'J', 0x1D: 'J', 0x1E: 'N',
+    0x1F: 'T', 0x20: 'T', 0x21: 'D', 0x22: 'D', 0x23: 'N',
+    0x24: 'T', 0x25: 'T', 0x26: 'D', 0x27: 'D', 0x28: 'N', 0x29: 'N',
+    0x2A: 'P', 0x2B: 'F', 0x2C: 'B', 0x2D: 'B', 0x2E: 'M',
+    0x2F: DROPPED, 0x30: 'R', 0x31: 'R', 0x32: 'L', 0x33: 'L', 0x34: 'L', 0x35: 'B',
+    0x36: 'S', 0x37: 'S', 0x38: 'S', 0x39: DROPPED,
+    0x58: 'K', 0x59: 'K', 0x5A: 'G', 0x5B: 'J', 0x5C: 'R', 0x5D: 'R', 0x5E: 'F', 0x5F: DROPPED,
+    0x4E: 'T',  # Bengali khanda ta
+    0x70: 'R', 0x71: 'B'  # Assamese ra / wa
+}
+INDIC_VOWELS = set(range(0x04, 0x15)) - {0x0B, 0x0C}
+INDIC_MATRAS = set(range(0x3E, 0x4D)) - {0x43, 0x44}
+BENGALI_YA = 0x2F
+BENGALI_O = 0x13
+
+# Nukta turns the preceding class into another (ड़ -> R)
+NUKTA_CLASSES = {'D': 'R'}
+
+LATIN_DIGRAPHS = {'ph': 'F', 'sh': 'S', 'ch': 'C', 'th': 'T', 'dh': 'D', 'kh': 'K', 'gh': 'G', 'bh': 'B',
+                  'jh': 'J', 'ck': 'K'}
+LATIN_CLASSES = {'b': 'B', 'd': 'D', 'f': 'F', 'g': 'G', 'j': 'J', 'k': 'K', 'l': 'L', 'm': 'M', 'n': 'N',
+                 'p': 'P', 'q': 'K', 'r': 'R', 's': 'S', 't': 'T', 'v': 'B', 'w': 'B', 'x': 'KS', 'z': 'J',
+                 'h': DROPPED, 'y': DROPPED}
+LATIN_VOWELS = set('aeiou')
+
+def _latin_classes(token: str, start: int) -> tuple:
+    """(classes, characters consumed) for the Latin letter at token[start]"""
+    pair = token[start:start + 2]
+    if pair in LATIN_DIGRAPHS:
+        return LATIN_DIGRAPHS[pair], 2
+    char = token[start]
+    if char in LATIN_VOWELS:
+        return VOWEL, 1
+    if char == 'c':
+        return ('S' if token[start + 1:start + 2] in ('e', 'i', 'y') else 'K'), 1
+    return LATIN_CLASSES.get(char, DROPPED), 1
+
+def _indic_block(char: str) -> Optional[int]:
+    code = ord(char)
+    if DEVANAGARI <= code < DEVANAGARI + 0x80:
+        return DEVANAGARI
+    if BENGALI <= code < BENGALI + 0x80:
+        return BENGALI
+    return None
+
+def phonetic_classes(token: str) -> List[str]:
+    """Sound classes of a normalized token, vowels included (see phonetic_key)"""
+    classes: List[str] = []
+    i = 0
+    while i < len(token):
+        char = token[i]
+        block = _indic_block(char)
+        if block is None:
+            if char.isascii() and char.isalpha():
+                value, consumed = _latin_classes(token, i)
+                classes.extend(value)
+                if not value:
+                    classes.append(DROPPED)
+                i += consumed
+                continue
+            i += 1
+            continue
+
+        offset = ord(char) - block
+        i += 1
+        if offset in INDIC_VOWELS or offset in INDIC_MATRAS:
+            classes.append(VOWEL)
+        elif offset == NUKTA:
+            if classes and classes[-1] in NUKTA_CLASSES:
+                classes[-1] = NUKTA_CLASSES[classes[-1]]
+        elif block == BENGALI and offset == BENGALI_YA:
+            previous = ord(token[i - 2]) - block if i >= 2 and _indic_block(token[i - 2]) == block else None
+            nukta = i < len(token) and ord(token[i]) - block == NUKTA
+            if nukta:
+                i += 1  # য় (ya) is a glide; after ও it spells "w"
+                if previous == BENGALI_O:
+                    classes[-1] = 'B'
+                else:
+                    classes.append(DROPPED)
+            elif previous == VIRAMA:
+                classes.append(DROPPED)  # ya-phala only colours the vowel
+            else:
+                classes.append('J')
+        else:
+            classes.append(INDIC_CLASSES.get(offset, DROPPED))
+    return classes
+
+def phonetic_key(token: str) -> str:
+    """Consonant-skeleton key shared by the Latin, Devanagari and Bengali spellings of a word"""
+    classes = phonetic_classes(token)
+    skeleton = [INITIAL_VOWEL] if classes and classes[0] == VOWEL else []
+    skeleton += [value for value in classes if value and value != VOWEL]
+    key = []
+    for position, value in enumerate(skeleton):
+        if value == ANUSVARA:
+            # The anusvara takes the place of the next consonant (नंबर = number)
+            value = 'M' if skeleton[position + 1:position + 2] in (['P'], ['B'], ['M']) else 'N'
+        if not key or key[-1] != value:
+            key.append(value)
+    return ''.join(key)
+
+def term_key(term: str) -> Optional[str]:
+    """Phonetic key a lexicon term is indexed under, in any script (MIN_KEY_CODES)"""
+    key = phonetic_key(term)
+    return key if len(key) >= MIN_KEY_CODES else None
+
+def token_key(token: str, min_codes: int = MIN_KEY_CODES) -> Optional[str]:
+    """Phonetic key of a transcript token if it is long enough to match on (at least MIN_LATIN_KEY_CODES for Latin)"""
+    key = phonetic_key(token)
+    if token.isascii():
+        min_codes = max(min_codes, MIN_LATIN_KEY_CODES)
+    return key if len(key) >= min_codes else None
+
+class PhoneticIndex:
+    """Phonetic key -> canonical lexicon term for one category (see module docstring)"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.canonical: Dict[str, str] = {}
+        self.variants: Dict[str, List[str]] = {}
+        self._terms: Dict[str, str] = {}
+        for term in terms:
+            if ' ' in term:
+                continue  # single tokens only; phrases go through fuzzy_phrases
+            key = term_key(term)
+            if key is None:
+                continue
+            self.canonical.setdefault(key, term)
+            self.variants.setdefault(key, []).append(term)
+            self._terms[term] = self.canonical[key]
+
+    def __len__(self):
+        return len(self.canonical)
+
+    def lookup(self, token: str, min_codes: int = MIN_VARIANT_KEY_CODES) -> Optional[str]:
+        """Canonical term for a lexicon term or a phonetic variant of one (key of min_codes classes), or None"""
+        canonical = self._terms.get(token)
+        if canonical is not None:
+            return canonical
+        key = token_key(token, min_codes)
+        return self.canonical.get(key) if key else None
+
+_indexes: 'weakref.WeakKeyDictionary[LexiconIndex, Dict[str, PhoneticIndex]]' = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+def get_phonetic_index(lexicon: LexiconIndex, category: str = 'scam_keywords') -> Optional[PhoneticIndex]:
+    """Index for a category of one lexicon version (built once), or None when phonetic matching is disabled"""
+    if not PHONETIC_MATCHING:
+        return None
+    with _indexes_lock:
+        per_category = _indexes.setdefault(lexicon, {})
+        if category not in per_category:
+            per_category[category] = PhoneticIndex(lexicon.terms(category))
+        return per_category[category]
+
+def english_spelling(token: str) -> Optional[str]:
+    """
+    English lexicon spelling of a Devanagari/Bengali token ("पासवर्ड" -> "password")
+
+    Used by the transliteration fallback, with the same variant threshold
+    as keyword scoring, so the rewritten text shows what was scored.
+    """
+    if token.isascii():
+        return None
+    index = get_phonetic_index(get_lexicon(), 'scam_keywords')
+    canonical = index.lookup(normalize_token(token)) if index else None
+    return canonical if canonical is not None and canonical.isascii() else None
@@ -10,10 +10,13 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 import requests
 from dotenv import load_dotenv
+from pipeline_metrics import get_logger, stage_timer
 
 # Load environment variables
 load_dotenv()
 
+logger = get_logger('pinata_service')
+
 class PinataService:
     def __init__(self):
         """Initialize Pinata service with API credentials"""
@@ -30,7 +33,7 @@ class PinataService:
             "Content-Type": "application/json"
         }
         
-        print("✅ Pinata service initialized")
+        logger.info("Pinata service initialized")
     
     def test_connection(self) -> bool:
         """Test Pinata API connection"""
@@ -42,15 +45,14 @@ class PinataService:
             )
             
             if response.status_code == 200:
-                print("✅ Pinata API connection successful")
+                logger.info("Pinata API connection successful")
                 return True
             else:
-                print(f"❌ Pinata API connection failed: {response.status_code}")
-                print(f"Response: {response.text}")
+                logger.error("Pinata API connection failed", extra={'status': response.status_code, 'response': response.text[:200]})
                 return False
                 
         except Exception as e:
-            print(f"❌ Pinata connection error: {e}")
+            logger.error("Pinata connection error", extra={'error': str(e)})
             return False
     
     def upload_audio_file(self, audio_data: bytes, filename: str, metadata: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
@@ -66,7 +68,7 @@ class PinataService:
             Dict with IPFS hash and other info, or None if failed
         """
         try:
-            print(f"📤 Uploading audio file to Pinata: {filename}")
+            logger.info("Uploading audio file to Pinata", extra={'upload_name': filename, 'bytes': len(audio_data)})
             
             # Create temporary file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
@@ -108,21 +110,20 @@ class PinataService:
                 }
                 
                 # Make upload request
-                response = requests.post(
-                    f"{self.base_url}/pinning/pinFileToIPFS",
-                    files=files,
-                    data=data,
-                    headers=upload_headers,
-                    timeout=30
-                )
+                with stage_timer('ipfs_upload'):
+                    response = requests.post(
+                        f"{self.base_url}/pinning/pinFileToIPFS",
+                        files=files,
+                        data=data,
+                        headers=upload_headers,
+                        timeout=30
+                    )
                 
                 if response.status_code == 200:
                     result = response.json()
                     ipfs_hash = result.get('IpfsHash')
                     
-                    print(f"✅ Audio uploaded successfully to IPFS")
-                    print(f"🔗 IPFS Hash: {ipfs_hash}")
-                    print(f"🌐 IPFS URL: https://gateway.pinata.cloud/ipfs/{ipfs_hash}")
+                    logger.info("Audio uploaded to IPFS", extra={'ipfs_hash': ipfs_hash})
                     
                     return {
                         'success': True,
@@ -134,8 +135,7 @@ class PinataService:
                         'upload_timestamp': datetime.utcnow().isoformat()
                     }
                 else:
-                    print(f"❌ Pinata upload failed: {response.status_code}")
-                    print(f"Response: {response.text}")
+                    logger.error("Pinata upload failed", extra={'status': response.status_code, 'response': response.text[:200]})
                     return None
                     
             finally:
@@ -146,7 +146,7 @@ class PinataService:
                     pass
                     
         except Exception as e:
-            print(f"❌ Error uploading to Pinata: {e}")
+            logger.error("Error uploading to Pinata", extra={'error': str(e)})
             return None
     
     def upload_base64_audio(self, base64_audio: str, filename: str, metadata: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
@@ -167,7 +167,7 @@ class PinataService:
             return self.upload_audio_file(audio_data, filename, metadata)
             
         except Exception as e:
-            print(f"❌ Error decoding base64 audio: {e}")
+            logger.error("Error decoding base64 audio", extra={'error': str(e)})
             return None
     
     def get_file_info(self, ipfs_hash: str) -> Optional[Dict[str, Any]]:
@@ -185,11 +185,11 @@ class PinataService:
                     return data['rows'][0]
                 return None
             else:
-                print(f"❌ Failed to get file info: {response.status_code}")
+                logger.error("Failed to get file info", extra={'status': response.status_code})
                 return None
                 
         except Exception as e:
-            print(f"❌ Error getting file info: {e}")
+            logger.error("Error getting file info", extra={'error': str(e)})
             return None
     
     def unpin_file(self, ipfs_hash: str) -> bool:
@@ -202,14 +202,14 @@ class PinataService:
             )
             
             if response.status_code == 200:
-                print(f"✅ File unpinned successfully: {ipfs_hash}")
+                logger.info("File unpinned", extra={'ipfs_hash': ipfs_hash})
                 return True
             else:
-                print(f"❌ Failed to unpin file: {response.status_code}")
+                logger.error("Failed to unpin file", extra={'status': response.status_code})
                 return False
                 
         except Exception as e:
-            print(f"❌ Error unpinning file: {e}")
+            logger.error("Error unpinning file", extra={'error': str(e)})
             return False
 
 # Global instance
@@ -228,7 +228,7 @@ def test_pinata_connection():
         service = get_pinata_service()
         return service.test_connection()
     except Exception as e:
-        print(f"❌ Pinata service initialization failed: {e}")
+        logger.error("Pinata service initialization failed", extra={'error': str(e)})
         return False
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing, metrics and structured logging for the analysis pipeline
+
+- stage_timer(): context manager that times a pipeline stage, records it
+  in a latency histogram and in the current request's timing breakdown
+- MetricsRegistry: thread-safe counters and histograms rendered in the
+  Prometheus text exposition format (served on /api/metrics)
+- get_logger(): leveled logger with a key=value structured formatter,
+  level controlled by LOG_LEVEL
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, from fast rule stages up to slow STT/LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format_labels(label_key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(label_key) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = [(key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for key, value in items]
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, Dict] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series['counts']):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(bound)))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+class MetricsRegistry:
+    """Holds all metrics and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, documentation)
+            return self._metrics[name]
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, documentation, buckets)
+            return self._metrics[name]
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Global registry and the pipeline's standard metrics
+metrics_registry = MetricsRegistry()
+
+stage_latency = metrics_registry.histogram(
+    'scam_pipeline_stage_duration_seconds',
+    'Latency of individual analysis pipeline stages'
+)
+stage_errors = metrics_registry.counter(
+    'scam_pipeline_stage_errors_total',
+    'Pipeline stages that raised an exception'
+)
+request_latency = metrics_registry.histogram(
+    'scam_api_request_duration_seconds',
+    'End-to-end latency of API analysis requests'
+)
+request_count = metrics_registry.counter(
+    'scam_api_requests_total',
+    'API analysis requests by endpoint and outcome'
+)
+
+# Per-request timing breakdown (isolated per thread / asyncio task)
+_request_timings: contextvars.ContextVar[Optional[List[Dict]]] = contextvars.ContextVar('request_timings', default=None)
+
+def start_request_trace() -> contextvars.Token:
+    """Begin collecting a timing breakdown for the current request"""
+    return _request_timings.set([])
+
+def end_request_trace(token: contextvars.Token) -> List[Dict]:
+    """Stop collecting and return the breakdown for the current request"""
+    timings = _request_timings.get() or []
+    _request_timings.reset(token)
+    return timings
+
+def get_request_timings() -> List[Dict]:
+    """Timing breakdown collected so far for the current request"""
+    return list(_request_timings.get() or [])
+
+def record_stage(stage: str, seconds: float, error: bool = False, **labels):
+    """Record an already-measured stage duration"""
+    stage_latency.observe(seconds, stage=stage, **labels)
+    if error:
+        stage_errors.inc(stage=stage, **labels)
+
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = {'stage': stage, 'ms': round(seconds * 1000.0, 2)}
+        entry.update(labels)
+        if error:
+            entry['error'] = True
+        timings.append(entry)
+
+@contextmanager
+def stage_timer(stage: str, **labels):
+    """
+    Time a pipeline stage
+
+    Usage:
+        with stage_timer('stt', language='hi-IN'):
+            response = client.recognize(...)
+    """
+    started = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - started, error=error, **labels)
+
+class StructuredFormatter(logging.Formatter):
+    """Render records as `time level logger message key=value ...`"""
+
+    _reserved = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+    def format(self, record: logging.LogRecord) -> str:
+        base = f"{self.formatTime(record, '%Y-%m-%dT%H:%M:%S')} {record.levelname:<7} {record.name} {record.getMessage()}"
+        fields = {key: value for key, value in vars(record).items() if key not in self._reserved}
+        if fields:
+            base += ' ' + ' '.join(f"{key}={value!r}" if isinstance(value, str) and ' ' in value else f"{key}={value}"
+                                   for key, value in fields.items())
+        if record.exc_info:
+            base += '\n' + self.formatException(record.exc_info)
+        return base
+
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger for the pipeline with structured output configured once"""
+    global _logging_configured
+    with _logging_lock:
+        if not _logging_configured:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(StructuredFormatter())
+            root = logging.getLogger('scam_detector')
+            root.addHandler(handler)
+            root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+            root.propagate = False
+            _logging_configured = True
+    return logging.getLogger(f"scam_detector.{name}")
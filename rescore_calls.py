@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Rescore stored calls after lexicon, rule or threshold changes
+
+Historical analyzed_calls keep the verdict they were saved with. This job
+re-runs the rule and scoring stages (speaker analysis, logic rules, bank
+detection and the risk model, see CompleteScamDetector.score_transcription)
+on the stored transcripts, without audio, STT or LLM calls:
+
+- documents are streamed from MongoDB with a cursor (batch_size = chunk
+  size) as raw BSON; decoding and scoring both happen in a process pool,
+  so the reading process only moves bytes
+- calls saved with their diarized words are rescored from those; older
+  documents fall back to the stored per-speaker text, with their stored
+  turn-taking features
+- only calls whose verdict changed are written back, with one unordered
+  bulk_write per chunk; the previous verdict is kept under 'rescore'
+- when scam_detected, the risk level or the logic verdict changed, the
+  Gemini advice and bank rules written for the old verdict are cleared
+  and their deferred sections reset to pending (regenerated on the next
+  read, see deferred_sections.py), and the stale cascade is dropped
+- every run writes a report: counts, verdict flips (safe -> scam and back),
+  risk-level transitions and a sample of flipped calls. --dry-run writes
+  the report only, e.g. to preview a candidate lexicon (--lexicon) before
+  deploying it.
+
+Usage:
+    python rescore_calls.py --dry-run --report flips.json
+    python rescore_calls.py --lexicon lexicons/candidate.json --dry-run
+    python rescore_calls.py --since 2026-01-01 --processes 8 --chunk-size 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analysis_context import AnalysisContext
+from analyzed_call_model import call_outcome, expand_words
+from deferred_sections import DEFERRED_SECTIONS, initial_sections
+
+RESCORE_PROJECTION = {
+    '_id': 1, 'analysis_id': 1, 'transcription': 1, 'analysis': 1, 'scam_detected': 1,
+    'risk_level': 1, 'overall_risk_score': 1, 'outcome': 1, 'logic_scam_detected': 1
+}
+SCORE_TOLERANCE = 1e-6
+FLIP_SAMPLES = 200
+
+_detector = None
+
+def _init_worker(lexicon_path: Optional[str]):
+    """Process-pool initializer: pin the lexicon and build a client-less detector once per worker"""
+    global _detector
+    from complete_scam_detector import CompleteScamDetector
+    from scam_lexicon import reload_lexicon
+    if lexicon_path:
+        reload_lexicon(lexicon_path)
+    _detector = CompleteScamDetector.rules_only()
+
+def stored_transcription(document: Dict) -> Tuple[Dict, str]:
+    """(transcription_result, source) rebuilt from a stored document"""
+    transcription = document.get('transcription') or {}
+    full_text = transcription.get('full_text', '')
+    words = expand_words(transcription.get('words'))
+    if words:
+        return {'full_text': full_text, 'words': words}, 'words'
+
+    # Older documents: each speaker's text, in speaker order (no timings)
+    words = []
+    for speaker, result in (document.get('analysis') or {}).items():
+        tag = int(speaker) if str(speaker).isdigit() else speaker
+        words.extend({'word': token, 'speaker_tag': tag} for token in (result.get('text') or '').split())
+    return {'full_text': full_text, 'words': words}, 'speaker_text'
+
+def _preset_stored_turns(context: AnalysisContext, document: Dict):
+    """Reuse stored turn-taking features and speaker summaries; speaker text has no timings"""
+    analysis = document.get('analysis') or {}
+    if not analysis or not all(result.get('turn_taking') for result in analysis.values()):
+        return
+    tags = {speaker: int(speaker) if str(speaker).isdigit() else speaker for speaker in analysis}
+    context.preset('turn_features', {tags[speaker]: result['turn_taking'] for speaker, result in analysis.items()})
+    context.preset('speaker_summary', {tags[speaker]: {
+        'word_count': result.get('word_count', 0),
+        'talk_time': result.get('talk_time', 0.0),
+        'turns': result.get('turns', 0)
+    } for speaker, result in analysis.items()})
+
+def rescore_document(detector, document: Dict) -> Dict:
+    """New verdict for one stored call, with the fields to $set when it changed"""
+    transcription, source = stored_transcription(document)
+    context = AnalysisContext(transcription)
+    if source == 'speaker_text':
+        _preset_stored_turns(context, document)
+
+    verdict = detector.score_transcription(transcription, context)
+    verdict['transcription'] = transcription
+    detector.apply_risk_model(verdict, context=context)
+
+    old = {
+        'scam_detected': bool(document.get('scam_detected')),
+        'risk_level': document.get('risk_level', 'safe'),
+        'overall_risk_score': float(document.get('overall_risk_score') or 0.0),
+        'outcome': document.get('outcome')
+    }
+    new = {
+        'scam_detected': bool(verdict['scam_detected']),
+        'risk_level': verdict['risk_level'],
+        'overall_risk_score': float(verdict['overall_risk_score']),
+        'outcome': call_outcome(verdict['scam_detected'], verdict['risk_level'], verdict['overall_risk_score'])
+    }
+    changed = (old['scam_detected'] != new['scam_detected'] or old['risk_level'] != new['risk_level']
+               or old['outcome'] != new['outcome']
+               or abs(old['overall_risk_score'] - new['overall_risk_score']) > SCORE_TOLERANCE)
+    # The advice prompt and cascade saw the old verdict; a score-only change keeps them
+    verdict_changed = (old['scam_detected'] != new['scam_detected'] or old['risk_level'] != new['risk_level']
+                       or bool(document.get('logic_scam_detected')) != bool(verdict['logic_scam_detected']))
+
+    result = {'_id': document.get('_id'), 'analysis_id': document.get('analysis_id'), 'source': source,
+              'changed': changed, 'old': old, 'new': new}
+    if changed:
+        analysis = {str(speaker): speaker_result for speaker, speaker_result in verdict['analysis'].items()}
+        result['reason'] = verdict['logic_reason']
+        result['set'] = dict(new, **{
+            'analysis': analysis,
+            'probability': int(new['overall_risk_score'] * 100),
+            'keywords': sorted({kw for kw in verdict['keywords_found'] if not kw.startswith('[PHRASE:')}),
+            'logic_scam_detected': verdict['logic_scam_detected'],
+            'logic_reason': verdict['logic_reason'],
+            'bank_analysis': verdict['bank_analysis'],
+            'risk_scorer': verdict.get('risk_scorer', 'heuristic'),
+            'rescore': {
+                'lexicon_version': context.lexicon.version,
+                'rescored_at': datetime.utcnow().isoformat(),
+                'source': source,
+                'previous': old
+            }
+        })
+        if verdict_changed:
+            result['set'].update({name: None for name in DEFERRED_SECTIONS})
+            result['set']['sections'] = initial_sections({'bank_analysis': verdict['bank_analysis']})
+            result['set']['cascade'] = None
+    return result
+
+def rescore_chunk(documents: List) -> List[Dict]:
+    """Process-pool stage: decode (raw BSON) and rescore a chunk of documents"""
+    import bson
+    results = []
+    for document in documents:
+        try:
+            if isinstance(document, (bytes, bytearray)):
+                document = bson.decode(document)
+            results.append(rescore_document(_detector, document))
+        except Exception as e:
+            identity = document if isinstance(document, dict) else {}
+            results.append({'_id': identity.get('_id'), 'analysis_id': identity.get('analysis_id'),
+                            'changed': False, 'error': str(e)})
+    return results
+
+class CallRescorer:
+    """Fan stored documents out over a process pool and write changed verdicts back in bulk"""
+
+    def __init__(self, processes: Optional[int] = None, chunk_size: int = 2000, dry_run: bool = False,
+                 lexicon_path: Optional[str] = None, call_model=None):
+        """
+        Args:
+            call_model: object with update_verdicts(updates); the shared
+                        AnalyzedCallModel when omitted (not used for dry runs)
+        """
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.lexicon_path = lexicon_path
+        self.call_model = call_model
+
+    def _chunks(self, documents: Iterable) -> Iterable[List]:
+        chunk = []
+        for document in documents:
+            chunk.append(document)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, documents: Iterable, progress: bool = True) -> Dict:
+        """Rescore every document (dicts or raw BSON bytes); returns the flip report"""
+        if not self.dry_run and self.call_model is None:
+            from analyzed_call_model import analyzed_call_model
+            self.call_model = analyzed_call_model
+
+        report = {
+            'dry_run': self.dry_run,
+            'lexicon_path': self.lexicon_path,
+            'scanned': 0, 'changed': 0, 'errors': 0, 'written': 0, 'write_errors': 0,
+            'flips': Counter(), 'level_changes': Counter(), 'sources': Counter(),
+            'flipped_calls': []
+        }
+        started = time.perf_counter()
+
+        def collect(results: List[Dict]):
+            updates = []
+            for result in results:
+                report['scanned'] += 1
+                if result.get('error'):
+                    report['errors'] += 1
+                    continue
+                report['sources'][result['source']] += 1
+                if not result['changed']:
+                    continue
+                report['changed'] += 1
+                old, new = result['old'], result['new']
+                if old['risk_level'] != new['risk_level']:
+                    report['level_changes'][f"{old['risk_level']} -> {new['risk_level']}"] += 1
+                if old['scam_detected'] != new['scam_detected']:
+                    flip = 'safe -> scam' if new['scam_detected'] else 'scam -> safe'
+                    report['flips'][flip] += 1
+                    if len(report['flipped_calls']) < FLIP_SAMPLES:
+                        report['flipped_calls'].append({'analysis_id': result['analysis_id'], 'flip': flip,
+                                                        'old': old, 'new': new, 'reason': result.get('reason')})
+                updates.append((result['_id'], result['set']))
+
+            if updates and not self.dry_run:
+                written = self.call_model.update_verdicts(updates)
+                report['written'] += written['modified']
+                report['write_errors'] += len(written['errors'])
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                 initargs=(self.lexicon_path,)) as pool:
+            chunks = iter(self._chunks(documents))
+            in_flight = set()
+
+            def submit_next():
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return False
+                in_flight.add(pool.submit(rescore_chunk, chunk))
+                return True
+
+            # Two chunks per worker keeps the pool busy while memory stays bounded
+            while len(in_flight) < self.processes * 2 and submit_next():
+                pass
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.discard(future)
+                    collect(future.result())
+                    submit_next()
+                if progress:
+                    elapsed = time.perf_counter() - started
+                    print(f"\r🔁 {report['scanned']} calls, {report['changed']} changed "
+                          f"({report['scanned'] / elapsed * 60:,.0f}/min)", end='', flush=True)
+        if progress:
+            print()
+
+        elapsed = time.perf_counter() - started
+        report['seconds'] = round(elapsed, 2)
+        report['calls_per_minute'] = round(report['scanned'] / elapsed * 60, 1) if elapsed > 0 else 0.0
+        for key in ('flips', 'level_changes', 'sources'):
+            report[key] = dict(report[key])
+        return report
+
+def stored_documents(since: Optional[str] = None, until: Optional[str] = None, limit: int = 0,
+                     batch_size: int = 2000) -> Iterable[bytes]:
+    """analyzed_calls documents as raw BSON, streamed with a cursor"""
+    from bson.codec_options import CodecOptions
+    from bson.raw_bson import RawBSONDocument
+    from analyzed_call_model import analyzed_call_model
+
+    query: Dict = {}
+    if since or until:
+        query['timestamp'] = {key: value for key, value in (('$gte', since), ('$lt', until)) if value}
+    collection = analyzed_call_model.analyzed_calls_collection.with_options(
+        codec_options=CodecOptions(document_class=RawBSONDocument)
+    )
+    cursor = collection.find(query, RESCORE_PROJECTION, no_cursor_timeout=True).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    try:
+        for document in cursor:
+            yield document.raw
+    finally:
+        cursor.close()
+
+def main():
+    """Rescore stored calls from the command line"""
+    parser = argparse.ArgumentParser(description="Rescore stored analyzed calls without STT or LLM calls")
+    parser.add_argument('--dry-run', action='store_true', help="Only report verdict changes, write nothing")
+    parser.add_argument('--lexicon', default=None, help="Lexicon file to score with (default: the deployed one)")
+    parser.add_argument('--since', default=None, help="Only calls analyzed at or after this ISO timestamp")
+    parser.add_argument('--until', default=None, help="Only calls analyzed before this ISO timestamp")
+    parser.add_argument('--limit', type=int, default=0, help="Maximum calls to rescore")
+    parser.add_argument('--processes', type=int, default=None, help="Process pool size (default: CPU count)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Documents per worker task and bulk write")
+    parser.add_argument('--report', default=None, help="Write the JSON report here")
+    args = parser.parse_args()
+
+    from scam_lexicon import load_lexicon
+
+    print("🔁 RESCORING STORED CALLS")
+    print("=" * 50)
+    lexicon_version = load_lexicon(args.lexicon).version
+    print(f"📚 Lexicon {lexicon_version}{' (dry run)' if args.dry_run else ''}")
+
+    rescorer = CallRescorer(processes=args.processes, chunk_size=args.chunk_size, dry_run=args.dry_run,
+                            lexicon_path=args.lexicon)
+    report = rescorer.run(stored_documents(args.since, args.until, args.limit, args.chunk_size))
+    report['lexicon_version'] = lexicon_version
+
+    print(f"\n📊 Scanned: {report['scanned']} | changed: {report['changed']} | errors: {report['errors']}")
+    for flip, count in report['flips'].items():
+        print(f"   🔀 {flip}: {count}")
+    for change, count in sorted(report['level_changes'].items(), key=lambda item: -item[1])[:10]:
+        print(f"   📶 {change}: {count}")
+    if not args.dry_run:
+        print(f"💾 Updated {report['written']} documents ({report['write_errors']} write errors)")
+    print(f"⏱️ {report['seconds']}s total, {report['calls_per_minute']:,.0f} calls/min")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, indent=2, default=str, ensure_ascii=False)
+        print(f"📝 Report written to {args.report}")
+    return 0 if report['errors'] == 0 and report['write_errors'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
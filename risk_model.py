@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Learned risk scorer over a fixed-length call feature vector
+
+build_feature_vector() flattens one analysis record (the dict returned by
+the API / batch CLI or a stored analyzed_calls document) into the layout
+given by FEATURE_NAMES:
+
+- lexicon hits per category, counted on the normalized full transcript
+- per-speaker keyword results from analyze_speakers (max over speakers)
+- turn-taking features and conversation pressure (max over speakers)
+- acoustic features from Mozilla voice insights, when available
+
+RiskModel is an L2-regularized logistic regression fitted with Newton's
+method on standardized features. Its output is a probability, so it
+replaces the hand-tuned keyword/override thresholds and the fixed 0.6/0.4
+text/voice blend once a model has been trained with train_risk_model.py.
+predict_proba() scores a whole matrix in one vectorized pass.
+
+The model is stored as a single .npz file (RISK_MODEL_PATH, default
+models/risk_model.npz). Without a model file get_risk_model() returns None
+and callers keep the heuristic scores.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from pipeline_metrics import get_logger
+from scam_lexicon import get_lexicon, normalize_text
+
+logger = get_logger('risk_model')
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'risk_model.npz')
+
+# Lexicon categories counted on the full transcript, in vector order
+LEXICON_FEATURES = (
+    'scam_keywords', 'high_risk_phrases', 'critical_patterns', 'bank_impersonation', 'money_demand',
+    'bank_terms', 'intent_scam_request', 'intent_information_gathering', 'intent_urgent_action',
+    'intent_money_transfer', 'intent_verification', 'intent_social_engineering',
+    'deception_urgency', 'deception_authority', 'deception_fear', 'deception_social_proof'
+)
+
+FEATURE_NAMES = (
+    ('log_word_count', 'speakers_count', 'max_unique_keywords', 'max_keyword_risk', 'phrase_hits',
+     'high_vulnerability', 'logic_scam_detected') +
+    tuple(f'lexicon_{category}' for category in LEXICON_FEATURES) +
+    ('max_conversation_pressure', 'max_talk_time_ratio', 'max_longest_turn_seconds',
+     'max_speaking_rate', 'interruptions_per_turn', 'overlaps_per_turn', 'mean_response_latency') +
+    ('has_voice', 'voice_scam_probability', 'voice_anomaly_score', 'pitch_std',
+     'zero_crossing_rate', 'spectral_centroid_khz', 'rms_energy')
+)
+
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+
+# Every record field build_feature_vector reads (for MongoDB projections)
+FEATURE_SOURCE_FIELDS = ('transcription', 'analysis', 'speaker_analysis', 'logic_scam_detected',
+                         'voice_insights', 'mozilla_insights')
+
+def _speaker_results(record: Dict) -> List[Dict]:
+    """Per-speaker analysis dicts (API records use 'analysis', analyze_conversation 'speaker_analysis')"""
+    analysis = record.get('analysis') or record.get('speaker_analysis') or {}
+    return [result for result in analysis.values() if isinstance(result, dict)]
+
+def build_feature_vector(record: Dict, voice_insights: Optional[Dict] = None, context=None) -> np.ndarray:
+    """
+    Fixed-length float64 vector for one analysis record (see FEATURE_NAMES)
+
+    An AnalysisContext for the same call reuses its normalized text and lexicon hits.
+    """
+    vector = np.zeros(len(FEATURE_NAMES))
+
+    def put(name, value):
+        vector[FEATURE_INDEX[name]] = float(value or 0.0)
+
+    transcription = record.get('transcription') or {}
+    full_text = context.normalized_text if context is not None else normalize_text(transcription.get('full_text', ''))
+    speakers = _speaker_results(record)
+
+    put('log_word_count', np.log1p(len(full_text.split())))
+    put('speakers_count', len(speakers))
+    if speakers:
+        put('max_unique_keywords', max(result.get('unique_scam_keywords', 0) for result in speakers))
+        put('max_keyword_risk', max(result.get('risk_score', 0.0) for result in speakers))
+        put('phrase_hits', sum(1 for result in speakers for keyword in result.get('scam_keywords', [])
+                               if keyword.startswith('[PHRASE:')))
+        put('high_vulnerability', any(result.get('vulnerability_level') == 'high' for result in speakers))
+    put('logic_scam_detected', record.get('logic_scam_detected', False))
+
+    lexicon = get_lexicon()
+    for category in LEXICON_FEATURES:
+        hits = context.find(category) if context is not None else lexicon.find(category, full_text)
+        put(f'lexicon_{category}', np.log1p(len(hits)))
+
+    turn_taking = [result['turn_taking'] for result in speakers if result.get('turn_taking')]
+    if turn_taking:
+        put('max_conversation_pressure', max(result.get('conversation_pressure', 0.0) for result in speakers))
+        put('max_talk_time_ratio', max(features['talk_time_ratio'] for features in turn_taking))
+        put('max_longest_turn_seconds', np.log1p(max(features['longest_turn_seconds'] for features in turn_taking)))
+        put('max_speaking_rate', max(features['speaking_rate'] for features in turn_taking))
+        turns = sum(features['turns'] for features in turn_taking) or 1
+        put('interruptions_per_turn', sum(features['interruptions'] for features in turn_taking) / turns)
+        put('overlaps_per_turn', sum(features['overlaps'] for features in turn_taking) / turns)
+        latencies = [features['mean_response_latency'] for features in turn_taking
+                     if features.get('mean_response_latency') is not None]
+        put('mean_response_latency', np.mean(latencies) if latencies else 0.0)
+
+    if voice_insights is None:
+        voice_insights = record.get('voice_insights') or record.get('mozilla_insights')
+    if voice_insights and not voice_insights.get('error'):
+        voice_analysis = voice_insights.get('voice_analysis') or {}
+        anomalies = voice_insights.get('anomalies') or {}
+        audio_features = voice_insights.get('audio_features') or {}
+        put('has_voice', 1.0)
+        put('voice_scam_probability', voice_analysis.get('scam_probability', 0.5))
+        put('voice_anomaly_score', anomalies.get('anomaly_score', 0.0))
+        put('pitch_std', np.log1p(audio_features.get('pitch_std', 0.0)))
+        put('zero_crossing_rate', audio_features.get('zero_crossing_rate', 0.0))
+        put('spectral_centroid_khz', audio_features.get('spectral_centroid', 0.0) / 1000.0)
+        put('rms_energy', audio_features.get('rms_energy', 0.0))
+
+    return vector
+
+def build_feature_matrix(records: Iterable[Dict]) -> np.ndarray:
+    """Stack feature vectors for many records into an (n, len(FEATURE_NAMES)) matrix"""
+    rows = [build_feature_vector(record) for record in records]
+    if not rows:
+        return np.zeros((0, len(FEATURE_NAMES)))
+    return np.vstack(rows)
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -35.0, 35.0)))
+
+class RiskModel:
+    """Standardized L2 logistic regression over FEATURE_NAMES"""
+
+    def __init__(self, weights: np.ndarray, bias: float, mean: np.ndarray, scale: np.ndarray,
+                 threshold: float = 0.5, feature_names=FEATURE_NAMES, version: Optional[str] = None,
+                 metrics: Optional[Dict] = None):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.threshold = float(threshold)
+        self.feature_names = tuple(feature_names)
+        self.version = version or datetime.utcnow().strftime('%Y%m%d%H%M%S')
+        self.metrics = metrics or {}
+
+    @classmethod
+    def fit(cls, X: np.ndarray, y: np.ndarray, l2: float = 1.0, iterations: int = 50,
+            tolerance: float = 1e-8) -> 'RiskModel':
+        """Fit with Newton's method (IRLS); the bias is not regularized"""
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+
+        Z = np.hstack([np.ones((len(X), 1)), (X - mean) / scale])
+        penalty = np.full(Z.shape[1], l2)
+        penalty[0] = 0.0
+        theta = np.zeros(Z.shape[1])
+        for _ in range(iterations):
+            p = _sigmoid(Z @ theta)
+            gradient = Z.T @ (p - y) + penalty * theta
+            hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty) + 1e-9 * np.eye(Z.shape[1])
+            step = np.linalg.solve(hessian, gradient)
+            theta -= step
+            if np.max(np.abs(step)) < tolerance:
+                break
+
+        model = cls(theta[1:], theta[0], mean, scale)
+        model.threshold = best_threshold(y, model.predict_proba(X))
+        return model
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Scam probability for every row of X (or for a single vector)"""
+        X = np.asarray(X, dtype=np.float64)
+        return _sigmoid(((X - self.mean) / self.scale) @ self.weights + self.bias)
+
+    def score(self, record: Dict, voice_insights: Optional[Dict] = None, context=None) -> Dict:
+        """Probability and decision for one analysis record"""
+        probability = float(self.predict_proba(build_feature_vector(record, voice_insights, context)))
+        return {
+            'probability': round(probability, 4),
+            'scam_detected': probability >= self.threshold,
+            'threshold': self.threshold,
+            'model_version': self.version
+        }
+
+    def top_contributions(self, vector: np.ndarray, count: int = 5) -> List[Dict]:
+        """Features that moved this vector's log-odds the most, for explaining a score"""
+        contributions = ((np.asarray(vector) - self.mean) / self.scale) * self.weights
+        order = np.argsort(-np.abs(contributions))[:count]
+        return [{'feature': self.feature_names[i], 'contribution': round(float(contributions[i]), 4)}
+                for i in order]
+
+    def save(self, path: str = DEFAULT_MODEL_PATH) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez(path, weights=self.weights, bias=self.bias, mean=self.mean, scale=self.scale,
+                 threshold=self.threshold, feature_names=np.array(self.feature_names),
+                 meta=json.dumps({'version': self.version, 'metrics': self.metrics}))
+        return path
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> 'RiskModel':
+        with np.load(path, allow_pickle=False) as data:
+            feature_names = tuple(str(name) for name in data['feature_names'])
+            if feature_names != FEATURE_NAMES:
+                raise ValueError(f"Model features do not match this build ({len(feature_names)} vs "
+                                 f"{len(FEATURE_NAMES)}); retrain with train_risk_model.py")
+            meta = json.loads(str(data['meta']))
+            return cls(data['weights'], float(data['bias']), data['mean'], data['scale'],
+                       threshold=float(data['threshold']), feature_names=feature_names,
+                       version=meta.get('version'), metrics=meta.get('metrics'))
+
+def best_threshold(y: np.ndarray, probabilities: np.ndarray) -> float:
+    """Decision threshold with the best F1 on (y, probabilities); 0.5 when y has one class"""
+    y = np.asarray(y, dtype=bool)
+    if y.all() or not y.any():
+        return 0.5
+    order = np.argsort(-probabilities)
+    sorted_p = probabilities[order]
+    true_positives = np.cumsum(y[order])
+    predicted = np.arange(1, len(y) + 1)
+    f1 = 2 * true_positives / (predicted + y.sum())
+    # Only cut between distinct probabilities
+    distinct = np.append(sorted_p[:-1] > sorted_p[1:], True)
+    best = np.flatnonzero(distinct)[np.argmax(f1[distinct])]
+    return round(float(sorted_p[best]), 4)
+
+def evaluate(y: np.ndarray, probabilities: np.ndarray, threshold: float = 0.5) -> Dict:
+    """Accuracy, precision, recall, F1, ROC AUC, Brier score and log loss"""
+    y = np.asarray(y, dtype=np.float64)
+    probabilities = np.clip(np.asarray(probabilities, dtype=np.float64), 1e-7, 1 - 1e-7)
+    predicted = probabilities >= threshold
+    positives = y == 1
+    tp = int(np.sum(predicted & positives))
+    fp = int(np.sum(predicted & ~positives))
+    fn = int(np.sum(~predicted & positives))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+
+    # Rank-based AUC (Mann-Whitney U), ties get average ranks
+    auc = None
+    if positives.any() and (~positives).any():
+        order = np.argsort(probabilities)
+        ranks = np.empty(len(y))
+        ranks[order] = np.arange(1, len(y) + 1)
+        for value in np.unique(probabilities):
+            tied = probabilities == value
+            ranks[tied] = ranks[tied].mean()
+        n_pos, n_neg = positives.sum(), (~positives).sum()
+        auc = round(float((ranks[positives].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)), 4)
+
+    return {
+        'samples': int(len(y)),
+        'positives': int(positives.sum()),
+        'accuracy': round(float(np.mean(predicted == positives)), 4) if len(y) else 0.0,
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        'roc_auc': auc,
+        'brier': round(float(np.mean((probabilities - y) ** 2)), 4) if len(y) else 0.0,
+        'log_loss': round(float(-np.mean(y * np.log(probabilities) + (1 - y) * np.log(1 - probabilities))), 4) if len(y) else 0.0
+    }
+
+_model: Optional[RiskModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+def get_risk_model() -> Optional[RiskModel]:
+    """The deployed model (loaded once from RISK_MODEL_PATH), or None to keep heuristic scoring"""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                path = os.getenv('RISK_MODEL_PATH', DEFAULT_MODEL_PATH)
+                if os.path.exists(path):
+                    try:
+                        _model = RiskModel.load(path)
+                        logger.info("Risk model loaded", extra={'path': path, 'version': _model.version})
+                    except Exception as e:
+                        logger.error("Risk model load failed, using heuristic scores", extra={'path': path, 'error': str(e)})
+                else:
+                    logger.info("No risk model file, using heuristic scores", extra={'path': path})
+                _model_loaded = True
+    return _model
+
+def reset_risk_model():
+    """Forget the loaded model so the next get_risk_model() re-reads the file"""
+    global _model, _model_loaded
+    with _model_lock:
+        _model, _model_loaded = None, False
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite for the scam detection pipeline
+
+Runs entirely against local fakes (benchmark_fakes.py) and a synthetic
+corpus (synthetic_call_corpus.py), so results are reproducible and need no
+Google, Gemini, MongoDB or Pinata access.
+
+Micro-benchmarks:
+- analyze_speakers
+- EnhancedFeatureExtractor.extract_acoustic_features
+- mozilla_voice_analyzer.generate_voice_insights
+- wav2vec2 voice inference: reference vs fast vs fast+int8 (each in its own process)
+
+Macro-benchmarks:
+- POST /api/analyze-audio through the Flask test client
+
+Results are written as JSON so regressions can be tracked over time.
+
+Usage:
+    python run_benchmarks.py --output bench_results.json
+    python run_benchmarks.py --only analyze_speakers --repeat 50
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import argparse
+import platform
+import tempfile
+import resource
+import subprocess
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+sys.path.append('.')
+
+from benchmark_fakes import FakeSpeechClient, install_fake_backends
+from synthetic_call_corpus import generate_call
+
+def measure(fn: Callable, repeat: int = 10, warmup: int = 1, track_memory: bool = False) -> Dict:
+    """Time repeated calls of fn and return latency statistics in milliseconds"""
+    for _ in range(warmup):
+        fn()
+
+    peak_bytes = None
+    if track_memory:
+        tracemalloc.start()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000.0)
+
+    if track_memory:
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    timings = np.array(timings)
+    stats = {
+        'runs': repeat,
+        'mean_ms': round(float(timings.mean()), 4),
+        'p50_ms': round(float(np.percentile(timings, 50)), 4),
+        'p95_ms': round(float(np.percentile(timings, 95)), 4),
+        'min_ms': round(float(timings.min()), 4),
+        'max_ms': round(float(timings.max()), 4)
+    }
+    if peak_bytes is not None:
+        stats['peak_memory_kb'] = round(peak_bytes / 1024.0, 1)
+    return stats
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return 'unknown'
+
+def _write_wav(call: Dict) -> str:
+    fd, path = tempfile.mkstemp(suffix='.wav', prefix=f"{call['call_id']}_")
+    with os.fdopen(fd, 'wb') as wav_file:
+        wav_file.write(call['wav_bytes'])
+    return path
+
+# (label, VOICE_INFERENCE_MODE, VOICE_QUANTIZE)
+VOICE_INFERENCE_VARIANTS = (
+    ('reference', 'reference', '0'),
+    ('fast', 'fast', '0'),
+    ('fast_int8', 'fast', '1')
+)
+
+def _voice_inference_worker(mode: str, quantize: str, paths: List[str], repeat: int, threads: int) -> Dict:
+    """
+    Time MozillaVoiceAnalyzer.analyze_voice_characteristics in a fresh process
+
+    The analyzer reads its settings from the environment when the module
+    creates its global instance, and a separate process gives each variant
+    its own peak RSS (torch allocations are invisible to tracemalloc).
+    """
+    os.environ['VOICE_INFERENCE_MODE'] = mode
+    os.environ['VOICE_QUANTIZE'] = quantize
+    if threads:
+        os.environ['VOICE_TORCH_THREADS'] = str(threads)
+
+    from mozilla_voice_analyzer import mozilla_voice_analyzer
+    if mozilla_voice_analyzer.model is None:
+        raise RuntimeError('wav2vec2 models could not be loaded')
+    loaded_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    results = {}
+    for path in paths:
+        stats = measure(lambda: mozilla_voice_analyzer.analyze_voice_characteristics(path), repeat=repeat)
+        results[os.path.basename(path)] = stats
+    results['_memory'] = {
+        'model_loaded_rss_mb': round(loaded_rss_kb / 1024.0, 1),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1)
+    }
+    return results
+
+class BenchmarkSuite:
+    """Collects micro and macro benchmarks over a synthetic corpus"""
+
+    def __init__(self, durations=(15.0, 40.0), languages=('en', 'hi', 'bn'), repeat: int = 10,
+                 stt_latency: float = 0.0, llm_latency: float = 0.0, track_memory: bool = False,
+                 voice_threads: int = 0):
+        """Generate the corpus and install fake backends"""
+        self.repeat = repeat
+        self.voice_threads = voice_threads
+        self.track_memory = track_memory
+        self.calls = []
+        for i, duration in enumerate(durations):
+            for language in languages:
+                for label in ('scam', 'safe'):
+                    self.calls.append(generate_call(
+                        call_id=f"bench_{language}_{label}_{int(duration)}s",
+                        duration=duration, language=language, label=label, seed=i
+                    ))
+
+        self.speech_client = FakeSpeechClient(latency=stt_latency)
+        for call in self.calls:
+            self.speech_client.register(call['wav_bytes'], call['transcript'], call['language'])
+
+        self.fakes = install_fake_backends(self.speech_client, gemini_latency=llm_latency)
+        self.results: Dict[str, Dict] = {}
+
+    def _record(self, name: str, stats: Dict, **params):
+        stats.update(params)
+        self.results[name] = stats
+        print(f"⏱️ {name}: mean {stats['mean_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms")
+
+    def bench_analyze_speakers(self):
+        """Rule-based speaker analysis on transcripts of each corpus call"""
+        from complete_scam_detector import CompleteScamDetector
+        import contextlib
+        import io
+
+        detector = CompleteScamDetector()
+        for call in self.calls:
+            def run(call=call):
+                transcript = json.loads(json.dumps(call['transcript']))
+                with contextlib.redirect_stdout(io.StringIO()):
+                    detector.analyze_speakers(transcript)
+            self._record(
+                f"analyze_speakers[{call['language']},{call['label']},{int(call['duration'])}s]",
+                measure(run, repeat=self.repeat, track_memory=self.track_memory),
+                words=len(call['transcript']['words'])
+            )
+
+    def bench_extract_acoustic_features(self):
+        """EnhancedFeatureExtractor acoustic path (NLP models are not loaded)"""
+        try:
+            import webrtcvad
+            from enhanced_feature_extractor import EnhancedFeatureExtractor
+            from feature_graph import PROFILE_NAMES
+        except ImportError as e:
+            print(f"⚠️ Skipping extract_acoustic_features: {e}")
+            return
+
+        # Build an acoustic-only extractor: __init__ would also load transformer pipelines
+        extractor = EnhancedFeatureExtractor.__new__(EnhancedFeatureExtractor)
+        extractor.sample_rate = 16000
+        extractor.frame_length = 1024
+        extractor.hop_length = 512
+        extractor.vad = webrtcvad.Vad(2)
+
+        for call in self._by_language('en'):
+            path = _write_wav(call)
+            try:
+                for profile in PROFILE_NAMES:
+                    self._record(
+                        f"extract_acoustic_features[{profile},{int(call['duration'])}s]",
+                        measure(lambda: extractor.extract_acoustic_features(path, profile),
+                                repeat=max(1, self.repeat // 5), track_memory=self.track_memory),
+                        audio_seconds=call['duration']
+                    )
+            finally:
+                os.unlink(path)
+
+    def bench_generate_voice_insights(self):
+        """Librosa-based Mozilla fallback voice analysis"""
+        from mozilla_voice_analyzer_fallback import mozilla_voice_analyzer
+
+        for call in self._by_language('en'):
+            path = _write_wav(call)
+            try:
+                self._record(
+                    f"generate_voice_insights[{int(call['duration'])}s]",
+                    measure(lambda: mozilla_voice_analyzer.generate_voice_insights(path), repeat=max(1, self.repeat // 5),
+                            track_memory=self.track_memory),
+                    audio_seconds=call['duration']
+                )
+            finally:
+                os.unlink(path)
+
+    def bench_voice_inference(self):
+        """wav2vec2 scoring + embedding: reference path vs single-pass windowed path, fp32 and int8"""
+        try:
+            import torch  # noqa: F401
+            import transformers  # noqa: F401
+        except ImportError as e:
+            print(f"⚠️ Skipping voice_inference: {e}")
+            return
+
+        calls = self._by_language('en')
+        paths = [_write_wav(call) for call in calls]
+        durations = {os.path.basename(path): call['duration'] for path, call in zip(paths, calls)}
+        try:
+            for label, mode, quantize in VOICE_INFERENCE_VARIANTS:
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    results = pool.submit(_voice_inference_worker, mode, quantize, paths,
+                                          max(1, self.repeat // 5), self.voice_threads).result()
+                memory = results.pop('_memory')
+                for name, stats in results.items():
+                    stats.update(memory)
+                    self._record(f"voice_inference[{label},{int(durations[name])}s]", stats,
+                                 audio_seconds=durations[name])
+        finally:
+            for path in paths:
+                os.unlink(path)
+
+    def bench_analyze_audio_endpoint(self):
+        """Full /api/analyze-audio request through the Flask test client"""
+        import contextlib
+        import io
+        import api_server
+
+        client = api_server.app.test_client()
+        for call in self._by_language('en'):
+            payload = {'audio': base64.b64encode(call['wav_bytes']).decode('ascii')}
+
+            def run(payload=payload):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = client.post('/api/analyze-audio', json=payload)
+                if response.status_code != 200:
+                    raise RuntimeError(f"analyze-audio returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+
+            self._record(
+                f"api_analyze_audio[{call['label']},{int(call['duration'])}s]",
+                measure(run, repeat=max(1, self.repeat // 2), track_memory=self.track_memory),
+                audio_seconds=call['duration']
+            )
+
+    def _by_language(self, language: str) -> List[Dict]:
+        return [call for call in self.calls if call['language'] == language]
+
+    def run(self, only: List[str] = None) -> Dict:
+        """Run the selected benchmarks and return the JSON report"""
+        benchmarks = {
+            'analyze_speakers': self.bench_analyze_speakers,
+            'extract_acoustic_features': self.bench_extract_acoustic_features,
+            'generate_voice_insights': self.bench_generate_voice_insights,
+            'voice_inference': self.bench_voice_inference,
+            'api_analyze_audio': self.bench_analyze_audio_endpoint
+        }
+
+        for name, bench in benchmarks.items():
+            if only and name not in only:
+                continue
+            print(f"\n🏁 {name}")
+            print("-" * 40)
+            try:
+                bench()
+            except Exception as e:
+                print(f"❌ {name} failed: {e}")
+                self.results[f"{name}:error"] = {'error': str(e)}
+
+        return {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': self.repeat,
+            'benchmarks': self.results
+        }
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[str]:
+    """Return benchmark names whose mean latency regressed by more than threshold"""
+    regressions = []
+    for name, stats in current.get('benchmarks', {}).items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if not base or 'mean_ms' not in base or 'mean_ms' not in stats:
+            continue
+        if stats['mean_ms'] > base['mean_ms'] * (1 + threshold):
+            regressions.append(f"{name}: {base['mean_ms']:.2f} -> {stats['mean_ms']:.2f} ms")
+    return regressions
+
+def main():
+    """Run the benchmark suite from the command line"""
+    parser = argparse.ArgumentParser(description="Scam detector benchmark suite")
+    parser.add_argument('--output', default='bench_results.json', help="Where to write the JSON report")
+    parser.add_argument('--repeat', type=int, default=10, help="Timed runs per micro-benchmark")
+    parser.add_argument('--only', nargs='*', help="Run only these benchmarks")
+    parser.add_argument('--durations', nargs='*', type=float, default=[15.0, 40.0], help="Synthetic call lengths in seconds")
+    parser.add_argument('--stt-latency', type=float, default=0.0, help="Simulated STT latency per request (s)")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Simulated Gemini latency per request (s)")
+    parser.add_argument('--memory', action='store_true', help="Also record peak traced memory")
+    parser.add_argument('--voice-threads', type=int, default=0, help="torch intra-op threads for voice_inference")
+    parser.add_argument('--baseline', help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    print("📈 SCAM DETECTOR BENCHMARK SUITE")
+    print("=" * 50)
+
+    suite = BenchmarkSuite(
+        durations=tuple(args.durations), repeat=args.repeat,
+        stt_latency=args.stt_latency, llm_latency=args.llm_latency,
+        track_memory=args.memory, voice_threads=args.voice_threads
+    )
+    report = suite.run(args.only)
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2, ensure_ascii=False)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as baseline_file:
+            regressions = compare_reports(json.load(baseline_file), report)
+        if regressions:
+            print("🚨 Regressions detected:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ No regressions against baseline")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
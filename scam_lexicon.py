@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Shared scam lexicon
+
+All keyword and phrase lists used by the scorers live in a versioned
+JSON (or YAML) file, lexicons/scam_lexicon.json by default, or the file
+named by SCAM_LEXICON_PATH. At load time the file is:
+
+- normalized once: NFC, casefold, punctuation stripped, whitespace collapsed
+- deduplicated, keeping the original order (first match wins where order matters)
+- compiled into a frozen LexiconIndex (tuples and frozensets per category
+  and per language)
+
+Scorers call get_lexicon() and match against normalize_text(text), so
+Hindi and Bengali text goes through the same normalization as the terms.
+reload_lexicon() swaps in a new index atomically without a restart;
+readers holding the old index keep a consistent view. get_lexicon() also
+checks the file's mtime every SCAM_LEXICON_WATCH_SECONDS (default 30, 0
+disables), so every worker process picks up an edited lexicon on its own.
+"""
+
+import os
+import json
+import time
+import threading
+import unicodedata
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from pipeline_metrics import get_logger
+
+logger = get_logger('scam_lexicon')
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons', 'scam_lexicon.json')
+
+def _is_punctuation(char: str) -> bool:
+    return unicodedata.category(char).startswith('P')
+
+def normalize_text(text: str) -> str:
+    """NFC-normalize, casefold, replace punctuation with spaces and collapse whitespace"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFC', text).casefold()
+    text = ''.join(' ' if _is_punctuation(char) else char for char in text)
+    return ' '.join(text.split())
+
+def normalize_token(token: str) -> str:
+    """Normalize a single word (punctuation is dropped rather than split on)"""
+    if not token:
+        return ''
+    token = unicodedata.normalize('NFC', token).casefold()
+    return ''.join(char for char in token if not _is_punctuation(char)).strip()
+
+class LexiconIndex:
+    """Immutable, normalized view of one lexicon version"""
+
+    def __init__(self, data: Dict, source: Optional[str] = None):
+        self.version = str(data.get('version', 'unversioned'))
+        self.source = source
+        self.scoring = MappingProxyType(dict(data.get('scoring', {})))
+
+        terms: Dict[str, Tuple[str, ...]] = {}
+        by_language: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+        for category, languages in data.get('categories', {}).items():
+            if isinstance(languages, list):
+                languages = {'any': languages}
+            merged: Dict[str, None] = {}
+            for language, values in languages.items():
+                normalized = tuple(dict.fromkeys(t for t in (normalize_text(v) for v in values) if t))
+                by_language[(category, language)] = normalized
+                merged.update(dict.fromkeys(normalized))
+            terms[category] = tuple(merged)
+
+        self._terms = MappingProxyType(terms)
+        self._by_language = MappingProxyType(by_language)
+        self._sets = MappingProxyType({category: frozenset(values) for category, values in terms.items()})
+
+    @property
+    def categories(self) -> List[str]:
+        return list(self._terms)
+
+    def terms(self, category: str, language: Optional[str] = None) -> Tuple[str, ...]:
+        """Normalized terms of a category, optionally for one language"""
+        if language is None:
+            return self._terms.get(category, ())
+        return self._by_language.get((category, language), ())
+
+    def term_set(self, category: str) -> FrozenSet[str]:
+        """Normalized terms of a category as a frozenset, for exact token lookups"""
+        return self._sets.get(category, frozenset())
+
+    def find(self, category: str, normalized_text: str) -> List[str]:
+        """Terms of a category occurring (as substrings) in already-normalized text, in lexicon order"""
+        return [term for term in self._terms.get(category, ()) if term in normalized_text]
+
+    def first(self, category: str, normalized_text: str) -> Optional[str]:
+        """First term of a category occurring in already-normalized text"""
+        for term in self._terms.get(category, ()):
+            if term in normalized_text:
+                return term
+        return None
+
+    def contains_any(self, category: str, normalized_text: str) -> bool:
+        return self.first(category, normalized_text) is not None
+
+    def count(self, category: str) -> int:
+        return len(self._terms.get(category, ()))
+
+def load_lexicon(path: Optional[str] = None) -> LexiconIndex:
+    """Read and compile a lexicon file (.json, or .yaml/.yml when PyYAML is installed)"""
+    path = path or os.getenv('SCAM_LEXICON_PATH', DEFAULT_LEXICON_PATH)
+    with open(path, 'r', encoding='utf-8') as lexicon_file:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            data = yaml.safe_load(lexicon_file)
+        else:
+            data = json.load(lexicon_file)
+    return LexiconIndex(data, source=path)
+
+WATCH_SECONDS = float(os.getenv('SCAM_LEXICON_WATCH_SECONDS', '30'))
+
+_lexicon: Optional[LexiconIndex] = None
+_lexicon_mtime: Optional[float] = None
+_next_check = 0.0
+_lexicon_lock = threading.Lock()
+
+def get_lexicon() -> LexiconIndex:
+    """The current lexicon index (loaded on first use, re-read when the file changes)"""
+    global _next_check
+    if _lexicon is None:
+        reload_lexicon()
+    elif WATCH_SECONDS and time.monotonic() >= _next_check:
+        _next_check = time.monotonic() + WATCH_SECONDS
+        reload_if_changed()
+    return _lexicon
+
+def reload_lexicon(path: Optional[str] = None) -> LexiconIndex:
+    """Load a lexicon and make it current; on error the previous index stays active"""
+    global _lexicon, _lexicon_mtime
+    with _lexicon_lock:
+        try:
+            index = load_lexicon(path)
+        except Exception as e:
+            logger.error("Lexicon load failed", extra={'path': path or 'default', 'error': str(e)})
+            if _lexicon is None:
+                raise
+            return _lexicon
+        _lexicon = index
+        _lexicon_mtime = os.path.getmtime(index.source)
+        logger.info("Lexicon loaded", extra={'version': index.version, 'path': index.source,
+                                             'categories': len(index.categories)})
+        return index
+
+def reload_if_changed() -> bool:
+    """Reload when the lexicon file changed on disk; returns True if a new version was loaded"""
+    current = _lexicon if _lexicon is not None else reload_lexicon()
+    try:
+        mtime = os.path.getmtime(current.source)
+    except OSError:
+        return False
+    if mtime == _lexicon_mtime:
+        return False
+    return reload_lexicon(current.source) is not current
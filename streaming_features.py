@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Streaming frame-based acoustic features with constant memory
+
+StreamingVoiceFeatures consumes fixed-size PCM blocks (soundfile.blocks,
+a MicrophoneStream or FileReplaySource chunk iterator) and keeps only:
+
+- a carry buffer shorter than one STFT frame plus the current block
+- Welford accumulators (RunningStats) for RMS, ZCR, spectral centroid,
+  rolloff, bandwidth, pitch and the 13 MFCCs
+
+so memory does not grow with call length and features are available while
+the call is still going. Every `window_seconds` of audio a window summary
+is emitted; finish() returns the summary of the whole call. Both use the
+schema of MozillaVoiceAnalyzerFallback.extract_audio_features (plus the
+EnhancedFeatureExtractor 'intensity_features' block), so they can be fed
+straight into calculate_scam_probability / detect_voice_anomalies.
+
+Frames are the same as librosa's centered STFT (n_fft 2048, hop 512, zero
+padding at both ends), so RMS, centroid, rolloff, bandwidth and piptrack
+pitch match the batch extractors. Two small differences: ZCR edge frames
+see zero padding rather than librosa's edge padding, and MFCCs are not
+clipped at 80 dB below the loudest frame of the call, which a stream
+cannot know in advance.
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import librosa
+import numpy as np
+
+from feature_graph import extraction_report
+from pipeline_metrics import record_stage
+
+class RunningStats:
+    """Welford mean/variance (plus min/max) over scalars or fixed-size vectors"""
+
+    def __init__(self, shape: tuple = ()):
+        self.shape = shape
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+
+    def update(self, values: np.ndarray):
+        """Add a batch of observations (first axis = observations), merged with Chan's formula"""
+        values = np.asarray(values, dtype=np.float64).reshape((-1,) + tuple(self.shape))
+        n = len(values)
+        if not n:
+            return
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        self.min = np.minimum(self.min, values.min(axis=0))
+        self.max = np.maximum(self.max, values.max(axis=0))
+
+    @property
+    def variance(self):
+        """Population variance (same as np.var)"""
+        return self.m2 / self.count if self.count else np.zeros(self.shape)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def range(self):
+        return self.max - self.min if self.count else np.zeros(self.shape)
+
+class StreamingVoiceFeatures:
+    """Online voice features over PCM blocks; see the module docstring"""
+
+    SCALARS = ('rms', 'zcr', 'centroid', 'rolloff', 'bandwidth', 'pitch')
+
+    def __init__(self, sample_rate: int = 16000, n_fft: int = 2048, hop_length: int = 512, n_mfcc: int = 13,
+                 window_seconds: float = 5.0):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mfcc = n_mfcc
+        self.window_frames = max(1, int(round(window_seconds * sample_rate / hop_length)))
+        self.mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=n_fft)
+
+        # Centered framing: the stream starts with n_fft // 2 zeros, like librosa's padding
+        self._carry = np.zeros(n_fft // 2, dtype=np.float32)
+        self.samples = 0
+        self.frames = 0
+        self.blocks = 0
+        self.windows_emitted = 0
+        self.costs: Dict[str, float] = {}
+        self.totals = self._new_stats()
+        self._window = self._new_stats()
+        self._window_start = 0
+        self.finished = False
+
+    def _new_stats(self) -> Dict[str, RunningStats]:
+        stats = {name: RunningStats() for name in self.SCALARS}
+        stats['mfcc'] = RunningStats((self.n_mfcc,))
+        return stats
+
+    def _timed(self, name: str, func: Callable):
+        started = time.perf_counter()
+        result = func()
+        self.costs[name] = self.costs.get(name, 0.0) + (time.perf_counter() - started) * 1000.0
+        return result
+
+    def push(self, block: np.ndarray) -> List[Dict]:
+        """
+        Add a PCM block (float in [-1, 1] or int16, mono or (n, channels))
+
+        Returns the window summaries completed by this block (often none).
+        """
+        if self.finished:
+            raise RuntimeError("push() after finish()")
+        block = np.asarray(block)
+        if block.ndim > 1:
+            block = block.mean(axis=1)
+        if block.dtype == np.int16:
+            block = block.astype(np.float32) / 32768.0
+        self.samples += len(block)
+        self.blocks += 1
+        self._carry = np.concatenate([self._carry, block.astype(np.float32)])
+        return self._consume()
+
+    def _consume(self) -> List[Dict]:
+        """Run every complete frame in the carry buffer; keep the remainder"""
+        if len(self._carry) < self.n_fft:
+            return []
+        n_frames = 1 + (len(self._carry) - self.n_fft) // self.hop_length
+        signal = self._carry[:(n_frames - 1) * self.hop_length + self.n_fft]
+        self._carry = self._carry[n_frames * self.hop_length:]
+        return self._add_frames(self._frame_features(signal))
+
+    def _frame_features(self, signal: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-frame feature arrays for an uncentered run of frames"""
+        sr, n_fft, hop = self.sample_rate, self.n_fft, self.hop_length
+        stft = self._timed('stft', lambda: np.abs(librosa.stft(signal, n_fft=n_fft, hop_length=hop, center=False)))
+        frame_values = {
+            'rms': self._timed('rms', lambda: librosa.feature.rms(y=signal, frame_length=n_fft, hop_length=hop,
+                                                                  center=False)[0]),
+            'zcr': self._timed('zero_crossing_rate', lambda: librosa.feature.zero_crossing_rate(
+                signal, frame_length=n_fft, hop_length=hop, center=False)[0]),
+            'centroid': self._timed('spectral_centroid', lambda: librosa.feature.spectral_centroid(S=stft, sr=sr)[0]),
+            'rolloff': self._timed('spectral_shape', lambda: librosa.feature.spectral_rolloff(S=stft, sr=sr)[0]),
+            'bandwidth': self._timed('spectral_shape', lambda: librosa.feature.spectral_bandwidth(S=stft, sr=sr)[0]),
+            'mfcc': self._timed('mfcc', lambda: librosa.feature.mfcc(
+                S=librosa.power_to_db(self.mel_basis @ stft ** 2, top_db=None), n_mfcc=self.n_mfcc).T)
+        }
+
+        def pitch():
+            pitches, magnitudes = librosa.piptrack(S=stft, sr=sr)
+            # Strongest candidate per frame; 0 = unvoiced
+            return pitches[magnitudes.argmax(axis=0), np.arange(pitches.shape[1])]
+        frame_values['pitch'] = self._timed('pitch', pitch)
+        return frame_values
+
+    def _add_frames(self, frame_values: Dict[str, np.ndarray]) -> List[Dict]:
+        """Fold frames into the call totals and the current window, splitting at window boundaries"""
+        completed = []
+        n_frames = len(frame_values['rms'])
+        start = 0
+        while start < n_frames:
+            in_window = self.frames - self._window_start
+            take = min(n_frames - start, self.window_frames - in_window)
+            part = {name: values[start:start + take] for name, values in frame_values.items()}
+            part['pitch'] = part['pitch'][part['pitch'] > 0]
+            for stats in (self.totals, self._window):
+                for name, values in part.items():
+                    stats[name].update(values)
+            self.frames += take
+            start += take
+            if self.frames - self._window_start == self.window_frames:
+                completed.append(self._close_window())
+        return completed
+
+    def _close_window(self) -> Dict:
+        summary = self.summarize(self._window, (self.frames - self._window_start) * self.hop_length)
+        summary['window'] = {
+            'index': self.windows_emitted,
+            'start_time': self._window_start * self.hop_length / self.sample_rate,
+            'end_time': self.frames * self.hop_length / self.sample_rate,
+            'frames': self.frames - self._window_start
+        }
+        self.windows_emitted += 1
+        self._window = self._new_stats()
+        self._window_start = self.frames
+        return summary
+
+    def finish(self) -> Dict:
+        """
+        Flush the trailing frames and return the summary of the whole stream
+
+        The final partial window (if any) is reported under 'last_window'.
+        """
+        if not self.finished:
+            self.finished = True
+            self._carry = np.concatenate([self._carry, np.zeros(self.n_fft // 2, dtype=np.float32)])
+            self._consume()
+            for name, ms in self.costs.items():
+                record_stage('feature', ms / 1000.0, node=name, mode='streaming')
+
+        summary = self.summarize(self.totals, self.samples)
+        if self.frames > self._window_start:
+            summary['last_window'] = self._close_window()
+        summary['extraction'] = dict(
+            extraction_report('streaming', {name: round(ms, 3) for name, ms in self.costs.items()}),
+            frames=self.frames, blocks=self.blocks, windows=self.windows_emitted
+        )
+        return summary
+
+    def summarize(self, stats: Dict[str, RunningStats], samples: int) -> Dict:
+        """Feature dict in the extract_audio_features schema"""
+        rms, pitch = stats['rms'], stats['pitch']
+        return {
+            'duration': samples / self.sample_rate,
+            'sample_rate': self.sample_rate,
+            'audio_length': samples,
+            'rms_energy': float(rms.mean),
+            'zero_crossing_rate': float(stats['zcr'].mean),
+            'spectral_centroid': float(stats['centroid'].mean),
+            'spectral_rolloff': float(stats['rolloff'].mean),
+            'spectral_bandwidth': float(stats['bandwidth'].mean),
+            'pitch_mean': float(pitch.mean),
+            'pitch_std': float(pitch.std),
+            'pitch_range': float(pitch.range),
+            'mfcc_mean': stats['mfcc'].mean.tolist(),
+            'mfcc_std': stats['mfcc'].std.tolist(),
+            'intensity_features': {
+                'mean_intensity': float(rms.mean),
+                'intensity_variance': float(rms.variance),
+                'max_intensity': float(rms.max) if rms.count else 0.0,
+                'min_intensity': float(rms.min) if rms.count else 0.0,
+                'intensity_range': float(rms.range),
+                'spectral_centroid_mean': float(stats['centroid'].mean),
+                'zero_crossing_rate_mean': float(stats['zcr'].mean)
+            }
+        }
+
+    def feed(self, chunks: Iterable[np.ndarray], on_window: Optional[Callable[[Dict], None]] = None) -> Iterator[np.ndarray]:
+        """Pass-through for a chunk iterator: features are updated as the chunks flow to the next consumer"""
+        for chunk in chunks:
+            for summary in self.push(chunk):
+                if on_window:
+                    on_window(summary)
+            yield chunk
+
+def stream_file_features(audio_path: str, block_seconds: float = 1.0, window_seconds: float = 5.0,
+                         on_window: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Features of an audio file read block by block with soundfile.blocks
+
+    The file is analysed at its own sample rate (no resampling); the
+    uploads converted by convert_to_wav are already 16 kHz mono.
+    """
+    import soundfile as sf
+
+    sample_rate = sf.info(audio_path).samplerate
+    extractor = StreamingVoiceFeatures(sample_rate=sample_rate, window_seconds=window_seconds)
+    for block in sf.blocks(audio_path, blocksize=int(block_seconds * sample_rate), dtype='float32'):
+        for summary in extractor.push(block):
+            if on_window:
+                on_window(summary)
+    return extractor.finish()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Synthetic call corpus generator
+
+Produces deterministic multi-speaker calls (scam or safe, English, Hindi or
+Bengali) with word-level diarization timings and matching 16kHz mono
+LINEAR16 audio. Used by the benchmark harness and the fake STT backend so
+performance runs need no microphone, credentials or network.
+"""
+
+import io
+import os
+import wave
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Utterances per language and label. Speaker 1 is the caller, speaker 2 the receiver.
+UTTERANCES = {
+    'en': {
+        'scam': {
+            1: [
+                'hello i am from the bank',
+                'your bank account blocked due to suspicious activity',
+                'please share your otp immediately',
+                'you need to pay money to unblock your account',
+                'send us money now or the account will be suspended',
+                'tell your pin for urgent verification'
+            ],
+            2: [
+                'which bank are you calling from',
+                'why is my account blocked',
+                'i did not receive any message',
+                'okay what should i do',
+                'can i visit the branch instead'
+            ]
+        },
+        'safe': {
+            1: [
+                'hi how are you doing today',
+                'are we still meeting for lunch tomorrow',
+                'i will bring the documents for the project',
+                'the weather looks nice this weekend',
+                'let me know when you reach home'
+            ],
+            2: [
+                'i am doing well thanks',
+                'yes lunch at one works for me',
+                'sounds good see you then',
+                'maybe we can go for a walk',
+                'sure i will call you later'
+            ]
+        }
+    },
+    'hi': {
+        'scam': {
+            1: [
+                'मैं बैंक से हूं',
+                'आपका बैंक खाता ब्लॉक हो गया है',
+                'अपना ओटीपी बताएं',
+                'पैसे भेजकर अनब्लॉक करें',
+                'तत्काल सत्यापन जरूरी है'
+            ],
+            2: [
+                'कौन सा बैंक',
+                'मेरा खाता क्यों ब्लॉक है',
+                'मुझे कोई मैसेज नहीं आया',
+                'ठीक है क्या करना है'
+            ]
+        },
+        'safe': {
+            1: [
+                'नमस्ते आप कैसे हैं',
+                'कल हम मिलते हैं',
+                'मैं शाम को घर आऊंगा',
+                'खाना तैयार है'
+            ],
+            2: [
+                'मैं ठीक हूं',
+                'हां कल मिलते हैं',
+                'ठीक है फिर बात करते हैं',
+                'धन्यवाद'
+            ]
+        }
+    },
+    'bn': {
+        'scam': {
+            1: [
+                'আমি ব্যাংক থেকে বলছি',
+                'আপনার ব্যাংক অ্যাকাউন্ট ব্লক',
+                'আপনার ওটিপি বলুন',
+                'টাকা পাঠিয়ে আনব্লক করুন',
+                'জরুরি যাচাই প্রয়োজন'
+            ],
+            2: [
+                'কোন ব্যাংক',
+                'আমার অ্যাকাউন্ট কেন ব্লক',
+                'ঠিক আছে কী করতে হবে'
+            ]
+        },
+        'safe': {
+            1: [
+                'নমস্কার কেমন আছেন',
+                'কাল দেখা হবে',
+                'আমি সন্ধ্যায় বাড়ি ফিরব'
+            ],
+            2: [
+                'আমি ভালো আছি',
+                'হ্যাঁ কাল দেখা হবে',
+                'ধন্যবাদ'
+            ]
+        }
+    }
+}
+
+# Base pitch per speaker so the acoustic extractors see two distinct voices
+SPEAKER_PITCH = {1: 125.0, 2: 215.0}
+
+def generate_transcript(duration: float, language: str = 'en', label: str = 'scam',
+                        words_per_second: float = 2.5, seed: int = 0,
+                        pause_between_turns: float = 0.4) -> Dict:
+    """
+    Generate an alternating two-speaker transcript of roughly `duration` seconds
+
+    Returns a dict shaped like CompleteScamDetector.transcribe_with_diarization
+    output ('full_text', 'speaker_text', 'words').
+    """
+    if language not in UTTERANCES:
+        raise ValueError(f"Unsupported language: {language}")
+    if label not in ('scam', 'safe'):
+        raise ValueError(f"Unsupported label: {label}")
+
+    rng = np.random.default_rng(seed)
+    lines = UTTERANCES[language][label]
+    word_duration = 1.0 / words_per_second
+
+    words = []
+    speaker_text = {}
+    current_time = 0.0
+    speaker = 1
+
+    while current_time < duration:
+        utterance = lines[speaker][int(rng.integers(len(lines[speaker])))]
+        for token in utterance.split():
+            # Small jitter keeps timings realistic without losing determinism
+            length = word_duration * float(rng.uniform(0.8, 1.2))
+            words.append({
+                'word': token,
+                'speaker_tag': speaker,
+                'start_time': round(current_time, 3),
+                'end_time': round(current_time + length, 3)
+            })
+            speaker_text.setdefault(speaker, []).append(token)
+            current_time += length
+        current_time += pause_between_turns
+        speaker = 2 if speaker == 1 else 1
+
+    return {
+        'full_text': ' '.join(word['word'] for word in words),
+        'speaker_text': speaker_text,
+        'words': words
+    }
+
+def synthesize_audio(words: List[Dict], duration: Optional[float] = None,
+                     sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """
+    Render a word timeline as voiced harmonic tones (float32, -1..1)
+
+    Each word becomes a short vowel-like harmonic burst at the speaker's
+    pitch with slight vibrato; gaps are low-level noise.
+    """
+    rng = np.random.default_rng(seed)
+    total = duration if duration is not None else (words[-1]['end_time'] + 0.5 if words else 1.0)
+    audio = (rng.standard_normal(int(total * sample_rate)) * 0.003).astype(np.float32)
+
+    for word in words:
+        start = int(word['start_time'] * sample_rate)
+        end = min(int(word['end_time'] * sample_rate), len(audio))
+        if end <= start:
+            continue
+
+        t = np.arange(end - start, dtype=np.float32) / sample_rate
+        f0 = SPEAKER_PITCH.get(word['speaker_tag'], 160.0) * (1.0 + 0.03 * np.sin(2 * np.pi * 5.0 * t))
+        phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+        tone = np.sin(phase) + 0.5 * np.sin(2 * phase) + 0.25 * np.sin(3 * phase)
+        envelope = np.hanning(end - start).astype(np.float32)
+        audio[start:end] += (0.25 * envelope * tone).astype(np.float32)
+
+    return np.clip(audio, -1.0, 1.0)
+
+def audio_to_wav_bytes(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """Encode float32 audio as 16-bit mono WAV bytes"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes((audio * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+def generate_call(call_id: str, duration: float = 15.0, language: str = 'en',
+                  label: str = 'scam', seed: int = 0, with_audio: bool = True) -> Dict:
+    """Generate one synthetic call with transcript and (optionally) WAV bytes"""
+    transcript = generate_transcript(duration, language=language, label=label, seed=seed)
+    call = {
+        'call_id': call_id,
+        'language': language,
+        'label': label,
+        'duration': duration,
+        'transcript': transcript
+    }
+
+    if with_audio:
+        audio = synthesize_audio(transcript['words'], duration=max(duration, transcript['words'][-1]['end_time']), seed=seed)
+        call['wav_bytes'] = audio_to_wav_bytes(audio)
+        call['content_hash'] = hashlib.sha1(call['wav_bytes']).hexdigest()
+
+    return call
+
+def generate_corpus(count: int = 20, durations=(15.0, 40.0), languages=('en', 'hi', 'bn'),
+                    scam_ratio: float = 0.5, seed: int = 42, with_audio: bool = True) -> List[Dict]:
+    """Generate a deterministic corpus cycling through durations and languages"""
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for i in range(count):
+        label = 'scam' if rng.random() < scam_ratio else 'safe'
+        corpus.append(generate_call(
+            call_id=f"synthetic_{i:05d}",
+            duration=float(durations[i % len(durations)]),
+            language=languages[i % len(languages)],
+            label=label,
+            seed=seed + i,
+            with_audio=with_audio
+        ))
+    return corpus
+
+def write_corpus(corpus: List[Dict], output_dir: str) -> str:
+    """Write WAV files plus a JSONL manifest (usable by batch_analyze_calls.py)"""
+    import json
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.jsonl')
+    with open(manifest_path, 'w', encoding='utf-8') as manifest:
+        for call in corpus:
+            wav_name = f"{call['call_id']}.wav"
+            if 'wav_bytes' in call:
+                with open(os.path.join(output_dir, wav_name), 'wb') as wav_file:
+                    wav_file.write(call['wav_bytes'])
+            manifest.write(json.dumps({
+                'path': wav_name,
+                'call_id': call['call_id'],
+                'label': call['label'],
+                'language': call['language'],
+                'duration': call['duration']
+            }, ensure_ascii=False) + '\n')
+    return manifest_path
+
+if __name__ == "__main__":
+    import sys
+    output = sys.argv[1] if len(sys.argv) > 1 else 'synthetic_corpus'
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    print(f"🧪 Generating {count} synthetic calls into {output}/")
+    path = write_corpus(generate_corpus(count), output)
+    print(f"✅ Manifest written: {path}")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared append-only store (row ids after a writer died mid-append)
+"""
+
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append('.')
+
+from append_store import AppendStore
+
+def make_store(count=5, dim=4):
+    store = AppendStore(tempfile.mkdtemp(), 'entries.jsonl', 'entry_offsets.u64')
+    store.create({'dim': dim})
+    store.append(np.arange(count * dim, dtype=np.float32).reshape(count, dim),
+                 [{'n': i} for i in range(count)])
+    return store
+
+def test_torn_append():
+    """Bytes left by a crashed writer are cut off before the next append"""
+    print("🧪 TESTING TORN APPEND RECOVERY")
+    print("=" * 50)
+
+    store = make_store()
+    # A writer that died after writing some of each file but before committing meta.json
+    with open(store.rows_path, 'ab') as rows_file:
+        rows_file.write(b'{"n": "torn", "partial')
+    with open(store.vectors_path, 'ab') as vectors_file:
+        vectors_file.write(np.ones(6, dtype=np.float32).tobytes())
+    with open(store.offsets_path, 'ab') as offsets_file:
+        offsets_file.write(b'\x01\x02\x03')
+
+    new_id = store.append(np.full((1, store.dim), 7.0), [{'n': 'next'}])
+    vectors, _ = store.mapped()
+    if new_id == 5 and store.row(5) == {'n': 'next'} and np.all(vectors[5] == 7.0) and store.row(4) == {'n': 4}:
+        print("✅ Next append gets row id 5 and reads back intact")
+    else:
+        print(f"❌ Row ids shifted: id {new_id}, row {store.row(new_id)}, vector {vectors[new_id]}")
+
+    sizes = (os.path.getsize(store.vectors_path), os.path.getsize(store.offsets_path))
+    expected = (6 * store.dim * 4, 6 * 8)
+    status = '✅' if sizes == expected else '❌'
+    print(f"{status} Files hold exactly the committed rows: {sizes}")
+
+def test_reopen():
+    """A second handle on the directory sees the rows and appends after them"""
+    print("\n🧪 TESTING REOPEN")
+    print("=" * 50)
+
+    store = make_store()
+    other = AppendStore(store.directory, 'entries.jsonl', 'entry_offsets.u64')
+    first = other.append(np.zeros((2, store.dim)), [{'n': 'a'}, {'n': 'b'}])
+    rows = [row['n'] for row in store.rows()]
+    if first == 5 and rows == [0, 1, 2, 3, 4, 'a', 'b']:
+        print(f"✅ Both handles agree on {len(rows)} rows")
+    else:
+        print(f"❌ Unexpected rows {rows} (first new id {first})")
+
+if __name__ == "__main__":
+    test_torn_append()
+    test_reopen()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the async stage graph used by /api/analyze-audio-async
+"""
+
+import sys
+import time
+import asyncio
+
+# Add current directory to path
+sys.path.append('.')
+
+from async_pipeline import StageGraph, StageError
+
+def sleeper(seconds, value=None):
+    """Stage that simulates a blocking network call"""
+    async def stage(results):
+        await asyncio.sleep(seconds)
+        return value
+    return stage
+
+async def failing(results):
+    raise RuntimeError("simulated outage")
+
+def test_independent_stages_overlap():
+    """Latency should follow the critical path, not the sum of stages"""
+    print("🧪 TESTING STAGE CONCURRENCY")
+    print("=" * 50)
+    
+    graph = StageGraph()
+    graph.add('decode', sleeper(0.05, 'audio.wav'))
+    graph.add('ipfs_upload', sleeper(0.3, {'ipfs_hash': 'bafy'}))
+    graph.add('stt', sleeper(0.3, 'transcript'), deps=['decode'])
+    graph.add('gemini_suggestion', sleeper(0.2, 'advice'), deps=['stt'])
+    graph.add('bank_rules', sleeper(0.2, 'rules'), deps=['stt'])
+    graph.add('save', sleeper(0.05, True), deps=['gemini_suggestion', 'bank_rules', 'ipfs_upload'])
+    
+    started = time.perf_counter()
+    results = asyncio.run(graph.run())
+    elapsed = time.perf_counter() - started
+    
+    print(f"🔍 Elapsed: {elapsed:.2f}s (sequential would be 1.10s)")
+    print(f"🔍 Critical path: {results['_critical_path']}")
+    
+    if elapsed < 0.8 and results['save'] is True:
+        print("✅ Independent stages ran concurrently")
+    else:
+        print("❌ Stages did not overlap as expected")
+
+def test_stage_failures():
+    """Optional stages degrade gracefully, required stages abort the run"""
+    print("\n🧪 TESTING STAGE FAILURES")
+    print("=" * 50)
+    
+    graph = StageGraph()
+    graph.add('stt', sleeper(0.01, 'transcript'))
+    graph.add('gemini_suggestion', failing, deps=['stt'], optional=True)
+    graph.add('save', sleeper(0.01, True), deps=['gemini_suggestion'])
+    results = asyncio.run(graph.run())
+    
+    if results['gemini_suggestion'] is None and 'gemini_suggestion' in results['_errors'] and results['save']:
+        print("✅ Optional stage failure recorded, pipeline continued")
+    else:
+        print(f"❌ Unexpected results: {results}")
+    
+    graph = StageGraph()
+    graph.add('stt', failing)
+    graph.add('save', sleeper(0.01, True), deps=['stt'])
+    try:
+        asyncio.run(graph.run())
+        print("❌ Required stage failure was swallowed")
+    except StageError as e:
+        print(f"✅ Required stage failure raised for '{e.stage}'")
+
+if __name__ == "__main__":
+    test_independent_stages_overlap()
+    test_stage_failures()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming capture (ring buffer, file replay and VAD segmentation)
+"""
+
+import sys
+import numpy as np
+
+# Add current directory to path
+sys.path.append('.')
+
+from audio_stream import RingBuffer, FileReplaySource, VadSegmenter
+
+def test_ring_buffer():
+    """Wrap-around reads and overflow accounting"""
+    print("🧪 TESTING RING BUFFER")
+    print("=" * 50)
+    
+    ring = RingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    first = ring.read(4)
+    ring.write(np.arange(6, 12, dtype=np.int16))  # wraps around the end
+    second = ring.read(8)
+    
+    if first.tolist() == [0, 1, 2, 3] and second.tolist() == list(range(4, 12)):
+        print("✅ Samples come back in order across the wrap point")
+    else:
+        print(f"❌ Unexpected order: {first.tolist()} {second.tolist()}")
+    
+    ring.write(np.arange(20, dtype=np.int16))  # more than capacity
+    latest = ring.read(8)
+    if latest.tolist() == list(range(12, 20)) and ring.dropped == 12:
+        print("✅ Overflow keeps the newest samples and counts the dropped ones")
+    else:
+        print(f"❌ Overflow handling wrong: {latest.tolist()} dropped={ring.dropped}")
+    
+    ring.close()
+    if ring.read(1, timeout=0.1) is None:
+        print("✅ Closed, drained buffer returns None")
+
+def test_file_replay_segments(path='two_person_test.wav'):
+    """Replay a recording through the VAD segmenter"""
+    print("\n🧪 TESTING FILE REPLAY + VAD")
+    print("=" * 50)
+    
+    try:
+        source = FileReplaySource(path)
+        chunks = list(source.chunks())
+        print(f"🔍 {len(chunks)} chunks of {source.chunk_samples} samples")
+        
+        segmenter = VadSegmenter(sample_rate=source.sample_rate)
+        segments = list(segmenter.segments(iter(chunks)))
+        for start, samples in segments:
+            print(f"   🗣️ {start:6.2f}s  {len(samples) / source.sample_rate:5.2f}s")
+        
+        if segments:
+            print(f"✅ {len(segments)} speech segments detected")
+        else:
+            print("⚠️ No speech detected in replayed file")
+    except ImportError as e:
+        print(f"⚠️ Skipping VAD test: {e}")
+    except Exception as e:
+        print(f"❌ Test failed with exception: {e}")
+
+if __name__ == "__main__":
+    test_ring_buffer()
+    test_file_replay_segments(sys.argv[1] if len(sys.argv) > 1 else 'two_person_test.wav')
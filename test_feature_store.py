@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-call feature store (vectors, frames, lookups, bulk loading)
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append('.')
+
+from feature_store import FeatureStore
+from risk_model import FEATURE_INDEX, FEATURE_NAMES, build_feature_vector
+
+def make_record(i, scam=False):
+    text = "please share your otp to verify your bank account" if scam else "see you at lunch tomorrow"
+    return {
+        'analysis_id': f"call_{i}",
+        'transcription': {'full_text': text, 'words': []},
+        'analysis': {1: {'risk_score': 0.8 if scam else 0.0, 'unique_scam_keywords': 3 if scam else 0}},
+        'scam_detected': scam,
+        'overall_risk_score': 0.8 if scam else 0.0,
+        'label': 'scam' if scam else 'safe'
+    }
+
+def test_put_and_lookup():
+    """Vectors round-trip, re-stored calls resolve to their latest row"""
+    print("🧪 TESTING PUT AND LOOKUP")
+    print("=" * 50)
+
+    store = FeatureStore(tempfile.mkdtemp())
+    records = [make_record(i, scam=i % 3 == 0) for i in range(30)]
+    for record in records:
+        store.put(record)
+
+    stored = store.get('call_6')
+    expected = build_feature_vector(records[6]).astype(np.float32)
+    if stored and np.allclose(stored['vector'], expected) and stored['row']['label'] == 'scam':
+        print(f"✅ call_6 vector ({len(FEATURE_NAMES)} features) and row entry round-trip")
+    else:
+        print(f"❌ Unexpected lookup: {stored}")
+
+    updated = dict(records[6], analysis={1: {'risk_score': 0.95, 'unique_scam_keywords': 5}})
+    new_row = store.put(updated)
+    reopened = FeatureStore(store.directory)
+    if reopened.row_id('call_6') == new_row == 30 and len(reopened.latest_rows()) == 30:
+        print("✅ Re-stored call resolves to its latest row, older row kept")
+    else:
+        print(f"❌ Latest row wrong: {reopened.row_id('call_6')} (expected {new_row})")
+
+    keyword_column = reopened.vectors()[:, FEATURE_INDEX['max_unique_keywords']]
+    blocks = list(reopened.iter_blocks(block_rows=8))
+    if isinstance(reopened.vectors(), np.memmap) and len(blocks) == 4 and keyword_column.max() == 5:
+        print("✅ Bulk load is memory-mapped and walks in row blocks")
+    else:
+        print("❌ Bulk load wrong")
+
+def test_frames():
+    """Frame arrays and the acoustic summary are stored compressed per call"""
+    print("\n🧪 TESTING FRAME ARRAYS")
+    print("=" * 50)
+
+    store = FeatureStore(tempfile.mkdtemp())
+    frames = {'rms_frames': np.linspace(0, 1, 200), 'mfcc_frames': np.ones((13, 200))}
+    insights = {'audio_features': {'pitch_std': 42.0, 'rms_energy': 0.1}, 'voice_analysis': {'scam_probability': 0.3}}
+    store.put(make_record(1), voice_insights=insights, frames=frames)
+
+    loaded = store.load_frames('call_1')
+    if loaded and loaded['mfcc_frames'].shape == (13, 200) and loaded['audio_features']['pitch_std'] == 42.0:
+        print("✅ Frames and acoustic summary load back by analysis id")
+    else:
+        print(f"❌ Frames not restored: {loaded}")
+
+    if store.get('call_1')['vector'][FEATURE_INDEX['has_voice']] == 1.0 and store.load_frames('missing') is None:
+        print("✅ Voice features are in the vector; unknown ids return None")
+    else:
+        print("❌ Voice features missing from the vector")
+
+if __name__ == "__main__":
+    test_put_and_lookup()
+    test_frames()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for script-independent phonetic keys (Latin / Devanagari / Bengali)
+"""
+
+import sys
+
+# Add current directory to path
+sys.path.append('.')
+
+from phonetic_keys import PhoneticIndex, phonetic_key
+from scam_lexicon import get_lexicon
+from transliteration import get_transducer
+
+def test_keys():
+    """Renderings of one word in three scripts share a key; different words do not"""
+    print("🧪 TESTING PHONETIC KEYS")
+    print("=" * 50)
+
+    groups = [
+        ['password', 'paasvard', 'पासवर्ड', 'পাসওয়ার্ড'],
+        ['otp', 'ओटीपी', 'ওটিপি'],
+        ['bank', 'बैंक', 'ব্যাংক'],
+        ['account', 'अकाउंट', 'অ্যাকাউন্ট'],
+        ['verify', 'वेरीफाई', 'ভেরিফাই'],
+        ['number', 'नंबर', 'নম্বর']
+    ]
+    for group in groups:
+        keys = {phonetic_key(word) for word in group}
+        status = '✅' if len(keys) == 1 else '❌'
+        print(f"{status} {' / '.join(group)} -> {', '.join(sorted(keys))}")
+
+    distinct = {phonetic_key(word) for word in ['password', 'bank', 'otp', 'account', 'refund']}
+    status = '✅' if len(distinct) == 5 else '❌'
+    print(f"{status} different words keep different keys")
+
+def test_index():
+    """Lexicon variants resolve to one canonical term; ordinary words stay unmatched (as keyword_hits calls lookup)"""
+    print("\n🧪 TESTING PHONETIC INDEX")
+    print("=" * 50)
+
+    index = PhoneticIndex(get_lexicon().terms('scam_keywords'))
+    print(f"📚 {len(index)} keys over the scam keywords")
+    cases = [
+        ('ओटीपी', 'otp'), ('পাসওয়ার্ড', 'password'), ('paasvard', 'password'), ('रिफंड', 'refund'),
+        ('सरकारी', 'सरकार'), ('नंबर', 'number'),
+        ('another', None), ('secret', None), ('walked', None),
+        # Three-class keys shared with bank (BNK) and card (KRD)
+        ('बनके', None), ('बनाके', None), ('खरीद', None)
+    ]
+    for token, expected in cases:
+        actual = index.lookup(token)
+        status = '✅' if actual == expected else '❌'
+        print(f"{status} {token} -> {actual}")
+
+def test_transliteration():
+    """Mapped Hindi words and lexicon words in Devanagari read as English"""
+    print("\n🧪 TESTING TRANSLITERATION FALLBACK")
+    print("=" * 50)
+
+    text = "आप अपना पासवर्ड और ओटीपी दें"
+    rewritten = get_transducer().transduce_text(text)
+    status = '✅' if 'password' in rewritten.split() and 'otp' in rewritten.split() else '❌'
+    print(f"{status} '{text}' -> '{rewritten}'")
+
+if __name__ == "__main__":
+    test_keys()
+    test_index()
+    test_transliteration()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming voice feature extractor (Welford stats, windows, batch parity)
+"""
+
+import sys
+import numpy as np
+
+# Add current directory to path
+sys.path.append('.')
+
+from streaming_features import RunningStats, StreamingVoiceFeatures
+from mozilla_voice_analyzer_fallback import VOICE_FEATURE_GRAPH
+
+def synthetic_voice(seconds=12.0, sr=16000):
+    """Gliding harmonic tone with noise and a pause, roughly voice-like"""
+    t = np.arange(int(seconds * sr)) / sr
+    f0 = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    audio = 0.3 * np.sin(phase) + 0.1 * np.sin(2 * phase) + 0.02 * np.random.RandomState(0).randn(len(t))
+    audio[int(5 * sr):int(6 * sr)] *= 0.01
+    return audio.astype(np.float32), sr
+
+def test_running_stats():
+    """Merging batches gives numpy's mean/var/min/max"""
+    print("🧪 TESTING RUNNING STATS")
+    print("=" * 50)
+    
+    data = np.random.RandomState(1).randn(1000, 13) * 5 + 3
+    stats = RunningStats((13,))
+    for start in range(0, 1000, 37):
+        stats.update(data[start:start + 37])
+    
+    if np.allclose(stats.mean, data.mean(axis=0)) and np.allclose(stats.variance, data.var(axis=0)) \
+            and np.allclose(stats.range, data.max(axis=0) - data.min(axis=0)):
+        print("✅ Batched Welford matches numpy over 1000 x 13 values")
+    else:
+        print("❌ Running stats drifted from numpy")
+
+def test_batch_parity():
+    """Block size does not change the result, and it matches the batch extractor"""
+    print("\n🧪 TESTING STREAMING VS BATCH")
+    print("=" * 50)
+    
+    audio, sr = synthetic_voice()
+    batch = {}
+    groups, _ = VOICE_FEATURE_GRAPH.compute(['rms_energy', 'spectral_centroid', 'pitch', 'spectral_shape'],
+                                            {'audio': audio, 'sr': sr})
+    for values in groups.values():
+        batch.update(values)
+    
+    summaries = {}
+    for block in (480, 16000, 50000):
+        extractor = StreamingVoiceFeatures(sample_rate=sr, window_seconds=5.0)
+        windows = []
+        for start in range(0, len(audio), block):
+            windows.extend(extractor.push(audio[start:start + block]))
+        summaries[block] = (extractor.finish(), windows)
+    
+    final, windows = summaries[16000]
+    same = all(np.isclose(summaries[block][0]['pitch_mean'], final['pitch_mean']) and
+               np.isclose(summaries[block][0]['rms_energy'], final['rms_energy']) for block in summaries)
+    print(f"{'✅' if same else '❌'} Block size independent (480 / 16000 / 50000 samples)")
+    
+    for key in ('rms_energy', 'spectral_centroid', 'spectral_rolloff', 'pitch_mean', 'pitch_std'):
+        close = np.isclose(final[key], batch[key], rtol=1e-3)
+        print(f"{'✅' if close else '❌'} {key}: streaming {final[key]:.4f} vs batch {batch[key]:.4f}")
+    
+    if len(windows) == 2 and 'last_window' in final and final['extraction']['windows'] == 3:
+        print(f"✅ Two full 5 s windows plus a final partial one "
+              f"({final['last_window']['window']['start_time']:.1f}s-{final['last_window']['window']['end_time']:.1f}s)")
+    else:
+        print(f"❌ Unexpected windows: {len(windows)} full, extraction {final['extraction']}")
+    
+    if final['audio_length'] == len(audio) and len(final['mfcc_mean']) == 13:
+        print("✅ Summary uses the extract_audio_features schema")
+    else:
+        print("❌ Summary schema mismatch")
+
+if __name__ == "__main__":
+    test_running_stats()
+    test_batch_parity()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for structured logging: extra= fields must not clash with LogRecord attributes
+
+Logger.makeRecord raises KeyError for an extra key such as 'filename' or
+'message', which turns the log call itself into an exception.
+"""
+
+import os
+import ast
+import sys
+import glob
+import logging
+
+# Add current directory to path
+sys.path.append('.')
+
+from pipeline_metrics import StructuredFormatter, get_logger
+
+def extra_keys(tree):
+    """(line, key) for every constant key of an extra={...} / extra=dict(...) argument"""
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+        for keyword in node.keywords:
+            if keyword.arg != 'extra':
+                continue
+            value = keyword.value
+            if isinstance(value, ast.Dict):
+                for key in value.keys:
+                    if isinstance(key, ast.Constant) and isinstance(key.value, str):
+                        yield node.lineno, key.value
+            elif isinstance(value, ast.Call) and getattr(value.func, 'id', None) == 'dict':
+                for item in value.keywords:
+                    if item.arg:
+                        yield node.lineno, item.arg
+
+def test_no_reserved_extra_keys():
+    """Every extra= key in the tree is safe to pass to the logger"""
+    print("🧪 TESTING extra= KEYS AGAINST LogRecord ATTRIBUTES")
+    print("=" * 50)
+
+    reserved = StructuredFormatter._reserved
+    clashes = []
+    files = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py')))
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as source_file:
+            tree = ast.parse(source_file.read(), filename=path)
+        clashes.extend((os.path.basename(path), line, key) for line, key in extra_keys(tree) if key in reserved)
+
+    if clashes:
+        for name, line, key in clashes:
+            print(f"❌ {name}:{line} uses reserved extra key '{key}'")
+    else:
+        print(f"✅ No reserved extra keys in {len(files)} modules")
+
+def test_reserved_key_raises():
+    """The check above guards a real failure mode"""
+    print("\n🧪 TESTING RESERVED KEY BEHAVIOUR")
+    print("=" * 50)
+
+    logger = get_logger('test_structured_logging')
+    clashing = {'filename': 'call.wav'}  # a variable, so the scan above does not flag this probe
+    try:
+        logger.info("probe", extra=clashing)
+        print("❌ Logging a reserved key did not raise")
+    except KeyError:
+        print("✅ Reserved key raises KeyError (so extra= keys must avoid them)")
+    logger.info("probe", extra={'upload_name': 'call.wav'})
+    print("✅ Renamed key logs normally")
+
+if __name__ == "__main__":
+    logging.getLogger('scam_detector').setLevel(logging.INFO)
+    test_no_reserved_extra_keys()
+    test_reserved_key_raises()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test script for Hindi transliteration: display text is rewritten, the scored words are not
+"""
+
+import sys
+
+# Add current directory to path
+sys.path.append('.')
+
+from complete_scam_detector import CompleteScamDetector
+
+def stt_words(text, speaker_tag=1):
+    return [{'word': token, 'speaker_tag': speaker_tag, 'start_time': i * 0.4, 'end_time': i * 0.4 + 0.3}
+            for i, token in enumerate(text.split())]
+
+def test_native_phrases_survive():
+    """Native-Hindi high-risk phrases containing mapped tokens (से, हूं, का) still score"""
+    print("🧪 TESTING NATIVE-HINDI PHRASES AFTER TRANSLITERATION")
+    print("=" * 50)
+
+    detector = CompleteScamDetector.rules_only()
+    cases = [
+        ("मैं बैंक से हूं आप अपना ओटीपी बताएं", ['मैं बैंक से हूं', 'अपना ओटीपी बताएं']),
+        ("हमारे सिस्टम में धोखाधड़ी का पता चला", ['धोखाधड़ी का पता चला'])
+    ]
+    for text, expected in cases:
+        transcription = detector.assemble_transcription(stt_words(text))
+        if [word['word'] for word in transcription['words']] != text.split():
+            print(f"❌ STT words were rewritten: {transcription['words']}")
+            continue
+        print(f"📝 Display text: {transcription['full_text']}")
+
+        analysis = detector.analyze_speakers(transcription)
+        found = [match['phrase'] for result in analysis.values() for match in result['phrase_matches']]
+        missing = [phrase for phrase in expected if phrase not in found]
+        if missing:
+            print(f"❌ '{text}': missing {missing} (found {found})")
+        else:
+            risk = max(result['risk_score'] for result in analysis.values())
+            print(f"✅ '{text}': {', '.join(expected)} (risk {risk:.2f})")
+
+def test_display_text():
+    """full_text and speaker_text still read as English where the mapping covers a word"""
+    print("\n🧪 TESTING DISPLAY TEXT")
+    print("=" * 50)
+
+    detector = CompleteScamDetector.rules_only()
+    transcription = detector.assemble_transcription(stt_words("आई एम फ्रॉम बैंक"))
+    speaker_text = ' '.join(transcription['speaker_text'][1])
+    if transcription['full_text'].startswith('I am') and speaker_text.startswith('I am'):
+        print(f"✅ '{transcription['full_text']}'")
+    else:
+        print(f"❌ Display text not transliterated: '{transcription['full_text']}' / '{speaker_text}'")
+
+if __name__ == "__main__":
+    test_native_phrases_survive()
+    test_display_text()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for the voice-print index (exact search, IVF search, appends, matching)
+"""
+
+import sys
+import tempfile
+
+import numpy as np
+
+# Add current directory to path
+sys.path.append('.')
+
+from voice_index import VoiceIndex, normalize_rows, speaker_audio
+
+def make_index(count=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    index = VoiceIndex(tempfile.mkdtemp(), dim=dim, embedder='test')
+    entries = [{'analysis_id': f"call_{i // 2}", 'speaker': i % 2 + 1, 'scam_detected': i % 4 == 0,
+                'is_potential_scammer': True} for i in range(count)]
+    index.add(vectors, entries)
+    return index, normalize_rows(vectors), rng
+
+def test_exact_search():
+    """Blocked top-k search agrees with a full brute-force ranking"""
+    print("🧪 TESTING EXACT SEARCH")
+    print("=" * 50)
+
+    index, vectors, rng = make_index()
+    queries = rng.normal(size=(3, vectors.shape[1]))
+    expected = np.argsort(-(normalize_rows(queries) @ vectors.T), axis=1)[:, :5]
+    results = index.search(queries, k=5)
+    if all([vector_id for vector_id, _ in results[q]] == list(expected[q]) for q in range(3)):
+        print("✅ Top-5 matches brute force for every query")
+    else:
+        print(f"❌ Mismatch: {results} vs {expected}")
+
+    reopened = VoiceIndex(index.directory)
+    if reopened.count == index.count and reopened.entry(7)['analysis_id'] == 'call_3':
+        print(f"✅ Reopened index has {reopened.count} vectors and their metadata")
+    else:
+        print("❌ Reopened index lost data")
+
+def test_ivf_and_appends():
+    """Partitioned search finds stored vectors, including ones appended afterwards"""
+    print("\n🧪 TESTING IVF SEARCH")
+    print("=" * 50)
+
+    index, vectors, rng = make_index()
+    index.build_ivf(lists=16)
+    found = sum(index.search(vectors[i], k=1, nprobe=4)[0][0][0] == i for i in range(0, 2000, 50))
+    print(f"{'✅' if found == 40 else '❌'} {found}/40 stored vectors found as their own nearest neighbour")
+
+    extra = rng.normal(size=(1, vectors.shape[1]))
+    [new_id] = index.add(extra, [{'analysis_id': 'call_new', 'speaker': 1, 'scam_detected': True}])
+    if index.search(extra, k=1, nprobe=1)[0][0][0] == new_id:
+        print("✅ Vector appended after build_ivf is searchable")
+    else:
+        print("❌ Appended vector not found")
+
+def test_match_and_speaker_audio():
+    """match() counts distinct prior scam calls; speaker_audio() slices turns"""
+    print("\n🧪 TESTING MATCHING")
+    print("=" * 50)
+
+    index, vectors, _ = make_index()
+    match = index.match(vectors[0], k=5, threshold=0.99)
+    if match['matched_calls'] == 1 and match['scam_calls'] == 1 and match['known_scam_voice']:
+        print(f"✅ {match['message']}")
+    else:
+        print(f"❌ Unexpected match: {match}")
+
+    audio = np.arange(16000 * 4, dtype=np.float32)
+    words = [
+        {'word': 'hello', 'speaker_tag': 1, 'start_time': 0.0, 'end_time': 1.5},
+        {'word': 'hi', 'speaker_tag': 2, 'start_time': 1.5, 'end_time': 2.0},
+        {'word': 'share', 'speaker_tag': 1, 'start_time': 2.0, 'end_time': 3.0}
+    ]
+    clips = speaker_audio(audio, words, 16000)
+    if list(clips) == [1] and len(clips[1]) == 16000 * 2.5:
+        print("✅ Speaker 1 gets 2.5 s from two turns, speaker 2 is too short to embed")
+    else:
+        print(f"❌ Unexpected clips: { {speaker: len(clip) for speaker, clip in clips.items()} }")
+
+def test_standardized_matching():
+    """Uncentered MFCC-style prints only match the same speaker once standardized"""
+    print("\n🧪 TESTING STANDARDIZED MATCHING")
+    print("=" * 50)
+
+    # MFCC mean/std stats share a large offset (std block all positive, c1 dominant);
+    # speakers differ by small deviations from it, and each call adds a little noise
+    rng = np.random.default_rng(1)
+    dim = 40
+    offset = rng.uniform(5.0, 15.0, size=dim)
+    speakers = rng.normal(size=(300, dim))
+
+    def call(speaker):
+        return offset + speaker + rng.normal(scale=0.2, size=dim)
+
+    unrelated = float((normalize_rows(call(speakers[0])) @ normalize_rows(call(speakers[1])).T)[0, 0])
+    print(f"{'✅' if unrelated > 0.85 else '❌'} Raw stats of two unrelated speakers: cosine {unrelated:.3f}")
+
+    index = VoiceIndex(tempfile.mkdtemp(), dim=dim, embedder='mfcc-test', standardize=True)
+    index.add(np.vstack([call(speaker) for speaker in speakers[:10]]),
+              [{'analysis_id': f"call_{i}", 'speaker': 1, 'scam_detected': True} for i in range(10)])
+    small = index.match(call(speakers[0]), threshold=0.9)
+    print(f"{'✅' if small['matched_calls'] == 0 else '❌'} Index of 10 voices is too small to match")
+
+    index.add(np.vstack([call(speaker) for speaker in speakers[10:200]]),
+              [{'analysis_id': f"call_{i}", 'speaker': 1, 'scam_detected': True} for i in range(10, 200)])
+    same = index.match(call(speakers[3]), threshold=0.9)
+    if [match['analysis_id'] for match in same['top_matches']] == ['call_3']:
+        print(f"✅ Same speaker matches its own call only ({same['top_matches'][0]['similarity']:.3f})")
+    else:
+        print(f"❌ Unexpected match for a known speaker: {same}")
+
+    strangers = [index.match(call(speaker), threshold=0.9) for speaker in speakers[200:]]
+    false_matches = sum(match['matched_calls'] for match in strangers)
+    status = '✅' if false_matches == 0 else '❌'
+    print(f"{status} {len(strangers)} unrelated speakers: {false_matches} matches against 200 stored voices")
+
+if __name__ == "__main__":
+    test_exact_search()
+    test_ivf_and_appends()
+    test_match_and_speaker_audio()
+    test_standardized_matching()
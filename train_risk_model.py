@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Train and evaluate the learned risk scorer (risk_model.py)
+
+Labelled calls come from batch result files (JSONL written by
+batch_analyze_calls.py, with a 'label' carried over from the manifest),
+stored analyzed_calls documents that carry a label field, and/or a
+feature store (feature_store.py), whose memory-mapped vectors are used
+as they are, without rebuilding features. Labels may be booleans, 0/1, or
+strings such as 'scam' / 'safe'.
+
+The data is split into train and held-out test sets, the model is fitted
+on the training split and both the model and the current heuristic score
+(overall_risk_score / scam_detected) are reported on the test split.
+
+Usage:
+    python train_risk_model.py --jsonl results.jsonl --output models/risk_model.npz
+    python train_risk_model.py --mongo --label-field label --test-fraction 0.3
+    python train_risk_model.py --feature-store features/ --output models/risk_model.npz
+    python train_risk_model.py --jsonl holdout.jsonl --evaluate models/risk_model.npz
+"""
+
+import sys
+import json
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from risk_model import (
+    DEFAULT_MODEL_PATH, FEATURE_NAMES, FEATURE_SOURCE_FIELDS, RiskModel, build_feature_matrix, evaluate
+)
+
+POSITIVE_LABELS = {'scam', 'fraud', 'spam', 'positive', 'true', 'yes', '1'}
+NEGATIVE_LABELS = {'safe', 'legit', 'legitimate', 'genuine', 'negative', 'false', 'no', '0'}
+
+def parse_label(value) -> Optional[int]:
+    """1 for scam, 0 for safe, None when the record is unlabelled"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return int(value)
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value in POSITIVE_LABELS:
+            return 1
+        if value in NEGATIVE_LABELS:
+            return 0
+    return None
+
+def load_jsonl_records(path: str, label_field: str) -> List[Dict]:
+    """Successful, labelled records from a batch result file"""
+    records = []
+    with open(path, 'r', encoding='utf-8') as results_file:
+        for line in results_file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('success', True) and parse_label(record.get(label_field)) is not None:
+                records.append(record)
+    return records
+
+def load_mongo_records(label_field: str, limit: int = 0) -> List[Dict]:
+    """Labelled analyzed_calls documents, with every field the serving path builds features from"""
+    from analyzed_call_model import analyzed_call_model
+    projection = dict.fromkeys(FEATURE_SOURCE_FIELDS + ('heuristic_risk_score', 'overall_risk_score', 'scam_detected',
+                                                        label_field), 1)
+    cursor = analyzed_call_model.analyzed_calls_collection.find({label_field: {'$exists': True}}, projection)
+    if limit:
+        cursor = cursor.limit(limit)
+    return [document for document in cursor if parse_label(document.get(label_field)) is not None]
+
+def load_store_rows(directory: str, label_field: str) -> Tuple[np.ndarray, List[Dict]]:
+    """Feature vectors and row entries of the labelled calls in a feature store (latest row per call)"""
+    from feature_store import FeatureStore
+    store = FeatureStore(directory)
+    latest = np.zeros(store.count, dtype=bool)
+    latest[store.latest_rows()] = True
+
+    row_ids, rows = [], []
+    for row_id, row in enumerate(store.rows()):
+        if latest[row_id] and parse_label(row.get(label_field)) is not None:
+            row_ids.append(row_id)
+            rows.append(row)
+    vectors = np.asarray(store.vectors()[np.array(row_ids, dtype=np.int64)], dtype=np.float64)
+    return vectors.reshape(len(row_ids), len(FEATURE_NAMES)), rows
+
+def split_indices(labels: np.ndarray, test_fraction: float, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Stratified shuffle split, so both classes appear in the test set"""
+    rng = np.random.default_rng(seed)
+    train, test = [], []
+    for value in (0, 1):
+        indices = rng.permutation(np.flatnonzero(labels == value))
+        cut = int(round(len(indices) * test_fraction))
+        test.extend(indices[:cut])
+        train.extend(indices[cut:])
+    return np.array(sorted(train), dtype=int), np.array(sorted(test), dtype=int)
+
+def print_metrics(title: str, metrics: Dict):
+    print(f"\n{title}")
+    print(f"   samples: {metrics['samples']} ({metrics['positives']} scam)")
+    print(f"   accuracy: {metrics['accuracy']:.3f} | precision: {metrics['precision']:.3f} | "
+          f"recall: {metrics['recall']:.3f} | F1: {metrics['f1']:.3f}")
+    auc = f"{metrics['roc_auc']:.3f}" if metrics['roc_auc'] is not None else 'n/a'
+    print(f"   ROC AUC: {auc} | Brier: {metrics['brier']:.4f} | log loss: {metrics['log_loss']:.4f}")
+
+def heuristic_metrics(records: List[Dict], labels: np.ndarray) -> Dict:
+    """Current scoring evaluated the same way (scam_detected as the decision)"""
+    scores = np.array([record.get('heuristic_risk_score', record.get('overall_risk_score', 0.0)) for record in records])
+    metrics = evaluate(labels, scores, threshold=0.5)
+    decisions = np.array([bool(record.get('scam_detected')) for record in records])
+    positives = labels == 1
+    tp = int(np.sum(decisions & positives))
+    precision = tp / decisions.sum() if decisions.sum() else 0.0
+    recall = tp / positives.sum() if positives.sum() else 0.0
+    metrics.update({
+        'accuracy': round(float(np.mean(decisions == positives)), 4) if len(labels) else 0.0,
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0
+    })
+    return metrics
+
+def main():
+    """Train or evaluate the risk model from the command line"""
+    parser = argparse.ArgumentParser(description="Train/evaluate the learned scam risk scorer")
+    parser.add_argument('--jsonl', action='append', default=[], help="Labelled batch result file (repeatable)")
+    parser.add_argument('--mongo', action='store_true', help="Also read labelled calls from analyzed_calls")
+    parser.add_argument('--mongo-limit', type=int, default=0, help="Maximum documents read from MongoDB")
+    parser.add_argument('--feature-store', help="Also read labelled calls from this feature store directory")
+    parser.add_argument('--label-field', default='label', help="Record field holding the label")
+    parser.add_argument('--output', default=DEFAULT_MODEL_PATH, help="Where to save the trained model")
+    parser.add_argument('--evaluate', metavar='MODEL', help="Only evaluate an existing model on all records")
+    parser.add_argument('--test-fraction', type=float, default=0.25, help="Held-out share of the data")
+    parser.add_argument('--l2', type=float, default=1.0, help="L2 regularization strength")
+    parser.add_argument('--seed', type=int, default=13, help="Split seed")
+    args = parser.parse_args()
+
+    print("🧠 RISK MODEL TRAINING")
+    print("=" * 50)
+
+    records = []
+    for path in args.jsonl:
+        loaded = load_jsonl_records(path, args.label_field)
+        print(f"📄 {path}: {len(loaded)} labelled records")
+        records.extend(loaded)
+    if args.mongo:
+        loaded = load_mongo_records(args.label_field, args.mongo_limit)
+        print(f"🗄️ MongoDB: {len(loaded)} labelled calls")
+        records.extend(loaded)
+
+    X = build_feature_matrix(records)
+    if args.feature_store:
+        store_X, store_rows = load_store_rows(args.feature_store, args.label_field)
+        print(f"🗃️ Feature store: {len(store_rows)} labelled calls")
+        X = np.vstack([X, store_X])
+        records.extend(store_rows)
+
+    if not records:
+        print("❌ No labelled records found")
+        return 1
+
+    labels = np.array([parse_label(record.get(args.label_field)) for record in records])
+    print(f"📐 Feature matrix: {X.shape[0]} calls x {X.shape[1]} features")
+
+    if args.evaluate:
+        model = RiskModel.load(args.evaluate)
+        print(f"📦 Model {model.version} (threshold {model.threshold:.3f})")
+        print_metrics("🤖 Model", evaluate(labels, model.predict_proba(X), model.threshold))
+        print_metrics("📏 Heuristic", heuristic_metrics(records, labels))
+        return 0
+
+    if len(set(labels.tolist())) < 2:
+        print("❌ Training needs both scam and safe examples")
+        return 1
+
+    train, test = split_indices(labels, args.test_fraction, args.seed)
+    model = RiskModel.fit(X[train], labels[train], l2=args.l2)
+    print(f"✅ Fitted on {len(train)} calls, decision threshold {model.threshold:.3f}")
+
+    print_metrics("🎯 Train", evaluate(labels[train], model.predict_proba(X[train]), model.threshold))
+    if len(test):
+        test_metrics = evaluate(labels[test], model.predict_proba(X[test]), model.threshold)
+        print_metrics("🤖 Model (held out)", test_metrics)
+        print_metrics("📏 Heuristic (held out)", heuristic_metrics([records[i] for i in test], labels[test]))
+        model.metrics = test_metrics
+
+    print("\n🔍 Strongest features:")
+    for i in np.argsort(-np.abs(model.weights))[:8]:
+        print(f"   {FEATURE_NAMES[i]}: {model.weights[i]:+.3f}")
+
+    path = model.save(args.output)
+    print(f"\n💾 Saved model {model.version} to {path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
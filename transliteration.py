@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Token transducer for mixed Hindi/English transcripts
+
+Hindi STT writes English words in Devanagari ("आई एम गोइंग" for "I am
+going"). The mapping lives in lexicons/transliteration_hi_en.json and is
+compiled once into a token trie. Matches are greedy longest-first, keys
+may span several tokens and values may expand to several.
+
+Only display text (full_text, speaker_text) is rewritten. The STT word
+list stays as transcribed: the scorers read it, native-script phrases
+("मैं बैंक से हूं") contain mapped tokens, and other scripts are matched
+by phonetic key instead.
+
+Tokens the mapping does not cover can be handed to a fallback; the shared
+transducer uses phonetic_keys.english_spelling, so Devanagari or Bengali
+renderings of lexicon words ("पासवर्ड") read as English.
+"""
+
+import os
+import json
+import unicodedata
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_TRANSLITERATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                            'lexicons', 'transliteration_hi_en.json')
+
+# Punctuation kept around a token when it is replaced (same set the old string pass stripped)
+EDGE_PUNCTUATION = '.,!?;:'
+
+_END = object()  # trie key marking the end of a mapping
+
+class TokenTransducer:
+    """Greedy longest-match token rewriter compiled from a source -> target mapping"""
+
+    def __init__(self, mappings: Dict[str, str], version: str = 'unversioned',
+                 fallback: Optional[Callable[[str], Optional[str]]] = None):
+        self.version = version
+        self.fallback = fallback
+        self._trie: Dict = {}
+        self.max_tokens = 0
+        for source, target in mappings.items():
+            tokens = tuple(self._key(token) for token in source.split())
+            if not tokens:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = tuple(target.split())
+            self.max_tokens = max(self.max_tokens, len(tokens))
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return unicodedata.normalize('NFC', token)
+
+    def _match(self, keys: List[str], start: int) -> Tuple[int, Optional[Tuple[str, ...]]]:
+        """Longest mapping starting at keys[start]: (tokens consumed, replacement)"""
+        node = self._trie
+        best_length, best_target = 0, None
+        for offset in range(min(self.max_tokens, len(keys) - start)):
+            node = node.get(keys[start + offset])
+            if node is None:
+                break
+            if _END in node:
+                best_length, best_target = offset + 1, node[_END]
+        return best_length, best_target
+
+    def transduce_tokens(self, tokens: List[str]) -> List[str]:
+        """Rewrite a token list, keeping punctuation at the edges of replaced spans"""
+        keys = [self._key(token.strip(EDGE_PUNCTUATION)) for token in tokens]
+        output = []
+        i = 0
+        while i < len(tokens):
+            length, target = self._match(keys, i)
+            if not length:
+                replacement = self.fallback(keys[i]) if self.fallback and keys[i] else None
+                if replacement is None:
+                    output.append(tokens[i])
+                    i += 1
+                    continue
+                length, target = 1, (replacement,)
+            replaced = list(target)
+            suffix = tokens[i + length - 1][len(tokens[i + length - 1].rstrip(EDGE_PUNCTUATION)):]
+            if replaced and suffix:
+                replaced[-1] += suffix
+            output.extend(replaced)
+            i += length
+        return output
+
+    def transduce_text(self, text: str) -> str:
+        return ' '.join(self.transduce_tokens(text.split()))
+
+def load_transducer(path: Optional[str] = None,
+                    fallback: Optional[Callable[[str], Optional[str]]] = None) -> TokenTransducer:
+    """Compile a transliteration mapping file"""
+    path = path or os.getenv('TRANSLITERATION_PATH', DEFAULT_TRANSLITERATION_PATH)
+    with open(path, 'r', encoding='utf-8') as mapping_file:
+        data = json.load(mapping_file)
+    return TokenTransducer(data.get('mappings', {}), version=str(data.get('version', 'unversioned')),
+                           fallback=fallback)
+
+_transducer: Optional[TokenTransducer] = None
+
+def get_transducer() -> TokenTransducer:
+    """Shared transducer, compiled on first use"""
+    global _transducer
+    if _transducer is None:
+        from phonetic_keys import english_spelling
+        _transducer = load_transducer(fallback=english_spelling)
+    return _transducer
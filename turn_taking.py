@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Turn-taking and interruption features from diarized word timings
+
+Works on a WordTable in O(n): turns are runs of consecutive words by one
+speaker, found with a single np.diff over the speaker column, and every
+per-speaker statistic is a bincount / maximum.at over the turn arrays.
+
+Per speaker:
+- turns, mean and longest turn (seconds and words)
+- response latency: mean pause before taking the floor from someone else
+- overlaps: turns that start before the previous speaker's last word ended
+- interruptions: turns taken with less than `interruption_gap` of silence
+  (overlaps included)
+- talk-time ratio and speaking rate (words per second of speech)
+
+conversation_pressure() folds these into a 0..1 score for the pattern
+typical of scam calls: one party holding the floor in long, fast
+monologues and cutting the other side off.
+"""
+
+from typing import Dict, Hashable
+
+import numpy as np
+
+from word_table import WordTable
+
+# Pressure score thresholds (seconds, words per second, ratios)
+DOMINANCE_START = 0.5        # talk-time share where dominance starts counting
+DOMINANCE_FULL = 0.9
+MONOLOGUE_FULL_SECONDS = 30.0
+RATE_START = 2.5
+RATE_FULL = 4.0
+PRESSURE_WEIGHTS = {'dominance': 0.4, 'monologue': 0.3, 'rate': 0.15, 'interruptions': 0.15}
+
+# Share of the keyword risk score that pressure can add (only when keywords were found)
+PRESSURE_RISK_WEIGHT = 0.1
+
+def analyze_turn_taking(table: WordTable, interruption_gap: float = 0.2) -> Dict[Hashable, Dict]:
+    """Turn-taking features per speaker label (empty dict for an empty table)"""
+    if not len(table):
+        return {}
+
+    speakers = table.speaker_count
+    first = table.turn_starts()
+    last = np.append(first[1:] - 1, len(table) - 1)
+    turn_speaker = table.speakers[first]
+    turn_start = table.starts[first]
+    turn_end = table.ends[last]
+    turn_seconds = np.clip(turn_end - turn_start, 0.0, None)
+    turn_words = last - first + 1
+
+    # Gap before each turn after the first; negative means the turns overlap
+    gaps = turn_start[1:] - turn_end[:-1]
+    takers = turn_speaker[1:]
+    latency_sum = np.bincount(takers, weights=np.clip(gaps, 0.0, None), minlength=speakers)
+    responses = np.bincount(takers, minlength=speakers)
+    overlaps = np.bincount(takers[gaps < 0], minlength=speakers)
+    interruptions = np.bincount(takers[gaps < interruption_gap], minlength=speakers)
+
+    turns = np.bincount(turn_speaker, minlength=speakers)
+    turn_seconds_sum = np.bincount(turn_speaker, weights=turn_seconds, minlength=speakers)
+    longest_turn = np.zeros(speakers)
+    np.maximum.at(longest_turn, turn_speaker, turn_seconds)
+    longest_turn_words = np.zeros(speakers, dtype=np.int64)
+    np.maximum.at(longest_turn_words, turn_speaker, turn_words)
+
+    talk = table.talk_time()
+    words = table.word_counts()
+    total_talk = float(talk.sum()) or 1.0
+
+    features = {}
+    for code, label in enumerate(table.speaker_labels):
+        features[label] = {
+            'turns': int(turns[code]),
+            'mean_turn_seconds': round(float(turn_seconds_sum[code] / turns[code]), 3) if turns[code] else 0.0,
+            'longest_turn_seconds': round(float(longest_turn[code]), 3),
+            'longest_turn_words': int(longest_turn_words[code]),
+            'mean_response_latency': round(float(latency_sum[code] / responses[code]), 3) if responses[code] else None,
+            'overlaps': int(overlaps[code]),
+            'interruptions': int(interruptions[code]),
+            'talk_time': round(float(talk[code]), 3),
+            'talk_time_ratio': round(float(talk[code]) / total_talk, 3),
+            'speaking_rate': round(float(words[code] / talk[code]), 3) if talk[code] > 0 else 0.0
+        }
+    return features
+
+def conversation_pressure(speaker_features: Dict) -> float:
+    """0..1 score for floor-holding pressure by one speaker (see module docstring)"""
+    dominance = np.clip((speaker_features['talk_time_ratio'] - DOMINANCE_START) / (DOMINANCE_FULL - DOMINANCE_START), 0.0, 1.0)
+    monologue = np.clip(speaker_features['longest_turn_seconds'] / MONOLOGUE_FULL_SECONDS, 0.0, 1.0)
+    rate = np.clip((speaker_features['speaking_rate'] - RATE_START) / (RATE_FULL - RATE_START), 0.0, 1.0)
+    turns = speaker_features['turns']
+    interruptions = speaker_features['interruptions'] / turns if turns else 0.0
+
+    score = (PRESSURE_WEIGHTS['dominance'] * dominance +
+             PRESSURE_WEIGHTS['monologue'] * monologue +
+             PRESSURE_WEIGHTS['rate'] * rate +
+             PRESSURE_WEIGHTS['interruptions'] * min(interruptions, 1.0))
+    return round(float(score), 3)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Voice-print index for repeat-caller matching
+
+Per-speaker embeddings (one per diarized speaker per call) are stored
+L2-normalized in an append-only float32 file that is memory-mapped for
+search, so the index is never loaded into RAM as a whole (append_store.py
+handles the files, locking and crash-safe appends):
+
+    meta.json           dim, embedder name, vector count, IVF state
+    vectors.f32         (count, dim) float32, row i = vector id i
+    entries.jsonl       one metadata line per vector (analysis_id, speaker, verdict, ...)
+    entry_offsets.u64   byte offset of each entries.jsonl line, for random access
+    ivf_*.npy           optional inverted-file partitioning (build_ivf)
+
+search() is exact cosine top-k by default: the matrix is scanned in
+blocks of rows, each block is one BLAS matrix product against all queries,
+and a running top-k is kept with argpartition. After build_ivf() only the
+nprobe closest partitions are scanned, plus any vectors appended since the
+partitioning was built, which keeps search fast at millions of vectors.
+
+Embeddings that are not centered by construction (the MFCC mean/std
+prints of the fallback analyzer, where every speaker has cosine ~0.9 with
+every other) are indexed with standardize=True: rows are stored raw,
+meta.json keeps running per-dimension sums, and search compares
+(x - mean) / std of the indexed population, so cosine measures how a voice
+deviates from the other callers. Such an index only reports matches once it
+holds MIN_STANDARDIZE_VECTORS vectors.
+
+The index is enabled by setting VOICE_INDEX_DIR; each embedder gets its
+own sub-directory because vectors from different models are not comparable,
+and each analyzer declares the similarity its prints need for a match
+(match_threshold).
+
+Usage:
+    python voice_index.py stats
+    python voice_index.py build-ivf --lists 1024
+"""
+
+import os
+import sys
+import argparse
+import threading
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from append_store import AppendStore
+from pipeline_metrics import get_logger
+
+logger = get_logger('voice_index')
+
+SEARCH_BLOCK_ROWS = 262144
+DEFAULT_MATCH_THRESHOLD = float(os.getenv('VOICE_MATCH_THRESHOLD', '0.85'))
+MIN_STANDARDIZE_VECTORS = int(os.getenv('VOICE_INDEX_MIN_POPULATION', '50'))
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """float32 copy with unit-length rows (zero rows stay zero)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def speaker_audio(audio: np.ndarray, words: Sequence[Dict], sr: int, max_seconds: float = 30.0,
+                  min_seconds: float = 1.0) -> Dict[Hashable, np.ndarray]:
+    """
+    Concatenate each diarized speaker's turns into one clip
+
+    Consecutive words of one speaker form a turn; turns are cut from the
+    call audio by their word timings. Speakers with less than min_seconds
+    of speech are left out, and every clip is capped at max_seconds.
+    """
+    turns: Dict[Hashable, List[tuple]] = {}
+    current_speaker, start, end = None, None, None
+    for word in words:
+        speaker = word.get('speaker_tag', 0)
+        if speaker != current_speaker:
+            if current_speaker is not None:
+                turns.setdefault(current_speaker, []).append((start, end))
+            current_speaker, start = speaker, word.get('start_time') or 0.0
+        end = word.get('end_time') or start
+    if current_speaker is not None:
+        turns.setdefault(current_speaker, []).append((start, end))
+
+    limit = int(max_seconds * sr)
+    clips = {}
+    for speaker, spans in turns.items():
+        pieces = [audio[int(s * sr):int(e * sr)] for s, e in spans if e > s]
+        clip = np.concatenate(pieces)[:limit] if pieces else np.zeros(0, dtype=audio.dtype)
+        if len(clip) >= min_seconds * sr:
+            clips[speaker] = clip
+    return clips
+
+class VoiceIndex:
+    """Append-only, memory-mapped cosine index (see module docstring)"""
+
+    def __init__(self, directory: str, dim: Optional[int] = None, embedder: str = 'unknown',
+                 standardize: bool = False):
+        self.directory = directory
+        self._ivf = None
+        self._store = AppendStore(directory, 'entries.jsonl', 'entry_offsets.u64')
+
+        if self._store.meta is not None:
+            if dim is not None and dim != self.meta['dim']:
+                raise ValueError(f"Index at {directory} holds {self.meta['dim']}-d vectors, got {dim}")
+        else:
+            if dim is None:
+                raise ValueError(f"No index at {directory}; a dimension is needed to create one")
+            meta = {'dim': int(dim), 'embedder': embedder, 'ivf': None, 'created': datetime.utcnow().isoformat()}
+            if standardize:
+                meta.update(standardize=True, sum=[0.0] * int(dim), sum_sq=[0.0] * int(dim))
+            self._store.create(meta)
+
+    @property
+    def meta(self) -> Dict:
+        return self._store.meta
+
+    @property
+    def dim(self) -> int:
+        return self._store.dim
+
+    @property
+    def count(self) -> int:
+        return self._store.count
+
+    @property
+    def standardized(self) -> bool:
+        return bool(self.meta.get('standardize'))
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        """Rows in the space cosine is taken in: unit length, after population standardization if enabled"""
+        if not self.standardized:
+            return normalize_rows(vectors)
+        count = max(self.count, 1)
+        mean = np.asarray(self.meta['sum']) / count
+        variance = np.asarray(self.meta['sum_sq']) / count - mean ** 2
+        scale = np.sqrt(np.maximum(variance, 0.0))
+        scale[scale == 0] = 1.0
+        return normalize_rows((np.atleast_2d(np.asarray(vectors, dtype=np.float64)) - mean) / scale)
+
+    def add(self, vectors: np.ndarray, entries: Sequence[Dict]) -> List[int]:
+        """Append vectors with one metadata dict each; returns their ids"""
+        if self.standardized:
+            vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        else:
+            vectors = normalize_rows(vectors)
+        if vectors.shape[1] != self.dim or len(vectors) != len(entries):
+            raise ValueError(f"Expected {len(entries)} vectors of dim {self.dim}, got {vectors.shape}")
+
+        first_id = self._store.append(vectors, entries, self._update_population if self.standardized else None)
+        return list(range(first_id, first_id + len(vectors)))
+
+    @staticmethod
+    def _update_population(meta: Dict, vectors: np.ndarray):
+        """Running per-dimension sums behind standardized search"""
+        rows = vectors.astype(np.float64)
+        meta['sum'] = (np.asarray(meta['sum']) + rows.sum(axis=0)).tolist()
+        meta['sum_sq'] = (np.asarray(meta['sum_sq']) + (rows ** 2).sum(axis=0)).tolist()
+
+    def entry(self, vector_id: int) -> Dict:
+        """Metadata stored with one vector"""
+        return self._store.row(vector_id)
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[List[tuple]]:
+        """
+        Top-k (vector_id, cosine similarity) per query, best first
+
+        Exact unless an IVF partitioning exists and nprobe is given
+        (or VOICE_INDEX_NPROBE is set).
+        """
+        vectors, _ = self._store.mapped()
+        queries = self._prepare(queries)
+        if not len(vectors):
+            return [[] for _ in queries]
+        k = min(k, len(vectors))
+
+        nprobe = nprobe or int(os.getenv('VOICE_INDEX_NPROBE', '0'))
+        if nprobe and self.meta.get('ivf'):
+            return [self._search_ivf(query, k, nprobe, vectors) for query in queries]
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(vectors), SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+            if self.standardized:
+                block = self._prepare(block)
+            scores = queries @ block.T
+            ids = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_scores, best_ids = self._merge_top_k(np.hstack([best_scores, scores]),
+                                                      np.hstack([best_ids, ids]), k)
+        return [self._ranked(best_ids[q], best_scores[q]) for q in range(len(queries))]
+
+    @staticmethod
+    def _merge_top_k(scores: np.ndarray, ids: np.ndarray, k: int):
+        if scores.shape[1] <= k:
+            return scores, ids
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        return np.take_along_axis(scores, keep, axis=1), np.take_along_axis(ids, keep, axis=1)
+
+    @staticmethod
+    def _ranked(ids: np.ndarray, scores: np.ndarray) -> List[tuple]:
+        order = np.argsort(-scores)
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def _load_ivf(self):
+        if self._ivf is None or self._ivf['lists'] != self.meta['ivf']['lists']:
+            self._ivf = {
+                'lists': self.meta['ivf']['lists'],
+                'centroids': np.load(os.path.join(self.directory, 'ivf_centroids.npy')),
+                'ids': np.load(os.path.join(self.directory, 'ivf_ids.npy'), mmap_mode='r'),
+                'offsets': np.load(os.path.join(self.directory, 'ivf_offsets.npy'))
+            }
+        return self._ivf
+
+    def _search_ivf(self, query: np.ndarray, k: int, nprobe: int, vectors: np.ndarray) -> List[tuple]:
+        """Scan the nprobe nearest partitions plus vectors added after build_ivf"""
+        ivf = self._load_ivf()
+        probes = np.argsort(-(ivf['centroids'] @ query))[:nprobe]
+        candidates = [np.asarray(ivf['ids'][ivf['offsets'][p]:ivf['offsets'][p + 1]]) for p in probes]
+        candidates.append(np.arange(self.meta['ivf']['trained_count'], len(vectors)))
+        candidates = np.sort(np.concatenate(candidates))
+        if not len(candidates):
+            return []
+        candidate_vectors = np.asarray(vectors[candidates])
+        if self.standardized:
+            candidate_vectors = self._prepare(candidate_vectors)
+        scores = candidate_vectors @ query
+        top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+        return self._ranked(candidates[top], scores[top])
+
+    def build_ivf(self, lists: Optional[int] = None, iterations: int = 10, sample: int = 100000,
+                  seed: int = 0) -> Dict:
+        """
+        Partition the current vectors with spherical k-means
+
+        Centroids are trained on a random sample, then every vector is
+        assigned block by block. Vectors appended later are searched
+        exhaustively until the partitioning is rebuilt.
+        """
+        vectors, _ = self._store.mapped()
+        count = len(vectors)
+        lists = lists or max(1, int(np.sqrt(count)))
+        if count < lists:
+            raise ValueError(f"Need at least {lists} vectors to build {lists} partitions, have {count}")
+
+        rng = np.random.default_rng(seed)
+        training = np.asarray(vectors[np.sort(rng.choice(count, size=min(sample, count), replace=False))])
+        if self.standardized:
+            training = self._prepare(training)
+        centroids = training[rng.choice(len(training), size=lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(training @ centroids.T, axis=1)
+            for c in range(lists):
+                members = training[assignment == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = normalize_rows(centroids)
+
+        assignment = np.empty(count, dtype=np.int64)
+        for start in range(0, count, SEARCH_BLOCK_ROWS):
+            block = np.asarray(vectors[start:start + SEARCH_BLOCK_ROWS])
+            if self.standardized:
+                block = self._prepare(block)
+            assignment[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=lists))))
+        np.save(os.path.join(self.directory, 'ivf_centroids.npy'), centroids)
+        np.save(os.path.join(self.directory, 'ivf_ids.npy'), order)
+        np.save(os.path.join(self.directory, 'ivf_offsets.npy'), offsets)
+
+        with self._store.lock():
+            self._store.refresh()
+            self.meta['ivf'] = {'lists': lists, 'trained_count': count, 'built': datetime.utcnow().isoformat()}
+            self._store.write_meta()
+        self._ivf = None
+        logger.info("Voice index partitioned", extra={'lists': lists, 'vectors': count})
+        return self.meta['ivf']
+
+    def match(self, embedding: np.ndarray, k: int = 50, threshold: float = DEFAULT_MATCH_THRESHOLD) -> Dict:
+        """
+        Prior calls whose stored voices are at least `threshold` similar
+
+        Counts distinct calls, and how many of them were scam calls in which
+        the matched speaker was the one flagged as the likely scammer. A
+        standardized index too small to estimate its population matches nothing.
+        """
+        self._store.refresh()
+        if self.standardized and self.count < MIN_STANDARDIZE_VECTORS:
+            hits = []
+        else:
+            hits = [(vector_id, score) for vector_id, score in self.search(embedding, k)[0] if score >= threshold]
+        calls: Dict[str, Dict] = {}
+        for vector_id, score in hits:
+            entry = self.entry(vector_id)
+            call_id = entry.get('analysis_id') or f"vector:{vector_id}"
+            if call_id not in calls or calls[call_id]['similarity'] < score:
+                calls[call_id] = {
+                    'analysis_id': entry.get('analysis_id'),
+                    'speaker': entry.get('speaker'),
+                    'similarity': round(score, 4),
+                    'scam_detected': bool(entry.get('scam_detected')) and bool(entry.get('is_potential_scammer', True)),
+                    'timestamp': entry.get('timestamp')
+                }
+        scam_calls = sum(1 for call in calls.values() if call['scam_detected'])
+        return {
+            'matched_calls': len(calls),
+            'scam_calls': scam_calls,
+            'known_scam_voice': scam_calls > 0,
+            'message': f"This voice matched {scam_calls} prior scam call{'s' if scam_calls != 1 else ''}" if scam_calls else None,
+            'top_matches': sorted(calls.values(), key=lambda call: -call['similarity'])[:5]
+        }
+
+_indexes: Dict[str, VoiceIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_voice_index(embedder: str, dim: int, standardize: bool = False) -> Optional[VoiceIndex]:
+    """Index for one embedder under VOICE_INDEX_DIR, or None when voice matching is disabled"""
+    root = os.getenv('VOICE_INDEX_DIR')
+    if not root:
+        return None
+    with _indexes_lock:
+        if embedder not in _indexes:
+            _indexes[embedder] = VoiceIndex(os.path.join(root, embedder), dim=dim, embedder=embedder,
+                                            standardize=standardize)
+        return _indexes[embedder]
+
+def main():
+    """Inspect or partition the voice index from the command line"""
+    parser = argparse.ArgumentParser(description="Voice-print index maintenance")
+    parser.add_argument('command', choices=['stats', 'build-ivf'])
+    parser.add_argument('--dir', default=os.getenv('VOICE_INDEX_DIR'), help="Index root (default: VOICE_INDEX_DIR)")
+    parser.add_argument('--embedder', help="Embedder sub-directory (default: every one found)")
+    parser.add_argument('--lists', type=int, default=None, help="IVF partitions (default: sqrt(count))")
+    args = parser.parse_args()
+
+    if not args.dir or not os.path.isdir(args.dir):
+        print("❌ No voice index directory (set VOICE_INDEX_DIR or pass --dir)")
+        return 1
+
+    embedders = [args.embedder] if args.embedder else sorted(
+        name for name in os.listdir(args.dir) if os.path.exists(os.path.join(args.dir, name, 'meta.json'))
+    )
+    for embedder in embedders:
+        index = VoiceIndex(os.path.join(args.dir, embedder))
+        if args.command == 'build-ivf':
+            ivf = index.build_ivf(args.lists)
+            print(f"✅ {embedder}: {ivf['trained_count']} vectors in {ivf['lists']} partitions")
+        else:
+            ivf = index.meta.get('ivf')
+            size_mb = index.count * index.dim * 4 / 1024 / 1024
+            print(f"🎙️ {embedder}: {index.count} vectors x {index.dim} dims ({size_mb:.1f} MB)"
+                  f"{', IVF ' + str(ivf['lists']) + ' lists' if ivf else ', exhaustive search'}"
+                  f"{', standardized' if index.standardized else ''}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Columnar view of a diarized word stream
+
+WordTable converts the STT word list in a single pass into parallel arrays:
+
+    tokens      original words (list of str)
+    token_ids   int32 ids into `vocabulary` (normalized tokens)
+    speakers    int32 speaker codes into `speaker_labels`
+    starts/ends float64 word timings in seconds
+
+Per-speaker views, talk time, turn counts and keyword hits are then
+vectorized NumPy operations instead of repeated dict walks and string joins.
+Keyword membership (and any phonetic lookup) is evaluated once per distinct
+token, not once per word.
+"""
+
+from typing import Callable, Dict, FrozenSet, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+from scam_lexicon import normalize_token
+
+class WordTable:
+    """Parallel arrays over one call's words (see module docstring)"""
+
+    __slots__ = ('tokens', 'token_ids', 'vocabulary', 'speakers', 'speaker_labels', 'starts', 'ends')
+
+    def __init__(self, words: Sequence[Dict], default_speaker: Hashable = 0):
+        count = len(words)
+        self.tokens: List[str] = [''] * count
+        self.token_ids = np.empty(count, dtype=np.int32)
+        self.speakers = np.empty(count, dtype=np.int32)
+        self.starts = np.empty(count, dtype=np.float64)
+        self.ends = np.empty(count, dtype=np.float64)
+        self.vocabulary: List[str] = []
+        self.speaker_labels: List[Hashable] = []
+
+        vocab_index: Dict[str, int] = {}
+        speaker_index: Dict[Hashable, int] = {}
+        for i, word in enumerate(words):
+            token = word['word']
+            self.tokens[i] = token
+
+            key = normalize_token(token)
+            token_id = vocab_index.get(key)
+            if token_id is None:
+                token_id = vocab_index[key] = len(self.vocabulary)
+                self.vocabulary.append(key)
+            self.token_ids[i] = token_id
+
+            label = word.get('speaker_tag')
+            if label is None:
+                label = default_speaker
+            code = speaker_index.get(label)
+            if code is None:
+                code = speaker_index[label] = len(self.speaker_labels)
+                self.speaker_labels.append(label)
+            self.speakers[i] = code
+
+            self.starts[i] = word.get('start_time') or 0.0
+            self.ends[i] = word.get('end_time') or self.starts[i]
+
+    def __len__(self):
+        return len(self.tokens)
+
+    @property
+    def speaker_count(self) -> int:
+        return len(self.speaker_labels)
+
+    @property
+    def durations(self) -> np.ndarray:
+        return np.clip(self.ends - self.starts, 0.0, None)
+
+    def speaker_mask(self, code: int) -> np.ndarray:
+        return self.speakers == code
+
+    def speaker_tokens(self, code: int, normalized: bool = False) -> List[str]:
+        """Words of one speaker, in order"""
+        indices = np.flatnonzero(self.speakers == code)
+        if normalized:
+            return [self.vocabulary[token_id] for token_id in self.token_ids[indices]]
+        return [self.tokens[i] for i in indices]
+
+    def word_counts(self) -> np.ndarray:
+        return np.bincount(self.speakers, minlength=self.speaker_count)
+
+    def talk_time(self) -> np.ndarray:
+        """Seconds spoken per speaker code"""
+        return np.bincount(self.speakers, weights=self.durations, minlength=self.speaker_count)
+
+    def turn_starts(self) -> np.ndarray:
+        """Indices of the first word of every turn (a run of words by one speaker)"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(([0], np.flatnonzero(np.diff(self.speakers)) + 1))
+
+    def turn_counts(self) -> np.ndarray:
+        """Number of turns per speaker code"""
+        return np.bincount(self.speakers[self.turn_starts()], minlength=self.speaker_count)
+
+    def resolve_vocabulary(self, terms: FrozenSet[str],
+                           resolve: Optional[Callable[[str], Optional[str]]] = None) -> List[Optional[str]]:
+        """
+        Matching term per vocabulary entry (None = no match)
+
+        Without `resolve` a token matches when it is in `terms`. `resolve`
+        maps a token to a canonical term (e.g. the English spelling of a
+        Devanagari or Bengali variant) and is called once per distinct token.
+        """
+        matched: List[Optional[str]] = []
+        for token in self.vocabulary:
+            term = resolve(token) if resolve is not None else None
+            if term is None and token in terms:
+                term = token
+            matched.append(term)
+        return matched
+
+    def hit_mask(self, terms: FrozenSet[str], resolve: Optional[Callable[[str], Optional[str]]] = None) -> np.ndarray:
+        """Boolean array marking words whose normalized token is in `terms` (or resolves to a term)"""
+        matched = self.resolve_vocabulary(terms, resolve)
+        vocab_hits = np.fromiter((term is not None for term in matched), dtype=bool, count=len(matched))
+        return vocab_hits[self.token_ids] if len(self) else np.zeros(0, dtype=bool)
+
+    def keyword_hits(self, terms: FrozenSet[str],
+                     resolve: Optional[Callable[[str], Optional[str]]] = None) -> Dict[int, List[str]]:
+        """Matching terms per speaker code, in word order (canonical terms when `resolve` is given)"""
+        matched = self.resolve_vocabulary(terms, resolve)
+        result: Dict[int, List[str]] = {code: [] for code in range(self.speaker_count)}
+        if not len(self):
+            return result
+        vocab_hits = np.fromiter((term is not None for term in matched), dtype=bool, count=len(matched))
+        for index in np.flatnonzero(vocab_hits[self.token_ids]):
+            result[int(self.speakers[index])].append(matched[self.token_ids[index]])
+        return result
+
+    def speaker_summary(self) -> Dict[Hashable, Dict]:
+        """Word count, talk time and turns per speaker label"""
+        words = self.word_counts()
+        talk = self.talk_time()
+        turns = self.turn_counts()
+        return {
+            label: {
+                'word_count': int(words[code]),
+                'talk_time': round(float(talk[code]), 3),
+                'turns': int(turns[code])
+            }
+            for code, label in enumerate(self.speaker_labels)
+        }
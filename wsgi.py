@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Production WSGI entry point for the Scam Detection API
+
+Importing this module builds every heavy object once (CompleteScamDetector,
+Mozilla voice analyzer, Mongo models) and warms them up. With
+`preload_app = True` in gunicorn.conf.py this happens in the master before
+forking, so worker processes share the loaded model pages copy-on-write
+instead of each loading its own copy.
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from api_server import app, warm_up
+
+warm_up()
+
+__all__ = ['app']